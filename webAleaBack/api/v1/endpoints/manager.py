@@ -6,6 +6,7 @@ from fastapi import APIRouter
 from pydantic import BaseModel, Field
 
 from model.utils.conda_utils import Conda
+from model.openalea.runner.openalea_runner import OpenAleaRunner
 from core.config import settings
 
 router = APIRouter()
@@ -85,4 +86,7 @@ def install_packages_in_env(request: InstallRequest):
 
     results = Conda.install_package_list(env_name, package_list)
     logging.info("Installation results: %s", results)
+    if results.get("installed"):
+        # Warm workers imported OpenAlea before the install and would not see it
+        OpenAleaRunner.reset_workers()
     return results
@@ -1,14 +1,34 @@
 """"API endpoints for running openalea workflows."""
-from typing import List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Any
+import asyncio
+import json
 import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from core.config import settings
+from model.openalea.cache.janitor import get_cache_janitor
+from model.openalea.cache.object_cache import cache_load, cache_stats
+from model.openalea.runner.execution_registry import get_execution_registry
+from model.openalea.runner.job_manager import TERMINAL_STATES, get_job_manager
 from model.openalea.runner.openalea_runner import OpenAleaRunner
+from model.openalea.runner.result_cache import get_result_cache
+from model.openalea.runner.utils.serialization import serialize_collection_slice
 
 router = APIRouter()
 
+# Seconds between client disconnect checks while an execution is running.
+DISCONNECT_POLL_INTERVAL = 0.5
+
 
 class NodeExecutionInput(BaseModel):
     """Input parameter for node execution."""
@@ -30,6 +50,38 @@ class NodeExecutionRequest(BaseModel):
             {"id": "in_1", "name": "b", "type": "float", "value": 3},
         ],
     )
+    use_cache: bool = Field(
+        True,
+        description="Allow memoized results; set to false for non-deterministic nodes.",
+    )
+    execution_id: Optional[str] = Field(
+        None,
+        description="Client-chosen id used to cancel the execution with POST /cancel/{execution_id}.",
+        example="run-42-node_1",
+    )
+
+
+class JobSubmitRequest(NodeExecutionRequest):
+    """Request model for submitting a node execution as an asynchronous job."""
+    timeout: Optional[int] = Field(
+        None,
+        description="Execution timeout in seconds, capped by RUNNER_JOB_MAX_TIMEOUT.",
+        example=1800,
+    )
+
+
+class BatchExecutionRequest(BaseModel):
+    """Request model for executing several independent nodes at once."""
+    requests: List[NodeExecutionRequest] = Field(..., min_length=1)
+    max_parallel: Optional[int] = Field(
+        None,
+        description="Upper bound on concurrent executions, capped by RUNNER_BATCH_MAX_PARALLEL.",
+        example=4,
+    )
+    stream: bool = Field(
+        False,
+        description="Stream one NDJSON line per node as soon as it completes.",
+    )
 
 
 class WorkflowExecutionRequest(BaseModel):
@@ -37,6 +89,115 @@ class WorkflowExecutionRequest(BaseModel):
     workflow_type: str = Field("dataflow", example="dataflow")
     nodes: List[dict] = Field(default_factory=list, example=[])
     edges: List[dict] = Field(default_factory=list, example=[])
+    return_nodes: Optional[List[str]] = Field(
+        None,
+        description="Node ids whose outputs are returned. Defaults to the sink nodes.",
+        example=["node_2"],
+    )
+    timeout: Optional[int] = Field(None, example=600)
+    execution_id: Optional[str] = Field(
+        None,
+        description="Client-chosen id used to cancel the execution with POST /cancel/{execution_id}.",
+        example="run-42",
+    )
+
+
+def _run_node_request(request: NodeExecutionRequest, **execute_options) -> dict:
+    """Execute a node request and build the endpoint response.
+
+    Args:
+        request (NodeExecutionRequest): Node execution request.
+        **execute_options: Extra ``OpenAleaRunner.execute_node`` options (timeout, on_log).
+    Returns:
+        response (dict): Response with success flag, node_id, outputs and error.
+    """
+    logging.info("Executing node: %s from package: %s", request.node_name, request.package_name)
+    logging.info("Inputs received: %s", request.inputs)
+
+    try:
+
+        # Convert inputs list to dict {name: value}
+        inputs_dict = {}
+        for inp in request.inputs:
+            # Use name as key if available, otherwise use id
+            key = inp.name if inp.name else inp.id
+            inputs_dict[key] = inp.value
+
+        logging.info("Inputs dict for execution: %s", inputs_dict)
+
+        # Execute node via subprocess
+        result = OpenAleaRunner.execute_node(
+            package_name=request.package_name,
+            node_name=request.node_name,
+            inputs=inputs_dict,
+            use_cache=request.use_cache,
+            execution_id=request.execution_id,
+            **execute_options
+        )
+
+        # Return response with node_id included
+        return {
+            "success": result.get("success", False),
+            "node_id": request.node_id,
+            "outputs": result.get("outputs", []),
+            "error": result.get("error")
+        }
+
+    except ValueError as e:
+        logging.error("Node execution error: %s", str(e))
+        return {
+            "success": False,
+            "node_id": request.node_id,
+            "outputs": [],
+            "error": str(e)
+        }
+    except (OSError, RuntimeError) as e:
+        logging.exception("Unexpected error during node execution")
+        return {
+            "success": False,
+            "node_id": request.node_id,
+            "outputs": [],
+            "error": str(e)
+        }
+
+
+def _with_execution_id(request):
+    """Return the request with an execution id, generating one if missing.
+
+    Args:
+        request (BaseModel): Request model with an ``execution_id`` field.
+    Returns:
+        request (BaseModel): Request whose ``execution_id`` is set.
+    """
+    if request.execution_id:
+        return request
+    return request.model_copy(update={"execution_id": uuid.uuid4().hex})
+
+
+async def _run_until_disconnected(http_request: Optional[Request], cancel: Callable[[], Any], func, *args):
+    """Run a blocking execution in the threadpool, cancelling it if the client goes away.
+
+    Args:
+        http_request (Optional[Request]): Incoming request, polled for disconnects.
+        cancel (Callable[[], Any]): Cancels the registered execution(s) run by ``func``.
+        func (Callable): Blocking function running the execution.
+        *args: Arguments of ``func``.
+    Returns:
+        response (Any): Return value of ``func``.
+    """
+    task = asyncio.ensure_future(run_in_threadpool(func, *args))
+    while http_request is not None and not task.done():
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if not done and await http_request.is_disconnected():
+            logging.warning("Client disconnected, cancelling its execution")
+            cancel()
+            break
+    return await task
+
+
+def _cancel_execution(execution_id: str) -> Callable[[], bool]:
+    """Return a callable cancelling one registered execution."""
+    return lambda: get_execution_registry().cancel(execution_id)
 
 
 @router.post(
@@ -59,7 +220,7 @@ class WorkflowExecutionRequest(BaseModel):
         }
     },
 )
-def execute_single_node(request: NodeExecutionRequest):
+async def execute_single_node(request: NodeExecutionRequest, http_request: Request = None):
     """Execute a single OpenAlea node with given inputs.
 
     Body format:
@@ -81,49 +242,488 @@ def execute_single_node(request: NodeExecutionRequest):
             {"index": 0, "name": "result", "value": 8, "type": "float"}
         ]
     }
+
+    The execution is killed if the client disconnects before it finishes.
     """
-    logging.info("Executing node: %s from package: %s", request.node_name, request.package_name)
-    logging.info("Inputs received: %s", request.inputs)
+    request = _with_execution_id(request)
+    return await _run_until_disconnected(
+        http_request, _cancel_execution(request.execution_id), _run_node_request, request
+    )
+
+def _batch_parallelism(requested: Optional[int], job_count: int) -> int:
+    """Compute the degree of parallelism for a batch.
+
+    Args:
+        requested (Optional[int]): Client-requested parallelism.
+        job_count (int): Number of nodes in the batch.
+    Returns:
+        parallelism (int): Number of concurrent executions to use.
+    """
+    limit = settings.RUNNER_BATCH_MAX_PARALLEL
+    if limit <= 0:
+        # Default: one execution per warm worker, or per core without a pool
+        limit = settings.RUNNER_POOL_SIZE if settings.RUNNER_POOL_SIZE > 0 else (os.cpu_count() or 1)
+    if requested:
+        limit = min(limit, requested)
+    return max(1, min(limit, job_count))
+
 
+def _run_batch_member(request: NodeExecutionRequest, stopped: threading.Event) -> dict:
+    """Execute one node of a batch, unless the batch was cancelled while it was queued."""
+    if stopped.is_set():
+        return {"success": False, "node_id": request.node_id, "outputs": [], "error": "Execution cancelled"}
+    return _run_node_request(request)
+
+
+def _cancel_batch(requests: List[NodeExecutionRequest], stopped: threading.Event) -> None:
+    """Stop a batch: queued nodes are skipped and running ones are killed.
+
+    Args:
+        requests (List[NodeExecutionRequest]): Batch requests, with their execution ids.
+        stopped (threading.Event): Event checked by each node before it starts.
+    Returns:
+        None (None): No return value.
+    """
+    stopped.set()
+    registry = get_execution_registry()
+    for request in requests:
+        if request.execution_id:
+            registry.cancel(request.execution_id)
+
+
+def _iter_batch_results(requests: List[NodeExecutionRequest], parallelism: int,
+                        stopped: Optional[threading.Event] = None):
+    """Execute node requests concurrently, yielding responses as they complete.
+
+    Closing the iterator before the last response cancels the batch
+    (``_cancel_batch``) instead of waiting for it.
+
+    Args:
+        requests (List[NodeExecutionRequest]): Node execution requests, with their execution ids.
+        parallelism (int): Maximum number of concurrent executions.
+        stopped (Optional[threading.Event]): Set to cancel the batch from outside.
+    Returns:
+        responses (Iterator[dict]): Node responses in completion order.
+    """
+    stopped = stopped or threading.Event()
+    executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="runner-batch")
+    futures = []
     try:
+        futures = [executor.submit(_run_batch_member, request, stopped) for request in requests]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Closed early when a streaming client disconnects: drop queued nodes
+        # and kill running ones instead of blocking the response task.
+        executor.shutdown(wait=False, cancel_futures=True)
+        if not all(future.done() for future in futures):
+            _cancel_batch(requests, stopped)
 
-        # Convert inputs list to dict {name: value}
-        inputs_dict = {}
-        for inp in request.inputs:
-            # Use name as key if available, otherwise use id
-            key = inp.name if inp.name else inp.id
-            inputs_dict[key] = inp.value
 
-        logging.info("Inputs dict for execution: %s", inputs_dict)
+@router.post(
+    "/execute/batch",
+    responses={
+        200: {
+            "description": "Batch execution results keyed by node id",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "results": {
+                            "node_1": {
+                                "success": True,
+                                "node_id": "node_1",
+                                "outputs": [
+                                    {"index": 0, "name": "result", "value": 8, "type": "float"}
+                                ],
+                                "error": None,
+                            }
+                        },
+                        "error": None,
+                    }
+                },
+                "application/x-ndjson": {
+                    "example": '{"success": true, "node_id": "node_1", "outputs": [...], "error": null}\n'
+                },
+            },
+        }
+    },
+)
+async def execute_node_batch(request: BatchExecutionRequest, http_request: Request = None):
+    """Execute several independent nodes concurrently.
 
-        # Execute node via subprocess
-        result = OpenAleaRunner.execute_node(
-            package_name=request.package_name,
-            node_name=request.node_name,
-            inputs=inputs_dict
+    Nodes run with a bounded degree of parallelism chosen by the server.
+    With ``stream`` set, each node response is sent as one NDJSON line as
+    soon as it completes; otherwise results are returned keyed by node id.
+    Each node gets its own execution id (``POST /cancel/{execution_id}``);
+    if the client disconnects, queued nodes are skipped and running ones killed.
+    """
+    node_ids = [req.node_id for req in request.requests]
+    if len(set(node_ids)) != len(node_ids):
+        return {"success": False, "results": {}, "error": "Batch node_ids must be unique"}
+
+    parallelism = _batch_parallelism(request.max_parallel, len(request.requests))
+    logging.info("Executing batch of %d nodes with parallelism=%d", len(request.requests), parallelism)
+    requests = [_with_execution_id(req) for req in request.requests]
+    stopped = threading.Event()
+    responses = _iter_batch_results(requests, parallelism, stopped)
+
+    if request.stream:
+        return StreamingResponse(
+            (json.dumps(response) + "\n" for response in responses),
+            media_type="application/x-ndjson",
         )
 
-        # Return response with node_id included
-        return {
-            "success": result.get("success", False),
-            "node_id": request.node_id,
-            "outputs": result.get("outputs", []),
-            "error": result.get("error")
+    results = await _run_until_disconnected(
+        http_request,
+        lambda: _cancel_batch(requests, stopped),
+        lambda: {response["node_id"]: response for response in responses},
+    )
+    return {
+        "success": all(response["success"] for response in results.values()),
+        "results": results,
+        "error": None
+    }
+
+
+@router.post(
+    "/workflow",
+    responses={
+        200: {
+            "description": "Workflow execution result",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "results": {
+                            "node_1": {"success": True},
+                            "node_2": {
+                                "success": True,
+                                "outputs": [
+                                    {"index": 0, "name": "result", "value": 8, "type": "float"}
+                                ],
+                            },
+                        },
+                        "error": None,
+                    }
+                }
+            },
         }
+    },
+)
+async def execute_workflow(request: WorkflowExecutionRequest, http_request: Request = None):
+    """Execute a whole workflow graph inside the backend.
 
-    except ValueError as e:
-        logging.error("Node execution error: %s", str(e))
+    Nodes are scheduled in topological order within a single OpenAlea
+    execution context, so intermediate values are passed as live Python
+    objects. Only the outputs of ``return_nodes`` (sink nodes by default)
+    are serialized in the response; other nodes only report their status.
+    The execution is killed if the client disconnects before it finishes.
+    """
+    logging.info(
+        "Executing workflow: %d nodes, %d edges, return_nodes=%s",
+        len(request.nodes), len(request.edges), request.return_nodes
+    )
+    if request.workflow_type != "dataflow":
         return {
             "success": False,
-            "node_id": request.node_id,
-            "outputs": [],
-            "error": str(e)
+            "results": {},
+            "error": f"Unsupported workflow type: {request.workflow_type}"
         }
-    except (OSError, RuntimeError) as e:
-        logging.exception("Unexpected error during node execution")
-        return {
-            "success": False,
-            "node_id": request.node_id,
-            "outputs": [],
-            "error": str(e)
+
+    request = _with_execution_id(request)
+    result = await _run_until_disconnected(
+        http_request,
+        _cancel_execution(request.execution_id),
+        lambda: OpenAleaRunner.execute_workflow(
+            nodes=request.nodes,
+            edges=request.edges,
+            return_nodes=request.return_nodes,
+            timeout=request.timeout or settings.RUNNER_WORKFLOW_TIMEOUT,
+            execution_id=request.execution_id,
+        ),
+    )
+    return {
+        "success": result.get("success", False),
+        "results": result.get("results", {}),
+        "error": result.get("error")
+    }
+
+
+@router.post(
+    "/cancel/{execution_id}",
+    responses={
+        200: {
+            "description": "Execution cancelled",
+            "content": {
+                "application/json": {"example": {"execution_id": "run-42-node_1", "cancelled": True}}
+            },
+        },
+        404: {"description": "No running execution with this id"},
+    },
+)
+def cancel_execution(execution_id: str):
+    """Cancel a running execution and kill its process group.
+
+    The cancelled request answers with ``{"success": false, "error": "Execution cancelled"}``.
+    """
+    if not get_execution_registry().cancel(execution_id):
+        raise HTTPException(status_code=404, detail=f"Execution '{execution_id}' is not running")
+    return {"execution_id": execution_id, "cancelled": True}
+
+
+@router.get(
+    "/cache/stats",
+    responses={
+        200: {
+            "description": "Node result cache statistics",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "enabled": True,
+                        "hits": 12,
+                        "misses": 4,
+                        "hit_rate": 0.75,
+                        "evictions": 0,
+                        "entries": 4,
+                        "bytes": 2048,
+                        "max_entries": 512,
+                        "max_bytes": 67108864,
+                    }
+                }
+            },
         }
+    },
+)
+def fetch_result_cache_stats():
+    """Return hit/miss counters and occupancy of the node result cache."""
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return {"enabled": False}
+    return result_cache.stats()
+
+
+@router.get(
+    "/object-cache/stats",
+    responses={
+        200: {
+            "description": "Occupancy and eviction counters of the object cache (shared by every process)",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "entries": 42,
+                        "bytes": 73400320,
+                        "max_bytes": 2147483648,
+                        "hits": 310,
+                        "evictions": 3,
+                        "evicted_bytes": 52428800,
+                        "expired": 12,
+                        "kinds": {
+                            "object": {"entries": 10, "bytes": 20971520},
+                            "scene_json": {"entries": 30, "bytes": 50331648},
+                            "scene_bin": {"entries": 2, "bytes": 2097152},
+                        },
+                        "janitor": {
+                            "running": True,
+                            "sweeps": 120,
+                            "removed": 12,
+                            "interval_seconds": 30,
+                            "max_deletes": 500,
+                        },
+                    }
+                }
+            },
+        }
+    },
+)
+def fetch_object_cache_stats():
+    """Return the occupancy, quota and eviction counters of the object cache and its janitor."""
+    stats = cache_stats()
+    janitor = get_cache_janitor()
+    stats["janitor"] = janitor.stats() if janitor is not None else {"running": False}
+    return stats
+
+
+# Collections loaded by /refs/{ref_id}/items, most recently paged last. Refs are
+# immutable, so a client paging through one unpickles it once instead of per page.
+_loaded_collections: "OrderedDict[str, Any]" = OrderedDict()
+_loaded_collections_lock = threading.Lock()
+
+
+def _load_collection(ref_id: str):
+    """Load a cached collection, reusing the copy kept from a previous page.
+
+    Args:
+        ref_id (str): Cache reference.
+    Returns:
+        value (Any): Cached value.
+    """
+    max_entries = settings.RUNNER_COLLECTION_CACHE_MAX_ENTRIES
+    with _loaded_collections_lock:
+        if ref_id in _loaded_collections:
+            _loaded_collections.move_to_end(ref_id)
+            return _loaded_collections[ref_id]
+    value = cache_load(ref_id)
+    if max_entries > 0 and isinstance(value, (list, tuple, dict)):
+        with _loaded_collections_lock:
+            _loaded_collections[ref_id] = value
+            while len(_loaded_collections) > max_entries:
+                _loaded_collections.popitem(last=False)
+    return value
+
+
+@router.get(
+    "/refs/{ref_id}/items",
+    responses={
+        200: {
+            "description": "Slice of a cached collection",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "ref": "c1f0a8e2",
+                        "type": "list",
+                        "length": 500000,
+                        "offset": 100,
+                        "items": [[1, 2], [3, 4]],
+                    }
+                }
+            },
+        },
+        404: {"description": "Unknown or expired ref"},
+    },
+)
+def fetch_collection_items(
+    ref_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Return a page of a large collection output stored as a ref.
+
+    Outputs above the inline budget are returned as
+    ``{"__type__", "__ref__", "length", "head"}``; this endpoint serves
+    the remaining items. Dict items are ``[key, value]`` pairs. The last
+    ``RUNNER_COLLECTION_CACHE_MAX_ENTRIES`` paged collections stay loaded.
+    """
+    try:
+        value = _load_collection(ref_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        logging.exception("Failed to load cached ref %s", ref_id)
+        raise HTTPException(status_code=500, detail=f"Cached value cannot be loaded: {e}") from e
+    if not isinstance(value, (list, tuple, dict)):
+        raise HTTPException(status_code=400, detail=f"Ref '{ref_id}' is not a collection")
+    return {
+        "ref": ref_id,
+        "type": type(value).__name__,
+        "length": len(value),
+        "offset": offset,
+        "items": serialize_collection_slice(value, offset, limit),
+    }
+
+
+@router.post(
+    "/jobs",
+    status_code=202,
+    responses={
+        202: {
+            "description": "Job accepted",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "job_id": "5b0c6f0e2d4b4a7f9c1e",
+                        "node_id": "node_1",
+                        "execution_id": "9d2e4c1a7b3f4e0d8a6c",
+                        "state": "queued",
+                    }
+                }
+            },
+        }
+    },
+)
+def submit_node_job(request: JobSubmitRequest):
+    """Submit a node execution as a background job and return its id immediately.
+
+    Follow the job with ``GET /jobs/{job_id}`` or the ``GET /jobs/{job_id}/events``
+    Server-Sent Events stream (state changes, stderr lines, final result).
+    """
+    timeout = min(request.timeout or settings.RUNNER_JOB_MAX_TIMEOUT, settings.RUNNER_JOB_MAX_TIMEOUT)
+    request = _with_execution_id(request)
+    job = get_job_manager().submit(
+        f"{request.package_name}.{request.node_name} ({request.node_id})",
+        lambda on_log: _run_node_request(request, timeout=timeout, on_log=on_log),
+    )
+    return {
+        "job_id": job.job_id,
+        "node_id": request.node_id,
+        "execution_id": request.execution_id,
+        "state": job.state,
+    }
+
+
+@router.get("/jobs/{job_id}")
+def fetch_node_job(job_id: str):
+    """Return the state of a job, including its result once finished."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    return job.snapshot()
+
+
+def _format_sse(event: dict) -> str:
+    """Format a job event as a Server-Sent Events frame.
+
+    Args:
+        event (dict): Job event with ``id``, ``event`` and ``data``.
+    Returns:
+        frame (str): SSE frame.
+    """
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _job_event_stream(job_id: str, after: int, poll_interval: float = 0.25,
+                            keepalive_interval: float = 15.0):
+    """Yield SSE frames for a job until it reaches a terminal state.
+
+    Polls the job manager instead of blocking so that open streams do not
+    occupy threadpool slots.
+
+    Args:
+        job_id (str): Job identifier.
+        after (int): Last event id already received by the client.
+        poll_interval (float): Seconds between polls.
+        keepalive_interval (float): Seconds between keep-alive comments.
+    Returns:
+        frames (AsyncIterator[str]): SSE frames.
+    """
+    manager = get_job_manager()
+    last_sent = time.monotonic()
+    while True:
+        for event in manager.events_since(job_id, after):
+            after = event["id"]
+            last_sent = time.monotonic()
+            yield _format_sse(event)
+            if event["event"] == "state" and event["data"].get("state") in TERMINAL_STATES:
+                return
+        if manager.get(job_id) is None:
+            return
+        if time.monotonic() - last_sent >= keepalive_interval:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(poll_interval)
+
+
+@router.get("/jobs/{job_id}/events")
+def stream_node_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Stream job events (``state``, ``log``, ``result``) as Server-Sent Events.
+
+    Reconnecting clients resume after the ``Last-Event-ID`` they received.
+    """
+    if get_job_manager().get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _job_event_stream(job_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,22 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+import json
 import logging
 import traceback
 
-from model.openalea.visualizer.utils.visualizer_service import resolve_visualization
-from model.openalea.cache.object_cache import (
-    cache_cleanup,
+from model.openalea.visualizer.utils.scene_binary import SCENE_BINARY_MEDIA_TYPE
+from model.openalea.visualizer.utils.tessellation_cache import get_tessellation_cache
+from model.openalea.visualizer.utils.visualizer_service import (
+    query_scene,
+    resolve_scene_binary,
+    resolve_scene_diff,
+    resolve_tile_binary,
+    resolve_tileset,
+    resolve_visualization,
+    stream_visualization,
 )
 
 router = APIRouter()
@@ -14,6 +25,12 @@ router = APIRouter()
 class VisualizationRequest(BaseModel):
     node_id: str
     visualization_data: dict = {}
+    # "preview", "medium", "full" or a scene triangle budget; None -> full resolution
+    lod: Optional[Union[int, str]] = None
+    # Merge static meshes into one mesh per material (see utils/batching.py)
+    batched: bool = False
+    # Scene ref of a previous run: return only the objects added, changed or removed since
+    diff_from: Optional[str] = None
 
 
 @router.post("/visualize")
@@ -28,8 +45,11 @@ def visualize_node(request: VisualizationRequest):
             len(payload.get("outputs", [])) if isinstance(payload.get("outputs"), list) else 0,
             bool(payload.get("scene_ref"))
         )
-        cache_cleanup()
-        return resolve_visualization(node_id, payload)
+        if request.diff_from:
+            return resolve_scene_diff(
+                node_id, payload, request.diff_from, lod=request.lod, batched=request.batched
+            )
+        return resolve_visualization(node_id, payload, lod=request.lod, batched=request.batched)
 
     except Exception as e:
         logging.exception("Visualizer endpoint error node=%s", request.node_id)
@@ -41,3 +61,162 @@ def visualize_node(request: VisualizationRequest):
         }
 
 
+class StreamVisualizationRequest(BaseModel):
+    node_id: str
+    visualization_data: dict = {}
+    # Objects per chunk; None -> VISUALIZER_STREAM_CHUNK_SHAPES
+    chunk_size: Optional[int] = None
+
+
+def _stream_lines(request: StreamVisualizationRequest):
+    try:
+        for message in stream_visualization(
+            request.node_id, request.visualization_data or {}, chunk_size=request.chunk_size
+        ):
+            yield json.dumps(message) + "\n"
+    except Exception as e:
+        logging.exception("Visualizer stream error node=%s", request.node_id)
+        yield json.dumps({"type": "error", "nodeId": request.node_id, "error": str(e)}) + "\n"
+
+
+@router.post("/visualize/stream")
+def visualize_node_stream(request: StreamVisualizationRequest):
+    """Stream a node scene as newline-delimited JSON messages.
+
+    Messages are ``{"type": "scene"}``, then one ``{"type": "chunk", "objects", "geometries"}``
+    per batch of tessellated objects, then ``{"type": "end", "objectCount"}``;
+    ``{"type": "error"}`` reports a failure. Concatenating the chunks gives the
+    scene returned by ``/visualize``, which is cached as a side effect.
+    """
+    if request.chunk_size is not None and request.chunk_size <= 0:
+        raise HTTPException(status_code=422, detail="chunk_size must be positive")
+    return StreamingResponse(_stream_lines(request), media_type="application/x-ndjson")
+
+
+@router.get("/scene/{scene_ref}.bin")
+def fetch_scene_binary(
+    scene_ref: str,
+    lod: Optional[str] = Query(None, description="preview, medium, full or a scene triangle budget"),
+    batched: bool = Query(False, description="Merge static meshes into one mesh per material"),
+    compact: bool = Query(False, description="Quantized positions, octahedral normals and welded meshes"),
+):
+    """Return a cached scene in the packed binary format (JSON header + typed buffer)."""
+    try:
+        data = resolve_scene_binary(scene_ref, lod=lod, batched=batched, compact=compact)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return Response(
+        content=data,
+        media_type=SCENE_BINARY_MEDIA_TYPE,
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
+
+
+@router.get("/scene/{scene_ref}/tileset")
+def fetch_scene_tileset(scene_ref: str):
+    """Return the octree tileset manifest of a cached scene, partitioning it on first request.
+
+    Clients walk ``tiles`` from ``root``, skip tiles whose ``bounds`` are out of view and fetch
+    ``/scene/{ref}/tiles/{id}.bin`` at the ``coarse`` or ``fine`` level depending on distance,
+    descending into ``children`` when a tile's fine level is not detailed enough.
+    """
+    try:
+        return resolve_tileset(scene_ref)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@router.get("/scene/{scene_ref}/tiles/{tile_id}.bin")
+def fetch_scene_tile_binary(
+    scene_ref: str,
+    tile_id: str,
+    level: str = Query("fine", description="coarse or fine"),
+    compact: bool = Query(False, description="Quantized positions, octahedral normals and welded meshes"),
+):
+    """Return one level of a scene tile in the packed binary format, producing it on first request."""
+    try:
+        data = resolve_tile_binary(scene_ref, tile_id, level=level, compact=compact)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return Response(
+        content=data,
+        media_type=SCENE_BINARY_MEDIA_TYPE,
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
+
+
+class QueryBox(BaseModel):
+    min: List[float] = Field(..., min_length=3, max_length=3)
+    max: List[float] = Field(..., min_length=3, max_length=3)
+
+
+class SceneQueryRequest(BaseModel):
+    box: Optional[QueryBox] = None
+    # Planes [a, b, c, d], inside where a*x + b*y + c*z + d >= 0 (e.g. a Three.js Frustum)
+    frustum: Optional[List[List[float]]] = None
+
+
+@router.post(
+    "/scene/{scene_ref}/query",
+    responses={
+        200: {
+            "description": "Ids of the scene objects intersecting the box or frustum",
+            "content": {
+                "application/json": {
+                    "example": {"sceneRef": "abc", "ids": ["2f1c...", "9a07..."], "count": 2}
+                }
+            },
+        }
+    },
+)
+def query_scene_objects(scene_ref: str, request: SceneQueryRequest):
+    """Return the objects of a cached scene whose bounding box intersects a box or frustum."""
+    if request.frustum is not None and any(len(plane) != 4 for plane in request.frustum):
+        raise HTTPException(status_code=422, detail="Frustum planes must have 4 coefficients")
+    try:
+        ids = query_scene(
+            scene_ref,
+            box=request.box.model_dump() if request.box else None,
+            frustum=request.frustum,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return {"sceneRef": scene_ref, "ids": ids, "count": len(ids)}
+
+
+@router.get(
+    "/tessellation-cache/stats",
+    responses={
+        200: {
+            "description": "Tessellation cache statistics of the API process",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "enabled": True,
+                        "hits": 940,
+                        "disk_hits": 50,
+                        "misses": 10,
+                        "hit_rate": 0.99,
+                        "evictions": 0,
+                        "entries": 60,
+                        "bytes": 1048576,
+                        "max_bytes": 134217728,
+                        "disk": True,
+                    }
+                }
+            },
+        }
+    },
+)
+def fetch_tessellation_cache_stats():
+    """Return hit/miss counters and occupancy of the tessellation cache."""
+    tessellation_cache = get_tessellation_cache()
+    if tessellation_cache is None:
+        return {"enabled": False}
+    return tessellation_cache.stats()
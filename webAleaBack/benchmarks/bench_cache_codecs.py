@@ -0,0 +1,115 @@
+"""Benchmark object cache codecs: write/read throughput versus disk footprint.
+
+Run from ``webAleaBack``:
+
+    python benchmarks/bench_cache_codecs.py --shapes 500
+
+Stores a synthetic scene JSON (``cache_store_scene_json``) and a pickled
+dict of NumPy arrays (``cache_store``) with every available codec, in a
+temporary cache dir (or ``--cache-dir``, e.g. on the NFS mount to measure),
+then with the default size-based policy (``auto``).
+Throughput is given in MiB/s of uncompressed content; ``lz4`` and ``zstd``
+are listed only when their packages are installed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.openalea.cache import object_cache  # noqa: E402
+from model.openalea.cache.codecs import DEFAULT_CODEC, available_codecs  # noqa: E402
+
+
+def _scene(shapes: int, resolution: int):
+    """Build a scene of curved triangle-soup grids, serialized like ``serialize_shape`` output."""
+    objects = []
+    for shape in range(shapes):
+        u, v = np.meshgrid(np.linspace(0, 1, resolution), np.linspace(0, 1, resolution))
+        points = np.column_stack([u.ravel(), v.ravel(), np.sin(3 * u.ravel() + shape)])
+        grid = np.arange(resolution * resolution).reshape(resolution, resolution)
+        triangles = np.concatenate([
+            np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 3),
+            np.stack([grid[1:, :-1], grid[:-1, 1:], grid[1:, 1:]], axis=-1).reshape(-1, 3),
+        ])
+        soup = points[triangles].reshape(-1, 3)
+        objects.append({
+            "id": str(shape),
+            "objectType": "mesh",
+            "geometry": {"type": "mesh", "vertices": soup.tolist(), "indices": np.arange(len(soup)).reshape(-1, 3).tolist()},
+            "material": {"color": [0.2, 0.6, 0.2], "opacity": 1.0},
+        })
+    return {"objects": objects}
+
+
+def _arrays(shapes: int, resolution: int):
+    """Build a dict of float arrays comparable to a pickled PlantGL point cloud."""
+    rng = np.random.default_rng(0)
+    return {f"organ_{i}": rng.normal(size=(resolution * resolution, 3)).cumsum(axis=0) for i in range(shapes)}
+
+
+def _time(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _bench(name, size, store, load, path_of, repeat):
+    write_time, ref_id = _time(store, repeat)
+    read_time, _ = _time(lambda: load(ref_id), repeat)
+    footprint = path_of(ref_id).stat().st_size
+    mib = size / (1024 * 1024)
+    print(
+        f"{name:<8}{footprint / 1024:12.1f} KiB {size / footprint:6.2f}x"
+        f"{mib / write_time:10.1f} MiB/s write{mib / read_time:10.1f} MiB/s read"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", type=int, default=500, help="Number of meshes / arrays.")
+    parser.add_argument("--resolution", type=int, default=24, help="Grid size per mesh.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is kept).")
+    parser.add_argument("--cache-dir", help="Cache dir to benchmark (default: a temporary directory).")
+    args = parser.parse_args()
+
+    scene = _scene(args.shapes, args.resolution)
+    arrays = _arrays(args.shapes, args.resolution)
+    scene_size = len(json.dumps(scene).encode("utf-8"))
+    pickle_size = len(pickle.dumps(arrays))
+
+    with tempfile.TemporaryDirectory(dir=args.cache_dir) as cache_dir:
+        os.environ["OPENALEA_CACHE_DIR"] = cache_dir
+        # Measure compression, not eviction or the size threshold
+        os.environ["OPENALEA_CACHE_MAX_BYTES"] = "0"
+        os.environ["OPENALEA_CACHE_COMPRESS_MIN_BYTES"] = "0"
+        print(f"scene json {scene_size / 1024:.1f} KiB, pickle {pickle_size / 1024:.1f} KiB")
+        # "auto" is the default size-based policy
+        for codec in [*available_codecs(), DEFAULT_CODEC]:
+            os.environ["OPENALEA_CACHE_CODEC"] = codec
+            print(f"-- {codec}")
+            _bench(
+                "scene", scene_size,
+                lambda: object_cache.cache_store_scene_json_new(scene),
+                object_cache.cache_load_scene_json, object_cache._scene_json_path, args.repeat,
+            )
+            _bench(
+                "pickle", pickle_size,
+                lambda: object_cache.cache_store(arrays),
+                object_cache.cache_load, object_cache._cache_path, args.repeat,
+            )
+
+
+if __name__ == "__main__":
+    main()
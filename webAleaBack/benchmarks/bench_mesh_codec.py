@@ -0,0 +1,122 @@
+"""Benchmark scene payload size and encoding time: JSON vs binary vs compact mesh codec.
+
+Run from ``webAleaBack``:
+
+    python benchmarks/bench_mesh_codec.py --shapes 200
+
+With PlantGL installed, the meshes are tessellated spheres serialized like
+``serialize_shape`` output (float64 nested lists, one vertex copy per face
+corner as emitted by the Tesselator). Without PlantGL (or with
+``--synthetic``), curved triangle-soup grids of the same size are used.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.openalea.visualizer.utils.mesh_codec import deflate_mesh, encode_mesh  # noqa: E402
+from model.openalea.visualizer.utils.scene_binary import encode_scene_binary  # noqa: E402
+
+
+def _plantgl_meshes(shapes: int, resolution: int):
+    """Tessellate PlantGL spheres into JSON meshes."""
+    from openalea.plantgl.all import Sphere
+
+    from model.openalea.visualizer.utils.plantgl import mesh_from_geometry
+
+    return [mesh_from_geometry(Sphere(1.0 + 0.01 * i, resolution, resolution)) for i in range(shapes)]
+
+
+def _synthetic_meshes(shapes: int, resolution: int):
+    """Build curved grids as triangle soups (three vertices per triangle)."""
+    meshes = []
+    for shape in range(shapes):
+        u, v = np.meshgrid(np.linspace(0, 1, resolution), np.linspace(0, 1, resolution))
+        points = np.column_stack([u.ravel(), v.ravel(), np.sin(3 * u.ravel() + shape)])
+        grid = np.arange(resolution * resolution).reshape(resolution, resolution)
+        triangles = np.concatenate([
+            np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 3),
+            np.stack([grid[1:, :-1], grid[:-1, 1:], grid[1:, 1:]], axis=-1).reshape(-1, 3),
+        ])
+        soup = points[triangles].reshape(-1, 3)
+        meshes.append({
+            "type": "mesh",
+            "vertices": soup.tolist(),
+            "indices": np.arange(len(soup)).reshape(-1, 3).tolist(),
+        })
+    return meshes
+
+
+def _scene(meshes):
+    material = {"color": [0.2, 0.6, 0.2], "opacity": 1.0}
+    return {
+        "objects": [
+            {"id": str(i), "objectType": "mesh", "geometry": mesh, "material": material}
+            for i, mesh in enumerate(meshes)
+        ]
+    }
+
+
+def _deflated(scene):
+    return sum(
+        len(deflate_mesh(encode_mesh(obj["geometry"]["vertices"], obj["geometry"]["indices"])))
+        for obj in scene["objects"]
+    )
+
+
+def _time(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", type=int, default=200, help="Number of meshes.")
+    parser.add_argument("--resolution", type=int, default=24, help="Slices/stacks (or grid size) per mesh.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is kept).")
+    parser.add_argument("--synthetic", action="store_true", help="Use synthetic meshes even if PlantGL is installed.")
+    args = parser.parse_args()
+
+    source = "synthetic"
+    if not args.synthetic:
+        try:
+            meshes = _plantgl_meshes(args.shapes, args.resolution)
+            source = "plantgl"
+        except ImportError:
+            print("PlantGL not available, falling back to synthetic meshes")
+    if source == "synthetic":
+        meshes = _synthetic_meshes(args.shapes, args.resolution)
+    scene = _scene(meshes)
+    triangles = sum(len(mesh["indices"]) for mesh in meshes)
+
+    rows = [
+        ("json", lambda: json.dumps(scene).encode("utf-8")),
+        ("json+gzip", lambda: gzip.compress(json.dumps(scene).encode("utf-8"), 6)),
+        ("binary", lambda: encode_scene_binary(scene)),
+        ("compact", lambda: encode_scene_binary(scene, compact=True)),
+        ("compact+gzip", lambda: gzip.compress(encode_scene_binary(scene, compact=True), 6)),
+    ]
+    print(f"source={source} shapes={args.shapes} triangles={triangles}")
+    json_size = None
+    for name, func in rows:
+        elapsed, data = _time(func, args.repeat)
+        json_size = json_size or len(data)
+        print(f"{name:<14}{len(data) / 1024:10.1f} KiB {json_size / len(data):6.1f}x {elapsed * 1000:9.1f} ms")
+    elapsed, size = _time(lambda: _deflated(scene), args.repeat)
+    print(f"{'delta+deflate':<14}{size / 1024:10.1f} KiB {json_size / size:6.1f}x {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
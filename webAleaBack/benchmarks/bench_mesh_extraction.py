@@ -0,0 +1,112 @@
+"""Benchmark PlantGL mesh extraction: per-point Python loop vs NumPy bulk path.
+
+Run from ``webAleaBack``:
+
+    python benchmarks/bench_mesh_extraction.py --triangles 200000
+
+With PlantGL installed, a synthetic ``TriangleSet`` scene is tessellated and
+both extraction paths are timed on its ``pointList``/``indexList``. Without
+PlantGL (or with ``--synthetic``), tuple-backed stand-ins are used, which
+only exercises the NumPy side of the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.openalea.visualizer.utils.mesh_arrays import indices_to_array, points_to_array  # noqa: E402
+
+
+class _Point(tuple):
+    """Tuple-backed stand-in for a PlantGL Vector3."""
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+
+def _plantgl_arrays(triangles: int, shapes: int):
+    """Tessellate a synthetic PlantGL scene and return its point/index arrays."""
+    from openalea.plantgl.all import Index3Array, Point3Array, Tesselator, TriangleSet
+
+    rng = np.random.default_rng(0)
+    per_shape = max(1, triangles // shapes)
+    arrays = []
+    for _ in range(shapes):
+        points = rng.random((per_shape * 3, 3))
+        mesh = TriangleSet(
+            Point3Array([tuple(p) for p in points.tolist()]),
+            Index3Array([(3 * i, 3 * i + 1, 3 * i + 2) for i in range(per_shape)]),
+        )
+        tesselator = Tesselator()
+        mesh.apply(tesselator)
+        arrays.append((tesselator.discretization.pointList, tesselator.discretization.indexList))
+    return arrays
+
+
+def _synthetic_arrays(triangles: int, shapes: int):
+    """Build tuple-backed point/index lists with the same sizes as the PlantGL scene."""
+    rng = np.random.default_rng(0)
+    per_shape = max(1, triangles // shapes)
+    arrays = []
+    for _ in range(shapes):
+        points = [_Point(p) for p in rng.random((per_shape * 3, 3)).tolist()]
+        faces = [(3 * i, 3 * i + 1, 3 * i + 2) for i in range(per_shape)]
+        arrays.append((points, faces))
+    return arrays
+
+
+def _legacy(point_list, index_list):
+    vertices = [[p.x, p.y, p.z] for p in point_list]
+    faces = [list(i) for i in index_list]
+    return vertices, faces
+
+
+def _vectorized(point_list, index_list):
+    return points_to_array(point_list), indices_to_array(index_list)
+
+
+def _time(func, arrays, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for point_list, index_list in arrays:
+            func(point_list, index_list)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triangles", type=int, default=200_000, help="Total number of triangles.")
+    parser.add_argument("--shapes", type=int, default=10, help="Number of shapes the triangles are split into.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is kept).")
+    parser.add_argument("--synthetic", action="store_true", help="Use stand-in arrays even if PlantGL is installed.")
+    args = parser.parse_args()
+
+    source = "synthetic"
+    if not args.synthetic:
+        try:
+            arrays = _plantgl_arrays(args.triangles, args.shapes)
+            source = "plantgl"
+        except ImportError:
+            print("PlantGL not available, falling back to synthetic arrays")
+    if source == "synthetic":
+        arrays = _synthetic_arrays(args.triangles, args.shapes)
+
+    legacy = _time(_legacy, arrays, args.repeat)
+    vectorized = _time(_vectorized, arrays, args.repeat)
+    print(f"source={source} triangles={args.triangles} shapes={args.shapes}")
+    print(f"legacy      {legacy * 1000:9.1f} ms")
+    print(f"vectorized  {vectorized * 1000:9.1f} ms")
+    print(f"speedup     {legacy / vectorized:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
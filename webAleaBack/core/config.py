@@ -1,7 +1,7 @@
 """Configuration settings for the application using Pydantic BaseSettings."""
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from logging.config import dictConfig
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,6 +28,36 @@ class Settings(BaseSettings):
     LOG_DATEFORMAT: str = "%Y-%m-%d %H:%M:%S"
     LOG_FILE: Optional[str] = "logs/app.log"  # path to a log file; empty -> no file logging
     LOG_TO_CONSOLE: bool = True
+    # runner settings
+    RUNNER_POOL_SIZE: int = 0  # number of warm node workers; 0 -> one subprocess per execution
+    RUNNER_POOL_MAX_JOBS_PER_WORKER: int = 100  # recycle a worker after this many jobs; 0 -> never
+    RUNNER_POOL_STARTUP_TIMEOUT: int = 120  # seconds a worker may spend importing OpenAlea
+    RUNNER_WORKFLOW_TIMEOUT: int = 600  # seconds allowed for a whole server-side workflow run
+    RUNNER_BATCH_MAX_PARALLEL: int = 0  # concurrent executions per batch; 0 -> pool size or CPU count
+    RUNNER_RESULT_CACHE_MAX_ENTRIES: int = 0  # memoized node results; 0 -> memoization disabled
+    RUNNER_RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # budget for memoized serialized outputs
+    # non-deterministic nodes never memoized, as "package.node" or "node" (JSON list in .env)
+    RUNNER_RESULT_CACHE_EXCLUDE: List[str] = []
+    RUNNER_JOB_MAX_CONCURRENT: int = 4  # asynchronous jobs running at the same time
+    RUNNER_JOB_RETENTION_SECONDS: int = 3600  # how long finished job results stay retrievable
+    RUNNER_JOB_MAX_TIMEOUT: int = 3600  # upper bound for the timeout requested by a job
+    RUNNER_COLLECTION_CACHE_MAX_ENTRIES: int = 4  # collections kept loaded for /refs/{ref_id}/items paging; 0 -> reload per page
+    # object cache settings (directory, TTL and quota: OPENALEA_CACHE_* environment variables)
+    CACHE_JANITOR_INTERVAL_SECONDS: float = 30  # pause between expiry sweeps; 0 -> no background expiry
+    CACHE_JANITOR_MAX_DELETES: int = 500  # files removed per sweep at most
+    # visualizer settings
+    VISUALIZER_TESSELLATION_CACHE_MAX_BYTES: int = 128 * 1024 * 1024  # in-process tessellations; 0 -> disabled
+    VISUALIZER_TESSELLATION_CACHE_DISK: bool = False  # also keep tessellations in OPENALEA_CACHE_DIR/tessellation
+    VISUALIZER_SERIALIZE_WORKERS: int = 0  # processes tessellating large scenes; 0 or 1 -> single process
+    VISUALIZER_NODE_SERIALIZE_WORKERS: int = 1  # cap of the above inside node subprocesses, which run side by side
+    VISUALIZER_SERIALIZE_PARALLEL_MIN_GEOMETRIES: int = 500  # distinct geometries before the pool is used
+    VISUALIZER_LOD_PREVIEW_TRIANGLES: int = 50_000  # scene triangle budget of lod=preview
+    VISUALIZER_LOD_MEDIUM_TRIANGLES: int = 300_000  # scene triangle budget of lod=medium
+    VISUALIZER_STREAM_CHUNK_SHAPES: int = 500  # shapes per chunk of POST /visualizer/visualize/stream
+    VISUALIZER_TILE_MAX_OBJECTS: int = 2000  # objects per octree leaf tile
+    VISUALIZER_TILE_MAX_DEPTH: int = 8  # octree depth limit
+    VISUALIZER_TILE_COARSE_TRIANGLES: int = 20_000  # triangle budget of a coarse tile
+    VISUALIZER_TILE_BUFFER_OBJECTS: int = 20_000  # objects held while bucketing leaf tiles; more spill to the cache
 # Instantiate settings once
 settings = Settings()
 
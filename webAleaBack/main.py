@@ -5,6 +5,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
 from api.v1 import router as v1_router
+from model.openalea.cache.janitor import start_cache_janitor, stop_cache_janitor
+from model.openalea.runner.job_manager import shutdown_job_manager
+from model.openalea.runner.worker_pool import get_worker_pool, shutdown_worker_pool
+from model.openalea.visualizer.utils import parallel
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -15,9 +19,17 @@ async def lifespan(app: FastAPI):
     """
     # Application startup logic
     print(f"Application '{settings.PROJECT_NAME}' starting up...")
+    pool = get_worker_pool()
+    if pool is not None:
+        pool.start()
+    start_cache_janitor()
     yield
     # Application shutdown logic
     print(f"Application '{settings.PROJECT_NAME}' shutting down...")
+    await stop_cache_janitor()
+    shutdown_job_manager()
+    shutdown_worker_pool()
+    parallel.shutdown_pool()
     app.state.shutdown_message = "Application has been shut down."
 
 # OpenAPI tag metadata
@@ -0,0 +1,303 @@
+"""Storage backends of the object cache.
+
+A backend stores the files of a cache entry (``<ref><suffix>``, e.g.
+``.pkl``, ``.pkl.buf``, ``.scene.json``) and is selected per ref from its
+routing prefix: ``<route>~<id>``. Routes are:
+
+- ``disk``: local directory, when the replica has no ``OPENALEA_CACHE_NODE_ID`` (``object_cache.DiskBackend``);
+- ``disk@<node>``: local directory of the replica named ``<node>`` by ``OPENALEA_CACHE_NODE_ID``;
+- ``fs``: directory shared by every replica, e.g. an NFS mount (same implementation);
+- ``mem@<node>:<pid>``: memory of one process, for tests and single-process use (runner
+  subprocesses fall back to ``disk``, see ``object_cache.mark_runner_process``);
+- ``kv``: shared Redis-compatible key-value store (``OPENALEA_CACHE_REDIS_URL``).
+
+Refs without a prefix were written before routing existed and live on the
+local disk. A replica receiving a ref held by another node or process
+fails with ``FileNotFoundError`` naming the holder, instead of guessing.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import socket
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from model.openalea.cache.codecs import CorruptEntryError, EntryWriter, read_entry
+
+ROUTE_SEPARATOR = "~"
+DEFAULT_MEMORY_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_KV_PREFIX = "webalea:cache:"
+
+
+def get_node_id() -> str:
+    """Return the replica name recorded in node-bound refs (``OPENALEA_CACHE_NODE_ID`` or the host name).
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        node (str): Node name restricted to ``[A-Za-z0-9_.-]``.
+    """
+    node = os.getenv("OPENALEA_CACHE_NODE_ID") or socket.gethostname()
+    return "".join(c if c.isalnum() or c in "_.-" else "-" for c in node)
+
+
+def split_ref(ref_id: str) -> tuple:
+    """Split a ref into its route and the rest.
+
+    Args:
+        ref_id (str): Cache reference, possibly derived (``<ref>.batched``...).
+    Returns:
+        route (Optional[str]): Routing prefix, None for refs written before routing existed.
+        key (str): Remainder of the ref.
+    """
+    route, separator, key = ref_id.partition(ROUTE_SEPARATOR)
+    return (route, key) if separator else (None, ref_id)
+
+
+class CacheBackend:
+    """Interface of entry storage; ``write``/``read`` take the callables that (de)serialize entries."""
+
+    # Routing prefix of the refs this backend creates
+    route: str = ""
+
+    def write(self, ref_id: str, suffix: str, kind: str, write: Callable[[BinaryIO], Any], compress: bool = False) -> int:
+        """Store an entry.
+
+        Args:
+            ref_id (str): Cache reference.
+            suffix (str): Entry suffix (``.pkl``, ``.scene.json``...).
+            kind (str): Entry kind reported by the stats.
+            write (Callable[[BinaryIO], Any]): Writes the entry content to a binary stream.
+            compress (bool): Whether to compress the entry (see ``codecs.py``).
+        Returns:
+            size (int): Stored bytes.
+        """
+        raise NotImplementedError
+
+    def read(self, ref_id: str, suffix: str, read: Callable[[BinaryIO], Any], compressed: bool = False):
+        """Load an entry.
+
+        Args:
+            ref_id (str): Cache reference.
+            suffix (str): Entry suffix.
+            read (Callable[[BinaryIO], Any]): Reads the value from a binary stream.
+            compressed (bool): Whether the entry was written with ``compress=True``.
+        Returns:
+            value (Any): Value returned by ``read``.
+        Raises:
+            FileNotFoundError: If the entry does not exist.
+        """
+        raise NotImplementedError
+
+    def map(self, ref_id: str, suffix: str) -> memoryview:
+        """Return a writable view of an uncompressed entry (memory-mapped copy-on-write when possible).
+
+        Args:
+            ref_id (str): Cache reference.
+            suffix (str): Entry suffix.
+        Returns:
+            view (memoryview): Entry bytes; edits are never written back.
+        Raises:
+            FileNotFoundError: If the entry does not exist.
+        """
+        raise NotImplementedError
+
+    def exists(self, ref_id: str, suffix: str) -> bool:
+        """Check whether an entry exists.
+
+        Args:
+            ref_id (str): Cache reference.
+            suffix (str): Entry suffix.
+        Returns:
+            exists (bool): True if the entry can be read.
+        """
+        raise NotImplementedError
+
+    def delete(self, ref_id: str, suffix: str) -> None:
+        """Remove an entry; a missing entry is ignored.
+
+        Args:
+            ref_id (str): Cache reference.
+            suffix (str): Entry suffix.
+        Returns:
+            None (None): No return value.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend statistics.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            stats (Dict[str, Any]): At least the ``backend`` route.
+        """
+        return {"backend": self.route}
+
+
+def _encode(write: Callable[[BinaryIO], Any], compress: bool) -> bytes:
+    buffer = io.BytesIO()
+    if compress:
+        with EntryWriter(buffer) as writer:
+            write(writer)
+    else:
+        write(buffer)
+    return buffer.getvalue()
+
+
+def _decode(data: bytes, read: Callable[[BinaryIO], Any], compressed: bool):
+    return read_entry(io.BytesIO(data), read, compressed)
+
+
+class BlobBackend(CacheBackend):
+    """Backend storing each entry as one byte string under ``<ref><suffix>``."""
+
+    def _put(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _has(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _fetch(self, ref_id: str, suffix: str) -> bytes:
+        data = self._get(ref_id + suffix)
+        if data is None:
+            raise FileNotFoundError(f"Cache entry not found: {ref_id}{suffix}")
+        return data
+
+    def write(self, ref_id: str, suffix: str, kind: str, write: Callable[[BinaryIO], Any], compress: bool = False) -> int:
+        data = _encode(write, compress)
+        self._put(ref_id + suffix, data)
+        return len(data)
+
+    def read(self, ref_id: str, suffix: str, read: Callable[[BinaryIO], Any], compressed: bool = False):
+        try:
+            return _decode(self._fetch(ref_id, suffix), read, compressed)
+        except CorruptEntryError as e:
+            # A miss: the next store of the key replaces it
+            logging.warning("Cache entry %s%s is corrupt, ignoring it: %s", ref_id, suffix, e)
+            raise FileNotFoundError(f"Cache entry not found: {ref_id}{suffix}") from e
+
+    def map(self, ref_id: str, suffix: str) -> memoryview:
+        # A private copy, writable like the copy-on-write maps of the disk backend
+        return memoryview(bytearray(self._fetch(ref_id, suffix)))
+
+    def exists(self, ref_id: str, suffix: str) -> bool:
+        return self._has(ref_id + suffix)
+
+    def delete(self, ref_id: str, suffix: str) -> None:
+        self._delete(ref_id + suffix)
+
+
+class MemoryBackend(BlobBackend):
+    """Entries in the memory of this process, least recently used evicted beyond ``max_bytes``."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_MAX_BYTES):
+        self.route = f"mem@{get_node_id()}:{os.getpid()}"
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def _has(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self._bytes -= len(data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.route,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class RedisBackend(BlobBackend):
+    """Entries in a Redis-compatible store shared by every replica.
+
+    Each read refreshes the entry TTL, so entries expire after
+    ``ttl_seconds`` without access; a quota is left to the server
+    (``maxmemory`` with an LRU ``maxmemory-policy``).
+    """
+
+    route = "kv"
+
+    def __init__(self, client, ttl_seconds: int = 0, prefix: str = DEFAULT_KV_PREFIX):
+        """Create the backend.
+
+        Args:
+            client (Any): Client with the ``get``/``set(ex=)``/``exists``/``expire`` methods of ``redis.Redis``.
+            ttl_seconds (int): Idle time before expiry; 0 keeps entries until the server evicts them.
+            prefix (str): Prefix of the store keys.
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: int = 0) -> "RedisBackend":
+        """Connect with the optional ``redis`` package.
+
+        Args:
+            url (str): Server URL, e.g. ``redis://cache:6379/0``.
+            ttl_seconds (int): Idle time before expiry.
+        Returns:
+            backend (RedisBackend): Backend using a new client.
+        Raises:
+            ValueError: If the ``redis`` package is not installed.
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ValueError("The 'kv' cache backend requires the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), ttl_seconds=ttl_seconds)
+
+    def _put(self, key: str, data: bytes) -> None:
+        self.client.set(self.prefix + key, data, ex=self.ttl_seconds or None)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        data = self.client.get(self.prefix + key)
+        if data is not None and self.ttl_seconds:
+            self.client.expire(self.prefix + key, self.ttl_seconds)
+        return data
+
+    def _has(self, key: str) -> bool:
+        return bool(self.client.exists(self.prefix + key))
+
+    def _delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
@@ -0,0 +1,95 @@
+"""Out-of-band buffers of pickled cache entries.
+
+``cache_store`` pickles with protocol 5: contiguous buffers of at least
+``OPENALEA_CACHE_OOB_MIN_BYTES`` (NumPy arrays, ``bytearray``...) are not
+copied into the pickle stream but written raw, each at a
+``BUFFER_ALIGNMENT``-byte aligned offset, into a ``<ref>.pkl.buf`` segment
+file. ``cache_load`` maps that file copy-on-write (on the disk backends)
+and hands the segments to ``pickle.load``, so the arrays it returns are views of the
+mapping: pages are read on first access and in-place edits stay private.
+
+Layout: ``OAB\\x01``, a little-endian uint64 buffer count, then one
+``(offset, nbytes)`` uint64 pair per buffer, then the aligned buffers.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+from typing import BinaryIO, List
+
+BUFFERS_MAGIC = b"OAB\x01"
+BUFFER_ALIGNMENT = 64
+DEFAULT_OOB_MIN_BYTES = 1024 * 1024
+
+
+def get_oob_min_bytes() -> int:
+    raw = os.getenv("OPENALEA_CACHE_OOB_MIN_BYTES")
+    if raw is None:
+        return DEFAULT_OOB_MIN_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_OOB_MIN_BYTES
+
+
+class BufferCollector:
+    """``buffer_callback`` keeping large contiguous buffers out of the pickle stream."""
+
+    def __init__(self, min_bytes: int):
+        self.min_bytes = min_bytes
+        self.buffers: List[memoryview] = []
+
+    def __call__(self, buffer: pickle.PickleBuffer) -> bool:
+        try:
+            raw = buffer.raw()
+        except BufferError:
+            # Non-contiguous buffers are serialized in-band
+            return True
+        if raw.nbytes < self.min_bytes:
+            return True
+        self.buffers.append(raw)
+        return False
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // BUFFER_ALIGNMENT) * BUFFER_ALIGNMENT
+
+
+def write_buffers(f: BinaryIO, buffers: List[memoryview]) -> None:
+    """Write buffers into a segment file.
+
+    Args:
+        f (BinaryIO): File positioned at its start.
+        buffers (List[memoryview]): Contiguous byte views, in pickling order.
+    Returns:
+        None (None): No return value.
+    """
+    offset = _aligned(len(BUFFERS_MAGIC) + 8 + 16 * len(buffers))
+    table = []
+    for buffer in buffers:
+        table.append((offset, buffer.nbytes))
+        offset = _aligned(offset + buffer.nbytes)
+    f.write(BUFFERS_MAGIC + struct.pack(f"<Q{2 * len(table)}Q", len(table), *[v for pair in table for v in pair]))
+    position = f.tell()
+    for (start, _), buffer in zip(table, buffers):
+        f.write(b"\0" * (start - position))
+        f.write(buffer)
+        position = start + buffer.nbytes
+
+
+def split_buffers(view: memoryview) -> List[memoryview]:
+    """Return views of the buffers of a segment file.
+
+    Args:
+        view (memoryview): Content of a file written by ``write_buffers``, typically memory-mapped.
+    Returns:
+        buffers (List[memoryview]): Slices of ``view``, which they keep alive.
+    Raises:
+        ValueError: If the content is not a segment file.
+    """
+    if bytes(view[:len(BUFFERS_MAGIC)]) != BUFFERS_MAGIC:
+        raise ValueError("Not a cache buffer file")
+    (count,) = struct.unpack_from("<Q", view, len(BUFFERS_MAGIC))
+    table = struct.unpack_from(f"<{2 * count}Q", view, len(BUFFERS_MAGIC) + 8)
+    return [view[table[2 * i]:table[2 * i] + table[2 * i + 1]] for i in range(count)]
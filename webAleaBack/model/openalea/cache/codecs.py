@@ -0,0 +1,296 @@
+"""Per-entry compression of object cache files.
+
+A compressed entry starts with a header naming its codec
+(``OAC\\x01`` + name length + ASCII name), so loads pick the decoder from
+the file itself and entries written with different settings, or before
+compression existed (no header), coexist in one cache dir.
+
+The codec of an entry is chosen from its size once enough of it has been
+written (``EntryWriter`` buffers at most ``OPENALEA_CACHE_COMPRESS_LARGE_BYTES``):
+
+- below ``OPENALEA_CACHE_COMPRESS_MIN_BYTES``: ``none``;
+- below ``OPENALEA_CACHE_COMPRESS_LARGE_BYTES``: a fast codec (``lz4``, else ``gzip`` level 1);
+- above: a denser codec (``zstd``, else ``gzip`` level 6), as large entries are
+  bound by disk or network I/O rather than CPU.
+
+``OPENALEA_CACHE_CODEC`` forces one codec for every entry above the minimum
+size (``none`` disables compression). ``lz4`` and ``zstd`` need the optional
+``lz4`` and ``zstandard`` packages; ``gzip`` always works. ``read_entry``
+reports a truncated or damaged entry as ``CorruptEntryError``, which the
+backends turn into a miss.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import pickle
+import zlib
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional
+
+HEADER_MAGIC = b"OAC\x01"
+DEFAULT_CODEC = "auto"
+DEFAULT_COMPRESS_MIN_BYTES = 64 * 1024
+DEFAULT_COMPRESS_LARGE_BYTES = 8 * 1024 * 1024
+
+
+class CorruptEntryError(ValueError):
+    """Entry whose header or content cannot be decoded (truncated or damaged file)."""
+
+
+class Codec(NamedTuple):
+    """Stream compressor: ``writer(file)`` and ``reader(file)`` wrap an open binary file."""
+
+    name: str
+    writer: Callable[[BinaryIO], BinaryIO]
+    reader: Callable[[BinaryIO], BinaryIO]
+    # Name of the package to install when the codec is unavailable
+    requires: Optional[str] = None
+
+
+class _Unclosable(io.BufferedIOBase):
+    """Pass-through wrapper so that closing a codec stream leaves the file open."""
+
+    def __init__(self, f: BinaryIO):
+        super().__init__()
+        self._f = f
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+    def readinto(self, buffer) -> int:
+        return self._f.readinto(buffer)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._f.readline(size)
+
+    def write(self, data) -> int:
+        return self._f.write(data)
+
+
+def _gzip(level: int) -> Codec:
+    return Codec(
+        name="gzip",
+        writer=lambda f: gzip.GzipFile(fileobj=f, mode="wb", compresslevel=level, mtime=0),
+        reader=lambda f: gzip.GzipFile(fileobj=f, mode="rb"),
+    )
+
+
+def _lz4() -> Optional[Codec]:
+    try:
+        import lz4.frame
+    except ImportError:
+        return None
+    return Codec(
+        name="lz4",
+        writer=lambda f: lz4.frame.LZ4FrameFile(f, mode="wb"),
+        reader=lambda f: lz4.frame.LZ4FrameFile(f, mode="rb"),
+    )
+
+
+def _zstd(level: int = 9) -> Optional[Codec]:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return Codec(
+        name="zstd",
+        writer=lambda f: zstandard.ZstdCompressor(level=level).stream_writer(f, closefd=False),
+        # The raw reader has no readline, which pickle needs
+        reader=lambda f: io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(f, closefd=False)),
+    )
+
+
+_NONE = Codec(name="none", writer=_Unclosable, reader=_Unclosable)
+_REQUIRES = {"lz4": "lz4", "zstd": "zstandard"}
+
+
+def available_codecs() -> Dict[str, Codec]:
+    """Return the codecs usable in this environment, keyed by name.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        codecs (Dict[str, Codec]): ``none`` and ``gzip``, plus ``lz4``/``zstd`` when installed.
+    """
+    codecs = {"none": _NONE, "gzip": _gzip(6)}
+    for codec in (_lz4(), _zstd()):
+        if codec is not None:
+            codecs[codec.name] = codec
+    return codecs
+
+
+def get_codec(name: str) -> Codec:
+    """Return a codec by name.
+
+    Args:
+        name (str): ``none``, ``gzip``, ``lz4`` or ``zstd``.
+    Returns:
+        codec (Codec): Codec.
+    Raises:
+        ValueError: If the codec is unknown or its package is not installed.
+    """
+    codec = available_codecs().get(name)
+    if codec is None:
+        if name in _REQUIRES:
+            raise ValueError(f"Cache codec '{name}' requires the '{_REQUIRES[name]}' package")
+        raise ValueError(f"Unknown cache codec: {name}")
+    return codec
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def choose_codec(size: int, complete: bool) -> Codec:
+    """Pick the codec of an entry from its size.
+
+    Args:
+        size (int): Bytes written so far.
+        complete (bool): Whether ``size`` is the whole entry (else it is at least that large).
+    Returns:
+        codec (Codec): Codec to write the entry with.
+    """
+    min_bytes = _env_int("OPENALEA_CACHE_COMPRESS_MIN_BYTES", DEFAULT_COMPRESS_MIN_BYTES)
+    if complete and size < min_bytes:
+        return _NONE
+    name = os.getenv("OPENALEA_CACHE_CODEC", DEFAULT_CODEC)
+    if name != DEFAULT_CODEC:
+        return get_codec(name)
+    large = not complete or size >= _env_int("OPENALEA_CACHE_COMPRESS_LARGE_BYTES", DEFAULT_COMPRESS_LARGE_BYTES)
+    if large:
+        return _zstd() or _gzip(6)
+    return _lz4() or _gzip(1)
+
+
+def write_header(f: BinaryIO, codec: Codec) -> None:
+    """Write the header naming the codec of an entry.
+
+    Args:
+        f (BinaryIO): File positioned at its start.
+        codec (Codec): Codec of the entry.
+    Returns:
+        None (None): No return value.
+    """
+    name = codec.name.encode("ascii")
+    f.write(HEADER_MAGIC + bytes([len(name)]) + name)
+
+
+def open_entry(f: BinaryIO) -> tuple:
+    """Read the header of an entry and return a stream of its decompressed content.
+
+    Args:
+        f (BinaryIO): File positioned at its start.
+    Returns:
+        stream (BinaryIO): Decompressed content; headerless (legacy) entries are read as is.
+        codec (str): Codec name.
+    Raises:
+        CorruptEntryError: If the header is truncated or names no known codec.
+        ValueError: If the entry codec is not available here.
+    """
+    magic = f.read(len(HEADER_MAGIC))
+    if magic != HEADER_MAGIC:
+        f.seek(0)
+        return f, "none"
+    length = f.read(1)
+    name = f.read(length[0]) if length else b""
+    if not length or len(name) != length[0]:
+        raise CorruptEntryError("Truncated cache entry header")
+    name = name.decode("ascii", errors="replace")
+    if name not in ("none", "gzip") and name not in _REQUIRES:
+        raise CorruptEntryError(f"Unknown cache codec: {name}")
+    codec = get_codec(name)
+    return (f if codec is _NONE else codec.reader(f)), name
+
+
+def _decode_errors() -> tuple:
+    # Raised by the decompressors and by pickle/json/NumPy on truncated or damaged content
+    errors = (EOFError, OSError, ValueError, RuntimeError, pickle.UnpicklingError, zlib.error)
+    try:
+        import zstandard
+    except ImportError:
+        return errors
+    return errors + (zstandard.ZstdError,)
+
+
+def read_entry(f: BinaryIO, read: Callable[[BinaryIO], object], compressed: bool = False):
+    """Decode an entry with ``read``, reporting damaged content as ``CorruptEntryError``.
+
+    Args:
+        f (BinaryIO): File positioned at its start.
+        read (Callable[[BinaryIO], object]): Loader of the (decompressed) content, e.g. ``pickle.load``.
+        compressed (bool): Whether the entry may start with a codec header.
+    Returns:
+        value (object): Loaded value.
+    Raises:
+        CorruptEntryError: If the header or the content cannot be decoded.
+        ValueError: If the entry codec is not available here.
+    """
+    stream = open_entry(f)[0] if compressed else f
+    try:
+        return read(stream)
+    except FileNotFoundError:
+        # Raised by loaders for a missing companion file: a miss, not damage
+        raise
+    except _decode_errors() as e:
+        raise CorruptEntryError(f"Corrupt cache entry: {e!r}") from e
+
+
+class EntryWriter(io.RawIOBase):
+    """Binary sink writing a header and compressing with a codec chosen from the entry size.
+
+    Writes are buffered in memory until the entry is known to reach
+    ``OPENALEA_CACHE_COMPRESS_LARGE_BYTES`` (or ends), so at most that much
+    is held before streaming starts.
+    """
+
+    def __init__(self, f: BinaryIO):
+        super().__init__()
+        self._f = f
+        self._buffer: Optional[bytearray] = bytearray()
+        self._stream: Optional[BinaryIO] = None
+        self._decide_bytes = max(
+            _env_int("OPENALEA_CACHE_COMPRESS_MIN_BYTES", DEFAULT_COMPRESS_MIN_BYTES),
+            _env_int("OPENALEA_CACHE_COMPRESS_LARGE_BYTES", DEFAULT_COMPRESS_LARGE_BYTES),
+        )
+        self.codec: Optional[str] = None
+
+    def writable(self) -> bool:
+        return True
+
+    def _start(self, complete: bool) -> None:
+        codec = choose_codec(len(self._buffer), complete)
+        write_header(self._f, codec)
+        self._stream = codec.writer(self._f)
+        self._stream.write(self._buffer)
+        self._buffer = None
+        self.codec = codec.name
+
+    def write(self, data) -> int:
+        if self._stream is not None:
+            self._stream.write(data)
+        else:
+            self._buffer += data
+            if len(self._buffer) >= self._decide_bytes:
+                self._start(complete=False)
+        return len(data)
+
+    def close(self) -> None:
+        """Flush the entry; the underlying file stays open."""
+        if not self.closed:
+            if self._stream is None:
+                self._start(complete=True)
+            self._stream.close()
+        super().close()
@@ -0,0 +1,158 @@
+"""Background expiry of the object cache.
+
+Request handlers never walk the cache directory: the API process runs a
+janitor task that calls ``cache_sweep`` every
+``CACHE_JANITOR_INTERVAL_SECONDS``, each sweep removing at most
+``CACHE_JANITOR_MAX_DELETES`` of the least recently accessed expired
+entries. A backlog is therefore drained at a bounded rate over several
+sweeps instead of in one burst of I/O.
+
+Files missing from the index are invisible to ``cache_sweep``, so each
+sweep also lists one directory of ``CACHE_SHARDS`` with
+``cache_sweep_unindexed``, in turn: the whole cache dir is covered once
+every ``len(CACHE_SHARDS)`` sweeps.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from model.openalea.cache.object_cache import CACHE_SHARDS, cache_sweep, cache_sweep_unindexed
+
+
+class CacheJanitor:
+    """Periodic, rate-limited expiry of cache entries on the event loop's thread pool."""
+
+    def __init__(self, interval_seconds: float, max_deletes: int):
+        self.interval_seconds = interval_seconds
+        self.max_deletes = max_deletes
+        self.sweeps = 0
+        self.removed = 0
+        self.unindexed_removed = 0
+        self._shard = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def sweep(self) -> int:
+        """Run one sweep.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            removed (int): Number of expired entries and unindexed files removed.
+        """
+        removed = cache_sweep(max_entries=self.max_deletes)
+        shard = CACHE_SHARDS[self._shard]
+        self._shard = (self._shard + 1) % len(CACHE_SHARDS)
+        unindexed = cache_sweep_unindexed(shard, max_entries=self.max_deletes - removed)
+        self.sweeps += 1
+        self.removed += removed + unindexed
+        self.unindexed_removed += unindexed
+        return removed + unindexed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # SQLite and unlink calls block: keep them off the event loop
+                await asyncio.to_thread(self.sweep)
+            except Exception:
+                logging.exception("Cache janitor sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start sweeping on the running event loop.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="cache-janitor")
+
+    async def stop(self) -> None:
+        """Cancel the sweeping task and wait for it to end.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the sweep counters of this process.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            stats (Dict[str, Any]): Janitor statistics.
+        """
+        return {
+            "running": self._task is not None,
+            "sweeps": self.sweeps,
+            "removed": self.removed,
+            "unindexed_removed": self.unindexed_removed,
+            "interval_seconds": self.interval_seconds,
+            "max_deletes": self.max_deletes,
+        }
+
+
+_CACHE_JANITOR: Optional[CacheJanitor] = None
+
+
+def start_cache_janitor() -> Optional[CacheJanitor]:
+    """Start the process-wide janitor configured from settings; call from the running event loop.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        janitor (Optional[CacheJanitor]): Running janitor, or None when background expiry is disabled.
+    """
+    global _CACHE_JANITOR
+    if settings.CACHE_JANITOR_INTERVAL_SECONDS <= 0:
+        return None
+    if _CACHE_JANITOR is None:
+        _CACHE_JANITOR = CacheJanitor(
+            interval_seconds=settings.CACHE_JANITOR_INTERVAL_SECONDS,
+            max_deletes=settings.CACHE_JANITOR_MAX_DELETES,
+        )
+        logging.info(
+            "Cache janitor started interval=%ss max_deletes=%s",
+            _CACHE_JANITOR.interval_seconds, _CACHE_JANITOR.max_deletes
+        )
+    _CACHE_JANITOR.start()
+    return _CACHE_JANITOR
+
+
+def get_cache_janitor() -> Optional[CacheJanitor]:
+    """Return the process-wide janitor, or None when it was not started.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        janitor (Optional[CacheJanitor]): Shared janitor.
+    """
+    return _CACHE_JANITOR
+
+
+async def stop_cache_janitor() -> None:
+    """Stop the process-wide janitor if it was started.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    global _CACHE_JANITOR
+    janitor, _CACHE_JANITOR = _CACHE_JANITOR, None
+    if janitor is not None:
+        await janitor.stop()
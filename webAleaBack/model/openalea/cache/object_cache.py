@@ -1,13 +1,87 @@
+"""File cache of runner outputs and visualizer scenes.
+
+Entries are files sharded into ``<cache dir>/<2 hex digits>/`` and recorded
+in a SQLite index (``index.sqlite3``) with their ref, kind, size, creation
+and last-access time. Loads refresh the access time (and the file mtime used
+by ``cache_cleanup``); stores evict the least recently used entries once the
+indexed bytes exceed ``OPENALEA_CACHE_MAX_BYTES``. Pickles and scene JSON
+are compressed per entry (see ``codecs.py``). The index is shared by the
+API and runner processes, possibly on several hosts, so it keeps SQLite's
+rollback journal unless ``OPENALEA_CACHE_INDEX_JOURNAL=WAL`` declares the dir
+local to the node; if it cannot be written the files still work, only the
+quota is not enforced.
+
+New refs are ``<route>~<id>``: ``OPENALEA_CACHE_BACKEND`` stores them on
+the local disk (``disk``, the default), in a cache dir shared by every
+replica (``fs``), in process memory (``memory``, API process only: runner
+subprocesses use ``disk``) or in a Redis-compatible store (``kv``), and
+loads pick the backend from the ref (see ``backends.py``).
+"""
+import hashlib
+import io
 import json
 import logging
+import mmap
 import os
 import pickle
+import sqlite3
+import struct
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
+from model.openalea.cache.backends import (
+    ROUTE_SEPARATOR,
+    DEFAULT_MEMORY_MAX_BYTES,
+    CacheBackend,
+    MemoryBackend,
+    RedisBackend,
+    get_node_id,
+    split_ref,
+)
+from model.openalea.cache.buffers import BufferCollector, get_oob_min_bytes, split_buffers, write_buffers
+from model.openalea.cache.codecs import CorruptEntryError, EntryWriter, read_entry
+
 
 DEFAULT_CACHE_DIR = "/tmp/webalea_object_cache" # Path where cached objects are stored. Can be overridden by setting the OPENALEA_CACHE_DIR environment variable.
 DEFAULT_TTL_SECONDS = 3600 # Time-to-live for cached objects in seconds. 
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024 # Byte quota of indexed entries; OPENALEA_CACHE_MAX_BYTES overrides it, 0 disables eviction.
+DEFAULT_BACKEND = "disk" # Backend of new refs; OPENALEA_CACHE_BACKEND overrides it (see backends.py).
+CACHE_BACKENDS = ("disk", "fs", "memory", "kv")
+DEFAULT_INDEX_JOURNAL = "DELETE" # Rollback journal of the index, safe on network filesystems; OPENALEA_CACHE_INDEX_JOURNAL=WAL is faster for a node-local dir.
+INDEX_JOURNALS = ("DELETE", "WAL")
+INDEX_FILE_NAME = "index.sqlite3"
+OBJECT_SUFFIX = ".pkl"
+BUFFERS_SUFFIX = ".pkl.buf"
+SCENE_JSON_SUFFIX = ".scene.json"
+SCENE_BIN_SUFFIX = ".scene.bin"
+SCENE_INDEX_SUFFIX = ".scene.idx"
+ARRAY_SUFFIX = ".npy"
+_ENTRY_PATTERNS = ("*.pkl", "*.pkl.buf", "*.scene.json", "*.scene.bin", "*.scene.idx", "*.npy")
+# Directories holding entries: the cache dir itself (files written before sharding), the shards, the tessellation tier
+CACHE_SHARDS = ("",) + tuple(f"{shard:02x}" for shard in range(256)) + ("tessellation",)
+_WRITE_BUFFER_BYTES = 1024 * 1024
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    ref TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
 
 
 def get_cache_dir() -> Path:
@@ -27,71 +101,759 @@ def get_cache_ttl_seconds() -> int:
         return DEFAULT_TTL_SECONDS
 
 
-def _cache_path(ref_id: str) -> Path:
+def get_cache_max_bytes() -> int:
+    raw = os.getenv("OPENALEA_CACHE_MAX_BYTES")
+    if raw is None:
+        return DEFAULT_MAX_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def get_cache_memory_max_bytes() -> int:
+    raw = os.getenv("OPENALEA_CACHE_MEMORY_MAX_BYTES")
+    if raw is None:
+        return DEFAULT_MEMORY_MAX_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_MEMORY_MAX_BYTES
+
+
+def get_cache_index_journal() -> str:
+    # WAL needs memory shared by every process using the index: never on a dir shared across hosts
+    name = os.getenv("OPENALEA_CACHE_INDEX_JOURNAL", DEFAULT_INDEX_JOURNAL).upper()
+    if name not in INDEX_JOURNALS:
+        logging.warning("Unknown OPENALEA_CACHE_INDEX_JOURNAL=%s, using %s", name, DEFAULT_INDEX_JOURNAL)
+        return DEFAULT_INDEX_JOURNAL
+    if name == "WAL" and get_cache_backend_name() == "fs":
+        return DEFAULT_INDEX_JOURNAL
+    return name
+
+
+def _entry_path(ref_id: str, suffix: str) -> Path:
     safe_id = ref_id.replace("/", "_")
-    return get_cache_dir() / f"{safe_id}.pkl"
+    # Hash-based shards keep directories small whatever the ref naming
+    shard = hashlib.sha1(safe_id.encode("utf-8")).hexdigest()[:2]
+    return get_cache_dir() / shard / f"{safe_id}{suffix}"
+
+
+def _cache_path(ref_id: str) -> Path:
+    return _entry_path(ref_id, OBJECT_SUFFIX)
+
+
+def _buffers_path(ref_id: str) -> Path:
+    return _entry_path(ref_id, BUFFERS_SUFFIX)
 
 
 def _scene_json_path(ref_id: str) -> Path:
-    safe_id = ref_id.replace("/", "_")
-    return get_cache_dir() / f"{safe_id}.scene.json"
+    return _entry_path(ref_id, SCENE_JSON_SUFFIX)
+
+
+def _scene_bin_path(ref_id: str) -> Path:
+    return _entry_path(ref_id, SCENE_BIN_SUFFIX)
+
+
+def _scene_index_path(ref_id: str) -> Path:
+    return _entry_path(ref_id, SCENE_INDEX_SUFFIX)
+
+
+def _array_path(ref_id: str) -> Path:
+    return _entry_path(ref_id, ARRAY_SUFFIX)
+
+
+def _index() -> sqlite3.Connection:
+    """Return this thread's connection to the index of the current cache dir."""
+    db_path = get_cache_dir() / INDEX_FILE_NAME
+    if getattr(_local, "pid", None) != os.getpid():
+        # Connections must not be shared with a forked child
+        _local.pid = os.getpid()
+        _local.connections = {}
+    connection = _local.connections.get(db_path)
+    if connection is not None and not db_path.exists():
+        # The cache dir was wiped under us
+        connection.close()
+        connection = None
+    if connection is None:
+        connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        journal = get_cache_index_journal()
+        connection.execute(f"PRAGMA journal_mode={journal}")
+        if journal == "WAL":
+            connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_INDEX_SCHEMA)
+        # Running total of indexed bytes, seeded once for an index created before it was kept
+        connection.execute(
+            "INSERT OR IGNORE INTO counters (name, value) SELECT 'indexed_bytes', COALESCE(SUM(size), 0) "
+            "FROM entries WHERE NOT EXISTS (SELECT 1 FROM counters WHERE name = 'indexed_bytes')"
+        )
+        _local.connections[db_path] = connection
+    return connection
+
+
+@contextmanager
+def _transaction():
+    """Hold the index write lock, committing on success and rolling back on error."""
+    connection = _index()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _index_key(path: Path) -> str:
+    return path.relative_to(get_cache_dir()).as_posix()
+
+
+def _bump_counters(connection: sqlite3.Connection, **increments) -> None:
+    for name, increment in increments.items():
+        connection.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, increment),
+        )
+
+
+def _delete_rows(connection: sqlite3.Connection, keys) -> None:
+    """Delete index rows, taking their sizes off the ``indexed_bytes`` total; caller holds the write lock."""
+    freed = 0
+    for key in keys:
+        row = connection.execute("SELECT size FROM entries WHERE path = ?", (key,)).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM entries WHERE path = ?", (key,))
+            freed += row[0]
+    if freed:
+        _bump_counters(connection, indexed_bytes=-freed)
+
+
+def _record(path: Path, ref_id: str, kind: str, size: int) -> None:
+    """Index a written entry and enforce the quota."""
+    now = time.time()
+    try:
+        with _transaction() as connection:
+            previous = connection.execute("SELECT size FROM entries WHERE path = ?", (_index_key(path),)).fetchone()
+            _bump_counters(connection, indexed_bytes=size - (previous[0] if previous else 0))
+            connection.execute(
+                "INSERT INTO entries (path, ref, kind, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, created = excluded.created, "
+                "accessed = excluded.accessed",
+                (_index_key(path), ref_id, kind, size, now, now),
+            )
+            _evict(connection, _index_key(path))
+    except sqlite3.Error as e:
+        logging.warning("Cache index update failed path=%s: %s", path, e)
+
+
+def _write_entry(path: Path, ref_id: str, kind: str, write, compress: bool = False) -> int:
+    """Write an entry atomically (compressed entries get a codec header), then index it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so concurrent readers never see a partial file
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            if compress:
+                # Batch small writes before they reach the compressor
+                with io.BufferedWriter(EntryWriter(f), buffer_size=_WRITE_BUFFER_BYTES) as writer:
+                    write(writer)
+            else:
+                write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    size = path.stat().st_size
+    _record(path, ref_id, kind, size)
+    return size
+
+
+def _evict(connection: sqlite3.Connection, keep: str) -> None:
+    """Remove least recently used entries until the quota holds; caller holds the write lock."""
+    max_bytes = get_cache_max_bytes()
+    if max_bytes <= 0:
+        return
+    total = connection.execute("SELECT value FROM counters WHERE name = 'indexed_bytes'").fetchone()[0]
+    if total <= max_bytes:
+        return
+    cache_dir = get_cache_dir()
+    evicted, evicted_bytes = [], 0
+    # An entry larger than the quota on its own evicts everything else but is kept
+    for key, size in connection.execute("SELECT path, size FROM entries WHERE path != ? ORDER BY accessed", (keep,)):
+        if total <= max_bytes:
+            break
+        try:
+            (cache_dir / key).unlink(missing_ok=True)
+        except OSError:
+            continue
+        evicted.append(key)
+        evicted_bytes += size
+        total -= size
+    _delete_rows(connection, evicted)
+    _bump_counters(connection, evictions=len(evicted), evicted_bytes=evicted_bytes)
+    logging.info("Cache evicted entries=%d bytes=%d max_bytes=%d", len(evicted), evicted_bytes, max_bytes)
+
+
+def _touch(path: Path) -> None:
+    """Record an access to an entry (index access time and hits, file mtime)."""
+    now = time.time()
+    try:
+        os.utime(path, (now, now))
+    except OSError:
+        return
+    try:
+        _index().execute(
+            "UPDATE entries SET accessed = ?, hits = hits + 1 WHERE path = ?", (now, _index_key(path))
+        )
+    except sqlite3.Error as e:
+        logging.warning("Cache index update failed path=%s: %s", path, e)
+
+
+def _in_cache_dir(path: Path) -> bool:
+    try:
+        path.relative_to(get_cache_dir())
+    except ValueError:
+        return False
+    return True
+
+
+def cache_register_file(path: Path, kind: str) -> None:
+    """Index a file written into the cache dir by another component (quota, expiry).
+
+    Args:
+        path (Path): File inside the cache dir; files elsewhere are ignored.
+        kind (str): Entry kind reported by ``cache_stats``.
+    Returns:
+        None (None): No return value.
+    """
+    if _in_cache_dir(path):
+        _record(path, path.stem, kind, path.stat().st_size)
+
+
+def cache_touch_file(path: Path) -> None:
+    """Record an access to a file indexed with ``cache_register_file``.
+
+    Args:
+        path (Path): File inside the cache dir; files elsewhere are ignored.
+    Returns:
+        None (None): No return value.
+    """
+    if _in_cache_dir(path):
+        _touch(path)
+
+
+def _dump_json(value, f) -> None:
+    # One-shot encoding uses the C encoder; json.dump's chunked one is pure Python and
+    # several times slower, while the text is small next to the decoded scene
+    f.write(json.dumps(value).encode("utf-8"))
+
+
+def _drop_entry(path: Path) -> None:
+    """Remove an entry file and its index row."""
+    path.unlink(missing_ok=True)
+    try:
+        with _transaction() as connection:
+            _delete_rows(connection, [_index_key(path)])
+    except sqlite3.Error as e:
+        logging.warning("Cache index update failed path=%s: %s", path, e)
+
+
+def _read_entry(path: Path, read, compressed: bool = False):
+    """Load an entry file; a truncated or damaged one is removed and reported as missing."""
+    try:
+        with open(path, "rb") as f:
+            value = read_entry(f, read, compressed=compressed)
+    except CorruptEntryError as e:
+        logging.warning("Cache entry %s is corrupt, removing it: %s", path, e)
+        try:
+            _drop_entry(path)
+        except OSError:
+            pass
+        raise FileNotFoundError(f"Cache entry not found: {path.name}") from e
+    _touch(path)
+    return value
+
+
+class DiskBackend(CacheBackend):
+    """Entries as files of the cache dir, indexed for the quota and the janitor."""
+
+    def __init__(self, route: str):
+        self.route = route
+
+    def write(self, ref_id: str, suffix: str, kind: str, write, compress: bool = False) -> int:
+        return _write_entry(_entry_path(ref_id, suffix), ref_id, kind, write, compress=compress)
+
+    def read(self, ref_id: str, suffix: str, read, compressed: bool = False):
+        return _read_entry(_entry_path(ref_id, suffix), read, compressed=compressed)
+
+    def map(self, ref_id: str, suffix: str) -> memoryview:
+        path = _entry_path(ref_id, suffix)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(bytearray())
+            # Copy-on-write: pages are read on access, and in-place edits stay private
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        _touch(path)
+        return memoryview(mapping)
+
+    def exists(self, ref_id: str, suffix: str) -> bool:
+        return _entry_path(ref_id, suffix).exists()
+
+    def delete(self, ref_id: str, suffix: str) -> None:
+        _drop_entry(_entry_path(ref_id, suffix))
+
+
+_backends: dict = {}
+_backends_lock = threading.Lock()
+# Set in runner subprocesses and pool workers (see ``mark_runner_process``)
+_runner_process = False
+
+
+def mark_runner_process() -> None:
+    """Declare this process a runner subprocess or pool worker.
+
+    Its refs are loaded by the API process, possibly after this one exited,
+    so ``memory`` refs would be lost: new refs go to the local disk instead.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    global _runner_process
+    _runner_process = True
+    if os.getenv("OPENALEA_CACHE_BACKEND") == "memory":
+        logging.warning(
+            "OPENALEA_CACHE_BACKEND=memory only holds refs of the API process; runner refs use %s", DEFAULT_BACKEND
+        )
+
+
+def get_cache_backend_name() -> str:
+    name = os.getenv("OPENALEA_CACHE_BACKEND", DEFAULT_BACKEND)
+    if name not in CACHE_BACKENDS:
+        logging.warning("Unknown OPENALEA_CACHE_BACKEND=%s, using %s", name, DEFAULT_BACKEND)
+        return DEFAULT_BACKEND
+    if name == "memory" and _runner_process:
+        # mem@ refs would die with this process, out of reach of the API process
+        return DEFAULT_BACKEND
+    return name
+
+
+def register_cache_backend(backend: CacheBackend) -> None:
+    """Use a backend instance for its route, e.g. a ``RedisBackend`` with a custom client.
+
+    Args:
+        backend (CacheBackend): Backend; replaces the one built from the environment for its route.
+    Returns:
+        None (None): No return value.
+    """
+    with _backends_lock:
+        _backends[backend.route] = backend
+
+
+def _backend(route: str, create) -> CacheBackend:
+    with _backends_lock:
+        backend = _backends.get(route)
+        if backend is None:
+            backend = _backends[route] = create()
+        return backend
+
+
+def _memory_route() -> str:
+    return f"mem@{get_node_id()}:{os.getpid()}"
+
+
+def _disk_route() -> str:
+    # Host names change with every container: only name the node when the deployment does
+    return f"disk@{get_node_id()}" if os.getenv("OPENALEA_CACHE_NODE_ID") else "disk"
+
+
+def _kv_backend() -> CacheBackend:
+    def create():
+        url = os.getenv("OPENALEA_CACHE_REDIS_URL")
+        if not url:
+            raise ValueError("The 'kv' cache backend requires OPENALEA_CACHE_REDIS_URL")
+        return RedisBackend.from_url(url, ttl_seconds=get_cache_ttl_seconds())
+
+    return _backend("kv", create)
+
+
+def _store_backend() -> CacheBackend:
+    """Return the backend of new refs (``OPENALEA_CACHE_BACKEND``)."""
+    name = get_cache_backend_name()
+    if name == "kv":
+        return _kv_backend()
+    if name == "memory":
+        route = _memory_route()
+        return _backend(route, lambda: MemoryBackend(get_cache_memory_max_bytes()))
+    route = "fs" if name == "fs" else _disk_route()
+    return _backend(route, lambda: DiskBackend(route))
+
+
+def _backend_for(ref_id: str) -> CacheBackend:
+    """Return the backend holding a ref, from its routing prefix."""
+    route, _ = split_ref(ref_id)
+    if route is None:
+        # Written before refs were routed: local disk
+        return _backend("", lambda: DiskBackend(""))
+    if route == "kv":
+        return _kv_backend()
+    # ``disk@<host name>`` refs were issued without a node id; still local on that host
+    if route in ("fs", "disk", _disk_route(), f"disk@{get_node_id()}"):
+        return _backend(route, lambda: DiskBackend(route))
+    if route == _memory_route():
+        return _backend(route, lambda: MemoryBackend(get_cache_memory_max_bytes()))
+    with _backends_lock:
+        # Registered custom backends; disk and memory routes of other nodes never resolve here
+        if route in _backends and not route.startswith(("disk@", "mem@")):
+            return _backends[route]
+    raise FileNotFoundError(f"Cache ref {ref_id} is held by '{route}', which this process cannot reach")
+
+
+def _new_ref() -> tuple:
+    backend = _store_backend()
+    return f"{backend.route}{ROUTE_SEPARATOR}{uuid.uuid4().hex}", backend
+
+
+def _array_from_npy(view: memoryview):
+    """Return the array of ``.npy`` content without copying its data."""
+    import numpy as np
+
+    version = (view[6], view[7])
+    header_end = 10 + struct.unpack_from("<H", view, 8)[0] if version == (1, 0) else 12 + struct.unpack_from("<I", view, 8)[0]
+    header = io.BytesIO(view[:header_end])
+    np.lib.format.read_magic(header)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+    if dtype.hasobject:
+        raise ValueError("Cached arrays of Python objects are not supported")
+    count = int(np.prod(shape, dtype=np.int64))
+    array = np.frombuffer(view, dtype=dtype, count=count, offset=header_end)
+    return array.reshape(shape, order="F" if fortran_order else "C")
 
 
 def cache_store(value) -> str:
-    ref_id = uuid.uuid4().hex
-    path = _cache_path(ref_id)
-    with open(path, "wb") as f:
-        pickle.dump(value, f)
-    logging.info("Cache store object ref=%s path=%s", ref_id, path)
+    ref_id, backend = _new_ref()
+    # Large buffers (array data) go raw to <ref>.pkl.buf instead of being copied into the stream
+    collector = BufferCollector(get_oob_min_bytes())
+    backend.write(
+        ref_id, OBJECT_SUFFIX, "object",
+        lambda f: pickle.dump(value, f, protocol=5, buffer_callback=collector),
+        compress=True,
+    )
+    if collector.buffers:
+        backend.write(ref_id, BUFFERS_SUFFIX, "object_buffers", lambda f: write_buffers(f, collector.buffers))
+    logging.info(
+        "Cache store object ref=%s oob_buffers=%d oob_bytes=%d",
+        ref_id, len(collector.buffers), sum(buffer.nbytes for buffer in collector.buffers)
+    )
     return ref_id
 
 
+def _load_pickle(backend: CacheBackend, ref_id: str, f):
+    try:
+        buffers = split_buffers(backend.map(ref_id, BUFFERS_SUFFIX))
+    except FileNotFoundError:
+        try:
+            return pickle.load(f)
+        except pickle.UnpicklingError as e:
+            # The segment file was removed (evicted) without its pickle
+            raise FileNotFoundError(str(e)) from e
+    return pickle.load(f, buffers=buffers)
+
+
 def cache_load(ref_id: str):
-    path = _cache_path(ref_id)
-    if not path.exists():
-        raise FileNotFoundError(f"Cached object not found: {ref_id}")
-    with open(path, "rb") as f:
-        value = pickle.load(f)
-    logging.info("Cache load object ref=%s path=%s", ref_id, path)
+    try:
+        backend = _backend_for(ref_id)
+        value = backend.read(ref_id, OBJECT_SUFFIX, lambda f: _load_pickle(backend, ref_id, f), compressed=True)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Cached object not found: {ref_id} ({e})") from None
+    logging.info("Cache load object ref=%s", ref_id)
     return value
 
 
+def cache_exists(ref_id: str) -> bool:
+    try:
+        backend = _backend_for(ref_id)
+    except FileNotFoundError:
+        return False
+    return any(backend.exists(ref_id, suffix) for suffix in (OBJECT_SUFFIX, SCENE_JSON_SUFFIX, ARRAY_SUFFIX))
+
+
+def cache_store_array(array) -> str:
+    import numpy as np
+
+    ref_id, backend = _new_ref()
+    backend.write(ref_id, ARRAY_SUFFIX, "array", lambda f: np.save(f, array, allow_pickle=False))
+    logging.info("Cache store array ref=%s shape=%s dtype=%s", ref_id, array.shape, array.dtype)
+    return ref_id
+
+
+def cache_load_array(ref_id: str):
+    import numpy as np
+
+    try:
+        backend = _backend_for(ref_id)
+        if isinstance(backend, DiskBackend):
+            # np.memmap keeps the file name and offset, for consumers that reopen the data
+            path = _array_path(ref_id)
+            array = np.load(path, mmap_mode="c", allow_pickle=False)
+            _touch(path)
+        else:
+            array = _array_from_npy(backend.map(ref_id, ARRAY_SUFFIX))
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Cached array not found: {ref_id} ({e})") from None
+    logging.info("Cache load array ref=%s shape=%s dtype=%s", ref_id, array.shape, array.dtype)
+    return array
+
+
 def cache_store_scene_json(ref_id: str, scene_json: dict) -> None:
-    path = _scene_json_path(ref_id)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(scene_json, f)
+    _backend_for(ref_id).write(
+        ref_id, SCENE_JSON_SUFFIX, "scene_json", lambda f: _dump_json(scene_json, f), compress=True
+    )
     object_count = len(scene_json.get("objects", [])) if isinstance(scene_json, dict) else -1
-    logging.info("Cache store scene json ref=%s objects=%s path=%s", ref_id, object_count, path)
+    logging.info("Cache store scene json ref=%s objects=%s", ref_id, object_count)
 
 
 def cache_store_scene_json_new(scene_json: dict) -> str:
-    ref_id = uuid.uuid4().hex
+    ref_id, _ = _new_ref()
     cache_store_scene_json(ref_id, scene_json)
     return ref_id
 
 
+def _load_optional(ref_id: str, suffix: str, read, compressed: bool = False):
+    try:
+        return _backend_for(ref_id).read(ref_id, suffix, read, compressed=compressed)
+    except FileNotFoundError:
+        return None
+
+
 def cache_load_scene_json(ref_id: str) -> dict | None:
-    path = _scene_json_path(ref_id)
-    if not path.exists():
+    scene_json = _load_optional(ref_id, SCENE_JSON_SUFFIX, lambda f: json.loads(f.read()), compressed=True)
+    if scene_json is None:
         return None
-    with open(path, "r", encoding="utf-8") as f:
-        scene_json = json.load(f)
     object_count = len(scene_json.get("objects", [])) if isinstance(scene_json, dict) else -1
-    logging.info("Cache load scene json ref=%s objects=%s path=%s", ref_id, object_count, path)
+    logging.info("Cache load scene json ref=%s objects=%s", ref_id, object_count)
     return scene_json
 
 
+def cache_delete_scene_json(ref_id: str) -> None:
+    """Remove a scene JSON entry, e.g. scratch data of a finished computation; a missing one is ignored.
+
+    Args:
+        ref_id (str): Cache reference.
+    Returns:
+        None (None): No return value.
+    """
+    try:
+        _backend_for(ref_id).delete(ref_id, SCENE_JSON_SUFFIX)
+    except OSError as e:
+        logging.warning("Cache delete scene json failed ref=%s: %s", ref_id, e)
+        return
+    logging.info("Cache delete scene json ref=%s", ref_id)
+
+
+def cache_store_scene_bin(ref_id: str, data: bytes) -> None:
+    _backend_for(ref_id).write(ref_id, SCENE_BIN_SUFFIX, "scene_bin", lambda f: f.write(data))
+    logging.info("Cache store scene bin ref=%s bytes=%s", ref_id, len(data))
+
+
+def cache_load_scene_bin(ref_id: str) -> bytes | None:
+    data = _load_optional(ref_id, SCENE_BIN_SUFFIX, lambda f: f.read())
+    if data is not None:
+        logging.info("Cache load scene bin ref=%s bytes=%s", ref_id, len(data))
+    return data
+
+
+def cache_store_scene_index(ref_id: str, data: bytes) -> None:
+    _backend_for(ref_id).write(ref_id, SCENE_INDEX_SUFFIX, "scene_index", lambda f: f.write(data))
+    logging.info("Cache store scene index ref=%s bytes=%s", ref_id, len(data))
+
+
+def cache_load_scene_index(ref_id: str) -> bytes | None:
+    data = _load_optional(ref_id, SCENE_INDEX_SUFFIX, lambda f: f.read())
+    if data is not None:
+        logging.info("Cache load scene index ref=%s bytes=%s", ref_id, len(data))
+    return data
+
+
+def cache_stats() -> dict:
+    """Return the occupancy and eviction counters of the cache index.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        stats (dict): Indexed ``entries`` and ``bytes`` (also per ``kinds``), ``max_bytes``,
+            access ``hits``, the ``evictions``/``evicted_bytes``/``expired`` counters, and
+            the ``backend`` of new refs with its own statistics; plus an ``error`` (and empty
+            counters) when the index cannot be read.
+    """
+    try:
+        backend = _store_backend().stats()
+    except ValueError as e:
+        backend = {"backend": get_cache_backend_name(), "error": str(e)}
+    try:
+        connection = _index()
+        kinds = {
+            kind: {"entries": entries, "bytes": size}
+            for kind, entries, size in connection.execute("SELECT kind, COUNT(*), SUM(size) FROM entries GROUP BY kind")
+        }
+        counters = dict(connection.execute("SELECT name, value FROM counters"))
+        hits = connection.execute("SELECT COALESCE(SUM(hits), 0) FROM entries").fetchone()[0]
+    except sqlite3.Error as e:
+        logging.warning("Cache index read failed: %s", e)
+        error = str(e)
+        kinds, counters, hits = {}, {}, 0
+    else:
+        error = None
+    stats = {
+        "entries": sum(kind["entries"] for kind in kinds.values()),
+        "bytes": sum(kind["bytes"] for kind in kinds.values()),
+        "max_bytes": get_cache_max_bytes(),
+        "hits": hits,
+        "evictions": counters.get("evictions", 0),
+        "evicted_bytes": counters.get("evicted_bytes", 0),
+        "expired": counters.get("expired", 0),
+        "kinds": kinds,
+        "backend": backend,
+    }
+    if error is not None:
+        stats["error"] = error
+    return stats
+
+
+def cache_sweep(ttl_seconds: int | None = None, max_entries: int = 500) -> int:
+    """Remove indexed entries not accessed within the TTL, oldest first.
+
+    Walks the access-time index instead of the directory, and removes at
+    most ``max_entries`` files so that a sweep has bounded I/O; call it
+    again to continue. Files are unlinked while holding the index write
+    lock, and a file modified within the TTL (its key was just rewritten)
+    is kept. Files missing from the index are left to ``cache_sweep_unindexed``.
+
+    Args:
+        ttl_seconds (int | None): Idle time before expiry; None -> ``OPENALEA_CACHE_TTL_SECONDS``, 0 disables.
+        max_entries (int): Maximum number of files removed.
+    Returns:
+        removed (int): Number of expired entries.
+    """
+    ttl = get_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
+    if ttl <= 0 or max_entries <= 0:
+        return 0
+    cutoff = time.time() - ttl
+    cache_dir = get_cache_dir()
+    removed, refreshed = [], []
+    try:
+        with _transaction() as connection:
+            for key, in connection.execute(
+                "SELECT path FROM entries WHERE accessed < ? ORDER BY accessed LIMIT ?", (cutoff, max_entries)
+            ).fetchall():
+                path = cache_dir / key
+                try:
+                    mtime = path.stat().st_mtime
+                except FileNotFoundError:
+                    mtime = None
+                except OSError:
+                    continue
+                if mtime is not None and mtime >= cutoff:
+                    # Rewritten since it was indexed (its own index update is waiting for the lock): keep it
+                    refreshed.append((mtime, key))
+                    continue
+                # Unlink under the write lock, so a writer of the same key cannot interleave
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    logging.warning("Cache sweep could not remove %s", key)
+                    continue
+                removed.append(key)
+            _delete_rows(connection, removed)
+            connection.executemany("UPDATE entries SET accessed = ? WHERE path = ?", refreshed)
+            _bump_counters(connection, expired=len(removed))
+    except sqlite3.Error as e:
+        logging.warning("Cache sweep failed: %s", e)
+        return len(removed)
+    if removed:
+        logging.info("Cache sweep removed=%d ttl=%d", len(removed), ttl)
+    return len(removed)
+
+
+def cache_sweep_unindexed(shard: str, ttl_seconds: int | None = None, max_entries: int = 500) -> int:
+    """Remove the files of one shard that are missing from the index and older than the TTL.
+
+    Catches what ``cache_sweep`` cannot see: files written before the index
+    existed or while it could not be updated, and temporary files of
+    interrupted writes. Only one directory is listed per call; pass each of
+    ``CACHE_SHARDS`` in turn to cover the whole cache.
+
+    Args:
+        shard (str): Entry of ``CACHE_SHARDS``: a shard dir, ``tessellation``, or ``""`` for the cache dir itself.
+        ttl_seconds (int | None): Age (file mtime) before removal; None -> ``OPENALEA_CACHE_TTL_SECONDS``, 0 disables.
+        max_entries (int): Maximum number of files removed.
+    Returns:
+        removed (int): Number of files removed.
+    """
+    ttl = get_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
+    if ttl <= 0 or max_entries <= 0:
+        return 0
+    cutoff = time.time() - ttl
+    directory = get_cache_dir() / shard
+    patterns = ("*.npz",) if shard == "tessellation" else _ENTRY_PATTERNS + ("*.tmp",)
+    candidates = []
+    for path in sorted(path for pattern in patterns for path in directory.glob(pattern)):
+        try:
+            if path.stat().st_mtime < cutoff:
+                candidates.append(path)
+        except OSError:
+            continue
+    if not candidates:
+        return 0
+    removed = 0
+    try:
+        with _transaction() as connection:
+            for path in candidates:
+                if removed >= max_entries:
+                    break
+                if connection.execute("SELECT 1 FROM entries WHERE path = ?", (_index_key(path),)).fetchone():
+                    continue
+                try:
+                    # Re-check under the write lock: a writer may have just replaced the file
+                    if path.stat().st_mtime >= cutoff:
+                        continue
+                    path.unlink()
+                except OSError:
+                    continue
+                removed += 1
+            _bump_counters(connection, expired=removed)
+    except sqlite3.Error as e:
+        # Without the index, unindexed files cannot be told apart
+        logging.warning("Cache sweep of unindexed files failed: %s", e)
+        return removed
+    if removed:
+        logging.info("Cache sweep removed unindexed=%d shard=%s ttl=%d", removed, shard or ".", ttl)
+    return removed
+
+
 def cache_cleanup(ttl_seconds: int | None = None) -> int:
+    # Full directory walk by mtime, including files missing from the index (e.g. written before it
+    # existed). Routine expiry is the incremental ``cache_sweep`` run by the cache janitor.
     ttl = get_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
     if ttl <= 0:
         return 0
 
     cache_dir = get_cache_dir()
-    removed = 0
-    from time import time
-    now = time()
+    removed_keys = []
+    now = time.time()
 
-    for path in list(cache_dir.glob("*.pkl")) + list(cache_dir.glob("*.scene.json")):
+    # Loads refresh the mtime, so entries expire ttl seconds after their last access.
+    # Flat patterns cover files written before entries were sharded.
+    patterns = _ENTRY_PATTERNS
+    paths = [path for pattern in patterns for path in cache_dir.glob(pattern)]
+    paths += [path for pattern in patterns for path in cache_dir.glob(f"??/{pattern}")]
+    paths += list(cache_dir.glob("tessellation/*.npz"))
+    for path in paths:
         try:
             mtime = path.stat().st_mtime
         except OSError:
@@ -100,10 +862,16 @@ def cache_cleanup(ttl_seconds: int | None = None) -> int:
         if (now - mtime) > ttl:
             try:
                 path.unlink()
-                removed += 1
+                removed_keys.append(_index_key(path))
             except OSError:
                 continue
 
-    if removed > 0:
-        logging.info("Cache cleanup removed=%d ttl=%d", removed, ttl)
-    return removed
+    if removed_keys:
+        try:
+            with _transaction() as connection:
+                _delete_rows(connection, removed_keys)
+                _bump_counters(connection, expired=len(removed_keys))
+        except sqlite3.Error as e:
+            logging.warning("Cache index update failed during cleanup: %s", e)
+        logging.info("Cache cleanup removed=%d ttl=%d", len(removed_keys), ttl)
+    return len(removed_keys)
@@ -0,0 +1,118 @@
+"""Registry of in-flight executions, used to cancel them by id."""
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+import uuid
+from typing import Dict, Iterator, List, Optional
+
+from model.openalea.runner.utils.openalea_runner_helpers import kill_process_group
+
+
+class Execution:
+    """One running execution and the process group currently serving it."""
+
+    def __init__(self, execution_id: str):
+        self.execution_id = execution_id
+        self.cancelled = False
+        self._pgid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def attach(self, pgid: Optional[int]) -> None:
+        """Record the process group running this execution (None to detach).
+
+        A process attached after a cancel request is killed immediately.
+
+        Args:
+            pgid (Optional[int]): Process group id, or None once the process is released.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            self._pgid = pgid
+            if self.cancelled and pgid is not None:
+                kill_process_group(pgid)
+
+    def cancel(self) -> None:
+        """Mark the execution as cancelled and kill its process group.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        # Killing under the lock guarantees a detached process is never signalled.
+        with self._lock:
+            self.cancelled = True
+            if self._pgid is not None:
+                kill_process_group(self._pgid)
+
+
+class ExecutionRegistry:
+    """Thread-safe map of execution ids to running executions."""
+
+    def __init__(self):
+        self._executions: Dict[str, Execution] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def track(self, execution_id: Optional[str] = None) -> Iterator[Execution]:
+        """Register an execution for the duration of the ``with`` block.
+
+        Args:
+            execution_id (Optional[str]): Client-chosen id; generated when omitted.
+        Returns:
+            execution (Iterator[Execution]): The registered execution.
+        """
+        execution = Execution(execution_id or uuid.uuid4().hex)
+        with self._lock:
+            if execution.execution_id in self._executions:
+                raise ValueError(f"Execution '{execution.execution_id}' is already running")
+            self._executions[execution.execution_id] = execution
+        try:
+            yield execution
+        finally:
+            with self._lock:
+                self._executions.pop(execution.execution_id, None)
+
+    def cancel(self, execution_id: str) -> bool:
+        """Cancel a running execution.
+
+        Args:
+            execution_id (str): Execution identifier.
+        Returns:
+            found (bool): False if no execution with this id is running.
+        """
+        with self._lock:
+            execution = self._executions.get(execution_id)
+        if execution is None:
+            return False
+        logging.info("Cancelling execution %s", execution_id)
+        execution.cancel()
+        return True
+
+    def running(self) -> List[str]:
+        """Return the ids of running executions.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            execution_ids (List[str]): Running execution ids.
+        """
+        with self._lock:
+            return list(self._executions)
+
+
+_REGISTRY = ExecutionRegistry()
+
+
+def get_execution_registry() -> ExecutionRegistry:
+    """Return the process-wide execution registry.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        registry (ExecutionRegistry): Shared registry.
+    """
+    return _REGISTRY
@@ -0,0 +1,218 @@
+"""Asynchronous execution jobs with state, log and result events."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+TERMINAL_STATES = {JOB_DONE, JOB_ERROR}
+
+# Older log events are dropped beyond this many per job; state/result events are kept.
+MAX_LOG_EVENTS = 2000
+
+
+class Job:
+    """State of one submitted execution and its ordered event log."""
+
+    def __init__(self, description: str):
+        self.job_id = uuid.uuid4().hex
+        self.description = description
+        self.state = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.log_count = 0
+        self._next_seq = 1
+
+    def add_event(self, event: str, data: Any) -> None:
+        """Append an event; caller must hold the manager lock."""
+        self.events.append({"id": self._next_seq, "event": event, "data": data})
+        self._next_seq += 1
+        if event == "log":
+            self.log_count += 1
+            if self.log_count > MAX_LOG_EVENTS:
+                oldest_log = next(i for i, e in enumerate(self.events) if e["event"] == "log")
+                del self.events[oldest_log]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the job."""
+        return {
+            "job_id": self.job_id,
+            "description": self.description,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "log_count": self.log_count,
+        }
+
+
+class JobManager:
+    """Run callables in a bounded thread pool and keep their results for a while."""
+
+    def __init__(self, max_concurrent: int, retention_seconds: int):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix="runner-job")
+        self._jobs: Dict[str, Job] = {}
+        self._changed = threading.Condition()
+
+    def submit(self, description: str, work: Callable[[Callable[[str], None]], Dict[str, Any]]) -> Job:
+        """Queue a job and return immediately.
+
+        Args:
+            description (str): Human readable job description.
+            work (Callable): Function receiving an ``on_log(line)`` callback and
+                returning an execution response ``{"success", ...}``.
+        Returns:
+            job (Job): The queued job.
+        """
+        self.prune()
+        job = Job(description)
+        with self._changed:
+            self._jobs[job.job_id] = job
+            job.add_event("state", {"state": JOB_QUEUED})
+            self._changed.notify_all()
+        self._executor.submit(self._run, job, work)
+        logging.info("Job %s queued: %s", job.job_id, description)
+        return job
+
+    def _run(self, job: Job, work) -> None:
+        """Execute a job in a pool thread and record its outcome."""
+        with self._changed:
+            job.state = JOB_RUNNING
+            job.started_at = time.time()
+            job.add_event("state", {"state": JOB_RUNNING})
+            self._changed.notify_all()
+
+        try:
+            result = work(lambda line: self._log(job, line))
+        except Exception as e:
+            logging.exception("Job %s failed", job.job_id)
+            result = {"success": False, "error": str(e)}
+
+        with self._changed:
+            job.result = result
+            job.error = result.get("error") if not result.get("success") else None
+            job.state = JOB_DONE if result.get("success") else JOB_ERROR
+            job.finished_at = time.time()
+            job.add_event("result", result)
+            job.add_event("state", {"state": job.state, "error": job.error})
+            self._changed.notify_all()
+        logging.info("Job %s finished state=%s", job.job_id, job.state)
+
+    def _log(self, job: Job, line: str) -> None:
+        """Record one log line emitted by a running job."""
+        with self._changed:
+            job.add_event("log", {"line": line})
+            self._changed.notify_all()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if unknown or expired.
+
+        Args:
+            job_id (str): Job identifier.
+        Returns:
+            job (Optional[Job]): The job if still retained.
+        """
+        self.prune()
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def events_since(self, job_id: str, after: int = 0, timeout: float = 0.0) -> List[Dict[str, Any]]:
+        """Return events newer than ``after``, waiting up to ``timeout`` for one.
+
+        Args:
+            job_id (str): Job identifier.
+            after (int): Last event id already seen by the client.
+            timeout (float): Seconds to wait when no new event is available.
+        Returns:
+            events (List[Dict[str, Any]]): New events in order.
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return []
+            self._changed.wait_for(
+                lambda: job.events[-1]["id"] > after or job.state in TERMINAL_STATES,
+                timeout=timeout,
+            )
+            return [event for event in job.events if event["id"] > after]
+
+    def prune(self) -> int:
+        """Forget finished jobs older than the retention period.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            removed (int): Number of forgotten jobs.
+        """
+        cutoff = time.time() - self.retention_seconds
+        with self._changed:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs; running jobs are not waited for.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_JOB_MANAGER: Optional[JobManager] = None
+_JOB_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager configured from settings.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        manager (JobManager): Shared job manager.
+    """
+    global _JOB_MANAGER
+    with _JOB_MANAGER_LOCK:
+        if _JOB_MANAGER is None:
+            _JOB_MANAGER = JobManager(
+                max_concurrent=settings.RUNNER_JOB_MAX_CONCURRENT,
+                retention_seconds=settings.RUNNER_JOB_RETENTION_SECONDS,
+            )
+        return _JOB_MANAGER
+
+
+def shutdown_job_manager() -> None:
+    """Shut down the process-wide job manager if it was created.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    global _JOB_MANAGER
+    with _JOB_MANAGER_LOCK:
+        manager, _JOB_MANAGER = _JOB_MANAGER, None
+    if manager is not None:
+        manager.shutdown()
@@ -2,14 +2,23 @@
 import subprocess
 import logging
 import os
-from unittest import result
+from typing import Callable, Optional
 
 from model.openalea.runner.utils.openalea_runner_helpers import (
     build_node_info,
-    log_subprocess_output,
+    build_workflow_info,
+    log_response_summary,
     parse_subprocess_response,
     run_node_subprocess,
 )
+from model.openalea.runner.execution_registry import get_execution_registry
+from model.openalea.runner.result_cache import (
+    forget_package_versions,
+    get_result_cache,
+    result_cache_key,
+)
+from model.openalea.runner.utils.workflow_graph import topological_order
+from model.openalea.runner.worker_pool import WorkerCrashedError, WorkerStartupTimeout, get_worker_pool
 
 class OpenAleaRunner:
     """Execute OpenAlea nodes in isolated subprocess."""
@@ -22,14 +31,23 @@ class OpenAleaRunner:
     )
 
     @staticmethod
-    def execute_node(package_name: str, node_name: str, inputs: dict, timeout: int = 60) -> dict:
+    def execute_node(package_name: str, node_name: str, inputs: dict, timeout: int = 60,
+                     use_cache: bool = True, on_log: Optional[Callable[[str], None]] = None,
+                     execution_id: Optional[str] = None) -> dict:
         """Execute a single OpenAlea node in a subprocess.
 
+        When ``RUNNER_POOL_SIZE`` is set, the node runs on a warm pool worker
+        instead of a freshly spawned interpreter. When result memoization is
+        enabled, identical executions are answered from the result cache.
+
         Args:
             package_name (str): OpenAlea package name (e.g., "openalea.math").
             node_name (str): Node name within the package (e.g., "addition").
             inputs (dict): Input values {name: value} or {index: value}.
             timeout (int): Execution timeout in seconds.
+            use_cache (bool): Allow memoized results (disable for non-deterministic nodes).
+            on_log (Optional[Callable[[str], None]]): Receives the execution's stderr lines.
+            execution_id (Optional[str]): Id under which the execution can be cancelled.
         Returns:
             response (dict): Execution response with success flag and outputs or error.
         """
@@ -38,11 +56,100 @@ class OpenAleaRunner:
             package_name, node_name, inputs
         )
 
+        result_cache = get_result_cache() if use_cache else None
+        cache_key = None
+        if result_cache is not None and result_cache.is_cacheable(package_name, node_name):
+            cache_key = result_cache_key(package_name, node_name, inputs)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                logging.info("OpenAleaRunner: Result cache hit for '%s.%s'", package_name, node_name)
+                return cached
+
         # Build node info for subprocess
         node_info = build_node_info(package_name, node_name, inputs)
+        response = OpenAleaRunner._run_payload(
+            node_info, timeout, f"{package_name}.{node_name}", on_log, execution_id
+        )
+        if cache_key is not None:
+            result_cache.put(cache_key, response)
+        return response
+
+    @staticmethod
+    def execute_workflow(nodes: list, edges: list, return_nodes: list | None = None,
+                         timeout: int = 600, execution_id: Optional[str] = None) -> dict:
+        """Execute a whole workflow graph in a single OpenAlea context.
 
+        Intermediate outputs stay live Python objects inside the subprocess;
+        only the outputs of ``return_nodes`` (sink nodes by default) are serialized.
+
+        Args:
+            nodes (list): Workflow nodes (frontend model).
+            edges (list): Workflow edges (frontend model).
+            return_nodes (list | None): Node ids whose outputs are returned.
+            timeout (int): Execution timeout in seconds for the whole workflow.
+            execution_id (Optional[str]): Id under which the execution can be cancelled.
+        Returns:
+            response (dict): ``{"success", "results": {node_id: {...}}}`` or error.
+        """
+        logging.info("OpenAleaRunner: Executing workflow with %d nodes and %d edges", len(nodes), len(edges))
         try:
-            result = run_node_subprocess(OpenAleaRunner.SCRIPT_PATH, node_info, timeout)
+            # Reject malformed or cyclic graphs before paying for a subprocess
+            topological_order(nodes, edges)
+        except ValueError as e:
+            logging.error("Invalid workflow: %s", e)
+            return {"success": False, "error": str(e)}
+
+        node_info = build_workflow_info(nodes, edges, return_nodes)
+        return OpenAleaRunner._run_payload(node_info, timeout, "workflow", execution_id=execution_id)
+
+    @staticmethod
+    def _run_payload(node_info: dict, timeout: int, label: str,
+                     on_log: Optional[Callable[[str], None]] = None,
+                     execution_id: Optional[str] = None) -> dict:
+        """Run an execution payload while it is registered for cancellation.
+
+        Args:
+            node_info (dict): Payload for ``run_workflow.py``.
+            timeout (int): Execution timeout in seconds.
+            label (str): Human readable target used in logs.
+            on_log (Optional[Callable[[str], None]]): Receives the execution's stderr lines.
+            execution_id (Optional[str]): Id under which the execution can be cancelled.
+        Returns:
+            response (dict): Execution response with success flag or error.
+        """
+        try:
+            with get_execution_registry().track(execution_id) as execution:
+                response = OpenAleaRunner._dispatch_payload(node_info, timeout, label, on_log, execution.attach)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if execution.cancelled:
+            logging.info("Execution of '%s' was cancelled", label)
+            return {"success": False, "error": "Execution cancelled", "cancelled": True}
+        return response
+
+    @staticmethod
+    def _dispatch_payload(node_info: dict, timeout: int, label: str,
+                          on_log: Optional[Callable[[str], None]],
+                          on_process: Callable[[Optional[int]], None]) -> dict:
+        """Run an execution payload on a pool worker or a fresh subprocess.
+
+        Args:
+            node_info (dict): Payload for ``run_workflow.py``.
+            timeout (int): Execution timeout in seconds.
+            label (str): Human readable target used in logs.
+            on_log (Optional[Callable[[str], None]]): Receives the execution's stderr lines.
+            on_process (Callable[[Optional[int]], None]): Receives the serving process group id.
+        Returns:
+            response (dict): Execution response with success flag or error.
+        """
+        try:
+            pool = get_worker_pool()
+            if pool is not None:
+                response = pool.execute(node_info, timeout, on_log, on_process)
+                log_response_summary(response)
+                return response
+
+            result = run_node_subprocess(OpenAleaRunner.SCRIPT_PATH, node_info, timeout, on_process, on_log)
             if result.stderr:
                 logging.warning("Subprocess stderr: %s", result.stderr)
             if result.stdout:
@@ -54,11 +161,26 @@ class OpenAleaRunner:
 
             return {"success": False, "error": "No output from subprocess"}
 
-        except subprocess.TimeoutExpired:
-            logging.error("Node execution timed out after %d seconds", timeout)
+        except WorkerStartupTimeout as e:
+            # The execution timeout only starts once the worker is ready
+            logging.error("Worker startup for '%s' timed out after %d seconds", label, e.timeout)
+            return {
+                "success": False,
+                "error": f"Worker startup timed out after {e.timeout} seconds"
+            }
+
+        except subprocess.TimeoutExpired as e:
+            logging.error("Execution of '%s' timed out after %d seconds", label, e.timeout)
+            return {
+                "success": False,
+                "error": f"Execution timed out after {e.timeout} seconds"
+            }
+
+        except WorkerCrashedError as e:
+            logging.error("Worker crashed while executing '%s': %s", label, e)
             return {
                 "success": False,
-                "error": f"Execution timed out after {timeout} seconds"
+                "error": str(e)
             }
 
         except FileNotFoundError:
@@ -74,3 +196,20 @@ class OpenAleaRunner:
                 "success": False,
                 "error": str(e)
             }
+
+    @staticmethod
+    def reset_workers() -> None:
+        """Recycle warm workers so they pick up newly installed packages.
+
+        Memoized package versions are dropped too, so results computed with
+        a previous package version are no longer served.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        forget_package_versions()
+        pool = get_worker_pool()
+        if pool is not None:
+            pool.restart()
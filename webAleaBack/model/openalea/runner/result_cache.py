@@ -0,0 +1,247 @@
+"""Content-addressed memoization of node execution results."""
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from importlib import metadata
+from typing import Any, Dict, Iterator, Optional
+
+from core.config import settings
+from model.openalea.cache.object_cache import cache_exists
+
+
+def _canonical(value: Any) -> Any:
+    """Reduce a value to a canonical JSON-compatible form for hashing.
+
+    Cached references hash by ref id only, so their ``summary`` or
+    ``__meta__`` fields never change the key.
+
+    Args:
+        value (Any): Input value.
+    Returns:
+        canonical (Any): Canonical representation.
+    """
+    if isinstance(value, dict):
+        if "__ref__" in value:
+            return {"__ref__": str(value["__ref__"])}
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def hash_inputs(inputs: dict) -> str:
+    """Compute a stable hash of resolved node inputs.
+
+    Args:
+        inputs (dict): Input values {name: value}.
+    Returns:
+        digest (str): Hex SHA-256 digest of the canonical inputs.
+    """
+    payload = json.dumps(_canonical(inputs), sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def package_version(package_name: str) -> str:
+    """Return the installed version of an OpenAlea package.
+
+    Args:
+        package_name (str): Package name, with or without the ``openalea.`` prefix.
+    Returns:
+        version (str): Installed version or ``"unknown"``.
+    """
+    candidates = [package_name]
+    if not package_name.startswith("openalea."):
+        candidates.append(f"openalea.{package_name}")
+    for candidate in candidates:
+        try:
+            return metadata.version(candidate)
+        except metadata.PackageNotFoundError:
+            continue
+    return "unknown"
+
+
+def forget_package_versions() -> None:
+    """Drop memoized package versions, e.g. after packages were installed.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    importlib.invalidate_caches()
+    package_version.cache_clear()
+
+
+def result_cache_key(package_name: str, node_name: str, inputs: dict) -> str:
+    """Build the memoization key of a node execution.
+
+    Args:
+        package_name (str): OpenAlea package name.
+        node_name (str): Node name within the package.
+        inputs (dict): Input values {name: value}.
+    Returns:
+        key (str): Key combining package, node, package version and input hash.
+    """
+    return "|".join([package_name, node_name, package_version(package_name), hash_inputs(inputs)])
+
+
+def _iter_refs(value: Any) -> Iterator[str]:
+    """Yield every cache ref id referenced by a serialized value."""
+    if isinstance(value, dict):
+        if "__ref__" in value:
+            yield str(value["__ref__"])
+        for item in value.values():
+            yield from _iter_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_refs(item)
+
+
+class ResultCache:
+    """Thread-safe LRU of successful execution responses, bounded by count and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, exclude=()):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.exclude = set(exclude)
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_cacheable(self, package_name: str, node_name: str) -> bool:
+        """Check whether results of a node may be memoized.
+
+        Args:
+            package_name (str): OpenAlea package name.
+            node_name (str): Node name within the package.
+        Returns:
+            cacheable (bool): False for excluded (non-deterministic) nodes.
+        """
+        return node_name not in self.exclude and f"{package_name}.{node_name}" not in self.exclude
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a memoized response, or None on a miss.
+
+        Entries whose cached object refs have expired are dropped.
+
+        Args:
+            key (str): Key from ``result_cache_key``.
+        Returns:
+            response (Optional[Dict[str, Any]]): Copy of the stored response.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        # Stat the cache files without holding the lock; stored responses are never mutated
+        valid = entry is not None and all(cache_exists(ref) for ref in _iter_refs(entry[0]))
+        with self._lock:
+            if valid:
+                if self._entries.get(key) is entry:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                if entry is not None and self._entries.get(key) is entry:
+                    self._remove(key)
+                self.misses += 1
+        return copy.deepcopy(entry[0]) if valid else None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Memoize a successful response, evicting least recently used entries.
+
+        Args:
+            key (str): Key from ``result_cache_key``.
+            response (Dict[str, Any]): Execution response.
+        Returns:
+            None (None): No return value.
+        """
+        if not response.get("success"):
+            return
+        size = len(json.dumps(response, default=repr))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (copy.deepcopy(response), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; caller must hold the lock."""
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Drop every memoized response.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            stats (Dict[str, Any]): Cache statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_RESULT_CACHE: Optional[ResultCache] = None
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the process-wide result cache, or None when memoization is disabled.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        cache (Optional[ResultCache]): Shared cache configured from settings.
+    """
+    global _RESULT_CACHE
+    if settings.RUNNER_RESULT_CACHE_MAX_ENTRIES <= 0:
+        return None
+    with _RESULT_CACHE_LOCK:
+        if _RESULT_CACHE is None:
+            _RESULT_CACHE = ResultCache(
+                max_entries=settings.RUNNER_RESULT_CACHE_MAX_ENTRIES,
+                max_bytes=settings.RUNNER_RESULT_CACHE_MAX_BYTES,
+                exclude=settings.RUNNER_RESULT_CACHE_EXCLUDE,
+            )
+            logging.info(
+                "Result cache enabled max_entries=%s max_bytes=%s exclude=%s",
+                _RESULT_CACHE.max_entries, _RESULT_CACHE.max_bytes, sorted(_RESULT_CACHE.exclude)
+            )
+        return _RESULT_CACHE
@@ -0,0 +1,106 @@
+"""Long-lived worker executing OpenAlea nodes received over stdin.
+
+Protocol (one JSON document per line):
+- stdin: ``{"job_id": "...", "node_info": {"package_name": ..., "node_name": ..., "inputs": {...}}}``
+  (or ``{"job_id": "...", "node_info": {"workflow": {...}}}`` for a whole graph)
+- stdout: ``{"ready": true}`` once OpenAlea is loaded, then
+  ``{"job_id": "...", "response": {...}}`` for every job.
+
+Anything printed by OpenAlea nodes is redirected to stderr so that stdout
+only carries protocol messages. A ``JOB_END_MARKER`` line on stderr closes
+the log of each job.
+"""
+import json
+import sys
+import logging
+import os
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from core.config import settings
+from model.openalea.cache.object_cache import mark_runner_process
+from model.openalea.runner.runnable.run_workflow import execute_payload
+from model.openalea.runner.utils.openalea_runner_helpers import JOB_END_MARKER
+from model.openalea.runner.utils.workflow_helpers import init_package_manager
+from model.openalea.visualizer.utils import parallel
+
+logging.basicConfig(level=logging.INFO)
+
+
+def open_protocol_stream():
+    """Reserve the original stdout for protocol messages.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        stream (TextIO): Line-buffered stream writing to the original stdout.
+    """
+    protocol_fd = os.dup(sys.stdout.fileno())
+    # Route fd 1 (Python prints and C-level writes) to stderr.
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return os.fdopen(protocol_fd, "w", encoding="utf-8", buffering=1)
+
+
+def write_message(stream, message: dict) -> None:
+    """Write one protocol message.
+
+    Args:
+        stream (TextIO): Protocol stream.
+        message (dict): JSON-serializable message.
+    Returns:
+        None (None): No return value.
+    """
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def handle_job(job: dict, pm) -> dict:
+    """Execute one job and build its response.
+
+    Args:
+        job (dict): Job payload with ``node_info`` (single node or workflow).
+        pm (PackageManager): Initialized PackageManager shared by all jobs.
+    Returns:
+        response (dict): Execution response with success flag and outputs or error.
+    """
+    return execute_payload(job.get("node_info") or {}, pm=pm)
+
+
+def serve() -> None:
+    """Initialize OpenAlea once then process jobs until stdin is closed.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    protocol = open_protocol_stream()
+    mark_runner_process()
+    # Pool workers run side by side: keep each one from starting a full serialization pool
+    parallel.limit_workers(settings.VISUALIZER_NODE_SERIALIZE_WORKERS)
+    pm = init_package_manager()
+    write_message(protocol, {"ready": True, "pid": os.getpid()})
+
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job_id = None
+            try:
+                job = json.loads(line)
+                job_id = job.get("job_id")
+                response = handle_job(job, pm)
+            except Exception as e:
+                logging.exception("Error executing node")
+                response = {"success": False, "error": str(e)}
+            sys.stdout.flush()
+            print(f"{JOB_END_MARKER} {job_id}", file=sys.stderr, flush=True)
+            write_message(protocol, {"job_id": job_id, "response": response})
+    finally:
+        parallel.shutdown_pool()
+
+
+if __name__ == "__main__":
+    serve()
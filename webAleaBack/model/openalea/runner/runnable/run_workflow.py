@@ -8,33 +8,50 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
+from core.config import settings
+from model.openalea.cache.object_cache import mark_runner_process
+from model.openalea.runner.utils.input_resolver import resolve_value
+from model.openalea.runner.utils.workflow_graph import (
+    gather_inputs,
+    incoming_edges,
+    is_openalea_node,
+    node_node_name,
+    node_package_name,
+    primitive_outputs,
+    sink_node_ids,
+    topological_order,
+)
 from model.openalea.runner.utils.workflow_helpers import (
     apply_inputs,
     build_outputs,
+    build_outputs_from_values,
     get_factory_outputs,
     get_node_factory,
     get_package,
     init_package_manager,
     instantiate_node,
 )
+from model.openalea.visualizer.utils import parallel
 
 logging.basicConfig(level=logging.INFO)
 
 
-def execute_node(package_name: str, node_name: str, inputs: dict) -> dict:
+def execute_node(package_name: str, node_name: str, inputs: dict, pm=None) -> dict:
     """Execute a single OpenAlea node.
 
     Args:
         package_name (str): OpenAlea package name (e.g., "openalea.math").
         node_name (str): Node name within the package (e.g., "addition").
         inputs (dict): Input values {input_name: value} or {input_index: value}.
+        pm (PackageManager | None): Already initialized PackageManager to reuse.
     Returns:
         response (dict): Output response with serialized outputs.
     """
     logging.info("Executing node '%s' from package '%s'", node_name, package_name)
 
     # 1. Init PackageManager + resolve factory
-    pm = init_package_manager()
+    if pm is None:
+        pm = init_package_manager()
     pkg = get_package(pm, package_name)
     factory = get_node_factory(pkg, package_name, node_name)
 
@@ -58,22 +75,122 @@ def execute_node(package_name: str, node_name: str, inputs: dict) -> dict:
     return {"success": True, "outputs": outputs}
 
 
+def _evaluate_graph_node(pm, node: dict, inputs: dict):
+    """Evaluate one OpenAlea node of a workflow with live input values.
+
+    Args:
+        pm (PackageManager): Initialized PackageManager.
+        node (dict): Workflow node.
+        inputs (dict): Input values {name: value}, already resolved.
+    Returns:
+        values_and_factory (tuple): Raw output values and factory output metadata.
+    """
+    package_name = node_package_name(node)
+    node_name = node_node_name(node)
+    pkg = get_package(pm, package_name)
+    factory = get_node_factory(pkg, package_name, node_name)
+    instance = instantiate_node(factory)
+    apply_inputs(instance, inputs, resolve_refs=False)
+    instance.eval()
+    return list(instance.outputs), get_factory_outputs(factory)
+
+
+def execute_workflow(workflow: dict, pm=None) -> dict:
+    """Execute a whole workflow graph in this process.
+
+    Outputs flow between nodes as live Python objects; only the nodes listed
+    in ``return_nodes`` (sink nodes by default) have their outputs serialized.
+
+    Args:
+        workflow (dict): ``{"nodes": [...], "edges": [...], "return_nodes": [...] | None}``.
+        pm (PackageManager | None): Already initialized PackageManager to reuse.
+    Returns:
+        response (dict): Per-node results keyed by node id.
+    """
+    nodes = workflow.get("nodes") or []
+    edges = workflow.get("edges") or []
+    order = topological_order(nodes, edges)
+    nodes_by_id = {node["id"]: node for node in nodes}
+    return_nodes = workflow.get("return_nodes")
+    returned = set(sink_node_ids(nodes, edges) if return_nodes is None else return_nodes)
+    logging.info("Executing workflow nodes=%d edges=%d returned=%s", len(nodes), len(edges), sorted(returned))
+
+    if pm is None and any(is_openalea_node(node) for node in nodes):
+        pm = init_package_manager()
+
+    produced = {}
+    results = {}
+    for node_id in order:
+        node = nodes_by_id[node_id]
+        failed_sources = [
+            edge.get("source") for edge in incoming_edges(edges, node_id)
+            if not results[edge.get("source")]["success"]
+        ]
+        if failed_sources:
+            results[node_id] = {
+                "success": False,
+                "skipped": True,
+                "error": f"Dependency {failed_sources[0]} failed",
+            }
+            continue
+        try:
+            if is_openalea_node(node):
+                inputs = gather_inputs(node, edges, produced, resolve_value)
+                values, factory_outputs = _evaluate_graph_node(pm, node, inputs)
+            else:
+                values, factory_outputs = primitive_outputs(node, resolve_value), node.get("outputs") or []
+        except Exception as e:
+            logging.exception("Workflow node '%s' failed", node_id)
+            results[node_id] = {"success": False, "error": str(e)}
+            continue
+
+        produced[node_id] = values
+        results[node_id] = {"success": True}
+        if node_id in returned:
+            results[node_id]["outputs"] = build_outputs_from_values(values, factory_outputs)
+
+    success = all(result["success"] for result in results.values())
+    logging.info("Workflow execution completed success=%s", success)
+    return {"success": success, "results": results}
+
+
+def execute_payload(node_info: dict, pm=None) -> dict:
+    """Execute a node or workflow payload built by the runner.
+
+    Args:
+        node_info (dict): Single-node payload or ``{"workflow": {...}}``.
+        pm (PackageManager | None): Already initialized PackageManager to reuse.
+    Returns:
+        response (dict): Execution response.
+    """
+    if "workflow" in node_info:
+        return execute_workflow(node_info["workflow"], pm=pm)
+
+    package_name = node_info.get("package_name")
+    node_name = node_info.get("node_name")
+    inputs = node_info.get("inputs", {})
+
+    if not package_name or not node_name:
+        raise ValueError("package_name and node_name are required")
+
+    return execute_node(package_name, node_name, inputs, pm=pm)
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print(json.dumps({"success": False, "error": "Missing node_info argument"}))
         sys.exit(1)
 
     try:
-        node_info = json.loads(sys.argv[1])
-
-        package_name = node_info.get("package_name")
-        node_name = node_info.get("node_name")
-        inputs = node_info.get("inputs", {})
-
-        if not package_name or not node_name:
-            raise ValueError("package_name and node_name are required")
-
-        result = execute_node(package_name, node_name, inputs)
+        # "-" means the payload is piped on stdin (large workflows exceed argv limits)
+        raw_info = sys.stdin.read() if sys.argv[1] == "-" else sys.argv[1]
+        node_info = json.loads(raw_info)
+
+        mark_runner_process()
+        # Executions run side by side: keep each one from starting a full serialization pool
+        parallel.limit_workers(settings.VISUALIZER_NODE_SERIALIZE_WORKERS)
+        result = execute_payload(node_info)
+        parallel.shutdown_pool()
         print(json.dumps(result))
 
     except Exception as e:
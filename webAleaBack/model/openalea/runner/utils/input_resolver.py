@@ -1,9 +1,28 @@
 from __future__ import annotations
 
+import base64
 import logging
 from typing import Any
 
-from model.openalea.cache.object_cache import cache_load, cache_load_scene_json
+from model.openalea.cache.object_cache import cache_load, cache_load_array, cache_load_scene_json
+
+
+def _decode_ndarray(value: dict):
+    """Rebuild an inline ndarray payload.
+
+    The decoded bytes are copied once into a ``bytearray``, which the array
+    then views without a further copy.
+
+    Args:
+        value (dict): Payload with ``dtype``, ``shape`` and base64 ``data``.
+    Returns:
+        array (numpy.ndarray): Writable array over the decoded buffer.
+    """
+    import numpy as np
+
+    # Writable for nodes that modify their inputs, unlike a view of the decoded bytes
+    buffer = bytearray(base64.b64decode(value["data"]))
+    return np.frombuffer(buffer, dtype=np.dtype(value["dtype"])).reshape(value["shape"])
 
 
 def _resolve_cached_ref(value: dict):
@@ -12,7 +31,8 @@ def _resolve_cached_ref(value: dict):
     Args:
         value (dict): Reference payload containing ``__ref__`` and optional ``__type__``.
     Returns:
-        resolved (Any): Loaded cached object or scene JSON.
+        resolved (Any): Loaded cached object or scene JSON. Arrays (``ndarray_ref``, or large
+            arrays inside a pickled object) are copy-on-write memory maps of the cache files.
     """
     ref_id = str(value["__ref__"])
     logging.info("Resolving cached input ref=%s", ref_id)
@@ -21,6 +41,8 @@ def _resolve_cached_ref(value: dict):
         if scene_json is None:
             raise FileNotFoundError(f"Cached scene JSON not found: {ref_id}")
         return scene_json
+    if value.get("__type__") == "ndarray_ref":
+        return cache_load_array(ref_id)
     return cache_load(ref_id)
 
 
@@ -57,6 +79,8 @@ def resolve_value(value: Any):
     if isinstance(value, dict):
         if "__ref__" in value:
             return _resolve_cached_ref(value)
+        if value.get("__type__") == "ndarray" and value.get("encoding") == "base64":
+            return _decode_ndarray(value)
         return _resolve_mapping(value)
     if isinstance(value, list):
         return _resolve_sequence(value)
@@ -3,8 +3,19 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import signal
 import subprocess
-from typing import Any, Dict, List
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Written on a worker's stderr once a job is finished, so that the pool knows
+# every log line of that job has been received.
+JOB_END_MARKER = "__webalea_job_end__"
+
+# Seconds left to the pipe threads once the process group is gone
+_PIPE_JOIN_TIMEOUT = 5
+
 
 def build_node_info(package_name: str, node_name: str, inputs: dict) -> Dict[str, Any]:
     """Build node info for subprocess execution.
@@ -23,23 +34,122 @@ def build_node_info(package_name: str, node_name: str, inputs: dict) -> Dict[str
     }
 
 
-def run_node_subprocess(script_path: str, node_info: Dict[str, Any], timeout: int) -> subprocess.CompletedProcess:
+def build_workflow_info(nodes: List[dict], edges: List[dict], return_nodes: List[str] | None) -> Dict[str, Any]:
+    """Build a whole-workflow payload for subprocess execution.
+
+    Args:
+        nodes (List[dict]): Workflow nodes.
+        edges (List[dict]): Workflow edges.
+        return_nodes (List[str] | None): Node ids whose outputs must be returned.
+    Returns:
+        node_info (Dict[str, Any]): Payload passed to the subprocess.
+    """
+    return {
+        "workflow": {
+            "nodes": nodes,
+            "edges": edges,
+            "return_nodes": return_nodes,
+        }
+    }
+
+
+def kill_process_group(pgid: int) -> None:
+    """Send SIGKILL to a process group, ignoring groups that already exited.
+
+    Args:
+        pgid (int): Process group id (the pid of a ``start_new_session`` child).
+    Returns:
+        None (None): No return value.
+    """
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _drain(stream, sink: Callable[[str], Any]) -> None:
+    """Pass each line of a text pipe to ``sink`` until EOF."""
+    for line in stream:
+        sink(line)
+    stream.close()
+
+
+def _feed(stream, data: str) -> None:
+    """Write a payload to a child's stdin and close it."""
+    try:
+        stream.write(data)
+        stream.close()
+    except (BrokenPipeError, OSError):
+        # The child exited (or was killed) without reading its payload
+        pass
+
+
+def run_node_subprocess(script_path: str, node_info: Dict[str, Any], timeout: int,
+                        on_process: Optional[Callable[[Optional[int]], None]] = None,
+                        on_log: Optional[Callable[[str], None]] = None
+                        ) -> subprocess.CompletedProcess:
     """Run the node execution script as a subprocess.
 
+    The child runs in its own process group, so a timeout or a cancellation
+    also kills the processes spawned by the evaluated nodes. Processes left
+    in the group once the child exited are killed too, since they may hold
+    its pipes open.
+
     Args:
         script_path (str): Path to the execution script.
         node_info (Dict[str, Any]): Payload to pass to the script.
         timeout (int): Execution timeout in seconds.
+        on_process (Optional[Callable[[Optional[int]], None]]): Called with the
+            process group id once started, and with None once it is reaped.
+        on_log (Optional[Callable[[str], None]]): Receives each stderr line as
+            soon as the child writes it.
     Returns:
-        result (subprocess.CompletedProcess): Subprocess execution result.
+        result (subprocess.CompletedProcess): Subprocess execution result;
+            ``stderr`` holds every line, including those passed to ``on_log``.
     """
-    return subprocess.run(
-        ["python3", script_path, json.dumps(node_info)],
-        capture_output=True,
+    # The payload is piped on stdin: workflow payloads can exceed argv size limits.
+    process = subprocess.Popen(
+        ["python3", script_path, "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
-        timeout=timeout,
-        check=False
+        start_new_session=True,
     )
+    if on_process is not None:
+        on_process(process.pid)
+    stdout_parts: List[str] = []
+    stderr_parts: List[str] = []
+
+    def forward(line: str) -> None:
+        stderr_parts.append(line)
+        if on_log is not None:
+            on_log(line.rstrip("\n"))
+
+    # One thread per pipe, so stderr reaches on_log while the child runs
+    # instead of once communicate() returns.
+    threads = [
+        threading.Thread(target=_feed, args=(process.stdin, json.dumps(node_info)), daemon=True),
+        threading.Thread(target=_drain, args=(process.stdout, stdout_parts.append), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, forward), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        process.wait(timeout=timeout)
+    finally:
+        # Also reaps background grandchildren, which would keep the pipes open
+        kill_process_group(process.pid)
+        process.wait()
+        # Pipes reach EOF once the process group is gone, unless a process
+        # escaped it: its output is then dropped rather than waited for.
+        for thread in threads:
+            thread.join(timeout=_PIPE_JOIN_TIMEOUT)
+            if thread.is_alive():
+                logging.warning("Subprocess pipe still open after exit pid=%s", process.pid)
+        if on_process is not None:
+            on_process(None)
+    return subprocess.CompletedProcess(process.args, process.returncode, "".join(stdout_parts), "".join(stderr_parts))
 
 def log_subprocess_output(result: subprocess.CompletedProcess) -> None:
     """Log subprocess stdout/stderr for debugging.
@@ -107,6 +217,18 @@ def parse_subprocess_response(stdout: str) -> Dict[str, Any] | None:
             "error": f"Invalid JSON response: {stdout[:200]}"
         }
 
+    log_response_summary(response)
+    return response
+
+
+def log_response_summary(response: Dict[str, Any]) -> None:
+    """Log a compact summary of an execution response.
+
+    Args:
+        response (Dict[str, Any]): Execution response with success flag and outputs.
+    Returns:
+        None (None): No return value.
+    """
     outputs = response.get("outputs", [])
     output_summary = summarize_outputs(outputs) if isinstance(outputs, list) else []
     logging.info(
@@ -115,4 +237,3 @@ def parse_subprocess_response(stdout: str) -> Dict[str, Any] | None:
         output_summary,
         response.get("error")
     )
-    return response
@@ -1,9 +1,47 @@
 from __future__ import annotations
 
+import base64
+import itertools
 import logging
+import os
 from typing import Any
 
-from model.openalea.cache.object_cache import cache_store, cache_store_scene_json_new
+from model.openalea.cache.object_cache import cache_store, cache_store_array, cache_store_scene_json_new
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_NDARRAY_LIST_MAX_BYTES = 1024 # Arrays up to this size keep the plain tolist() form. Override with OPENALEA_NDARRAY_LIST_MAX_BYTES.
+DEFAULT_NDARRAY_INLINE_MAX_BYTES = 64 * 1024 # Larger arrays are stored as .npy refs. Override with OPENALEA_NDARRAY_INLINE_MAX_BYTES.
+NDARRAY_PREVIEW_LENGTH = 16 # Number of leading values shown in ndarray ref previews.
+# Numeric dtype kinds (bool, int, uint, float, complex) sent as packed buffers.
+_BUFFER_DTYPE_KINDS = "biufc"
+
+DEFAULT_COLLECTION_INLINE_MAX_ITEMS = 1000 # Longer collections are stored as refs. Override with OPENALEA_COLLECTION_INLINE_MAX_ITEMS.
+DEFAULT_COLLECTION_INLINE_MAX_BYTES = 256 * 1024 # Estimated JSON size budget. Override with OPENALEA_COLLECTION_INLINE_MAX_BYTES.
+COLLECTION_PREVIEW_LENGTH = 20 # Number of leading items returned in collection refs.
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read a non-negative integer from the environment.
+
+    Args:
+        name (str): Environment variable name.
+        default (int): Value used when unset or invalid.
+    Returns:
+        value (int): Configured value.
+    """
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return default
 
 PLANTGL_AVAILABLE = False
 try:
@@ -144,9 +182,102 @@ def _serialize_plantgl(value: Any):
     return None
 
 
+def _estimated_size(value: Any, budget: int) -> int:
+    """Estimate the JSON size of a value, stopping once ``budget`` is exceeded.
+
+    Args:
+        value (Any): Value to measure.
+        budget (int): Size after which the walk stops early.
+    Returns:
+        size (int): Estimated size in bytes (at least ``budget + 1`` when over budget).
+    """
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, (list, tuple)):
+        total = 2
+        for item in value:
+            total += _estimated_size(item, budget - total) + 1
+            if total > budget:
+                break
+        return total
+    if isinstance(value, dict):
+        total = 2
+        for key, item in value.items():
+            total += len(str(key)) + 4 + _estimated_size(item, budget - total)
+            if total > budget:
+                break
+        return total
+    if NUMPY_AVAILABLE and isinstance(value, np.ndarray):
+        # Large arrays become refs of bounded size
+        return min(value.nbytes * 4 // 3, get_ndarray_inline_max_bytes()) + 64
+    return 8
+
+
+def _exceeds_inline_budget(value) -> bool:
+    """Check whether a collection is too large to be serialized inline.
+
+    Args:
+        value (list | tuple | dict): Collection to check.
+    Returns:
+        exceeds (bool): True if over the item or byte budget.
+    """
+    max_items = _env_int("OPENALEA_COLLECTION_INLINE_MAX_ITEMS", DEFAULT_COLLECTION_INLINE_MAX_ITEMS)
+    if len(value) > max_items:
+        return True
+    max_bytes = _env_int("OPENALEA_COLLECTION_INLINE_MAX_BYTES", DEFAULT_COLLECTION_INLINE_MAX_BYTES)
+    return _estimated_size(value, max_bytes) > max_bytes
+
+
+def serialize_collection_slice(value, offset: int, limit: int, depth: int = 0, max_depth: int = 3) -> list:
+    """Serialize a slice of a collection.
+
+    Args:
+        value (list | tuple | dict): Collection to slice.
+        offset (int): Index of the first item.
+        limit (int): Maximum number of items.
+        depth (int): Recursion depth of the collection itself.
+        max_depth (int): Maximum allowed recursion depth.
+    Returns:
+        items (list): Serialized items, ``[key, value]`` pairs for dicts.
+    """
+    if isinstance(value, dict):
+        return [
+            [str(k), serialize_value(v, depth + 1, max_depth)]
+            for k, v in itertools.islice(value.items(), offset, offset + limit)
+        ]
+    return [serialize_value(v, depth + 1, max_depth) for v in value[offset:offset + limit]]
+
+
+def _serialize_collection_ref(value, depth: int, max_depth: int):
+    """Store a large collection in the object cache and return a ref with its head.
+
+    Args:
+        value (list | tuple | dict): Collection to store.
+        depth (int): Current recursion depth.
+        max_depth (int): Maximum allowed recursion depth.
+    Returns:
+        payload (dict | None): Collection ref payload or None if it cannot be cached.
+    """
+    try:
+        ref_id = cache_store(value)
+    except Exception:
+        logging.warning("Failed to cache large %s, serializing inline", type(value).__name__)
+        return None
+    logging.info("Stored %s of length %d as ref=%s", type(value).__name__, len(value), ref_id)
+    return {
+        "__type__": _object_type_name(value),
+        "__ref__": ref_id,
+        "length": len(value),
+        "head": serialize_collection_slice(value, 0, COLLECTION_PREVIEW_LENGTH, depth, max_depth),
+    }
+
+
 def _serialize_collection(value: Any, depth: int, max_depth: int):
     """Serialize collections like lists, tuples, and dictionaries.
 
+    Collections above the item or byte budget are stored once in the
+    object cache and returned as a ref with their first items.
+
     Args:
         value (Any): Collection to serialize.
         depth (int): Current recursion depth.
@@ -154,21 +285,105 @@ def _serialize_collection(value: Any, depth: int, max_depth: int):
     Returns:
         serialized (Any | None): Serialized collection or None if not a collection.
     """
+    if not isinstance(value, (list, tuple, dict)):
+        return None
+    if _exceeds_inline_budget(value):
+        collection_ref = _serialize_collection_ref(value, depth, max_depth)
+        if collection_ref is not None:
+            return collection_ref
     if isinstance(value, (list, tuple)):
         return [serialize_value(v, depth + 1, max_depth) for v in value]
-    if isinstance(value, dict):
-        return {str(k): serialize_value(v, depth + 1, max_depth) for k, v in value.items()}
-    return None
+    return {str(k): serialize_value(v, depth + 1, max_depth) for k, v in value.items()}
+
+
+def get_ndarray_list_max_bytes() -> int:
+    """Return the size up to which arrays are sent as plain (nested) lists.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        max_bytes (int): Threshold in bytes.
+    """
+    return _env_int("OPENALEA_NDARRAY_LIST_MAX_BYTES", DEFAULT_NDARRAY_LIST_MAX_BYTES)
+
+
+def get_ndarray_inline_max_bytes() -> int:
+    """Return the size above which arrays are stored in the cache instead of inlined.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        max_bytes (int): Threshold in bytes.
+    """
+    return _env_int("OPENALEA_NDARRAY_INLINE_MAX_BYTES", DEFAULT_NDARRAY_INLINE_MAX_BYTES)
+
+
+def _ndarray_preview(array) -> list:
+    """Return the first values of an array in C order, as JSON-compatible numbers.
+
+    Args:
+        array (numpy.ndarray): Array to preview.
+    Returns:
+        preview (list): Leading values ([real, imag] pairs for complex arrays).
+    """
+    head = array.flat[:NDARRAY_PREVIEW_LENGTH]
+    if array.dtype.kind == "c":
+        return [[v.real, v.imag] for v in head.tolist()]
+    return head.tolist()
+
+
+def _serialize_ndarray(array):
+    """Serialize a numeric ndarray as dtype, shape and a packed buffer.
+
+    Arrays are inlined as base64, and larger ones stored as ``.npy`` in the
+    object cache and returned as a ref with a short preview. Real arrays up
+    to ``OPENALEA_NDARRAY_LIST_MAX_BYTES`` are left to ``tolist()``, the form
+    consumers received before buffers existed.
+
+    Args:
+        array (numpy.ndarray): Array to serialize.
+    Returns:
+        payload (dict | None): Array payload or None if the array keeps the list form.
+    """
+    if array.dtype.kind not in _BUFFER_DTYPE_KINDS or array.ndim == 0:
+        return None
+    # Complex values have no JSON list form
+    if array.dtype.kind != "c" and array.nbytes <= get_ndarray_list_max_bytes():
+        return None
+    header = {"dtype": array.dtype.str, "shape": list(array.shape)}
+    if array.nbytes <= get_ndarray_inline_max_bytes():
+        data = base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+        return {"__type__": "ndarray", **header, "encoding": "base64", "data": data}
+    try:
+        ref_id = cache_store_array(array)
+    except Exception:
+        logging.exception("Failed to cache ndarray, falling back to inline buffer")
+        data = base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+        return {"__type__": "ndarray", **header, "encoding": "base64", "data": data}
+    return {
+        "__type__": "ndarray_ref",
+        "__ref__": ref_id,
+        **header,
+        "__meta__": {"nbytes": int(array.nbytes), "preview": _ndarray_preview(array)},
+    }
 
 
 def _serialize_numpy_like(value: Any):
-    """Serialize numpy-like objects using ``tolist()`` when available.
+    """Serialize numpy-like objects.
+
+    Numeric ndarrays above ``OPENALEA_NDARRAY_LIST_MAX_BYTES`` are sent as
+    packed buffers; other numpy-like values (small arrays, scalars, object or
+    string arrays) use ``tolist()``.
 
     Args:
         value (Any): Numpy-like object to serialize.
     Returns:
         serialized (Any | None): Serialized value or None if not supported.
     """
+    if NUMPY_AVAILABLE and isinstance(value, np.ndarray):
+        payload = _serialize_ndarray(value)
+        if payload is not None:
+            return payload
     if hasattr(value, 'tolist'):
         return value.tolist()
     return None
@@ -0,0 +1,169 @@
+"""Graph helpers for executing a whole workflow in one OpenAlea context.
+
+Nodes and edges follow the frontend workflow model:
+- node: ``{"id", "packageName", "nodeName", "inputs": [{"id", "name", "value", "default"}], "outputs": [...]}``
+- edge: ``{"source", "sourceHandle": "output_<i>", "target", "targetHandle": "<input id>"}``
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+_OUTPUT_HANDLE_RE = re.compile(r"output_(\d+)")
+
+
+def node_package_name(node: dict) -> Optional[str]:
+    """Return the OpenAlea package of a node, accepting camelCase and snake_case keys.
+
+    Args:
+        node (dict): Workflow node.
+    Returns:
+        package_name (Optional[str]): Package name or None for primitive nodes.
+    """
+    return node.get("packageName") or node.get("package_name")
+
+
+def node_node_name(node: dict) -> Optional[str]:
+    """Return the OpenAlea node name of a node, accepting camelCase and snake_case keys.
+
+    Args:
+        node (dict): Workflow node.
+    Returns:
+        node_name (Optional[str]): Node name or None for primitive nodes.
+    """
+    return node.get("nodeName") or node.get("node_name")
+
+
+def is_openalea_node(node: dict) -> bool:
+    """Check whether a node must be evaluated by OpenAlea.
+
+    Args:
+        node (dict): Workflow node.
+    Returns:
+        is_openalea (bool): True if the node references a package and a node name.
+    """
+    return bool(node_package_name(node) and node_node_name(node))
+
+
+def output_index(source_handle: Any) -> int:
+    """Parse the output index from an edge source handle (``output_2`` -> 2).
+
+    Args:
+        source_handle (Any): Edge ``sourceHandle`` value.
+    Returns:
+        index (int): Output index, 0 when the handle cannot be parsed.
+    """
+    match = _OUTPUT_HANDLE_RE.search(str(source_handle or ""))
+    return int(match.group(1)) if match else 0
+
+
+def topological_order(nodes: List[dict], edges: List[dict]) -> List[str]:
+    """Order node ids so that every node comes after its dependencies.
+
+    Args:
+        nodes (List[dict]): Workflow nodes.
+        edges (List[dict]): Workflow edges.
+    Returns:
+        order (List[str]): Node ids in execution order (stable w.r.t. ``nodes``).
+    """
+    node_ids = [node.get("id") for node in nodes]
+    if any(node_id is None for node_id in node_ids):
+        raise ValueError("Every workflow node needs an 'id'")
+    known = set(node_ids)
+    if len(known) != len(node_ids):
+        raise ValueError("Workflow node ids must be unique")
+
+    in_degree = {node_id: 0 for node_id in node_ids}
+    successors: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    for edge in edges:
+        source, target = edge.get("source"), edge.get("target")
+        if source not in known or target not in known:
+            raise ValueError(f"Edge references an unknown node: {source} -> {target}")
+        successors[source].append(target)
+        in_degree[target] += 1
+
+    ready = deque(node_id for node_id in node_ids if in_degree[node_id] == 0)
+    order = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for target in successors[node_id]:
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                ready.append(target)
+
+    if len(order) != len(node_ids):
+        cyclic = [node_id for node_id in node_ids if in_degree[node_id] > 0]
+        raise ValueError(f"Workflow contains a cycle involving nodes: {cyclic}")
+    return order
+
+
+def incoming_edges(edges: List[dict], node_id: str) -> List[dict]:
+    """Return edges targeting a node.
+
+    Args:
+        edges (List[dict]): Workflow edges.
+        node_id (str): Target node id.
+    Returns:
+        incoming (List[dict]): Edges whose target is ``node_id``.
+    """
+    return [edge for edge in edges if edge.get("target") == node_id]
+
+
+def sink_node_ids(nodes: List[dict], edges: List[dict]) -> List[str]:
+    """Return ids of nodes without outgoing edges.
+
+    Args:
+        nodes (List[dict]): Workflow nodes.
+        edges (List[dict]): Workflow edges.
+    Returns:
+        sinks (List[str]): Node ids that feed no other node.
+    """
+    sources = {edge.get("source") for edge in edges}
+    return [node["id"] for node in nodes if node["id"] not in sources]
+
+
+def gather_inputs(node: dict, edges: List[dict], produced: Dict[str, list], resolve) -> dict:
+    """Build the ``{name: value}`` input dict of a node.
+
+    Values coming from upstream nodes are passed as live Python objects;
+    literal values from the request go through ``resolve`` (cache refs).
+
+    Args:
+        node (dict): Workflow node.
+        edges (List[dict]): Workflow edges.
+        produced (Dict[str, list]): Raw output values of already evaluated nodes.
+        resolve (Callable[[Any], Any]): Resolver applied to literal input values.
+    Returns:
+        inputs (dict): Input values keyed by input name (or id when unnamed).
+    """
+    wired = {}
+    for edge in incoming_edges(edges, node["id"]):
+        source_outputs = produced.get(edge.get("source"), [])
+        index = output_index(edge.get("sourceHandle"))
+        wired[edge.get("targetHandle")] = source_outputs[index] if index < len(source_outputs) else None
+
+    inputs = {}
+    for position, port in enumerate(node.get("inputs") or []):
+        key = port.get("name") or port.get("id") or position
+        if port.get("id") in wired:
+            inputs[key] = wired[port.get("id")]
+            continue
+        value = port.get("value")
+        if value is None:
+            value = port.get("default")
+        inputs[key] = resolve(value)
+    return inputs
+
+
+def primitive_outputs(node: dict, resolve) -> list:
+    """Return the output values of a primitive (non-OpenAlea) node.
+
+    Args:
+        node (dict): Workflow node.
+        resolve (Callable[[Any], Any]): Resolver applied to the literal values.
+    Returns:
+        outputs (list): Raw output values.
+    """
+    return [resolve(output.get("value")) for output in node.get("outputs") or []]
@@ -108,18 +108,21 @@ def instantiate_node(factory):
     return node
 
 
-def apply_inputs(node, inputs: dict):
+def apply_inputs(node, inputs: dict, resolve_refs: bool = True):
     """Apply input values to a node.
 
     Args:
         node (Any): Node instance to apply inputs to.
         inputs (dict): Input values {name: value} or {index: value}.
+        resolve_refs (bool): Resolve cached ``__ref__`` values before setting them.
+            Disable it for values that are already live Python objects.
     Returns:
         None (None): No return value.
     """
     for key, value in inputs.items():
         try:
-            value = resolve_value(value)
+            if resolve_refs:
+                value = resolve_value(value)
             logging.info("Input '%s' resolved type=%s", key, type(value).__name__)
             # Try as index first if key is numeric
             if isinstance(key, int):
@@ -177,12 +180,23 @@ def build_outputs(node, factory_outputs):
     Returns:
         outputs (list): Output dictionaries with index, name, value, type.
     """
-    outputs = []
     node_outputs = node.outputs if hasattr(node, 'outputs') else []
     logging.info("Node produced %d outputs", len(node_outputs))
     logging.info("Node raw output types: %s", [type(v).__name__ for v in node_outputs])
+    return build_outputs_from_values(node_outputs, factory_outputs)
+
+
+def build_outputs_from_values(values, factory_outputs):
+    """Build output dictionaries from raw output values.
 
-    for i, output_value in enumerate(node_outputs):
+    Args:
+        values (list): Raw output values.
+        factory_outputs (list): Factory output metadata list.
+    Returns:
+        outputs (list): Output dictionaries with index, name, value, type.
+    """
+    outputs = []
+    for i, output_value in enumerate(values):
         outputs.append({
             "index": i,
             "name": get_output_name(factory_outputs, i),
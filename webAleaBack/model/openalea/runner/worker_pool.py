@@ -0,0 +1,343 @@
+"""Pool of long-lived OpenAlea worker processes."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+from model.openalea.runner.utils.openalea_runner_helpers import JOB_END_MARKER, kill_process_group
+
+# Seconds to wait for the end-of-job stderr marker before returning a response.
+LOG_DRAIN_TIMEOUT = 2.0
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised when a worker process exits while a job is pending."""
+
+
+class WorkerStartupTimeout(subprocess.TimeoutExpired):
+    """Raised when a worker does not load OpenAlea within the startup timeout."""
+
+
+class PoolWorker:
+    """A single warm worker process speaking the ``node_worker.py`` protocol."""
+
+    def __init__(self, script_path: str, generation: int = 0):
+        self.generation = generation
+        self.jobs_done = 0
+        self.ready = False
+        self.on_log: Optional[Callable[[str], None]] = None
+        self._log_done = threading.Event()
+        self._responses: queue.Queue = queue.Queue()
+        # start_new_session puts the worker in its own process group so that
+        # terminate() also reaps processes spawned by the evaluated nodes.
+        self.process = subprocess.Popen(
+            ["python3", script_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        self.pid = self.process.pid
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+        logging.info("Worker pool: started worker pid=%s", self.pid)
+
+    def _read_stdout(self) -> None:
+        """Forward protocol messages to the response queue, ``None`` on EOF."""
+        for line in self.process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning("Worker pid=%s wrote invalid protocol line: %s", self.pid, line[:200])
+        self._responses.put(None)
+
+    def _read_stderr(self) -> None:
+        """Drain stderr so the worker never blocks on a full pipe."""
+        for line in self.process.stderr:
+            line = line.rstrip()
+            if line.startswith(JOB_END_MARKER):
+                self._log_done.set()
+                continue
+            logging.info("Worker pid=%s stderr: %s", self.pid, line)
+            on_log = self.on_log
+            if on_log is not None:
+                on_log(line)
+        self._log_done.set()
+
+    def is_alive(self) -> bool:
+        """Return True if the worker process is still running.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            alive (bool): True while the process has not exited.
+        """
+        return self.process.poll() is None
+
+    def _next_message(self, deadline: float, timeout: int,
+                      error: type = subprocess.TimeoutExpired) -> dict:
+        """Wait for the next protocol message before ``deadline``.
+
+        Args:
+            deadline (float): Monotonic time after which waiting stops.
+            timeout (int): Timeout reported in the raised exception.
+            error (type): ``subprocess.TimeoutExpired`` subclass raised on timeout.
+        Returns:
+            message (dict): Decoded protocol message.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise error(cmd=f"worker {self.pid}", timeout=timeout)
+        try:
+            message = self._responses.get(timeout=remaining)
+        except queue.Empty as e:
+            raise error(cmd=f"worker {self.pid}", timeout=timeout) from e
+        if message is None:
+            raise WorkerCrashedError(
+                f"Worker process exited unexpectedly (exit code {self.process.poll()})"
+            )
+        return message
+
+    def wait_ready(self, timeout: int) -> None:
+        """Block until the worker has loaded OpenAlea.
+
+        Args:
+            timeout (int): Maximum startup time in seconds.
+        Returns:
+            None (None): No return value.
+        Raises:
+            WorkerStartupTimeout: If the worker is not ready within ``timeout``.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.ready:
+            message = self._next_message(deadline, timeout, WorkerStartupTimeout)
+            self.ready = bool(message.get("ready"))
+
+    def run(self, node_info: Dict[str, Any], timeout: int,
+            on_log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Send a job to the worker and wait for its response.
+
+        Args:
+            node_info (Dict[str, Any]): Payload built by ``build_node_info``.
+            timeout (int): Execution timeout in seconds.
+            on_log (Optional[Callable[[str], None]]): Receives stderr lines during the job.
+        Returns:
+            response (Dict[str, Any]): Execution response from the worker.
+        """
+        self._log_done.clear()
+        self.on_log = on_log
+        try:
+            response = self._run(node_info, timeout)
+            if on_log is not None:
+                # stderr is read by another thread: wait for the job's last lines
+                self._log_done.wait(timeout=LOG_DRAIN_TIMEOUT)
+            return response
+        finally:
+            self.on_log = None
+
+    def _run(self, node_info: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """Write the job to the worker and wait for the matching response."""
+        job_id = uuid.uuid4().hex
+        try:
+            self.process.stdin.write(json.dumps({"job_id": job_id, "node_info": node_info}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashedError(f"Worker process is not accepting jobs: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        while True:
+            message = self._next_message(deadline, timeout)
+            if message.get("job_id") == job_id:
+                self.jobs_done += 1
+                return message.get("response") or {"success": False, "error": "Empty worker response"}
+
+    def terminate(self) -> None:
+        """Kill the worker process group and reap it.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        kill_process_group(self.pid)
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logging.error("Worker pool: worker pid=%s did not exit after SIGKILL", self.pid)
+        logging.info("Worker pool: terminated worker pid=%s", self.pid)
+
+
+class WorkerPool:
+    """Bounded pool of warm workers, recycled on crash, timeout or job count."""
+
+    def __init__(self, script_path: str, size: int, max_jobs_per_worker: int = 0,
+                 startup_timeout: int = 120):
+        self.script_path = script_path
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max(0, max_jobs_per_worker)
+        self.startup_timeout = startup_timeout
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle: List[PoolWorker] = []
+        self._generation = 0
+        self._closed = False
+
+    def start(self) -> None:
+        """Spawn every worker up-front so the first requests find them warm.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            missing = self.size - len(self._idle)
+            for _ in range(missing):
+                self._idle.append(PoolWorker(self.script_path, self._generation))
+
+    def _acquire(self) -> PoolWorker:
+        """Take an idle worker or spawn a new one; caller must hold a slot."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive() and worker.generation == self._generation:
+                    return worker
+                worker.terminate()
+            return PoolWorker(self.script_path, self._generation)
+
+    def _release(self, worker: Optional[PoolWorker]) -> None:
+        """Return a worker to the pool, or discard it if it should be recycled."""
+        if worker is None:
+            return
+        with self._lock:
+            recycle = (
+                self._closed
+                or not worker.is_alive()
+                or worker.generation != self._generation
+                or (self.max_jobs_per_worker and worker.jobs_done >= self.max_jobs_per_worker)
+            )
+            if not recycle:
+                self._idle.append(worker)
+                return
+        worker.terminate()
+
+    def execute(self, node_info: Dict[str, Any], timeout: int,
+                on_log: Optional[Callable[[str], None]] = None,
+                on_process: Optional[Callable[[Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Run one node job on a warm worker.
+
+        Args:
+            node_info (Dict[str, Any]): Payload built by ``build_node_info``.
+            timeout (int): Execution timeout in seconds (startup time excluded).
+            on_log (Optional[Callable[[str], None]]): Receives worker stderr lines during the job.
+            on_process (Optional[Callable[[Optional[int]], None]]): Called with the worker's
+                process group id while it serves the job, and with None before it is released.
+        Returns:
+            response (Dict[str, Any]): Execution response from the worker.
+        """
+        with self._slots:
+            worker = self._acquire()
+            if on_process is not None:
+                on_process(worker.pid)
+            try:
+                worker.wait_ready(self.startup_timeout)
+                return worker.run(node_info, timeout, on_log)
+            except (subprocess.TimeoutExpired, WorkerCrashedError):
+                # A timed out worker may still be busy: never hand it out again.
+                worker.terminate()
+                worker = None
+                raise
+            finally:
+                # Detach first so a late cancel can never kill a worker serving another job.
+                if on_process is not None:
+                    on_process(None)
+                self._release(worker)
+
+    def restart(self) -> None:
+        """Retire every worker, e.g. after new packages were installed.
+
+        Busy workers finish their current job and are replaced on release.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.terminate()
+        logging.info("Worker pool: restarted (generation=%s)", self._generation)
+
+    def shutdown(self) -> None:
+        """Terminate all idle workers and refuse new jobs.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.terminate()
+
+
+_POOL: Optional[WorkerPool] = None
+_POOL_LOCK = threading.Lock()
+
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "runnable", "node_worker.py")
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """Return the process-wide worker pool, or None when pooling is disabled.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        pool (Optional[WorkerPool]): Shared pool configured from settings.
+    """
+    global _POOL
+    if settings.RUNNER_POOL_SIZE <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = WorkerPool(
+                WORKER_SCRIPT_PATH,
+                size=settings.RUNNER_POOL_SIZE,
+                max_jobs_per_worker=settings.RUNNER_POOL_MAX_JOBS_PER_WORKER,
+                startup_timeout=settings.RUNNER_POOL_STARTUP_TIMEOUT,
+            )
+        return _POOL
+
+
+def shutdown_worker_pool() -> None:
+    """Shut down the process-wide worker pool if it was created.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,156 @@
+"""Server-side material batching of static meshes.
+
+Performs once, in the scene cache, the merge the client pipeline
+(``objectPipeline.js``) would otherwise run on every open: static meshes
+sharing a material are concatenated into one mesh per material, with their
+transforms baked into the vertices and their triangle indices rebased.
+Each batch keeps ``batch: {"ids", "faceOffsets"}`` so that a picked
+triangle maps back to its source object: the triangles of ``ids[i]`` are
+``faceOffsets[i]`` to ``faceOffsets[i + 1]``. Geometries shared by several
+objects of the same material stay instanced, as the client draws them with
+one ``InstancedMesh``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+from model.openalea.visualizer.utils.instancing import is_identity, transform_matrix
+from model.openalea.visualizer.utils.mesh_arrays import triangulate_faces
+
+# Same defaults as the client material builder
+DEFAULT_COLOR = [0.8, 0.8, 0.8]
+DEFAULT_OPACITY = 1
+
+
+def batched_cache_key(key: str) -> str:
+    """Return the cache key of the batched variant of a scene (``<key>.batched.scene.json``).
+
+    Args:
+        key (str): Scene cache reference, possibly of a LOD variant.
+    Returns:
+        key (str): Cache reference of the batched variant.
+    """
+    return f"{key}.batched"
+
+
+def _is_static_mesh(obj: dict) -> bool:
+    return obj.get("objectType") == "mesh" and not obj.get("animation") and not obj.get("children")
+
+
+def _hashable(value):
+    """Turn nested JSON lists and dicts into tuples usable as a dict key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _material_key(obj: dict) -> tuple:
+    # Every material field counts, since a batch takes the whole material of its first object
+    material = dict(obj.get("material") or {})
+    material["color"] = material.get("color") or DEFAULT_COLOR
+    material.setdefault("opacity", DEFAULT_OPACITY)
+    return _hashable(material)
+
+
+def _mesh_arrays(geometry: dict, transform: Optional[dict]) -> tuple:
+    """Return the world-space vertices and triangles of a mesh geometry.
+
+    Args:
+        geometry (dict): Mesh geometry with ``vertices`` and optional ``indices``.
+        transform (Optional[dict]): Object transform, baked into the vertices.
+    Returns:
+        vertices (numpy.ndarray): ``(n, 3)`` float64 vertices.
+        triangles (numpy.ndarray): ``(m, 3)`` int64 triangles.
+    """
+    vertices = np.asarray(geometry.get("vertices") or [], dtype=np.float64).reshape(-1, 3)
+    if geometry.get("indices"):
+        triangles = triangulate_faces(geometry["indices"]).astype(np.int64).reshape(-1, 3)
+    else:
+        # Non-indexed meshes are drawn as triangle lists
+        triangles = np.arange(len(vertices) - len(vertices) % 3, dtype=np.int64).reshape(-1, 3)
+    matrix = transform_matrix(transform)
+    if not is_identity(matrix):
+        vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+        if np.linalg.det(matrix[:3, :3]) < 0:
+            # Mirroring transforms flip the winding, which Three.js would undo for an object matrix
+            triangles = triangles[:, ::-1]
+    return vertices, triangles
+
+
+def _merge(index: int, items: list) -> dict:
+    """Merge the meshes of one material into a single batch object.
+
+    Args:
+        index (int): Batch number, used for its id.
+        items (list): ``(object, geometry)`` pairs sharing a material.
+    Returns:
+        batch (dict): Mesh object with rebased indices and its face-range table.
+    """
+    arrays = [_mesh_arrays(geometry, obj.get("transform")) for obj, geometry in items]
+    vertex_counts = np.array([len(vertices) for vertices, _ in arrays], dtype=np.int64)
+    vertex_offsets = np.concatenate(([0], np.cumsum(vertex_counts)[:-1]))
+    face_offsets = np.concatenate(([0], np.cumsum([len(triangles) for _, triangles in arrays])))
+    vertices = np.concatenate([vertices for vertices, _ in arrays])
+    triangles = np.concatenate([triangles + offset for (_, triangles), offset in zip(arrays, vertex_offsets)])
+
+    first = items[0][0]
+    material = first.get("material") or {"color": DEFAULT_COLOR, "opacity": DEFAULT_OPACITY}
+    return {
+        "id": f"batch-{index}",
+        "objectType": "mesh",
+        "geometry": {"type": "mesh", "vertices": vertices.tolist(), "indices": triangles.tolist()},
+        "material": material,
+        "bbox": vertices.min(axis=0).tolist() + vertices.max(axis=0).tolist(),
+        "batch": {
+            "ids": [obj.get("id") for obj, _ in items],
+            "faceOffsets": face_offsets.tolist(),
+        },
+    }
+
+
+def batch_scene(scene_json: dict, instances: bool = True) -> dict:
+    """Merge the static meshes of a scene into one mesh per material.
+
+    Args:
+        scene_json (dict): Scene JSON, with an optional ``geometries`` table.
+        instances (bool): Whether geometries shared by several objects of a material stay
+            instanced; False bakes every copy into the batch.
+    Returns:
+        scene_json (dict): Scene whose static meshes are replaced by batch objects, followed by
+            the objects left as is (instances, lines, texts, animated meshes); unused shared
+            geometries are dropped.
+    """
+    objects = scene_json.get("objects") or []
+    geometries = scene_json.get("geometries") or {}
+
+    instance_counts = {}
+    for obj in objects:
+        if instances and _is_static_mesh(obj) and obj.get("geometryRef") in geometries:
+            key = (obj["geometryRef"], _material_key(obj))
+            instance_counts[key] = instance_counts.get(key, 0) + 1
+
+    groups = {}
+    kept = []
+    for obj in objects:
+        geometry = geometries.get(obj.get("geometryRef")) if obj.get("geometryRef") else obj.get("geometry")
+        instanced = instance_counts.get((obj.get("geometryRef"), _material_key(obj)), 0) > 1
+        if not _is_static_mesh(obj) or instanced or not isinstance(geometry, dict) or not geometry.get("vertices"):
+            kept.append(obj)
+            continue
+        groups.setdefault(_material_key(obj), []).append((obj, geometry))
+
+    batches = [_merge(index, items) for index, items in enumerate(groups.values())]
+    batched = dict(scene_json, objects=batches + kept)
+    if "geometries" in scene_json:
+        used = {obj.get("geometryRef") for obj in kept}
+        batched["geometries"] = {ref: geometry for ref, geometry in geometries.items() if ref in used}
+    logging.info(
+        "Visualizer batched scene objects=%s batches=%s merged=%s kept=%s",
+        len(objects), len(batches), sum(len(items) for items in groups.values()), len(kept)
+    )
+    return batched
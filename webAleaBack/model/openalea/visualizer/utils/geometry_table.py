@@ -0,0 +1,119 @@
+"""Shared geometry table of a serialized scene.
+
+Shapes register their base geometry and get a ``geometryRef``; the table
+then tessellates each registered geometry once and emits it under that
+reference in ``scene.geometries``. Geometries are registered by PlantGL
+object id, so a shared instance is only tessellated once, and deduplicated
+by the content of their mesh, so equal geometries built as separate
+instances (e.g. one ``Cylinder`` per internode) are emitted once and all
+point at the same reference.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable, List
+
+from core.config import settings
+from model.openalea.visualizer.utils.mesh_arrays import mesh_to_json
+from model.openalea.visualizer.utils.parallel import map_chunks
+from model.openalea.visualizer.utils.scene_diff import mesh_digest
+
+
+class GeometryTable:
+    """Collect the distinct geometries of a scene, then tessellate each once.
+
+    Args:
+        tessellate_chunk (Callable[[list], list]): Turns a list of geometries into mesh/line arrays;
+            must be picklable (a module-level function) to run in the serialization pool.
+    """
+
+    def __init__(self, tessellate_chunk: Callable[[List], List]):
+        self._tessellate_chunk = tessellate_chunk
+        # Emitted geometries are not retained, so chunked serialization only holds the current chunk
+        self.tessellated = 0
+        # Local (min, max) of each emitted geometry, for object bounding boxes
+        self.bounds = {}
+        # Content digest of each emitted geometry, for object ids
+        self.digests = {}
+        self._refs = {}
+        # Also keeps the Python wrappers alive so their id() cannot be reused
+        self._sources = []
+        self._by_digest = {}
+        # Reference of a geometry whose mesh equals one emitted before -> reference of that one
+        self._aliases = {}
+
+    @staticmethod
+    def _key(geometry):
+        get_id = getattr(geometry, "getObjectId", None)
+        return get_id() if callable(get_id) else id(geometry)
+
+    def add(self, geometry) -> str:
+        """Return the reference of a geometry, registering it on first use.
+
+        The reference is provisional until ``tessellate`` ran: pass the
+        objects through ``remap`` to point them at the emitted geometry.
+
+        Args:
+            geometry (Any): Base PlantGL geometry.
+        Returns:
+            ref (str): Reference of the geometry.
+        """
+        key = self._key(geometry)
+        ref = self._refs.get(key)
+        if ref is None:
+            ref = f"g{len(self._sources)}"
+            self._refs[key] = ref
+            self._sources.append(geometry)
+        return ref
+
+    def resolve(self, ref: str) -> str:
+        """Return the emitted reference of a registered geometry.
+
+        Args:
+            ref (str): Reference returned by ``add``.
+        Returns:
+            ref (str): Reference of the geometry with the same mesh emitted first.
+        """
+        return self._aliases.get(ref, ref)
+
+    def remap(self, objects: Iterable[dict]) -> None:
+        """Point the ``geometryRef`` of serialized objects at emitted geometries, in place.
+
+        Args:
+            objects (Iterable[dict]): Serialized objects of the tessellated geometries.
+        """
+        for obj in objects:
+            ref = obj.get("geometryRef")
+            if ref in self._aliases:
+                obj["geometryRef"] = self._aliases[ref]
+
+    def tessellate(self, workers: int = 1) -> dict:
+        """Tessellate the geometries registered since the last call, in a process pool for large batches.
+
+        Args:
+            workers (int): Worker processes; the pool is only used from
+                ``VISUALIZER_SERIALIZE_PARALLEL_MIN_GEOMETRIES`` new geometries.
+        Returns:
+            geometries (dict): JSON mesh/line per newly emitted reference; a geometry
+                whose mesh was already emitted is aliased to it instead.
+        """
+        start = self.tessellated
+        pending = self._sources[start:]
+        if workers > 1 and len(pending) >= settings.VISUALIZER_SERIALIZE_PARALLEL_MIN_GEOMETRIES:
+            meshes = map_chunks(self._tessellate_chunk, pending, workers)
+        else:
+            meshes = self._tessellate_chunk(pending)
+        added = {}
+        for index, mesh in enumerate(meshes, start):
+            ref = f"g{index}"
+            digest = mesh_digest(mesh)
+            canonical = self._by_digest.get(digest)
+            if canonical is not None:
+                self._aliases[ref] = canonical
+                continue
+            self._by_digest[digest] = ref
+            added[ref] = mesh_to_json(mesh)
+            self.digests[ref] = digest
+            if len(mesh["vertices"]):
+                self.bounds[ref] = (mesh["vertices"].min(axis=0), mesh["vertices"].max(axis=0))
+        self.tessellated = len(self._sources)
+        return added
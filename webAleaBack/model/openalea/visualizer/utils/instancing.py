@@ -0,0 +1,134 @@
+"""Affine matrices for PlantGL transformation nodes.
+
+Matrices are 4x4 float64 NumPy arrays acting on column vectors. They are
+emitted in column-major order (``matrix_to_list``), the layout expected by
+Three.js ``Matrix4.fromArray``.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+IDENTITY = np.identity(4)
+
+
+def translation_matrix(translation) -> np.ndarray:
+    """Return the matrix of a ``Translated`` node.
+
+    Args:
+        translation (Sequence[float]): xyz translation.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    matrix = np.identity(4)
+    matrix[:3, 3] = translation
+    return matrix
+
+
+def scaling_matrix(scale) -> np.ndarray:
+    """Return the matrix of a ``Scaled`` node.
+
+    Args:
+        scale (Sequence[float]): xyz scale factors.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    matrix = np.identity(4)
+    matrix[:3, :3] = np.diag(np.asarray(scale, dtype=np.float64))
+    return matrix
+
+
+def orientation_matrix(primary, secondary) -> np.ndarray:
+    """Return the matrix of an ``Oriented`` node (basis primary, secondary, primary ^ secondary).
+
+    Args:
+        primary (Sequence[float]): Image of the x axis.
+        secondary (Sequence[float]): Image of the y axis.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    primary = np.asarray(primary, dtype=np.float64)
+    secondary = np.asarray(secondary, dtype=np.float64)
+    matrix = np.identity(4)
+    matrix[:3, 0] = primary
+    matrix[:3, 1] = secondary
+    matrix[:3, 2] = np.cross(primary, secondary)
+    return matrix
+
+
+def axis_rotation_matrix(axis, angle: float) -> np.ndarray:
+    """Return the matrix of an ``AxisRotated`` node (Rodrigues formula).
+
+    Args:
+        axis (Sequence[float]): Rotation axis, normalized here.
+        angle (float): Angle in radians.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    norm = np.linalg.norm(axis)
+    matrix = np.identity(4)
+    if norm == 0:
+        return matrix
+    x, y, z = axis / norm
+    cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    matrix[:3, :3] = np.identity(3) + np.sin(angle) * cross + (1 - np.cos(angle)) * cross @ cross
+    return matrix
+
+
+def euler_rotation_matrix(azimuth: float, elevation: float, roll: float) -> np.ndarray:
+    """Return the matrix of an ``EulerRotated`` node (Rz(azimuth) . Ry(elevation) . Rx(roll)).
+
+    Args:
+        azimuth (float): Rotation around z, in radians.
+        elevation (float): Rotation around y, in radians.
+        roll (float): Rotation around x, in radians.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    return (
+        axis_rotation_matrix((0, 0, 1), azimuth)
+        @ axis_rotation_matrix((0, 1, 0), elevation)
+        @ axis_rotation_matrix((1, 0, 0), roll)
+    )
+
+
+def transform_matrix(transform: dict) -> np.ndarray:
+    """Return the matrix of a scene JSON ``transform``.
+
+    Args:
+        transform (dict): ``{"matrix": [16 floats]}`` (column-major) or
+            ``position``/``rotation``/``scale``, with rotation as Three.js XYZ Euler angles.
+    Returns:
+        matrix (numpy.ndarray): 4x4 matrix.
+    """
+    if not transform:
+        return IDENTITY
+    if transform.get("matrix") is not None:
+        return np.asarray(transform["matrix"], dtype=np.float64).reshape(4, 4).T
+    rx, ry, rz = transform.get("rotation") or (0, 0, 0)
+    rotation = (
+        axis_rotation_matrix((1, 0, 0), rx)
+        @ axis_rotation_matrix((0, 1, 0), ry)
+        @ axis_rotation_matrix((0, 0, 1), rz)
+    )
+    return (
+        translation_matrix(transform.get("position") or (0, 0, 0))
+        @ rotation
+        @ scaling_matrix(transform.get("scale") or (1, 1, 1))
+    )
+
+
+def is_identity(matrix: np.ndarray) -> bool:
+    """Check whether a matrix is the identity (up to float rounding)."""
+    return bool(np.allclose(matrix, IDENTITY))
+
+
+def matrix_to_list(matrix: np.ndarray) -> list:
+    """Flatten a matrix to 16 floats in column-major order.
+
+    Args:
+        matrix (numpy.ndarray): 4x4 matrix.
+    Returns:
+        values (list): Column-major matrix elements.
+    """
+    return np.asarray(matrix, dtype=np.float64).T.reshape(-1).tolist()
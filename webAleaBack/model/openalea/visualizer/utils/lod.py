@@ -0,0 +1,229 @@
+"""Level-of-detail variants of scene JSON.
+
+A LOD is a triangle budget for the whole scene. Meshes are decimated by
+vertex clustering: each object's bounding box is cut into a grid, the
+vertices of a cell are merged into their mean and collapsed triangles are
+dropped. All objects are clustered in one vectorized pass, so the cost does
+not grow with the number of small objects. Lines and texts are kept as is.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+from core.config import settings
+from model.openalea.visualizer.utils.mesh_arrays import triangulate_faces
+
+LOD_FULL = "full"
+LOD_PRESETS = ("preview", "medium")
+
+# Grid cells per axis are capped so that (object, cell) keys fit in int64
+_MAX_CELLS = 2048
+# Clustering passes rescaling each grid until its result is within the target band
+_MAX_PASSES = 4
+_OVERSHOOT = 1.2
+_UNDERSHOOT = 0.5
+
+
+def parse_lod(lod: Any) -> Optional[str]:
+    """Normalize a requested LOD into a variant name.
+
+    Args:
+        lod (Any): ``"preview"``, ``"medium"``, ``"full"``/None, or a triangle budget (int or digit string).
+    Returns:
+        variant (Optional[str]): Preset name or ``"t<budget>"``; None for full resolution.
+    Raises:
+        ValueError: If the LOD is not recognized.
+    """
+    if lod is None or lod == LOD_FULL:
+        return None
+    if lod in LOD_PRESETS:
+        return lod
+    if isinstance(lod, str) and lod.isdigit():
+        lod = int(lod)
+    if isinstance(lod, int) and not isinstance(lod, bool) and lod > 0:
+        return f"t{lod}"
+    raise ValueError(f"Unknown LOD '{lod}': expected preview, medium, full or a positive triangle budget")
+
+
+def lod_triangle_budget(variant: str) -> int:
+    """Return the scene triangle budget of a variant from ``parse_lod``.
+
+    Args:
+        variant (str): Variant name.
+    Returns:
+        budget (int): Maximum number of triangles.
+    """
+    if variant == "preview":
+        return settings.VISUALIZER_LOD_PREVIEW_TRIANGLES
+    if variant == "medium":
+        return settings.VISUALIZER_LOD_MEDIUM_TRIANGLES
+    return int(variant[1:])
+
+
+def lod_cache_key(scene_ref: str, variant: str) -> str:
+    """Return the cache key of a LOD variant (stored as ``<ref>.lod-<variant>.scene.json``).
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        variant (str): Variant name.
+    Returns:
+        key (str): Cache reference of the variant.
+    """
+    return f"{scene_ref}.lod-{variant}"
+
+
+def _cluster(meshes: list, cells: np.ndarray) -> list:
+    """Vertex-cluster several meshes at once.
+
+    Args:
+        meshes (list): ``(vertices (n, 3) float64, triangles (m, 3) int64)`` pairs, n > 0.
+        cells (numpy.ndarray): Grid cells per axis, per mesh.
+    Returns:
+        meshes (list): Decimated ``(vertices, triangles)`` pairs.
+    """
+    vertex_counts = np.array([len(v) for v, _ in meshes])
+    vertex_starts = np.concatenate(([0], np.cumsum(vertex_counts)[:-1]))
+    vertices = np.concatenate([v for v, _ in meshes])
+    triangles = np.concatenate([t + start for (_, t), start in zip(meshes, vertex_starts)])
+    owner = np.repeat(np.arange(len(meshes)), vertex_counts)
+
+    low = np.minimum.reduceat(vertices, vertex_starts)
+    extent = (np.maximum.reduceat(vertices, vertex_starts) - low).max(axis=1)
+    cell_size = np.where(extent > 0, extent / cells, 1.0)
+    cell = np.floor((vertices - low[owner]) / cell_size[owner, None]).astype(np.int64)
+    np.clip(cell, 0, _MAX_CELLS, out=cell)
+
+    base = _MAX_CELLS + 1
+    keys = ((owner * base + cell[:, 0]) * base + cell[:, 1]) * base + cell[:, 2]
+    unique_keys, cluster = np.unique(keys, return_inverse=True)
+    cluster_counts = np.bincount(cluster)
+    merged = np.column_stack([
+        np.bincount(cluster, weights=vertices[:, axis]) / cluster_counts for axis in range(3)
+    ])
+    cluster_owner = unique_keys // base ** 3
+
+    collapsed = cluster[triangles]
+    keep = (
+        (collapsed[:, 0] != collapsed[:, 1])
+        & (collapsed[:, 1] != collapsed[:, 2])
+        & (collapsed[:, 0] != collapsed[:, 2])
+    )
+    collapsed = collapsed[keep]
+    # Several triangles often collapse onto the same cells; keep one, in original order
+    _, first = np.unique(np.sort(collapsed, axis=1), axis=0, return_index=True)
+    collapsed = collapsed[np.sort(first)]
+
+    cluster_bounds = np.searchsorted(cluster_owner, np.arange(len(meshes) + 1))
+    triangle_owner = cluster_owner[collapsed[:, 0]]
+    triangle_bounds = np.searchsorted(triangle_owner, np.arange(len(meshes) + 1))
+    return [
+        (
+            merged[cluster_bounds[i]:cluster_bounds[i + 1]],
+            collapsed[triangle_bounds[i]:triangle_bounds[i + 1]] - cluster_bounds[i],
+        )
+        for i in range(len(meshes))
+    ]
+
+
+def decimate_meshes(meshes: list, targets) -> list:
+    """Reduce each mesh to roughly its target triangle count.
+
+    Args:
+        meshes (list): ``(vertices (n, 3), triangles (m, 3))`` pairs.
+        targets (Sequence[int]): Target triangle count per mesh.
+    Returns:
+        meshes (list): ``(vertices, triangles)`` pairs; meshes already under target are returned unchanged.
+    """
+    result = list(meshes)
+    todo = [i for i, (v, t) in enumerate(meshes) if len(v) and len(t) > targets[i]]
+    if not todo:
+        return result
+    batch = [
+        (np.asarray(meshes[i][0], dtype=np.float64), np.asarray(meshes[i][1], dtype=np.int64)) for i in todo
+    ]
+    batch_targets = np.maximum(np.array([targets[i] for i in todo], dtype=np.float64), 1.0)
+    # A surface clustered on an n^3 grid keeps on the order of n^2 triangles;
+    # each pass corrects every object's grid from its own result
+    cells = np.clip(np.ceil(np.sqrt(batch_targets)), 1, _MAX_CELLS)
+    best = [None] * len(todo)
+    for _ in range(_MAX_PASSES):
+        decimated = _cluster(batch, cells)
+        counts = np.array([len(t) for _, t in decimated], dtype=np.float64)
+        for j, count in enumerate(counts):
+            if count <= batch_targets[j] * _OVERSHOOT and (best[j] is None or count > len(best[j][1])):
+                best[j] = decimated[j]
+        if np.all((counts <= batch_targets * _OVERSHOOT) & (counts >= batch_targets * _UNDERSHOOT)):
+            break
+        factor = np.clip(np.sqrt(batch_targets / np.maximum(counts, 1.0)), 0.5, 2.0)
+        cells = np.clip(np.round(cells * factor), 1, _MAX_CELLS)
+    for j, i in enumerate(todo):
+        # Objects never under budget keep their coarsest result
+        result[i] = best[j] if best[j] is not None else decimated[j]
+    return result
+
+
+def scene_lod(scene_json: dict, budget: int, variant: str) -> dict:
+    """Build a LOD variant of a scene within a triangle budget.
+
+    The budget is shared in proportion to each mesh's triangle count,
+    counting shared geometries (``geometries``) once per instance.
+
+    Args:
+        scene_json (dict): Full-resolution scene JSON.
+        budget (int): Maximum number of triangles in the scene.
+        variant (str): Variant name, recorded under ``lod``.
+    Returns:
+        scene_json (dict): Scene with decimated meshes and a ``lod`` summary.
+    """
+    objects = scene_json.get("objects", [])
+    geometries = scene_json.get("geometries") or {}
+    instance_counts = {}
+    for obj in objects:
+        if obj.get("geometryRef") in geometries:
+            instance_counts[obj["geometryRef"]] = instance_counts.get(obj["geometryRef"], 0) + 1
+
+    # (container, key, weight) of every inline or shared mesh geometry
+    slots = [(geometries, ref, count) for ref, count in instance_counts.items()]
+    slots += [(obj, "geometry", 1) for obj in objects if isinstance(obj.get("geometry"), dict)]
+    slots = [slot for slot in slots if slot[0][slot[1]].get("type") == "mesh" and slot[0][slot[1]].get("indices")]
+
+    meshes = [
+        (
+            np.asarray(container[key]["vertices"], dtype=np.float64).reshape(-1, 3),
+            triangulate_faces(container[key]["indices"]).astype(np.int64).reshape(-1, 3),
+        )
+        for container, key, _ in slots
+    ]
+    weights = np.array([weight for _, _, weight in slots], dtype=np.int64)
+    counts = np.array([len(triangles) for _, triangles in meshes], dtype=np.int64)
+    source_triangles = int((counts * weights).sum())
+
+    lod_scene = dict(scene_json, objects=[dict(obj) for obj in objects])
+    if geometries:
+        lod_scene["geometries"] = dict(geometries)
+    decimated = source_triangles > budget
+    if decimated:
+        ratio = budget / source_triangles
+        targets = np.floor(counts * ratio).astype(np.int64)
+        meshes = decimate_meshes(meshes, targets)
+        # Slots point into the source scene; rebind them to the copies
+        containers = {id(obj): copy for obj, copy in zip(objects, lod_scene["objects"])}
+        for (container, key, _), (vertices, triangles) in zip(slots, meshes):
+            target = lod_scene["geometries"] if container is geometries else containers[id(container)]
+            target[key] = dict(container[key], vertices=vertices.tolist(), indices=triangles.tolist())
+
+    triangles = int(sum(len(t) * w for (_, t), w in zip(meshes, weights)))
+    lod_scene["lod"] = {
+        "level": variant,
+        "decimated": decimated,
+        "triangles": triangles,
+        "sourceTriangles": source_triangles,
+    }
+    logging.info(
+        "Visualizer LOD variant=%s budget=%s triangles=%s source_triangles=%s",
+        variant, budget, triangles, source_triangles
+    )
+    return lod_scene
@@ -0,0 +1,124 @@
+"""Bulk conversion of PlantGL point and index arrays to NumPy."""
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+
+
+def _supports_array_protocol(values) -> bool:
+    """Check whether an object can be viewed by NumPy without iteration."""
+    if hasattr(values, "__array__") or hasattr(values, "__array_interface__"):
+        return True
+    try:
+        memoryview(values)
+    except TypeError:
+        return False
+    return True
+
+
+def _bulk_array(values, dtype, width: int | None = None):
+    """Convert a PlantGL array to a 2-D NumPy array without per-item Python code.
+
+    Uses the array/buffer protocol when exposed; otherwise flattens the rows
+    with ``itertools.chain`` straight into ``np.fromiter``, so no attribute
+    lookup or intermediate list is made per point.
+
+    Args:
+        values (Any): PlantGL array (``Point3Array``, ``Index3Array``, ...).
+        dtype (numpy.dtype): Target dtype.
+        width (int | None): Expected number of columns, any when None.
+    Returns:
+        array (numpy.ndarray | None): C-contiguous array, or None if the bulk conversion failed.
+    """
+    try:
+        if _supports_array_protocol(values):
+            array = np.asarray(values, dtype=dtype)
+        else:
+            count = len(values)
+            if count == 0:
+                return np.empty((0, width or 3), dtype=dtype)
+            lengths = np.fromiter(map(len, values), dtype=np.intp, count=count)
+            if lengths.min() != lengths.max():
+                return None
+            flat = np.fromiter(
+                itertools.chain.from_iterable(values), dtype=dtype, count=int(lengths.sum())
+            )
+            array = flat.reshape(count, int(lengths[0]))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if array.size == 0:
+        return np.empty((0, width or 3), dtype=dtype)
+    if array.ndim != 2 or (width is not None and array.shape[1] != width):
+        return None
+    return np.ascontiguousarray(array)
+
+
+def points_to_array(point_list, dtype=np.float32) -> np.ndarray:
+    """Return the points of a PlantGL point list as an ``(n, 3)`` array.
+
+    Args:
+        point_list (Any): PlantGL ``Point3Array``.
+        dtype (numpy.dtype): Vertex dtype (float32 for GPU buffers, float64 for exact JSON).
+    Returns:
+        vertices (numpy.ndarray): Contiguous array of xyz rows.
+    """
+    array = _bulk_array(point_list, dtype, 3)
+    if array is not None:
+        return array
+    # Fallback: per-point attribute access (previous implementation)
+    return np.array([[p.x, p.y, p.z] for p in point_list], dtype=dtype).reshape(-1, 3)
+
+
+def indices_to_array(index_list) -> np.ndarray | None:
+    """Return the faces of a PlantGL index list as a uint32 ``(m, k)`` array.
+
+    Args:
+        index_list (Any): PlantGL ``Index3Array`` (or any list of equal-size faces).
+    Returns:
+        faces (numpy.ndarray | None): Contiguous uint32 array, or None for ragged faces.
+    """
+    array = _bulk_array(index_list, np.uint32)
+    if array is not None:
+        return array
+    faces = [list(i) for i in index_list]
+    if len({len(face) for face in faces}) > 1:
+        return None
+    return np.array(faces, dtype=np.uint32).reshape(len(faces), -1)
+
+
+def triangulate_faces(faces) -> np.ndarray:
+    """Convert face lists to a flat triangle index array (fan-triangulating polygons).
+
+    Args:
+        faces (Any): Faces as lists of vertex indices, or an ``(m, 3)`` array.
+    Returns:
+        flat (numpy.ndarray): Flat uint32 triangle indices.
+    """
+    try:
+        array = np.asarray(faces, dtype=np.uint32)
+    except ValueError:
+        array = None
+    if array is not None and array.ndim == 2 and array.shape[1] == 3:
+        return array.reshape(-1)
+    triangles = []
+    for face in faces:
+        for i in range(1, len(face) - 1):
+            triangles.extend((face[0], face[i], face[i + 1]))
+    return np.asarray(triangles, dtype=np.uint32)
+
+
+def mesh_to_json(mesh):
+    """Convert the arrays of ``mesh_arrays_from_geometry`` to JSON-friendly lists.
+
+    Args:
+        mesh (dict): Mesh/line arrays.
+    Returns:
+        mesh (dict): Mesh/line dict with nested-list vertices and indices.
+    """
+    # ndarray.tolist() builds the nested lists in C
+    json_mesh = {"type": mesh["type"], "vertices": mesh["vertices"].tolist()}
+    if "indices" in mesh:
+        indices = mesh["indices"]
+        json_mesh["indices"] = indices.tolist() if hasattr(indices, "tolist") else indices
+    return json_mesh
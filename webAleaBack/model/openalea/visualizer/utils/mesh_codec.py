@@ -0,0 +1,305 @@
+"""Compact mesh encoding for the binary scene format.
+
+A mesh is welded (the Tesselator emits one copy of a vertex per face),
+except across creases sharper than ``CREASE_ANGLE`` where each side keeps
+its own vertex so that hard edges stay sharp, then its positions are quantized to uint16 within the mesh bounding box and
+its area-weighted vertex normals are precomputed and octahedral-encoded as
+two int16. Indices use uint16 when the welded mesh allows it. Positions are
+recovered as ``offset + q * scale`` with an error of at most ``scale / 2``
+per axis.
+
+``deflate_mesh`` optionally adds delta + zigzag coding of the integer
+streams followed by DEFLATE, for storage or clients able to inflate.
+"""
+from __future__ import annotations
+
+import io
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+_QUANT_MAX = 65535
+_OCT_MAX = 32767
+# Edges sharper than this stay hard when welding (the Three.js toCreasedNormals default)
+CREASE_ANGLE = math.pi / 3
+
+
+def _unique_rows(rows: np.ndarray) -> tuple:
+    """Deduplicate bit-identical rows, keeping first-occurrence order.
+
+    Returns:
+        first (numpy.ndarray): Index of the first occurrence of each distinct row, in order.
+        rank (numpy.ndarray): Position of every row's distinct row in ``first``.
+    """
+    rows = np.ascontiguousarray(rows)
+    # Comparing rows as opaque byte keys is several times faster than np.unique(axis=0)
+    keys = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.reshape(-1)]
+
+
+def creased_corner_normals(vertices: np.ndarray, triangles: np.ndarray, crease_angle: float) -> np.ndarray:
+    """Compute a normal per triangle corner, smoothed only across edges flatter than a crease angle.
+
+    Each corner averages (area-weighted) the faces around its vertex whose normal is
+    within ``crease_angle`` of its own face normal, as ``toCreasedNormals`` does in Three.js.
+
+    Args:
+        vertices (numpy.ndarray): ``(n, 3)`` welded vertices.
+        triangles (numpy.ndarray): ``(m, 3)`` vertex indices.
+        crease_angle (float): Largest angle between face normals, in radians, that is smoothed.
+    Returns:
+        normals (numpy.ndarray): ``(3 * m, 3)`` float64 unit normals in corner order; zero for degenerate faces.
+    """
+    corners = vertices[triangles]
+    area_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(area_normals, axis=1)
+    unit_normals = area_normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+
+    corner_vertex = triangles.reshape(-1)
+    order = np.argsort(corner_vertex, kind="stable")
+    corner_face = (np.arange(len(corner_vertex)) // 3)[order]
+    sizes = np.bincount(corner_vertex, minlength=len(vertices))
+    group_size = sizes[corner_vertex[order]]
+    group_start = (np.cumsum(sizes) - sizes)[corner_vertex[order]]
+    # Every (a, b) pair of corners sharing a vertex, in sorted corner order
+    a = np.repeat(np.arange(len(order)), group_size)
+    b = np.repeat(group_start, group_size) + np.arange(len(a)) - np.repeat(np.cumsum(group_size) - group_size, group_size)
+    face_a, face_b = corner_face[a], corner_face[b]
+    smooth = np.einsum("ij,ij->i", unit_normals[face_a], unit_normals[face_b]) >= np.cos(crease_angle)
+    summed = np.column_stack([
+        np.bincount(a[smooth], weights=area_normals[face_b[smooth], axis], minlength=len(order))
+        for axis in range(3)
+    ])
+    normals = np.empty_like(summed)
+    normals[order] = summed
+    lengths = np.linalg.norm(normals, axis=1)
+    return normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+
+
+def weld_vertices(vertices: np.ndarray, triangles: np.ndarray, crease_angle: Optional[float] = None) -> tuple:
+    """Merge bit-identical vertices, keeping first-occurrence order.
+
+    With a ``crease_angle``, a position is only merged across faces whose
+    normals are smoothed together (see ``creased_corner_normals``), so hard
+    edges keep one vertex per side and their normals stay sharp.
+
+    Args:
+        vertices (numpy.ndarray): ``(n, 3)`` vertices.
+        triangles (numpy.ndarray): ``(m, 3)`` vertex indices.
+        crease_angle (Optional[float]): Crease angle in radians; None merges every identical position.
+    Returns:
+        vertices (numpy.ndarray): ``(k, 3)`` vertices.
+        triangles (numpy.ndarray): ``(m, 3)`` int64 indices into them.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if not len(vertices):
+        return vertices, triangles
+    vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+    first, rank = _unique_rows(vertices)
+    vertices, triangles = vertices[first], rank[triangles]
+    if crease_angle is None or not len(triangles):
+        return vertices, triangles
+    # Corners sharing a position and a creased normal share a vertex
+    corner_vertex = triangles.reshape(-1)
+    keys = np.column_stack([
+        corner_vertex.astype(np.float64), creased_corner_normals(vertices, triangles, crease_angle)
+    ])
+    first, rank = _unique_rows(keys)
+    return vertices[corner_vertex[first]], rank.reshape(-1, 3)
+
+
+def vertex_normals(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Compute area-weighted unit vertex normals (as ``computeVertexNormals`` would).
+
+    Args:
+        vertices (numpy.ndarray): ``(n, 3)`` vertices.
+        triangles (numpy.ndarray): ``(m, 3)`` vertex indices.
+    Returns:
+        normals (numpy.ndarray): ``(n, 3)`` float64 normals; unused vertices get ``(0, 0, 1)``.
+    """
+    corners = vertices[triangles]
+    face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    corner_faces = np.repeat(face_normals, 3, axis=0)
+    normals = np.column_stack([
+        np.bincount(triangles.reshape(-1), weights=corner_faces[:, axis], minlength=len(vertices))
+        for axis in range(3)
+    ])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals[lengths == 0] = (0.0, 0.0, 1.0)
+    lengths[lengths == 0] = 1.0
+    return normals / lengths[:, None]
+
+
+def _sign(values: np.ndarray) -> np.ndarray:
+    return np.where(values >= 0, 1.0, -1.0)
+
+
+def octahedral_encode(normals: np.ndarray) -> np.ndarray:
+    """Encode unit normals on the octahedron, two int16 per normal.
+
+    Args:
+        normals (numpy.ndarray): ``(n, 3)`` unit vectors.
+    Returns:
+        encoded (numpy.ndarray): ``(n, 2)`` int16.
+    """
+    normals = np.asarray(normals, dtype=np.float64)
+    projected = normals[:, :2] / np.abs(normals).sum(axis=1, keepdims=True)
+    lower = normals[:, 2] < 0
+    folded = (1.0 - np.abs(projected[lower][:, ::-1])) * _sign(projected[lower])
+    projected[lower] = folded
+    return np.round(np.clip(projected, -1.0, 1.0) * _OCT_MAX).astype(np.int16)
+
+
+def octahedral_decode(encoded: np.ndarray) -> np.ndarray:
+    """Decode ``octahedral_encode`` output to unit normals.
+
+    Args:
+        encoded (numpy.ndarray): ``(n, 2)`` int16.
+    Returns:
+        normals (numpy.ndarray): ``(n, 3)`` float64 unit vectors.
+    """
+    xy = np.asarray(encoded, dtype=np.float64) / _OCT_MAX
+    z = 1.0 - np.abs(xy).sum(axis=1)
+    lower = z < 0
+    xy[lower] = (1.0 - np.abs(xy[lower][:, ::-1])) * _sign(xy[lower])
+    normals = np.column_stack([xy, z])
+    return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+
+def quantize_positions(vertices: np.ndarray) -> tuple:
+    """Quantize positions to uint16 within their bounding box.
+
+    Args:
+        vertices (numpy.ndarray): ``(n, 3)`` vertices, n > 0.
+    Returns:
+        quantized (numpy.ndarray): ``(n, 3)`` uint16.
+        offset (numpy.ndarray): Bounding box minimum.
+        scale (numpy.ndarray): Size of one quantization step per axis.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    offset = vertices.min(axis=0)
+    extent = vertices.max(axis=0) - offset
+    scale = np.where(extent > 0, extent / _QUANT_MAX, 1.0)
+    quantized = np.round((vertices - offset) / scale)
+    return np.clip(quantized, 0, _QUANT_MAX).astype(np.uint16), offset, scale
+
+
+def dequantize_positions(quantized: np.ndarray, offset, scale) -> np.ndarray:
+    """Invert ``quantize_positions``.
+
+    Args:
+        quantized (numpy.ndarray): ``(n, 3)`` uint16.
+        offset (Sequence[float]): Bounding box minimum.
+        scale (Sequence[float]): Quantization step per axis.
+    Returns:
+        vertices (numpy.ndarray): ``(n, 3)`` float64.
+    """
+    return np.asarray(offset, dtype=np.float64) + np.asarray(quantized, dtype=np.float64) * np.asarray(scale)
+
+
+def encode_mesh(
+    vertices, triangles, normals: bool = True, crease_angle: Optional[float] = CREASE_ANGLE
+) -> Dict[str, np.ndarray]:
+    """Encode a triangle mesh compactly.
+
+    Args:
+        vertices (Any): ``(n, 3)`` vertices.
+        triangles (Any): ``(m, 3)`` vertex indices.
+        normals (bool): Whether to precompute octahedral normals.
+        crease_angle (Optional[float]): Crease angle of the weld in radians; None welds every
+            identical position and smooths all normals.
+    Returns:
+        encoded (Dict[str, numpy.ndarray]): ``positions`` (uint16), ``offset``, ``scale``,
+            flat ``indices`` (uint16 or uint32) and, optionally, ``normals`` (int16 pairs).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    vertices, triangles = weld_vertices(vertices, triangles, crease_angle)
+    if len(vertices):
+        positions, offset, scale = quantize_positions(vertices)
+    else:
+        positions, offset, scale = np.empty((0, 3), dtype=np.uint16), np.zeros(3), np.ones(3)
+    index_dtype = np.uint16 if len(vertices) <= _QUANT_MAX + 1 else np.uint32
+    encoded = {
+        "positions": positions,
+        "offset": offset,
+        "scale": scale,
+        "indices": triangles.reshape(-1).astype(index_dtype),
+    }
+    if normals:
+        encoded["normals"] = octahedral_encode(vertex_normals(vertices, triangles))
+    return encoded
+
+
+def decode_mesh(encoded: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Decode ``encode_mesh`` output.
+
+    Args:
+        encoded (Dict[str, numpy.ndarray]): Encoded mesh.
+    Returns:
+        mesh (Dict[str, numpy.ndarray]): ``vertices`` (n, 3), ``triangles`` (m, 3) and optional ``normals`` (n, 3).
+    """
+    mesh = {
+        "vertices": dequantize_positions(encoded["positions"], encoded["offset"], encoded["scale"]),
+        "triangles": np.asarray(encoded["indices"], dtype=np.int64).reshape(-1, 3),
+    }
+    if "normals" in encoded:
+        mesh["normals"] = octahedral_decode(encoded["normals"])
+    return mesh
+
+
+def _zigzag_delta(values: np.ndarray) -> np.ndarray:
+    deltas = np.diff(np.asarray(values, dtype=np.int64), axis=0, prepend=0)
+    return ((deltas << 1) ^ (deltas >> 63)).astype(np.uint32)
+
+
+def _undo_zigzag_delta(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    return np.cumsum((values >> 1) ^ -(values & 1), axis=0)
+
+
+def deflate_mesh(encoded: Dict[str, np.ndarray]) -> bytes:
+    """Delta + zigzag code the integer streams of an encoded mesh, then DEFLATE them.
+
+    Args:
+        encoded (Dict[str, numpy.ndarray]): Output of ``encode_mesh``.
+    Returns:
+        data (bytes): Compressed mesh (an ``.npz`` archive).
+    """
+    arrays = {
+        "positions": _zigzag_delta(encoded["positions"]),
+        "indices": _zigzag_delta(encoded["indices"]),
+        "offset": encoded["offset"],
+        "scale": encoded["scale"],
+        "index_dtype": np.array(encoded["indices"].dtype.str),
+    }
+    if "normals" in encoded:
+        arrays["normals"] = encoded["normals"]
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def inflate_mesh(data: bytes) -> Dict[str, np.ndarray]:
+    """Invert ``deflate_mesh``.
+
+    Args:
+        data (bytes): Compressed mesh.
+    Returns:
+        encoded (Dict[str, numpy.ndarray]): Encoded mesh as returned by ``encode_mesh``.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        encoded = {
+            "positions": _undo_zigzag_delta(archive["positions"]).astype(np.uint16),
+            "indices": _undo_zigzag_delta(archive["indices"]).astype(np.dtype(str(archive["index_dtype"]))),
+            "offset": archive["offset"],
+            "scale": archive["scale"],
+        }
+        if "normals" in archive:
+            encoded["normals"] = archive["normals"]
+    return encoded
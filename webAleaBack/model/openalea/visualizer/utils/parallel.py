@@ -0,0 +1,108 @@
+"""Process pool used to tessellate large scenes in parallel."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+# Chunks per worker: small enough to balance uneven geometries, large enough to amortize pickling.
+CHUNKS_PER_WORKER = 4
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+# Upper bound on pool workers in this process; None -> as requested
+_WORKER_LIMIT: Optional[int] = None
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared process pool, (re)creating it for a new worker count."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            # spawn: the API process runs threads, which fork does not handle safely
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+            logging.info("Serialization pool started workers=%s", workers)
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    """Stop the shared process pool, if any.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        None (None): No return value.
+    """
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+def limit_workers(max_workers: Optional[int]) -> None:
+    """Cap the pool size of this process, e.g. in node workers that already run side by side.
+
+    Args:
+        max_workers (Optional[int]): Most worker processes per call; 1 or less serializes in-process,
+            None removes the cap.
+    Returns:
+        None (None): No return value.
+    """
+    global _WORKER_LIMIT
+    _WORKER_LIMIT = max_workers
+
+
+def split_chunks(items: list, count: int) -> List[list]:
+    """Split a list into at most ``count`` contiguous chunks of near-equal size.
+
+    Args:
+        items (list): Items to split.
+        count (int): Number of chunks wanted.
+    Returns:
+        chunks (List[list]): Non-empty chunks, in order.
+    """
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    chunks = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return [chunk for chunk in chunks if chunk]
+
+
+def map_chunks(func: Callable[[list], list], items: list, workers: int) -> list:
+    """Apply ``func`` to contiguous chunks of ``items`` in worker processes.
+
+    Results are concatenated in input order. Runs ``func(items)`` in-process
+    when ``workers <= 1`` or when the pool fails (e.g. unpicklable items).
+    ``workers`` is capped by ``limit_workers``.
+
+    Args:
+        func (Callable[[list], list]): Module-level function mapping a chunk to one result per item.
+        items (list): Items to process.
+        workers (int): Number of worker processes.
+    Returns:
+        results (list): One result per item.
+    """
+    if _WORKER_LIMIT is not None:
+        workers = min(workers, _WORKER_LIMIT)
+    if workers <= 1 or len(items) < 2:
+        return func(items)
+    chunks = split_chunks(items, workers * CHUNKS_PER_WORKER)
+    try:
+        results = list(_get_pool(workers).map(func, chunks))
+    except Exception:
+        logging.exception("Parallel serialization failed, falling back to a single process")
+        shutdown_pool()
+        return func(items)
+    return [result for chunk_results in results for result in chunk_results]
@@ -1,7 +1,11 @@
+import numpy as np
 from openalea.plantgl.all import (
-    Polyline, BezierCurve, NurbsCurve, PointSet, Tesselator, Discretizer
+    Polyline, BezierCurve, NurbsCurve, PointSet, Tesselator, Discretizer, ExplicitModel
 )
 
+from model.openalea.visualizer.utils.mesh_arrays import indices_to_array, mesh_to_json, points_to_array
+from model.openalea.visualizer.utils.tessellation_cache import get_tessellation_cache, tessellation_key
+
 
 def _is_curve(geometry) -> bool:
     """Check if a PlantGL geometry is curve-like.
@@ -14,20 +18,66 @@ def _is_curve(geometry) -> bool:
     return isinstance(geometry, (Polyline, BezierCurve, NurbsCurve, PointSet))
 
 
-def mesh_from_geometry(geometry):
-    """Convert PlantGL geometry into JSON-friendly mesh/line data.
+def mesh_arrays_from_geometry(geometry, vertex_dtype=np.float32):
+    """Convert PlantGL geometry into NumPy mesh/line arrays.
+
+    Parametric geometries go through the tessellation cache; explicit meshes
+    are cheaper to convert than to hash and bypass it.
 
     Args:
         geometry (Any): PlantGL geometry instance.
+        vertex_dtype (numpy.dtype): Dtype of the vertex array.
     Returns:
-        mesh (dict): Mesh/line dict with vertices and indices when applicable.
+        mesh (dict): ``type`` plus ``vertices`` (n, 3) and, for meshes,
+            ``indices`` as a uint32 (m, 3) array (a list of lists for ragged faces).
+            Arrays served from the cache are read-only.
     """
+    cache = None if isinstance(geometry, ExplicitModel) else get_tessellation_cache()
+    if cache is None:
+        return _discretize(geometry, vertex_dtype)
+
+    discretizer_name = "Discretizer" if _is_curve(geometry) else "Tesselator"
+    key = tessellation_key(geometry, discretizer_name, vertex_dtype)
+    if key is None:
+        return _discretize(geometry, vertex_dtype)
+    mesh = cache.get(key)
+    if mesh is None:
+        mesh = cache.put(key, _discretize(geometry, vertex_dtype))
+    return mesh
+
+
+def _discretize(geometry, vertex_dtype):
+    """Run the PlantGL discretizer and convert its result (see ``mesh_arrays_from_geometry``)."""
     discretizer = Discretizer() if _is_curve(geometry) else Tesselator()
     geometry.apply(discretizer)
     if _is_curve(geometry):
-        vertices = [[p.x, p.y, p.z] for p in discretizer.result.pointList]
-        return {"type": "line", "vertices": vertices}
+        return {"type": "line", "vertices": points_to_array(discretizer.result.pointList, vertex_dtype)}
+
+    discretization = discretizer.discretization
+    faces = indices_to_array(discretization.indexList)
+    if faces is None:
+        faces = [list(i) for i in discretization.indexList]
+    return {"type": "mesh", "vertices": points_to_array(discretization.pointList, vertex_dtype), "indices": faces}
+
 
-    vertices = [[p.x, p.y, p.z] for p in discretizer.discretization.pointList]
-    faces = [list(i) for i in discretizer.discretization.indexList]
-    return {"type": "mesh", "vertices": vertices, "indices": faces}
+def geometry_kind(geometry) -> str:
+    """Return the scene object type a geometry serializes to.
+
+    Args:
+        geometry (Any): PlantGL geometry instance.
+    Returns:
+        kind (str): ``"line"`` for curves, ``"mesh"`` otherwise.
+    """
+    return "line" if _is_curve(geometry) else "mesh"
+
+
+def mesh_from_geometry(geometry):
+    """Convert PlantGL geometry into JSON-friendly mesh/line data.
+
+    Args:
+        geometry (Any): PlantGL geometry instance.
+    Returns:
+        mesh (dict): Mesh/line dict with vertices and indices when applicable.
+    """
+    # float64 keeps the JSON values identical to PlantGL's double coordinates
+    return mesh_to_json(mesh_arrays_from_geometry(geometry, vertex_dtype=np.float64))
@@ -0,0 +1,215 @@
+"""Packed binary encoding of scene JSON for the Three.js client.
+
+Layout (all integers little-endian)::
+
+    magic "WASB" | uint32 version | uint32 header_length | header JSON | buffer
+
+The header is UTF-8 JSON padded with spaces to a multiple of 4 bytes. It
+holds the scene objects with their geometry replaced by buffer views
+``{"byteOffset", "count", "componentType", "itemSize"}`` (offsets relative
+to the start of the buffer, 4-byte aligned) and a ``materials`` table that
+objects reference through ``materialIndex``. Shared geometries of instanced
+scenes (``geometries`` referenced by ``geometryRef``) are written once. The client can wrap each view
+in a typed array without parsing.
+
+With ``compact=True`` meshes are welded and stored with ``"encoding": "compact"``
+(see ``mesh_codec``): uint16 ``vertices`` to scale by ``quantization``
+(``offset + q * scale``), int16 octahedral ``normals`` and uint16 indices
+whenever the welded mesh has at most 65536 vertices.
+"""
+from __future__ import annotations
+
+import json
+import struct
+
+import numpy as np
+
+from model.openalea.visualizer.utils.mesh_arrays import triangulate_faces
+from model.openalea.visualizer.utils.mesh_codec import dequantize_positions, encode_mesh, octahedral_decode
+
+SCENE_BINARY_MAGIC = b"WASB"
+SCENE_BINARY_VERSION = 1
+SCENE_BINARY_MEDIA_TYPE = "application/vnd.webalea.scene+octet-stream"
+
+_PREAMBLE = struct.Struct("<4sII")
+_COMPONENT_TYPES = {
+    "float32": np.dtype("<f4"),
+    "int16": np.dtype("<i2"),
+    "uint16": np.dtype("<u2"),
+    "uint32": np.dtype("<u4"),
+}
+
+
+def _pad4(length: int) -> int:
+    """Return the number of bytes needed to reach the next 4-byte boundary."""
+    return -length % 4
+
+
+class _BufferWriter:
+    """Accumulate aligned little-endian arrays and describe them as views."""
+
+    def __init__(self):
+        self._chunks = []
+        self.byte_length = 0
+
+    def add(self, array: np.ndarray, component_type: str, item_size: int) -> dict:
+        data = np.ascontiguousarray(array, dtype=_COMPONENT_TYPES[component_type]).tobytes()
+        view = {
+            "byteOffset": self.byte_length,
+            "count": len(data) // _COMPONENT_TYPES[component_type].itemsize,
+            "componentType": component_type,
+            "itemSize": item_size,
+        }
+        padding = _pad4(len(data))
+        self._chunks.append(data + b"\0" * padding)
+        self.byte_length += len(data) + padding
+        return view
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def _encode_compact_mesh(geometry: dict, writer: _BufferWriter) -> dict:
+    """Move a mesh into the buffer with the compact encoding.
+
+    Args:
+        geometry (dict): Mesh with nested-list ``vertices`` and optional ``indices``.
+        writer (_BufferWriter): Output buffer.
+    Returns:
+        geometry (dict): Geometry with quantized buffer views.
+    """
+    vertices = np.asarray(geometry.get("vertices") or [], dtype=np.float64).reshape(-1, 3)
+    if geometry.get("indices"):
+        triangles = triangulate_faces(geometry["indices"])
+    else:
+        # Non-indexed meshes are drawn as triangle lists
+        triangles = np.arange(len(vertices) - len(vertices) % 3)
+    mesh = encode_mesh(vertices, triangles)
+    encoded = {k: v for k, v in geometry.items() if k not in ("vertices", "indices")}
+    encoded["encoding"] = "compact"
+    encoded["vertices"] = writer.add(mesh["positions"], "uint16", 3)
+    encoded["quantization"] = {"offset": mesh["offset"].tolist(), "scale": mesh["scale"].tolist()}
+    encoded["normals"] = writer.add(mesh["normals"], "int16", 2)
+    encoded["indices"] = writer.add(mesh["indices"], mesh["indices"].dtype.name, 1)
+    return encoded
+
+
+def _encode_geometry(geometry: dict, writer: _BufferWriter, compact: bool = False) -> dict:
+    """Move the vertices/indices of a geometry into the buffer.
+
+    Args:
+        geometry (dict): Geometry with nested-list ``vertices`` and optional ``indices``.
+        writer (_BufferWriter): Output buffer.
+        compact (bool): Whether to use the compact encoding for meshes.
+    Returns:
+        geometry (dict): Geometry with buffer views instead of lists.
+    """
+    if compact and geometry.get("type") == "mesh":
+        return _encode_compact_mesh(geometry, writer)
+    encoded = {k: v for k, v in geometry.items() if k not in ("vertices", "indices")}
+    vertices = np.asarray(geometry.get("vertices") or [], dtype=np.float32).reshape(-1, 3)
+    encoded["vertices"] = writer.add(vertices, "float32", 3)
+    if geometry.get("indices"):
+        triangles = triangulate_faces(geometry["indices"])
+        # Same index width rule as the client-side buildIndexArray
+        component_type = "uint16" if triangles.size and triangles.max() <= 65535 else "uint32"
+        encoded["indices"] = writer.add(triangles, component_type, 1)
+    return encoded
+
+
+def encode_scene_binary(scene_json: dict, compact: bool = False) -> bytes:
+    """Encode scene JSON into the packed binary format.
+
+    Args:
+        scene_json (dict): Scene JSON with an ``objects`` list and optional ``geometries`` table.
+        compact (bool): Whether to quantize meshes and precompute their normals.
+    Returns:
+        data (bytes): Binary scene.
+    """
+    writer = _BufferWriter()
+    materials = []
+    material_keys = {}
+    objects = []
+    for obj in scene_json.get("objects", []):
+        encoded = dict(obj)
+        if isinstance(obj.get("geometry"), dict):
+            encoded["geometry"] = _encode_geometry(obj["geometry"], writer, compact)
+        if "material" in obj:
+            key = json.dumps(obj["material"], sort_keys=True)
+            if key not in material_keys:
+                material_keys[key] = len(materials)
+                materials.append(obj["material"])
+            encoded["materialIndex"] = material_keys[key]
+            del encoded["material"]
+        objects.append(encoded)
+
+    header = {
+        "version": SCENE_BINARY_VERSION,
+        "objects": objects,
+        "materials": materials,
+    }
+    for key in ("lod", "bounds"):
+        if key in scene_json:
+            header[key] = scene_json[key]
+    if "geometries" in scene_json:
+        header["geometries"] = {
+            ref: _encode_geometry(geometry, writer, compact) for ref, geometry in scene_json["geometries"].items()
+        }
+    header["bufferByteLength"] = writer.byte_length
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * _pad4(len(header_bytes))
+    preamble = _PREAMBLE.pack(SCENE_BINARY_MAGIC, SCENE_BINARY_VERSION, len(header_bytes))
+    return preamble + header_bytes + writer.getvalue()
+
+
+def decode_scene_binary(data: bytes) -> dict:
+    """Decode a binary scene back to scene JSON (flat NumPy views as geometry).
+
+    Args:
+        data (bytes): Binary scene produced by ``encode_scene_binary``.
+    Returns:
+        scene_json (dict): Scene with ``objects`` (and ``geometries``); vertices are ``(n, 3)``
+            float32 arrays and indices flat integer arrays. Compact meshes are dequantized
+            and get ``(n, 3)`` float32 ``normals``.
+    """
+    magic, version, header_length = _PREAMBLE.unpack_from(data)
+    if magic != SCENE_BINARY_MAGIC or version != SCENE_BINARY_VERSION:
+        raise ValueError("Not a WebAlea binary scene")
+    header_start = _PREAMBLE.size
+    header = json.loads(data[header_start:header_start + header_length])
+    buffer = memoryview(data)[header_start + header_length:]
+
+    def view(accessor):
+        dtype = _COMPONENT_TYPES[accessor["componentType"]]
+        array = np.frombuffer(buffer, dtype=dtype, count=accessor["count"], offset=accessor["byteOffset"])
+        return array.reshape(-1, accessor["itemSize"]) if accessor["itemSize"] > 1 else array
+
+    def geometry_views(geometry):
+        if not isinstance(geometry, dict) or not isinstance(geometry.get("vertices"), dict):
+            return geometry
+        decoded = dict(geometry, vertices=view(geometry["vertices"]))
+        if "indices" in geometry:
+            decoded["indices"] = view(geometry["indices"])
+        if decoded.pop("encoding", None) == "compact":
+            quantization = decoded.pop("quantization")
+            decoded["vertices"] = dequantize_positions(
+                decoded["vertices"], quantization["offset"], quantization["scale"]
+            ).astype(np.float32)
+            decoded["normals"] = octahedral_decode(view(geometry["normals"])).astype(np.float32)
+        return decoded
+
+    objects = []
+    for obj in header["objects"]:
+        decoded = dict(obj)
+        if "geometry" in obj:
+            decoded["geometry"] = geometry_views(obj["geometry"])
+        if "materialIndex" in obj:
+            decoded["material"] = header["materials"][decoded.pop("materialIndex")]
+        objects.append(decoded)
+    scene_json = {"objects": objects}
+    for key in ("lod", "bounds"):
+        if key in header:
+            scene_json[key] = header[key]
+    if "geometries" in header:
+        scene_json["geometries"] = {ref: geometry_views(g) for ref, g in header["geometries"].items()}
+    return scene_json
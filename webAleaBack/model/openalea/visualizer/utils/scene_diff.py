@@ -0,0 +1,145 @@
+"""Content-derived object ids and diffs between scenes.
+
+An object id hashes what the object shows: its type, material, transform
+and the content of its geometry (or its text and position), plus an
+occurrence number for identical copies. Re-running a node therefore gives
+unchanged objects the same ids, and a diff against the previous scene only
+carries the objects that appeared or changed. Changes are recognized by the
+PlantGL ``Shape.id`` (``shapeId``) shared by a removed and an added object,
+e.g. an organ that grew between two simulation steps.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+OBJECT_ID_LENGTH = 20
+
+# Keys that do not define what an object shows (producers may renumber shapes between runs)
+_IDENTITY_EXCLUDED = ("id", "geometryRef", "bbox", "shapeId")
+
+
+def diff_cache_key(scene_ref: str, previous_ref: str) -> str:
+    """Return the cache key of the diff between two scenes (``<ref>.diff-<previous>.scene.json``).
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        previous_ref (str): Reference of the scene the diff starts from.
+    Returns:
+        key (str): Cache reference of the diff.
+    """
+    return f"{scene_ref}.diff-{previous_ref}"
+
+
+def mesh_digest(mesh: dict) -> str:
+    """Hash the content of tessellated mesh/line arrays.
+
+    Args:
+        mesh (dict): ``type``, ``vertices`` array and optional ``indices`` (array or ragged lists).
+    Returns:
+        digest (str): Hex SHA-1 digest.
+    """
+    digest = hashlib.sha1(mesh["type"].encode("utf-8"))
+    digest.update(np.ascontiguousarray(mesh["vertices"], dtype=np.float64).tobytes())
+    indices = mesh.get("indices")
+    if isinstance(indices, np.ndarray):
+        digest.update(np.ascontiguousarray(indices, dtype=np.int64).tobytes())
+    elif indices is not None:
+        digest.update(json.dumps(indices).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def geometry_digest(geometry: dict) -> str:
+    """Hash a JSON geometry.
+
+    Args:
+        geometry (dict): Mesh/line geometry with nested-list ``vertices`` and ``indices``.
+    Returns:
+        digest (str): Hex SHA-1 digest.
+    """
+    return hashlib.sha1(json.dumps(geometry, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def assign_object_ids(objects: list, geometry_digests: Dict[str, str], occurrences: Dict[str, int]) -> None:
+    """Give objects ids derived from their content (in place).
+
+    Args:
+        objects (list): Serialized objects, in scene order.
+        geometry_digests (Dict[str, str]): Content digest of each ``geometryRef``.
+        occurrences (Dict[str, int]): Objects seen so far per content key, shared by the chunks of a scene.
+    Returns:
+        None (None): No return value.
+    """
+    for obj in objects:
+        content = {key: value for key, value in obj.items() if key not in _IDENTITY_EXCLUDED}
+        if obj.get("geometryRef") is not None:
+            content["geometry"] = geometry_digests.get(obj["geometryRef"])
+        key = hashlib.sha1(json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        obj["id"] = hashlib.sha1(f"{key}#{occurrence}".encode("utf-8")).hexdigest()[:OBJECT_ID_LENGTH]
+
+
+def diff_scenes(previous: dict, current: dict, previous_ref: Optional[str] = None) -> Dict[str, Any]:
+    """Compute the objects to add, replace and remove to turn one scene into another.
+
+    Shared geometries of the sent objects are keyed by their content digest
+    (``h<digest>``), so they cannot clash with the references of the
+    scene the client already holds.
+
+    Args:
+        previous (dict): Scene the client holds.
+        current (dict): New scene.
+        previous_ref (Optional[str]): Reference of the previous scene, recorded as ``base``.
+    Returns:
+        diff (Dict[str, Any]): ``base``, ``added`` and ``changed`` objects (the latter with the
+            ``previousId`` they replace), ``removed`` ids, their ``geometries``, the new
+            ``objectCount``, ``unchanged`` count and scene ``bounds``.
+    """
+    previous_objects = {obj.get("id"): obj for obj in previous.get("objects") or []}
+    current_objects = current.get("objects") or []
+    current_ids = {obj.get("id") for obj in current_objects}
+
+    new_objects = [obj for obj in current_objects if obj.get("id") not in previous_objects]
+    removed = [obj_id for obj_id in previous_objects if obj_id not in current_ids]
+    # A removed and a new object sharing a PlantGL shape id are the same organ, changed
+    removed_by_shape = {}
+    for obj_id in removed:
+        shape_id = previous_objects[obj_id].get("shapeId")
+        if shape_id is not None:
+            removed_by_shape.setdefault(shape_id, obj_id)
+
+    geometries = current.get("geometries") or {}
+    digests = {}
+    sent_geometries = {}
+    added, changed = [], []
+    for obj in new_objects:
+        sent = dict(obj)
+        ref = obj.get("geometryRef")
+        if ref in geometries:
+            if ref not in digests:
+                digests[ref] = f"h{geometry_digest(geometries[ref])}"
+                sent_geometries[digests[ref]] = geometries[ref]
+            sent["geometryRef"] = digests[ref]
+        previous_id = removed_by_shape.pop(obj.get("shapeId"), None) if obj.get("shapeId") is not None else None
+        if previous_id is not None:
+            changed.append(dict(sent, previousId=previous_id))
+        else:
+            added.append(sent)
+    replaced = {obj["previousId"] for obj in changed}
+
+    diff = {
+        "base": previous_ref,
+        "added": added,
+        "changed": changed,
+        "removed": [obj_id for obj_id in removed if obj_id not in replaced],
+        "geometries": sent_geometries,
+        "objectCount": len(current_objects),
+        "unchanged": len(current_objects) - len(new_objects),
+    }
+    if current.get("bounds"):
+        diff["bounds"] = current["bounds"]
+    return diff
@@ -1,11 +1,35 @@
 from __future__ import annotations
 
 import logging
-import uuid
-
-from openalea.plantgl.all import Scene, Shape, Text
-
-from model.openalea.visualizer.utils.plantgl import mesh_from_geometry
+from itertools import islice
+from typing import Iterator
+
+import numpy as np
+from openalea.plantgl.all import (
+    AxisRotated, EulerRotated, Oriented, Scaled, Scene, Shape, Text, Transformed, Translated
+)
+
+from model.openalea.visualizer.utils.instancing import (
+    IDENTITY,
+    axis_rotation_matrix,
+    euler_rotation_matrix,
+    is_identity,
+    matrix_to_list,
+    orientation_matrix,
+    scaling_matrix,
+    translation_matrix,
+)
+from core.config import settings
+from model.openalea.visualizer.utils.geometry_table import GeometryTable
+from model.openalea.visualizer.utils.plantgl import geometry_kind, mesh_arrays_from_geometry
+from model.openalea.visualizer.utils.scene_diff import assign_object_ids
+from model.openalea.visualizer.utils.spatial import annotate_bounds, scene_bounds
+
+IDENTITY_TRANSFORM = {
+    "position": [0, 0, 0],
+    "rotation": [0, 0, 0],
+    "scale": [1, 1, 1]
+}
 
 
 def serialize_color(color):
@@ -23,60 +47,172 @@ def serialize_color(color):
     ]
 
 
-def serialize_shape(shape: Shape):
+def _vec3(vector):
+    return [vector.x, vector.y, vector.z]
+
+
+def _matrix4_to_array(matrix4):
+    rows = [matrix4.getRow(i) for i in range(4)]
+    return np.array([[row.x, row.y, row.z, row.w] for row in rows], dtype=np.float64)
+
+
+def _node_matrix(geometry):
+    """Return the affine matrix of a PlantGL transformation node, or None for other geometries.
+
+    Args:
+        geometry (Any): PlantGL geometry instance.
+    Returns:
+        matrix (numpy.ndarray | None): 4x4 matrix.
+    """
+    if isinstance(geometry, Translated):
+        return translation_matrix(_vec3(geometry.translation))
+    if isinstance(geometry, Scaled):
+        return scaling_matrix(_vec3(geometry.scale))
+    if isinstance(geometry, Oriented):
+        return orientation_matrix(_vec3(geometry.primary), _vec3(geometry.secondary))
+    if isinstance(geometry, AxisRotated):
+        return axis_rotation_matrix(_vec3(geometry.axis), geometry.angle)
+    if isinstance(geometry, EulerRotated):
+        return euler_rotation_matrix(geometry.azimuth, geometry.elevation, geometry.roll)
+    if isinstance(geometry, Transformed):
+        # Other wrappers expose their transformation; only affine ones (a Matrix4) are unwrapped
+        get_matrix = getattr(geometry.transformation(), "getMatrix", None)
+        if callable(get_matrix):
+            return _matrix4_to_array(get_matrix())
+    return None
+
+
+def unwrap_geometry(geometry):
+    """Strip affine transformation nodes from a PlantGL geometry.
+
+    Args:
+        geometry (Any): PlantGL geometry, possibly ``Translated``/``Oriented``/``Scaled``/... wrapped,
+            or wrapped in any other ``Transformed`` node whose transformation is a matrix.
+    Returns:
+        base (Any): Innermost non-transformation geometry.
+        matrix (numpy.ndarray): Accumulated 4x4 transform of the wrappers.
+    """
+    matrix = IDENTITY
+    node_matrix = _node_matrix(geometry)
+    while node_matrix is not None:
+        matrix = matrix @ node_matrix
+        geometry = geometry.geometry
+        node_matrix = _node_matrix(geometry)
+    return geometry, matrix
+
+
+def _tessellate_chunk(geometries):
+    """Tessellate a chunk of geometries (runs in serialization pool workers).
+
+    Args:
+        geometries (list): PlantGL geometries.
+    Returns:
+        meshes (list): float64 mesh/line arrays, one per geometry.
+    """
+    return [mesh_arrays_from_geometry(geometry, vertex_dtype=np.float64) for geometry in geometries]
+
+
+def serialize_shape(shape: Shape, geometry_table: GeometryTable):
     """Serialize a PlantGL Shape into a JSON-friendly object node.
 
     Args:
         shape (Shape): PlantGL shape to serialize.
+        geometry_table (GeometryTable): Shared geometries of the scene, tessellated afterwards.
     Returns:
-        node (dict): Serialized object node.
+        node (dict): Serialized object node referencing its geometry through ``geometryRef``;
+            its ``id`` is set by ``assign_object_ids`` once the geometry is tessellated.
     """
-    geom_data = mesh_from_geometry(shape.geometry)
+    base, matrix = unwrap_geometry(shape.geometry)
+    geometry_ref = geometry_table.add(base)
 
     material = shape.appearance
     color = material.ambient
     opacity = 1.0 - material.transparency
 
-    return {
-        "id": str(uuid.uuid4()),
-        "objectType": geom_data["type"],
-        "geometry": geom_data,
+    node = {
+        "objectType": geometry_kind(base),
+        "geometryRef": geometry_ref,
         "material": {
             "color": serialize_color(color),
             "opacity": opacity
         },
-        "transform": {
-            "position": [0, 0, 0],
-            "rotation": [0, 0, 0],
-            "scale": [1, 1, 1]
-        }
+        "transform": dict(IDENTITY_TRANSFORM) if is_identity(matrix) else {"matrix": matrix_to_list(matrix)}
     }
+    shape_id = getattr(shape, "id", None)
+    # Shapes get an id from their producer (e.g. the L-Py module); NOID otherwise
+    if isinstance(shape_id, int) and shape_id != getattr(Shape, "NOID", None):
+        node["shapeId"] = shape_id
+    return node
+
+
+def _serialize_object(shape: Shape, geometry_table: GeometryTable):
+    """Serialize a shape, inlining texts and registering other geometries in the table."""
+    if isinstance(shape.geometry, Text):
+        pos = shape.geometry.position
+        return {
+            "objectType": "text",
+            "text": shape.geometry.string,
+            "position": [pos.x, pos.y, pos.z]
+        }
+    return serialize_shape(shape, geometry_table)
+
 
+def iter_serialize_scene(scene: Scene, chunk_size: int | None = None, workers: int | None = None) -> Iterator[dict]:
+    """Serialize a PlantGL Scene chunk by chunk.
 
-def serialize_scene(scene: Scene):
+    Each chunk holds the next ``chunk_size`` objects and the geometries
+    they are the first to reference, tessellated just before it is yielded,
+    so a consumer can render the first objects while the rest are processed.
+    Merging the chunks gives the output of ``serialize_scene``.
+
+    Args:
+        scene (Scene): PlantGL scene to serialize.
+        chunk_size (int | None): Shapes per chunk; None or 0 serializes the scene in one chunk.
+        workers (int | None): Tessellation processes, ``VISUALIZER_SERIALIZE_WORKERS`` when None.
+    Yields:
+        chunk (dict): ``objects`` list (each with its content-derived ``id`` and world ``bbox``) and new
+            ``geometries`` entries.
+    """
+    workers = settings.VISUALIZER_SERIALIZE_WORKERS if workers is None else workers
+    geometry_table = GeometryTable(_tessellate_chunk)
+    occurrences = {}
+    shapes = iter(scene)
+    first = True
+    while True:
+        batch = list(islice(shapes, chunk_size or None))
+        # An empty scene still yields one (empty) chunk
+        if not batch and not first:
+            return
+        first = False
+        objects = [_serialize_object(shape, geometry_table) for shape in batch]
+        geometries = geometry_table.tessellate(workers)
+        geometry_table.remap(objects)
+        assign_object_ids(objects, geometry_table.digests, occurrences)
+        annotate_bounds(objects, local_bounds=geometry_table.bounds)
+        yield {"objects": objects, "geometries": geometries}
+
+
+def serialize_scene(scene: Scene, workers: int | None = None):
     """Serialize a PlantGL Scene into JSON with object nodes.
 
+    Shapes are walked in order in this process; the CPU-bound tessellation of
+    their distinct geometries is split across ``workers`` processes.
+
     Args:
         scene (Scene): PlantGL scene to serialize.
+        workers (int | None): Tessellation processes, ``VISUALIZER_SERIALIZE_WORKERS`` when None.
     Returns:
-        scene_json (dict): JSON scene with objects list.
+        scene_json (dict): JSON scene with objects list, the ``geometries``
+            table they reference (one entry per distinct base geometry) and the
+            scene ``bounds``.
     """
-    objects = []
-    shape_count = 0
-
-    for shape in scene:
-        shape_count += 1
-        if isinstance(shape.geometry, Text):
-            pos = shape.geometry.position
-            objects.append({
-                "id": str(uuid.uuid4()),
-                "objectType": "text",
-                "text": shape.geometry.string,
-                "position": [pos.x, pos.y, pos.z]
-            })
-            continue
-
-        objects.append(serialize_shape(shape))
-
-    logging.info("serialize_scene done shape_count=%s object_count=%s", shape_count, len(objects))
-    return {"objects": objects}
+    scene_json = next(iter_serialize_scene(scene, workers=workers))
+    bounds = scene_bounds(scene_json["objects"])
+    if bounds:
+        scene_json["bounds"] = bounds
+    logging.info(
+        "serialize_scene done object_count=%s geometry_count=%s",
+        len(scene_json["objects"]),
+        len(scene_json["geometries"])
+    )
+    return scene_json
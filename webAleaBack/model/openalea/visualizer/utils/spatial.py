@@ -0,0 +1,311 @@
+"""Axis-aligned bounding boxes and a bounding volume hierarchy over scene objects.
+
+Object boxes are stored in the scene JSON (``bbox``: min xyz then max xyz,
+world space) together with the scene box (``bounds``), so clients can frame
+and cull without walking vertices. The BVH is a flat-array binary tree in
+depth-first order (the left child of node ``k`` is ``k + 1``) kept next to
+the cached scene, and answers box and frustum queries on the backend.
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from model.openalea.visualizer.utils.instancing import transform_matrix
+
+BVH_LEAF_SIZE = 8
+
+
+def geometry_bounds(geometry: Any) -> Optional[tuple]:
+    """Return the local bounding box of a mesh/line geometry.
+
+    Args:
+        geometry (Any): Geometry dict with ``vertices`` (nested lists or array).
+    Returns:
+        bounds (Optional[tuple]): ``(min, max)`` xyz arrays, or None without vertices.
+    """
+    if not isinstance(geometry, dict) or geometry.get("vertices") is None:
+        return None
+    vertices = np.asarray(geometry["vertices"], dtype=np.float64).reshape(-1, 3)
+    if not len(vertices):
+        return None
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def transform_boxes(mins: np.ndarray, maxs: np.ndarray, matrices: np.ndarray) -> tuple:
+    """Transform boxes by affine matrices and return their axis-aligned bounds.
+
+    Args:
+        mins (numpy.ndarray): ``(n, 3)`` box minimums.
+        maxs (numpy.ndarray): ``(n, 3)`` box maximums.
+        matrices (numpy.ndarray): ``(n, 4, 4)`` matrices.
+    Returns:
+        mins (numpy.ndarray): ``(n, 3)`` transformed minimums.
+        maxs (numpy.ndarray): ``(n, 3)`` transformed maximums.
+    """
+    centers = (mins + maxs) / 2
+    extents = (maxs - mins) / 2
+    linear = matrices[:, :3, :3]
+    centers = np.einsum("nij,nj->ni", linear, centers) + matrices[:, :3, 3]
+    extents = np.einsum("nij,nj->ni", np.abs(linear), extents)
+    return centers - extents, centers + extents
+
+
+def object_boxes(objects: list, geometries: Optional[dict] = None, local_bounds: Optional[dict] = None) -> tuple:
+    """Compute the world bounding boxes of scene objects.
+
+    Objects that already carry a ``bbox`` keep it; texts are points at their
+    position; groups and objects without vertices get NaN boxes.
+
+    Args:
+        objects (list): Scene objects.
+        geometries (Optional[dict]): Shared geometry table referenced by ``geometryRef``.
+        local_bounds (Optional[dict]): Precomputed ``(min, max)`` per geometry reference.
+    Returns:
+        mins (numpy.ndarray): ``(n, 3)`` minimums.
+        maxs (numpy.ndarray): ``(n, 3)`` maximums.
+    """
+    geometries = geometries or {}
+    local_bounds = dict(local_bounds or {})
+    count = len(objects)
+    mins = np.full((count, 3), np.nan)
+    maxs = np.full((count, 3), np.nan)
+    local_min = np.zeros((count, 3))
+    local_max = np.zeros((count, 3))
+    matrices = np.repeat(np.identity(4)[None], count, axis=0)
+    pending = []
+    matrix_rows, matrix_values = [], []
+
+    for index, obj in enumerate(objects):
+        if obj.get("bbox") is not None:
+            mins[index], maxs[index] = obj["bbox"][:3], obj["bbox"][3:]
+            continue
+        if obj.get("objectType") == "text" and obj.get("position") is not None:
+            mins[index] = maxs[index] = obj["position"]
+            continue
+        ref = obj.get("geometryRef")
+        if ref is not None:
+            if ref not in local_bounds:
+                local_bounds[ref] = geometry_bounds(geometries.get(ref))
+            bounds = local_bounds[ref]
+        else:
+            bounds = geometry_bounds(obj.get("geometry"))
+        if bounds is None:
+            continue
+        local_min[index], local_max[index] = bounds
+        pending.append(index)
+        transform = obj.get("transform")
+        if transform and transform.get("matrix") is not None:
+            matrix_rows.append(index)
+            matrix_values.append(transform["matrix"])
+        elif transform:
+            matrices[index] = transform_matrix(transform)
+
+    if matrix_rows:
+        # Column-major lists parsed in one call rather than per object
+        matrices[matrix_rows] = np.asarray(matrix_values, dtype=np.float64).reshape(-1, 4, 4).transpose(0, 2, 1)
+    if pending:
+        mins[pending], maxs[pending] = transform_boxes(local_min[pending], local_max[pending], matrices[pending])
+    return mins, maxs
+
+
+def annotate_bounds(objects: list, geometries: Optional[dict] = None, local_bounds: Optional[dict] = None) -> None:
+    """Store the world bounding box of each object under ``bbox`` (in place).
+
+    Args:
+        objects (list): Scene objects.
+        geometries (Optional[dict]): Shared geometry table.
+        local_bounds (Optional[dict]): Precomputed ``(min, max)`` per geometry reference.
+    Returns:
+        None (None): No return value.
+    """
+    mins, maxs = object_boxes(objects, geometries, local_bounds)
+    boxes = np.hstack([mins, maxs])
+    valid = ~np.isnan(boxes).any(axis=1)
+    for obj, box, has_box in zip(objects, boxes.tolist(), valid):
+        if has_box:
+            obj["bbox"] = box
+
+
+def scene_bounds(objects: list) -> Optional[Dict[str, list]]:
+    """Return the union of the ``bbox`` of scene objects.
+
+    Args:
+        objects (list): Scene objects, annotated by ``annotate_bounds``.
+    Returns:
+        bounds (Optional[Dict[str, list]]): ``{"min": xyz, "max": xyz}``, or None without boxes.
+    """
+    boxes = np.asarray([obj["bbox"] for obj in objects if obj.get("bbox") is not None], dtype=np.float64)
+    if not len(boxes):
+        return None
+    return {"min": boxes[:, :3].min(axis=0).tolist(), "max": boxes[:, 3:].max(axis=0).tolist()}
+
+
+def _outside_planes(mins: np.ndarray, maxs: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """Flag boxes entirely on the negative side of one of the planes ``n . x + d >= 0``."""
+    normals = planes[:, :3]
+    # Corner of each box furthest along each plane normal
+    corners = np.where(normals[None] >= 0, maxs[:, None], mins[:, None])
+    distances = np.einsum("bpk,pk->bp", corners, normals) + planes[:, 3]
+    return (distances < 0).any(axis=1)
+
+
+class BVH:
+    """Bounding volume hierarchy over object boxes, stored as flat arrays."""
+
+    def __init__(self, ids: list, object_min, object_max, order, node_min, node_max, node_child, node_start, node_count):
+        self.ids = ids
+        self.object_min = object_min
+        self.object_max = object_max
+        self.order = order
+        self.node_min = node_min
+        self.node_max = node_max
+        self.node_child = node_child
+        self.node_start = node_start
+        self.node_count = node_count
+
+    @classmethod
+    def build(cls, ids: list, mins: np.ndarray, maxs: np.ndarray, leaf_size: int = BVH_LEAF_SIZE) -> "BVH":
+        """Build the hierarchy by median splits along the longest axis of the box centers.
+
+        Args:
+            ids (list): Object ids, one per box.
+            mins (numpy.ndarray): ``(n, 3)`` box minimums (rows with NaN are skipped).
+            maxs (numpy.ndarray): ``(n, 3)`` box maximums.
+            leaf_size (int): Maximum number of objects per leaf.
+        Returns:
+            bvh (BVH): Hierarchy.
+        """
+        valid = ~(np.isnan(mins).any(axis=1) | np.isnan(maxs).any(axis=1))
+        ids = [obj_id for obj_id, keep in zip(ids, valid) if keep]
+        mins = np.asarray(mins[valid], dtype=np.float64)
+        maxs = np.asarray(maxs[valid], dtype=np.float64)
+        centers = (mins + maxs) / 2
+        order = np.arange(len(ids))
+        node_min, node_max, child, start, count = [], [], [], [], []
+        # (start, end, index of the parent whose right child this is)
+        stack = [(0, len(ids), -1)] if len(ids) else []
+        while stack:
+            begin, end, parent = stack.pop()
+            node = len(child)
+            if parent >= 0:
+                child[parent] = node
+            members = order[begin:end]
+            node_min.append(mins[members].min(axis=0))
+            node_max.append(maxs[members].max(axis=0))
+            start.append(begin)
+            if end - begin <= leaf_size:
+                child.append(-1)
+                count.append(end - begin)
+                continue
+            member_centers = centers[members]
+            axis = int(np.argmax(member_centers.max(axis=0) - member_centers.min(axis=0)))
+            half = (end - begin) // 2
+            order[begin:end] = members[np.argpartition(member_centers[:, axis], half)]
+            child.append(0)
+            count.append(0)
+            stack.append((begin + half, end, node))
+            # Popped next, so the left child is node + 1
+            stack.append((begin, begin + half, -1))
+        return cls(
+            ids, mins, maxs, order,
+            np.asarray(node_min).reshape(-1, 3), np.asarray(node_max).reshape(-1, 3),
+            np.asarray(child, dtype=np.int64), np.asarray(start, dtype=np.int64), np.asarray(count, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_scene(cls, scene_json: dict) -> "BVH":
+        """Build the hierarchy of a scene JSON (using its ``bbox`` annotations when present).
+
+        Args:
+            scene_json (dict): Scene JSON.
+        Returns:
+            bvh (BVH): Hierarchy over the objects with an extent.
+        """
+        objects = scene_json.get("objects") or []
+        mins, maxs = object_boxes(objects, scene_json.get("geometries"))
+        return cls.build([obj.get("id") for obj in objects], mins, maxs)
+
+    def _query(self, node_outside, objects_outside) -> List[Any]:
+        hits = []
+        stack = [0] if len(self.node_child) else []
+        while stack:
+            node = stack.pop()
+            if node_outside(node):
+                continue
+            if self.node_child[node] < 0:
+                members = self.order[self.node_start[node]:self.node_start[node] + self.node_count[node]]
+                hits.extend(members[~objects_outside(members)].tolist())
+            else:
+                stack.extend((self.node_child[node], node + 1))
+        return [self.ids[index] for index in sorted(hits)]
+
+    def query_box(self, box_min, box_max) -> List[Any]:
+        """Return the ids of objects whose box intersects a box.
+
+        Args:
+            box_min (Sequence[float]): Query box minimum.
+            box_max (Sequence[float]): Query box maximum.
+        Returns:
+            ids (List[Any]): Matching object ids, in scene order.
+        """
+        box_min = np.asarray(box_min, dtype=np.float64)
+        box_max = np.asarray(box_max, dtype=np.float64)
+        return self._query(
+            lambda node: bool((self.node_min[node] > box_max).any() or (self.node_max[node] < box_min).any()),
+            lambda members: (self.object_min[members] > box_max).any(axis=1)
+            | (self.object_max[members] < box_min).any(axis=1),
+        )
+
+    def query_frustum(self, planes) -> List[Any]:
+        """Return the ids of objects whose box is not fully outside a frustum.
+
+        Args:
+            planes (Sequence[Sequence[float]]): Planes ``[a, b, c, d]`` with ``a*x + b*y + c*z + d >= 0``
+                inside (e.g. the six planes of a Three.js ``Frustum``).
+        Returns:
+            ids (List[Any]): Matching object ids, in scene order.
+        """
+        planes = np.asarray(planes, dtype=np.float64).reshape(-1, 4)
+        return self._query(
+            lambda node: bool(_outside_planes(self.node_min[node:node + 1], self.node_max[node:node + 1], planes)[0]),
+            lambda members: _outside_planes(self.object_min[members], self.object_max[members], planes),
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the hierarchy (``.npz`` archive, no pickling).
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            data (bytes): Serialized hierarchy.
+        """
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            ids=np.array(json.dumps(self.ids)),
+            object_min=self.object_min, object_max=self.object_max, order=self.order,
+            node_min=self.node_min, node_max=self.node_max, node_child=self.node_child,
+            node_start=self.node_start, node_count=self.node_count,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BVH":
+        """Load a hierarchy written by ``to_bytes``.
+
+        Args:
+            data (bytes): Serialized hierarchy.
+        Returns:
+            bvh (BVH): Hierarchy.
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(
+                json.loads(str(archive["ids"])),
+                archive["object_min"], archive["object_max"], archive["order"],
+                archive["node_min"], archive["node_max"], archive["node_child"],
+                archive["node_start"], archive["node_count"],
+            )
@@ -0,0 +1,271 @@
+"""Content-addressed cache of PlantGL tessellations.
+
+Keys hash the defining fields of a geometry, i.e. its parameters including
+the resolution attributes (``slices``, ``stacks``, ``stride``...) but not its name,
+together with the discretizer and vertex dtype. Identical organs across
+scenes and runs therefore share one tessellation. An in-process LRU bounded
+by bytes sits in front of an optional ``.npz`` tier in
+``<OPENALEA_CACHE_DIR>/tessellation`` shared by every process.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.config import settings
+from model.openalea.cache.object_cache import cache_register_file, cache_touch_file, get_cache_dir
+
+TESSELLATION_DIR_NAME = "tessellation"
+
+
+# Fields that name a scene object rather than define its shape
+_IDENTITY_FIELDS = frozenset(("name", "id"))
+
+
+def _is_scene_object(value) -> bool:
+    return callable(getattr(value, "getObjectId", None))
+
+
+def _geometry_fields(geometry) -> list:
+    """Return the ``(field, value)`` pairs defining a geometry, without its name.
+
+    PlantGL exposes its attributes as properties; other objects are read
+    from their ``__dict__``. Nested scene objects (e.g. the profile of an
+    ``Extrusion``) are expanded the same way so their names are left out too.
+    """
+    fields = {}
+    for field in dir(type(geometry)):
+        if field not in _IDENTITY_FIELDS and isinstance(getattr(type(geometry), field, None), property):
+            fields[field] = getattr(geometry, field)
+    for field, value in getattr(geometry, "__dict__", {}).items():
+        if field not in _IDENTITY_FIELDS:
+            fields[field] = value
+    return [
+        (field, _geometry_fields(value) if _is_scene_object(value) else value)
+        for field, value in sorted(fields.items())
+    ]
+
+
+def tessellation_key(geometry, discretizer: str, vertex_dtype) -> Optional[str]:
+    """Compute the cache key of a geometry tessellation.
+
+    Only the fields defining the shape are hashed, so two geometries that
+    differ by their name share a key. Objects without readable fields are
+    hashed whole.
+
+    Args:
+        geometry (Any): PlantGL geometry instance.
+        discretizer (str): Name of the discretizer applied to it.
+        vertex_dtype (numpy.dtype): Dtype of the vertex array.
+    Returns:
+        key (Optional[str]): Hex SHA-256 digest, or None if the geometry cannot be pickled.
+    """
+    try:
+        fields = _geometry_fields(geometry)
+        state = pickle.dumps(fields if fields else geometry, protocol=4)
+    except Exception:
+        return None
+    digest = hashlib.sha256()
+    for part in (type(geometry).__name__, discretizer, np.dtype(vertex_dtype).str):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(state)
+    return digest.hexdigest()
+
+
+def _mesh_nbytes(mesh: dict) -> int:
+    """Estimate the memory held by a tessellation."""
+    size = mesh["vertices"].nbytes
+    indices = mesh.get("indices")
+    if isinstance(indices, np.ndarray):
+        size += indices.nbytes
+    elif indices is not None:
+        size += 8 * sum(len(face) for face in indices)
+    return size
+
+
+def _freeze(mesh: dict) -> dict:
+    """Make the arrays of a cached tessellation read-only, since it is shared."""
+    for value in mesh.values():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+    return mesh
+
+
+class TessellationCache:
+    """Thread-safe LRU of tessellated meshes bounded by bytes, with an optional disk tier."""
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.npz"
+
+    def _load_disk(self, key: str) -> Optional[dict]:
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                mesh = {"type": str(data["type"]), "vertices": data["vertices"]}
+                if "indices" in data:
+                    mesh["indices"] = data["indices"]
+        except (OSError, ValueError, KeyError):
+            logging.warning("Ignoring unreadable tessellation cache file %s", path)
+            return None
+        cache_touch_file(path)
+        return mesh
+
+    def _store_disk(self, key: str, mesh: dict) -> None:
+        # Ragged faces would need pickling; they stay in memory only
+        if self.disk_dir is None or ("indices" in mesh and not isinstance(mesh["indices"], np.ndarray)):
+            return
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        # Write then rename so concurrent processes never read a partial file
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **mesh)
+            os.replace(tmp_path, path)
+        except OSError:
+            logging.warning("Failed to write tessellation cache file %s", path)
+            tmp_path.unlink(missing_ok=True)
+            return
+        cache_register_file(path, "tessellation")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a cached tessellation, or None on a miss.
+
+        Args:
+            key (str): Key from ``tessellation_key``.
+        Returns:
+            mesh (Optional[dict]): ``type``, read-only ``vertices`` and optional ``indices``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        mesh = self._load_disk(key) if self.disk_dir is not None else None
+        with self._lock:
+            if mesh is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._insert(key, mesh)
+        return mesh
+
+    def put(self, key: str, mesh: dict) -> dict:
+        """Cache a tessellation, evicting least recently used entries.
+
+        Args:
+            key (str): Key from ``tessellation_key``.
+            mesh (dict): Output of ``mesh_arrays_from_geometry``.
+        Returns:
+            mesh (dict): The tessellation, read-only once it is kept in memory.
+        """
+        self._insert(key, mesh)
+        self._store_disk(key, mesh)
+        return mesh
+
+    def _insert(self, key: str, mesh: dict) -> None:
+        size = _mesh_nbytes(mesh)
+        # A rejected mesh stays writable: it is not shared
+        if size > self.max_bytes:
+            return
+        _freeze(mesh)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (mesh, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; caller must hold the lock."""
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Drop every in-memory tessellation (the disk tier is expired by the cache janitor).
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            stats (Dict[str, Any]): Cache statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "enabled": True,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk": self.disk_dir is not None,
+            }
+
+
+_TESSELLATION_CACHE: Optional[TessellationCache] = None
+_TESSELLATION_CACHE_LOCK = threading.Lock()
+
+
+def get_tessellation_cache() -> Optional[TessellationCache]:
+    """Return the process-wide tessellation cache, or None when it is disabled.
+
+    Args:
+        None (None): No arguments.
+    Returns:
+        cache (Optional[TessellationCache]): Shared cache configured from settings.
+    """
+    global _TESSELLATION_CACHE
+    if settings.VISUALIZER_TESSELLATION_CACHE_MAX_BYTES <= 0:
+        return None
+    with _TESSELLATION_CACHE_LOCK:
+        if _TESSELLATION_CACHE is None:
+            disk_dir = get_cache_dir() / TESSELLATION_DIR_NAME if settings.VISUALIZER_TESSELLATION_CACHE_DISK else None
+            _TESSELLATION_CACHE = TessellationCache(
+                max_bytes=settings.VISUALIZER_TESSELLATION_CACHE_MAX_BYTES,
+                disk_dir=disk_dir,
+            )
+            logging.info(
+                "Tessellation cache enabled max_bytes=%s disk_dir=%s",
+                _TESSELLATION_CACHE.max_bytes, disk_dir
+            )
+        return _TESSELLATION_CACHE
@@ -0,0 +1,310 @@
+"""Octree tiling of large scenes.
+
+A scene is partitioned by the centers of its object boxes into an octree:
+a tile is split into its non-empty octants until it holds at most
+``VISUALIZER_TILE_MAX_OBJECTS`` objects or reaches
+``VISUALIZER_TILE_MAX_DEPTH``. Every tile has two levels:
+
+- ``fine``: the objects of a leaf at full resolution; for an inner tile,
+  the ``coarse`` levels of its children merged together.
+- ``coarse``: the static meshes of the ``fine`` level batched per material
+  (instances baked) then decimated to ``VISUALIZER_TILE_COARSE_TRIANGLES``.
+
+So a tile's ``fine`` level shows exactly what its children show at
+``coarse``, and no level ever holds more than one leaf's objects or eight
+coarse tiles, whatever the size of the scene. Building the tileset buckets
+the objects per leaf in one pass over the scene (``LeafBuckets``) and stores
+the ``fine`` level of every leaf; the other levels are derived on first
+request, so producing a tile never reads more than one bucket or the
+coarse levels of its children.
+"""
+from __future__ import annotations
+
+import io
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from model.openalea.visualizer.utils.batching import batch_scene
+from model.openalea.visualizer.utils.lod import scene_lod
+from model.openalea.visualizer.utils.spatial import scene_bounds
+
+TILE_ROOT = "r"
+TILE_LEVELS = ("coarse", "fine")
+
+
+def tile_cache_key(scene_ref: str, tile_id: str, level: str) -> str:
+    """Return the cache key of a tile level (``<ref>.tile-<id>[.coarse].scene.json``).
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        tile_id (str): Tile identifier.
+        level (str): ``coarse`` or ``fine``.
+    Returns:
+        key (str): Cache reference of the tile level.
+    """
+    key = f"{scene_ref}.tile-{tile_id}"
+    return f"{key}.coarse" if level == "coarse" else key
+
+
+def tileset_cache_key(scene_ref: str) -> str:
+    """Return the cache key of the tileset manifest (``<ref>.tileset.scene.json``)."""
+    return f"{scene_ref}.tileset"
+
+
+def tile_members_cache_key(scene_ref: str) -> str:
+    """Return the cache key of the object-to-leaf table (``<ref>.tiles.scene.idx``)."""
+    return f"{scene_ref}.tiles"
+
+
+def tile_part_cache_key(scene_ref: str, part: int) -> str:
+    """Return the cache key of a serialized chunk of the source scene (``<ref>.tiles-part-<n>.scene.json``)."""
+    return f"{scene_ref}.tiles-part-{part}"
+
+
+def tile_spill_cache_key(scene_ref: str, tile_id: str, spill: int) -> str:
+    """Return the cache key of objects of a leaf set aside while bucketing (``<ref>.tile-<id>.part-<n>.scene.json``)."""
+    return f"{scene_ref}.tile-{tile_id}.part-{spill}"
+
+
+def _bounds(mins: np.ndarray, maxs: np.ndarray) -> Optional[Dict[str, list]]:
+    if not len(mins):
+        return None
+    return {"min": mins.min(axis=0).tolist(), "max": maxs.max(axis=0).tolist()}
+
+
+def build_octree(mins: np.ndarray, maxs: np.ndarray, max_objects: int, max_depth: int) -> tuple:
+    """Partition object boxes into an octree of tiles.
+
+    Objects without a box (NaN rows) go to the tile holding the scene center.
+
+    Args:
+        mins (numpy.ndarray): ``(n, 3)`` object box minimums.
+        maxs (numpy.ndarray): ``(n, 3)`` object box maximums.
+        max_objects (int): Maximum number of objects per leaf.
+        max_depth (int): Maximum depth of a leaf (the root has depth 0).
+    Returns:
+        tiles (List[dict]): Tiles in breadth-first order, each with ``id``, ``depth``, tight
+            ``bounds``, ``objectCount`` and ``children`` ids (empty for leaves).
+        leaf_of (numpy.ndarray): Index in ``tiles`` of the leaf holding each object.
+    """
+    mins = np.asarray(mins, dtype=np.float64).reshape(-1, 3)
+    maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 3)
+    valid = ~(np.isnan(mins).any(axis=1) | np.isnan(maxs).any(axis=1))
+    if valid.any():
+        low, high = mins[valid].min(axis=0), maxs[valid].max(axis=0)
+    else:
+        low = high = np.zeros(3)
+    centers = np.where(valid[:, None], (mins + maxs) / 2, (low + high) / 2)
+
+    tiles: List[Dict[str, Any]] = []
+    leaf_of = np.zeros(len(mins), dtype=np.int64)
+    queue = deque([(TILE_ROOT, 0, np.arange(len(mins)), low, high)])
+    while queue:
+        tile_id, depth, members, cell_low, cell_high = queue.popleft()
+        member_valid = members[valid[members]]
+        tile = {
+            "id": tile_id,
+            "depth": depth,
+            "bounds": _bounds(mins[member_valid], maxs[member_valid])
+            or {"min": cell_low.tolist(), "max": cell_high.tolist()},
+            "objectCount": int(len(members)),
+            "children": [],
+        }
+        tiles.append(tile)
+        if len(members) <= max_objects or depth >= max_depth:
+            leaf_of[members] = len(tiles) - 1
+            continue
+        middle = (cell_low + cell_high) / 2
+        upper = centers[members] >= middle
+        octants = upper[:, 0] | (upper[:, 1] << 1) | (upper[:, 2] << 2)
+        for octant in range(8):
+            child_members = members[octants == octant]
+            if not len(child_members):
+                continue
+            bits = np.array([octant & 1, octant & 2, octant & 4], dtype=bool)
+            child_id = f"{tile_id}{octant}"
+            tile["children"].append(child_id)
+            queue.append((
+                child_id, depth + 1, child_members,
+                np.where(bits, middle, cell_low), np.where(bits, cell_high, middle),
+            ))
+    return tiles, leaf_of
+
+
+def pack_tile_members(leaf_of, ref_of, refs: list) -> bytes:
+    """Serialize the leaf and shared geometry of each object of a tiled scene (``.npz``, no pickling).
+
+    Args:
+        leaf_of (numpy.ndarray): Leaf tile index of each object.
+        ref_of (Sequence[int]): Index in ``refs`` of each object's geometry, -1 for inline geometry.
+        refs (list): Shared geometry references.
+    Returns:
+        data (bytes): Serialized table.
+    """
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        leaf_of=np.asarray(leaf_of, dtype=np.int64),
+        ref_of=np.asarray(ref_of, dtype=np.int64),
+        refs=np.asarray(refs, dtype=str),
+    )
+    return buffer.getvalue()
+
+
+def unpack_tile_members(data: bytes) -> Dict[str, np.ndarray]:
+    """Load a table written by ``pack_tile_members``.
+
+    Args:
+        data (bytes): Serialized table.
+    Returns:
+        members (Dict[str, numpy.ndarray]): Arrays keyed by the ``pack_tile_members`` argument names.
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def merge_tile_scenes(scenes: list) -> dict:
+    """Merge tile scenes, prefixing object ids and geometry references with their tile id.
+
+    Args:
+        scenes (list): ``(tile_id, scene_json)`` pairs.
+    Returns:
+        scene_json (dict): Scene holding the objects and geometries of every tile.
+    """
+    objects, geometries = [], {}
+    for tile_id, scene in scenes:
+        for obj in scene.get("objects") or []:
+            merged = dict(obj, id=f"{tile_id}/{obj.get('id')}")
+            if obj.get("geometryRef") is not None:
+                merged["geometryRef"] = f"{tile_id}/{obj['geometryRef']}"
+            objects.append(merged)
+        for ref, geometry in (scene.get("geometries") or {}).items():
+            geometries[f"{tile_id}/{ref}"] = geometry
+    merged_scene = {"objects": objects, "geometries": geometries}
+    bounds = scene_bounds(objects)
+    if bounds:
+        merged_scene["bounds"] = bounds
+    return merged_scene
+
+
+def coarse_tile_scene(scene_json: dict, budget: int) -> dict:
+    """Build the coarse level of a tile from its fine level.
+
+    Args:
+        scene_json (dict): Fine level of the tile.
+        budget (int): Triangle budget of the coarse level.
+    Returns:
+        scene_json (dict): One mesh per material (instances baked) within the budget; lines,
+            texts and animated meshes are left to the fine level.
+    """
+    batched = batch_scene(scene_json, instances=False)
+    batched["objects"] = [obj for obj in batched["objects"] if "batch" in obj]
+    batched["geometries"] = {}
+    bounds = scene_bounds(batched["objects"])
+    if bounds:
+        batched["bounds"] = bounds
+    else:
+        batched.pop("bounds", None)
+    return scene_lod(batched, budget, "coarse")
+
+
+class LeafBuckets:
+    """Split a scene streamed in chunks into the scenes of its leaf tiles, with bounded memory.
+
+    Objects are appended to the bucket of their leaf in scene order, each
+    with the shared geometries it references (these always arrive with or
+    before the first object using them). A leaf is handed to ``complete``
+    as soon as its last object arrived. When more than ``max_buffered``
+    objects and geometries are held, the largest buckets are passed to
+    ``spill`` and read back with ``load_spill`` on completion.
+
+    Args:
+        counts (Sequence[int]): Number of objects of each leaf, by tile index (0 for inner tiles).
+        geometry_leaves (Dict[str, set]): Leaf indices referencing each shared geometry.
+        max_buffered (int): Objects and geometries held at most before spilling.
+        complete (Callable[[int, dict], None]): Receives each leaf index with its full scene.
+        spill (Callable[[int, int, dict], None]): Stores spill number ``n`` of a leaf.
+        load_spill (Callable[[int, int], dict]): Returns a stored spill; each is loaded once, so it may be discarded.
+    """
+
+    def __init__(
+        self,
+        counts,
+        geometry_leaves: Dict[str, set],
+        max_buffered: int,
+        complete: Callable[[int, dict], None],
+        spill: Callable[[int, int, dict], None],
+        load_spill: Callable[[int, int], dict],
+    ):
+        self._remaining = {leaf: int(count) for leaf, count in enumerate(counts) if count}
+        self._geometry_leaves = geometry_leaves
+        self._max_buffered = max(1, max_buffered)
+        self._complete = complete
+        self._spill = spill
+        self._load_spill = load_spill
+        self._buckets: Dict[int, dict] = {}
+        self._spills: Dict[int, int] = {}
+        self._buffered = 0
+
+    def _bucket(self, leaf: int) -> dict:
+        bucket = self._buckets.get(leaf)
+        if bucket is None:
+            bucket = self._buckets[leaf] = {"objects": [], "geometries": {}}
+        return bucket
+
+    def add(self, leaves, chunk: dict) -> None:
+        """Bucket the next chunk of the scene.
+
+        Args:
+            leaves (Sequence[int]): Leaf index of each object of the chunk.
+            chunk (dict): ``objects`` and the ``geometries`` they are the first to reference.
+        Returns:
+            None (None): No return value.
+        """
+        for ref, geometry in chunk["geometries"].items():
+            for leaf in self._geometry_leaves.get(ref, ()):
+                self._bucket(leaf)["geometries"][ref] = geometry
+                self._buffered += 1
+        for leaf, obj in zip(leaves, chunk["objects"]):
+            leaf = int(leaf)
+            self._bucket(leaf)["objects"].append(obj)
+            self._buffered += 1
+            self._remaining[leaf] -= 1
+            if not self._remaining[leaf]:
+                self._finish_leaf(leaf)
+        while self._buffered > self._max_buffered and self._buckets:
+            leaf = max(self._buckets, key=lambda key: len(self._buckets[key]["objects"]))
+            bucket = self._buckets.pop(leaf)
+            self._buffered -= len(bucket["objects"]) + len(bucket["geometries"])
+            spill = self._spills.get(leaf, 0)
+            self._spill(leaf, spill, bucket)
+            self._spills[leaf] = spill + 1
+
+    def _finish_leaf(self, leaf: int) -> None:
+        del self._remaining[leaf]
+        bucket = self._buckets.pop(leaf)
+        self._buffered -= len(bucket["objects"]) + len(bucket["geometries"])
+        objects, geometries = [], {}
+        # Spills hold earlier objects, so scene order is kept
+        for spill in range(self._spills.pop(leaf, 0)):
+            stored = self._load_spill(leaf, spill)
+            objects.extend(stored["objects"])
+            geometries.update(stored["geometries"])
+        objects.extend(bucket["objects"])
+        geometries.update(bucket["geometries"])
+        self._complete(leaf, {"objects": objects, "geometries": geometries})
+
+    def finish(self) -> None:
+        """Check that every leaf received all of its objects.
+
+        Args:
+            None (None): No arguments.
+        Returns:
+            None (None): No return value.
+        Raises:
+            ValueError: If the scene held fewer objects than counted.
+        """
+        if self._remaining:
+            raise ValueError(f"{len(self._remaining)} leaf tiles did not receive all their objects")
@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+from core.config import settings
 
 from model.openalea.cache.object_cache import (
     cache_load,
+    cache_load_scene_bin,
+    cache_load_scene_index,
+    cache_delete_scene_json,
     cache_load_scene_json,
+    cache_store_scene_bin,
+    cache_store_scene_index,
     cache_store_scene_json,
 )
+from model.openalea.visualizer.utils.batching import batch_scene, batched_cache_key
+from model.openalea.visualizer.utils.lod import lod_cache_key, lod_triangle_budget, parse_lod, scene_lod
 from model.openalea.visualizer.utils.payload_extractors import parse_visualization_payload
-from model.openalea.visualizer.utils.visualizer_utils import json_from_result
+from model.openalea.visualizer.utils.scene_binary import encode_scene_binary
+from model.openalea.visualizer.utils.scene_diff import diff_cache_key, diff_scenes
+from model.openalea.visualizer.utils.spatial import BVH, annotate_bounds, geometry_bounds, object_boxes, scene_bounds
+from model.openalea.visualizer.utils.tiling import (
+    TILE_LEVELS,
+    TILE_ROOT,
+    build_octree,
+    coarse_tile_scene,
+    LeafBuckets,
+    merge_tile_scenes,
+    pack_tile_members,
+    tile_cache_key,
+    tile_members_cache_key,
+    tile_part_cache_key,
+    tile_spill_cache_key,
+    tileset_cache_key,
+    unpack_tile_members,
+)
+from model.openalea.visualizer.utils.visualizer_utils import iter_json_from_result, json_from_result
 
 
 def _build_error_response(node_id: str, message: str) -> Dict[str, Any]:
@@ -49,7 +79,82 @@ def build_scene_response(node_id: str, scene: dict, cache_hit: bool = False) ->
     return response
 
 
-def _resolve_scene_ref(node_id: str, scene_ref_data: Dict[str, Any]) -> Dict[str, Any]:
+def _apply_lod(node_id: str, response: Dict[str, Any], variant: str | None, scene_ref: str | None = None) -> Dict[str, Any]:
+    """Replace the scene of a success response by one of its LOD variants.
+
+    Args:
+        node_id (str): Node identifier.
+        response (Dict[str, Any]): Full-resolution scene response.
+        variant (str | None): Variant from ``parse_lod``; None keeps the response as is.
+        scene_ref (str | None): Scene cache reference the variant is cached under.
+    Returns:
+        response (Dict[str, Any]): Response with the LOD scene.
+    """
+    if not variant or not response.get("success") or not isinstance(response.get("scene"), dict):
+        return response
+    lod_scene = scene_lod(response["scene"], lod_triangle_budget(variant), variant)
+    if scene_ref:
+        cache_store_scene_json(lod_cache_key(scene_ref, variant), lod_scene)
+    return build_scene_response(node_id, lod_scene, cache_hit=False)
+
+
+def _apply_batching(node_id: str, response: Dict[str, Any], batched: bool, cache_key: str | None = None) -> Dict[str, Any]:
+    """Replace the scene of a success response by its material-batched variant.
+
+    Args:
+        node_id (str): Node identifier.
+        response (Dict[str, Any]): Scene response.
+        batched (bool): Whether to batch; False keeps the response as is.
+        cache_key (str | None): Scene cache reference the batched variant is cached under.
+    Returns:
+        response (Dict[str, Any]): Response with the batched scene.
+    """
+    if not batched or not response.get("success") or not isinstance(response.get("scene"), dict):
+        return response
+    batched_scene = batch_scene(response["scene"])
+    if cache_key:
+        cache_store_scene_json(cache_key, batched_scene)
+    return build_scene_response(node_id, batched_scene, cache_hit=False)
+
+
+def _variant_cache_key(scene_ref: str, variant: str | None, batched: bool) -> str:
+    """Return the cache reference of a scene variant (LOD and/or batching)."""
+    key = lod_cache_key(scene_ref, variant) if variant else scene_ref
+    return batched_cache_key(key) if batched else key
+
+
+def _resolve_scene_ref(
+    node_id: str, scene_ref_data: Dict[str, Any], variant: str | None = None, batched: bool = False
+) -> Dict[str, Any]:
+    """Resolve a scene reference, or one of its LOD/batched variants, through the cache.
+
+    Args:
+        node_id (str): Node identifier.
+        scene_ref_data (Dict[str, Any]): Scene reference metadata.
+        variant (str | None): LOD variant from ``parse_lod``; None for full resolution.
+        batched (bool): Whether to merge static meshes per material.
+    Returns:
+        response (Dict[str, Any]): Response with resolved scene or error.
+    """
+    scene_ref = scene_ref_data.get("ref")
+    if batched:
+        batched_key = _variant_cache_key(scene_ref, variant, batched)
+        cached_batched = cache_load_scene_json(batched_key)
+        if cached_batched:
+            logging.info("Visualizer batched scene cache hit node=%s ref=%s lod=%s", node_id, scene_ref, variant)
+            return build_scene_response(node_id, cached_batched, cache_hit=True)
+        response = _resolve_scene_ref(node_id, scene_ref_data, variant)
+        return _apply_batching(node_id, response, batched, batched_key)
+    if variant:
+        cached_lod = cache_load_scene_json(lod_cache_key(scene_ref, variant))
+        if cached_lod:
+            logging.info("Visualizer LOD cache hit node=%s ref=%s lod=%s", node_id, scene_ref, variant)
+            return build_scene_response(node_id, cached_lod, cache_hit=True)
+    response = _resolve_full_scene_ref(node_id, scene_ref_data)
+    return _apply_lod(node_id, response, variant, scene_ref)
+
+
+def _resolve_full_scene_ref(node_id: str, scene_ref_data: Dict[str, Any]) -> Dict[str, Any]:
     """Resolve a scene reference through cache lookup and serialization.
 
     Args:
@@ -122,29 +227,611 @@ def _resolve_raw_payload(node_id: str, raw: Any) -> Dict[str, Any] | None:
     return None
 
 
-def resolve_visualization(node_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def resolve_visualization(node_id: str, payload: Dict[str, Any], lod: Any = None, batched: bool = False) -> Dict[str, Any]:
     """Resolve visualization payload into a response with a scene or error.
 
     Args:
         node_id (str): Node identifier.
         payload (Dict[str, Any]): Visualization payload.
+        lod (Any): Level of detail (``preview``, ``medium``, ``full`` or a triangle budget).
+        batched (bool): Whether to merge static meshes into one mesh per material.
     Returns:
         response (Dict[str, Any]): Response with scene or error.
     """
+    try:
+        variant = parse_lod(lod)
+    except ValueError as e:
+        return _build_error_response(node_id, str(e))
+
     scene, scene_ref_data = parse_visualization_payload(payload)
     if scene:
         object_count = len(scene.get("objects", [])) if isinstance(scene, dict) else -1
         logging.info("Visualizer using inline scene node=%s objects=%s", node_id, object_count)
-        return build_scene_response(node_id, scene, cache_hit=False)
+        response = _apply_lod(node_id, build_scene_response(node_id, scene, cache_hit=False), variant)
+        return _apply_batching(node_id, response, batched)
 
     if scene_ref_data:
-        return _resolve_scene_ref(node_id, scene_ref_data)
+        return _resolve_scene_ref(node_id, scene_ref_data, variant, batched)
 
     raw = payload.get("raw") if isinstance(payload, dict) else None
     if raw is not None:
         response = _resolve_raw_payload(node_id, raw)
         if response:
-            return response
+            return _apply_batching(node_id, _apply_lod(node_id, response, variant), batched)
 
     logging.warning("Visualizer no visualizable data node=%s", node_id)
     return _build_error_response(node_id, "No visualizable data found in visualization_data")
+
+
+def resolve_scene_binary(scene_ref: str, lod: Any = None, batched: bool = False, compact: bool = False) -> bytes:
+    """Return the packed binary encoding of a cached scene.
+
+    The encoding is stored as ``<ref>.scene.bin`` next to the scene JSON
+    (``<ref>.lod-<variant>.scene.bin`` for LOD variants, with a ``.batched``
+    suffix before ``.scene.bin`` for batched ones and ``.compact`` for the
+    compact mesh encoding), so it is only built once per scene and variant.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        lod (Any): Level of detail (``preview``, ``medium``, ``full`` or a triangle budget).
+        batched (bool): Whether to merge static meshes into one mesh per material.
+        compact (bool): Whether to quantize meshes and precompute their normals.
+    Returns:
+        data (bytes): Binary scene.
+    Raises:
+        ValueError: If the LOD is not recognized.
+        LookupError: If the scene cannot be resolved from the cache.
+    """
+    variant = parse_lod(lod)
+    bin_key = _variant_cache_key(scene_ref, variant, batched)
+    if compact:
+        bin_key = f"{bin_key}.compact"
+    cached = cache_load_scene_bin(bin_key)
+    if cached is not None:
+        return cached
+
+    response = _resolve_scene_ref(scene_ref, {"ref": scene_ref}, variant, batched)
+    if not response.get("success"):
+        raise LookupError(response.get("error") or f"Scene not found: {scene_ref}")
+    data = encode_scene_binary(response["scene"], compact=compact)
+    cache_store_scene_bin(bin_key, data)
+    logging.info(
+        "Visualizer encoded binary scene ref=%s lod=%s batched=%s compact=%s bytes=%s",
+        scene_ref, variant or "full", batched, compact, len(data)
+    )
+    return data
+
+
+def resolve_scene_diff(
+    node_id: str, payload: Dict[str, Any], previous_ref: str, lod: Any = None, batched: bool = False
+) -> Dict[str, Any]:
+    """Resolve a visualization payload into the changes since a previous scene of the node.
+
+    Object ids are content-derived, so objects left untouched between two
+    runs match and are not sent again. Diffs between two cached scenes are
+    stored as ``<ref>.diff-<previous>.scene.json``.
+
+    Args:
+        node_id (str): Node identifier.
+        payload (Dict[str, Any]): Visualization payload of the new run.
+        previous_ref (str): Scene cache reference of the previous run, as held by the client.
+        lod (Any): Must be full resolution; decimation budgets change with the scene.
+        batched (bool): Must be False; batches are not stable across runs.
+    Returns:
+        response (Dict[str, Any]): Response with a ``diff`` (see ``diff_scenes``) or error.
+    """
+    try:
+        variant = parse_lod(lod)
+    except ValueError as e:
+        return _build_error_response(node_id, str(e))
+    if variant:
+        return _build_error_response(node_id, "Scene diffs are only available at full resolution")
+    if batched:
+        return _build_error_response(node_id, "Scene diffs cannot be combined with batching")
+
+    _, scene_ref_data = parse_visualization_payload(payload)
+    scene_ref = scene_ref_data.get("ref") if scene_ref_data else None
+    if scene_ref:
+        cached_diff = cache_load_scene_json(diff_cache_key(scene_ref, previous_ref))
+        if cached_diff:
+            logging.info("Visualizer diff cache hit node=%s ref=%s previous=%s", node_id, scene_ref, previous_ref)
+            return {"nodeId": node_id, "success": True, "diff": cached_diff, "cacheHit": True}
+
+    previous = _resolve_scene_ref(node_id, {"ref": previous_ref})
+    if not previous.get("success"):
+        return _build_error_response(node_id, f"Previous scene not found: {previous_ref}")
+    current = resolve_visualization(node_id, payload)
+    if not current.get("success"):
+        return current
+
+    diff = diff_scenes(previous["scene"], current["scene"], previous_ref)
+    if scene_ref:
+        cache_store_scene_json(diff_cache_key(scene_ref, previous_ref), diff)
+    logging.info(
+        "Visualizer diff node=%s ref=%s previous=%s added=%s changed=%s removed=%s unchanged=%s",
+        node_id, scene_ref, previous_ref,
+        len(diff["added"]), len(diff["changed"]), len(diff["removed"]), diff["unchanged"]
+    )
+    return {"nodeId": node_id, "success": True, "diff": diff, "cacheHit": False}
+
+
+def iter_scene_chunks(scene: dict, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """Split an already serialized scene into streaming chunks.
+
+    Shared geometries are sent with the first chunk that references them.
+
+    Args:
+        scene (dict): Scene JSON payload.
+        chunk_size (int): Objects per chunk.
+    Yields:
+        chunk (Dict[str, Any]): ``objects`` and new ``geometries`` entries.
+    """
+    objects = scene.get("objects") or []
+    geometries = scene.get("geometries") or {}
+    sent = set()
+    for start in range(0, max(len(objects), 1), chunk_size):
+        chunk_objects = objects[start:start + chunk_size]
+        chunk_geometries = {}
+        for obj in chunk_objects:
+            ref = obj.get("geometryRef") if isinstance(obj, dict) else None
+            if ref in geometries and ref not in sent:
+                sent.add(ref)
+                chunk_geometries[ref] = geometries[ref]
+        yield {"objects": chunk_objects, "geometries": chunk_geometries}
+
+
+def _stream_messages(node_id: str, chunks, cache_hit: bool, scene_ref: str | None = None) -> Iterator[Dict[str, Any]]:
+    """Wrap scene chunks into stream messages, caching the assembled scene when it was serialized here.
+
+    Args:
+        node_id (str): Node identifier.
+        chunks (Iterable[dict]): Scene chunks, or a single error payload.
+        cache_hit (bool): Whether the scene came from cache.
+        scene_ref (str | None): Reference the full scene JSON is stored under once complete.
+    Yields:
+        message (Dict[str, Any]): ``scene``, ``chunk``, ``end`` or ``error`` messages.
+    """
+    yield {"type": "scene", "nodeId": node_id, "cacheHit": cache_hit}
+    objects, geometries = [], {}
+    for chunk in chunks:
+        if "error" in chunk:
+            logging.error("Visualizer stream failed node=%s ref=%s error=%s", node_id, scene_ref, chunk["error"])
+            yield {"type": "error", "nodeId": node_id, "error": chunk["error"]}
+            return
+        objects.extend(chunk["objects"])
+        geometries.update(chunk["geometries"])
+        yield {"type": "chunk", **chunk}
+
+    if scene_ref:
+        scene = {"objects": objects, "geometries": geometries}
+        bounds = scene_bounds(objects)
+        if bounds:
+            scene["bounds"] = bounds
+        cache_store_scene_json(scene_ref, scene)
+    end = {"type": "end", "nodeId": node_id, "objectCount": len(objects)}
+    if not objects:
+        end["warning"] = "Scene contains no objects."
+    logging.info("Visualizer stream done node=%s ref=%s objects=%s", node_id, scene_ref, len(objects))
+    yield end
+
+
+def _stream_scene_ref(node_id: str, scene_ref_data: Dict[str, Any], chunk_size: int) -> Iterator[Dict[str, Any]]:
+    """Stream a scene reference from the scene JSON cache or by serializing the cached object.
+
+    Args:
+        node_id (str): Node identifier.
+        scene_ref_data (Dict[str, Any]): Scene reference metadata.
+        chunk_size (int): Objects per chunk.
+    Yields:
+        message (Dict[str, Any]): Stream messages.
+    """
+    scene_ref = scene_ref_data.get("ref")
+    cached_scene_json = cache_load_scene_json(scene_ref)
+    if isinstance(cached_scene_json, dict):
+        logging.info("Visualizer stream scene JSON cache hit node=%s ref=%s", node_id, scene_ref)
+        yield from _stream_messages(node_id, iter_scene_chunks(cached_scene_json, chunk_size), cache_hit=True)
+        return
+
+    if scene_ref_data.get("refType") == "plantgl_scene_json_ref":
+        yield {"type": "error", "nodeId": node_id, "error": f"Scene JSON cache entry not found: {scene_ref}"}
+        return
+
+    try:
+        raw_cached = cache_load(scene_ref)
+    except Exception as e:
+        logging.exception("Visualizer failed loading scene object cache node=%s ref=%s", node_id, scene_ref)
+        yield {"type": "error", "nodeId": node_id, "error": f"Failed to load scene cache: {e}"}
+        return
+    yield from _stream_messages(
+        node_id, iter_json_from_result(raw_cached, chunk_size), cache_hit=False, scene_ref=scene_ref
+    )
+
+
+def stream_visualization(node_id: str, payload: Dict[str, Any], chunk_size: int | None = None) -> Iterator[Dict[str, Any]]:
+    """Resolve a visualization payload into a stream of scene chunks.
+
+    Emits a ``scene`` message, one ``chunk`` message per batch of objects
+    (with the geometries they are the first to reference) and a final ``end``
+    message; failures are reported by an ``error`` message. Scenes serialized
+    from the object cache are tessellated chunk by chunk and stored in the
+    scene JSON cache once complete.
+
+    Args:
+        node_id (str): Node identifier.
+        payload (Dict[str, Any]): Visualization payload.
+        chunk_size (int | None): Objects per chunk, ``VISUALIZER_STREAM_CHUNK_SHAPES`` when None.
+    Yields:
+        message (Dict[str, Any]): Stream messages.
+    """
+    chunk_size = chunk_size or settings.VISUALIZER_STREAM_CHUNK_SHAPES
+    scene, scene_ref_data = parse_visualization_payload(payload)
+    if scene:
+        yield from _stream_messages(node_id, iter_scene_chunks(scene, chunk_size), cache_hit=False)
+        return
+
+    if scene_ref_data:
+        yield from _stream_scene_ref(node_id, scene_ref_data, chunk_size)
+        return
+
+    raw = payload.get("raw") if isinstance(payload, dict) else None
+    if raw is not None:
+        yield from _stream_messages(node_id, iter_json_from_result(raw, chunk_size), cache_hit=False)
+        return
+
+    logging.warning("Visualizer no visualizable data node=%s", node_id)
+    yield {"type": "error", "nodeId": node_id, "error": "No visualizable data found in visualization_data"}
+
+
+def _scene_index(scene_ref: str) -> BVH:
+    """Return the BVH of a cached scene, building and caching it on first use.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+    Returns:
+        bvh (BVH): Object hierarchy of the full-resolution scene.
+    Raises:
+        LookupError: If the scene cannot be resolved from the cache.
+    """
+    cached = cache_load_scene_index(scene_ref)
+    if cached is not None:
+        return BVH.from_bytes(cached)
+    response = _resolve_scene_ref(scene_ref, {"ref": scene_ref})
+    if not response.get("success"):
+        raise LookupError(response.get("error") or f"Scene not found: {scene_ref}")
+    bvh = BVH.from_scene(response["scene"])
+    cache_store_scene_index(scene_ref, bvh.to_bytes())
+    logging.info("Visualizer built scene index ref=%s objects=%s nodes=%s", scene_ref, len(bvh.ids), len(bvh.node_child))
+    return bvh
+
+
+def query_scene(scene_ref: str, box: Dict[str, Any] | None = None, frustum: list | None = None) -> list:
+    """Return the ids of the objects of a cached scene intersecting a box or a frustum.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        box (Dict[str, Any] | None): ``{"min": xyz, "max": xyz}``.
+        frustum (list | None): Planes ``[a, b, c, d]`` with ``a*x + b*y + c*z + d >= 0`` inside.
+    Returns:
+        ids (list): Matching object ids, in scene order.
+    Raises:
+        ValueError: If neither or both of ``box`` and ``frustum`` are given, or the box is inverted.
+        LookupError: If the scene cannot be resolved from the cache.
+    """
+    if (box is None) == (frustum is None):
+        raise ValueError("Expected exactly one of box or frustum")
+    if box is not None and any(low > high for low, high in zip(box["min"], box["max"])):
+        raise ValueError("Query box min must not exceed max on any axis")
+    bvh = _scene_index(scene_ref)
+    if box is not None:
+        return bvh.query_box(box["min"], box["max"])
+    return bvh.query_frustum(frustum)
+
+
+def _iter_tile_source(scene_ref: str, chunk_size: int):
+    """Serialize the scene to tile chunk by chunk, from the object cache or else the scene JSON cache.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        chunk_size (int): Objects per chunk.
+    Returns:
+        chunks (Iterator[dict]): Scene chunks, or a single error payload.
+    Raises:
+        LookupError: If neither cache holds the scene.
+    """
+    try:
+        raw_cached = cache_load(scene_ref)
+    except FileNotFoundError:
+        cached_scene_json = cache_load_scene_json(scene_ref)
+        if not isinstance(cached_scene_json, dict):
+            raise LookupError(f"Scene not found: {scene_ref}")
+        return iter_scene_chunks(cached_scene_json, chunk_size)
+    return iter_json_from_result(raw_cached, chunk_size)
+
+
+def _load_tile_data(key: str, scene_ref: str) -> Dict[str, Any]:
+    """Load a scene stored while building a tileset.
+
+    Args:
+        key (str): Cache key of the stored scene.
+        scene_ref (str): Scene cache reference, for the error message.
+    Returns:
+        scene_json (Dict[str, Any]): Stored scene.
+    Raises:
+        LookupError: If the entry left the cache meanwhile.
+    """
+    scene = cache_load_scene_json(key)
+    if scene is None:
+        raise LookupError(f"Tileset data not found: {scene_ref}")
+    return scene
+
+
+def _take_tile_data(key: str, scene_ref: str) -> Dict[str, Any]:
+    """Load a scratch scene stored while building a tileset, and remove it from the cache.
+
+    Args:
+        key (str): Cache key of the stored scene.
+        scene_ref (str): Scene cache reference, for the error message.
+    Returns:
+        scene_json (Dict[str, Any]): Stored scene.
+    Raises:
+        LookupError: If the entry left the cache meanwhile.
+    """
+    scene = _load_tile_data(key, scene_ref)
+    # Read once: keeping it would double the scene in the cache quota
+    cache_delete_scene_json(key)
+    return scene
+
+
+def _store_leaf_tile(scene_ref: str, tile_id: str, scene: Dict[str, Any]) -> Dict[str, Any]:
+    """Store the fine level of a leaf tile, with object boxes and scene bounds.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        tile_id (str): Tile identifier.
+        scene (Dict[str, Any]): Objects of the leaf and the geometries they use.
+    Returns:
+        scene_json (Dict[str, Any]): Stored fine level.
+    """
+    objects = scene["objects"]
+    annotate_bounds([obj for obj in objects if obj.get("bbox") is None], scene["geometries"])
+    bounds = scene_bounds(objects)
+    if bounds:
+        scene["bounds"] = bounds
+    cache_store_scene_json(tile_cache_key(scene_ref, tile_id, "fine"), scene)
+    return scene
+
+
+# Lock stripes serializing tileset builds and leaf rebuilds of the same scene
+_TILESET_LOCKS = [threading.RLock() for _ in range(64)]
+
+
+def _tileset_lock(scene_ref: str) -> threading.RLock:
+    return _TILESET_LOCKS[hash(scene_ref) % len(_TILESET_LOCKS)]
+
+
+def _build_tileset(scene_ref: str) -> Dict[str, Any]:
+    """Partition a cached scene into an octree of tiles, store its leaf tiles, then the manifest.
+
+    The scene is serialized chunk by chunk and each chunk is stored as is,
+    keeping only the object boxes and geometry references. The stored chunks
+    are then read once, in order, to bucket the objects per leaf (the
+    largest buckets are spilled to the cache beyond
+    ``VISUALIZER_TILE_BUFFER_OBJECTS``), each chunk and spill being removed
+    from the cache once read; each leaf's fine level is stored as soon as it
+    is complete. The other levels are produced on request (``_tile_scene``).
+    The whole scene is never held in memory. Call with the scene's
+    ``_tileset_lock`` held.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+    Returns:
+        manifest (Dict[str, Any]): Tileset manifest.
+    Raises:
+        LookupError: If the scene cannot be loaded or serialized.
+    """
+    mins, maxs, ref_of = [], [], []
+    ref_ids = {}
+    local_bounds = {}
+    part_sizes = []
+    for part, chunk in enumerate(_iter_tile_source(scene_ref, settings.VISUALIZER_STREAM_CHUNK_SHAPES)):
+        if "error" in chunk:
+            raise LookupError(chunk["error"])
+        cache_store_scene_json(tile_part_cache_key(scene_ref, part), chunk)
+        for ref, geometry in chunk["geometries"].items():
+            local_bounds[ref] = geometry_bounds(geometry)
+        chunk_mins, chunk_maxs = object_boxes(chunk["objects"], local_bounds=local_bounds)
+        mins.append(chunk_mins)
+        maxs.append(chunk_maxs)
+        for obj in chunk["objects"]:
+            ref = obj.get("geometryRef")
+            ref_of.append(-1 if ref is None else ref_ids.setdefault(ref, len(ref_ids)))
+        part_sizes.append(len(chunk["objects"]))
+
+    tiles, leaf_of = build_octree(
+        np.concatenate(mins), np.concatenate(maxs),
+        settings.VISUALIZER_TILE_MAX_OBJECTS, settings.VISUALIZER_TILE_MAX_DEPTH,
+    )
+    refs = list(ref_ids)
+    # Lets a single evicted leaf be gathered again without partitioning the scene
+    cache_store_scene_index(tile_members_cache_key(scene_ref), pack_tile_members(leaf_of, ref_of, refs))
+    geometry_leaves = {}
+    for ref_index, leaf in set(zip(ref_of, leaf_of.tolist())):
+        if ref_index >= 0:
+            geometry_leaves.setdefault(refs[ref_index], set()).add(leaf)
+
+    buckets = LeafBuckets(
+        np.bincount(leaf_of, minlength=len(tiles)),
+        geometry_leaves,
+        settings.VISUALIZER_TILE_BUFFER_OBJECTS,
+        complete=lambda leaf, scene: _store_leaf_tile(scene_ref, tiles[leaf]["id"], scene),
+        spill=lambda leaf, n, scene: cache_store_scene_json(
+            tile_spill_cache_key(scene_ref, tiles[leaf]["id"], n), scene
+        ),
+        load_spill=lambda leaf, n: _take_tile_data(tile_spill_cache_key(scene_ref, tiles[leaf]["id"], n), scene_ref),
+    )
+    start, consumed = 0, 0
+    try:
+        for part, size in enumerate(part_sizes):
+            consumed = part + 1
+            buckets.add(leaf_of[start:start + size], _take_tile_data(tile_part_cache_key(scene_ref, part), scene_ref))
+            start += size
+    finally:
+        # Chunks left over by a failed build
+        for part in range(consumed, len(part_sizes)):
+            cache_delete_scene_json(tile_part_cache_key(scene_ref, part))
+    buckets.finish()
+
+    manifest = {
+        "sceneRef": scene_ref,
+        "root": TILE_ROOT,
+        "objectCount": int(len(leaf_of)),
+        "bounds": tiles[0]["bounds"],
+        "levels": list(TILE_LEVELS),
+        "coarseTriangles": settings.VISUALIZER_TILE_COARSE_TRIANGLES,
+        "tiles": tiles,
+    }
+    cache_store_scene_json(tileset_cache_key(scene_ref), manifest)
+    logging.info(
+        "Visualizer built tileset ref=%s objects=%s tiles=%s leaves=%s",
+        scene_ref, len(leaf_of), len(tiles), sum(1 for tile in tiles if not tile["children"])
+    )
+    return manifest
+
+
+def resolve_tileset(scene_ref: str) -> Dict[str, Any]:
+    """Return the tileset manifest of a cached scene, partitioning the scene on first use.
+
+    Concurrent first requests for a scene wait for a single build.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+    Returns:
+        manifest (Dict[str, Any]): ``sceneRef``, ``root``, ``objectCount``, ``bounds``, ``levels``,
+            ``coarseTriangles`` and ``tiles`` (``id``, ``depth``, ``bounds``, ``objectCount``, ``children``).
+    Raises:
+        LookupError: If the scene cannot be resolved from the cache.
+    """
+    manifest = cache_load_scene_json(tileset_cache_key(scene_ref))
+    if manifest is not None:
+        return manifest
+    with _tileset_lock(scene_ref):
+        # Built by a concurrent request while this one waited
+        manifest = cache_load_scene_json(tileset_cache_key(scene_ref))
+        if manifest is not None:
+            return manifest
+        return _build_tileset(scene_ref)
+
+
+def _rebuild_leaf_tile(scene_ref: str, tiles: list, index: int) -> Dict[str, Any]:
+    """Gather the fine level of a leaf tile again, after it left the cache.
+
+    The source scene is serialized once more and only the leaf's objects,
+    found from the stored object-to-leaf table, and the geometries they use
+    are kept. Without that table the scene is partitioned again.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        tiles (list): Manifest tiles.
+        index (int): Index of the leaf in ``tiles``.
+    Returns:
+        scene_json (Dict[str, Any]): Fine level of the leaf.
+    Raises:
+        LookupError: If the scene cannot be resolved from the cache.
+    """
+    tile_id = tiles[index]["id"]
+    key = tile_cache_key(scene_ref, tile_id, "fine")
+    with _tileset_lock(scene_ref):
+        # Gathered by a concurrent request while this one waited
+        cached = cache_load_scene_json(key)
+        if cached is not None:
+            return cached
+        data = cache_load_scene_index(tile_members_cache_key(scene_ref))
+        if data is None:
+            logging.warning("Visualizer tileset data missing ref=%s, partitioning again", scene_ref)
+            _build_tileset(scene_ref)
+            return _load_tile_data(key, scene_ref)
+        members = unpack_tile_members(data)
+        selected = members["leaf_of"] == index
+        used = np.unique(members["ref_of"][selected])
+        needed = set(members["refs"][used[used >= 0]].tolist())
+        objects, geometries, start = [], {}, 0
+        for chunk in _iter_tile_source(scene_ref, settings.VISUALIZER_STREAM_CHUNK_SHAPES):
+            if "error" in chunk:
+                raise LookupError(chunk["error"])
+            count = len(chunk["objects"])
+            objects.extend(obj for obj, keep in zip(chunk["objects"], selected[start:start + count]) if keep)
+            geometries.update((ref, geometry) for ref, geometry in chunk["geometries"].items() if ref in needed)
+            start += count
+        logging.info("Visualizer gathered leaf tile again ref=%s tile=%s objects=%s", scene_ref, tile_id, len(objects))
+        return _store_leaf_tile(scene_ref, tile_id, {"objects": objects, "geometries": geometries})
+
+
+def _tile_scene(scene_ref: str, tiles: list, tile_id: str, level: str) -> Dict[str, Any]:
+    """Return a tile level from the cache, producing it (and the levels it derives from) on first use.
+
+    Only the missing levels are produced: a coarse level from its fine
+    level, the fine level of an inner tile from its children's coarse
+    levels, and an evicted leaf from the source scene.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        tiles (list): Manifest tiles.
+        tile_id (str): Tile identifier.
+        level (str): ``coarse`` or ``fine``.
+    Returns:
+        scene_json (Dict[str, Any]): Scene of the tile level.
+    """
+    key = tile_cache_key(scene_ref, tile_id, level)
+    cached = cache_load_scene_json(key)
+    if cached is not None:
+        return cached
+    index = next(index for index, tile in enumerate(tiles) if tile["id"] == tile_id)
+    tile = tiles[index]
+    if not tile["children"] and level == "fine":
+        return _rebuild_leaf_tile(scene_ref, tiles, index)
+    if level == "coarse":
+        scene = coarse_tile_scene(
+            _tile_scene(scene_ref, tiles, tile_id, "fine"), settings.VISUALIZER_TILE_COARSE_TRIANGLES
+        )
+    else:
+        # Children are produced one after the other; only their coarse levels are held here
+        scene = merge_tile_scenes([
+            (child_id, _tile_scene(scene_ref, tiles, child_id, "coarse")) for child_id in tile["children"]
+        ])
+    cache_store_scene_json(key, scene)
+    logging.info(
+        "Visualizer produced tile ref=%s tile=%s level=%s objects=%s",
+        scene_ref, tile_id, level, len(scene.get("objects", []))
+    )
+    return scene
+
+
+def resolve_tile_binary(scene_ref: str, tile_id: str, level: str = "fine", compact: bool = False) -> bytes:
+    """Return one level of a scene tile in the packed binary format.
+
+    Args:
+        scene_ref (str): Scene cache reference.
+        tile_id (str): Tile identifier from the manifest.
+        level (str): ``coarse`` or ``fine``.
+        compact (bool): Whether to quantize meshes and precompute their normals.
+    Returns:
+        data (bytes): Binary scene of the tile level.
+    Raises:
+        ValueError: If the level is not recognized.
+        LookupError: If the scene or the tile does not exist.
+    """
+    if level not in TILE_LEVELS:
+        raise ValueError(f"Unknown tile level '{level}': expected {' or '.join(TILE_LEVELS)}")
+    bin_key = tile_cache_key(scene_ref, tile_id, level)
+    if compact:
+        bin_key = f"{bin_key}.compact"
+    cached = cache_load_scene_bin(bin_key)
+    if cached is not None:
+        return cached
+
+    manifest = resolve_tileset(scene_ref)
+    if not any(tile["id"] == tile_id for tile in manifest["tiles"]):
+        raise LookupError(f"Tile not found: {tile_id}")
+    data = encode_scene_binary(_tile_scene(scene_ref, manifest["tiles"], tile_id, level), compact=compact)
+    cache_store_scene_bin(bin_key, data)
+    return data
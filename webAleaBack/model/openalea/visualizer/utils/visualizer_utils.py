@@ -35,3 +35,29 @@ def json_from_result(result):
         scene.add(result)
         return serialize_scene(scene)
     return {"error": "Unsupported type for 3D rendering"}
+
+
+def iter_json_from_result(result, chunk_size):
+    """Serialize PlantGL Scene/Shape results chunk by chunk.
+
+    Args:
+        result (Any): PlantGL Scene or Shape instance.
+        chunk_size (int): Shapes per chunk.
+    Yields:
+        chunk (dict): ``objects`` and new ``geometries`` entries, or a single error payload.
+    """
+    if not PLANTGL_AVAILABLE:
+        yield {"error": "OpenAlea PlantGL is not available in this environment"}
+        return
+
+    from model.openalea.visualizer.utils.serialize import iter_serialize_scene
+
+    if isinstance(result, Shape):
+        scene = Scene()
+        scene.add(result)
+        result = scene
+    if not isinstance(result, Scene):
+        yield {"error": "Unsupported type for 3D rendering"}
+        return
+    logging.info("Streaming Scene object to JSON chunk_size=%s", chunk_size)
+    yield from iter_serialize_scene(result, chunk_size)
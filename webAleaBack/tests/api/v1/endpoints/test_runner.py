@@ -1,9 +1,24 @@
 """Tests for the runner endpoints."""
+import asyncio
+import threading
+import time
 import unittest
 import unittest.mock
 
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
 from api.v1.endpoints import runner
 
+
+def _node_request(node_id, value=1):
+    return runner.NodeExecutionRequest(
+        node_id=node_id,
+        package_name="openalea.math",
+        node_name="addition",
+        inputs=[runner.NodeExecutionInput(id="in_0", name="a", type="float", value=value)],
+    )
+
 class TestOpenAleaInspectorRunner(unittest.TestCase):
     """Unit tests for OpenAlea Inspector endpoints."""
 
@@ -12,6 +27,15 @@ class TestOpenAleaInspectorRunner(unittest.TestCase):
     # expected route names
     expected_route_names = {
         "execute_single_node",
+        "execute_workflow",
+        "execute_node_batch",
+        "fetch_result_cache_stats",
+        "fetch_object_cache_stats",
+        "submit_node_job",
+        "fetch_node_job",
+        "stream_node_job_events",
+        "cancel_execution",
+        "fetch_collection_items",
     }
 
     def test_routes_exist(self):
@@ -47,8 +71,294 @@ class TestOpenAleaInspectorRunner(unittest.TestCase):
             ]
         )
         # execute the node
-        response = runner.execute_single_node(request)
+        response = asyncio.run(runner.execute_single_node(request))
         self.assertTrue(response["success"])
         self.assertEqual(response["node_id"], "node_1")
         self.assertEqual(len(response["outputs"]), 1)
         self.assertEqual(response["outputs"][0]["value"], 8)
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_workflow")
+    def test_execute_workflow(self, mock_execute_workflow):
+        """Test executing a whole workflow on the backend."""
+        mock_execute_workflow.return_value = {
+            "success": True,
+            "results": {
+                "node_1": {"success": True},
+                "node_2": {"success": True, "outputs": [{"index": 0, "name": "result", "value": 8, "type": "float"}]},
+            },
+        }
+        request = runner.WorkflowExecutionRequest(
+            nodes=[{"id": "node_1"}, {"id": "node_2"}],
+            edges=[{"source": "node_1", "sourceHandle": "output_0", "target": "node_2", "targetHandle": "in_0"}],
+            return_nodes=["node_2"],
+        )
+        response = asyncio.run(runner.execute_workflow(request))
+        self.assertTrue(response["success"])
+        self.assertEqual(response["results"]["node_2"]["outputs"][0]["value"], 8)
+        self.assertEqual(mock_execute_workflow.call_args.kwargs["return_nodes"], ["node_2"])
+
+    def test_execute_workflow_unsupported_type(self):
+        """Test that only dataflow workflows are accepted."""
+        request = runner.WorkflowExecutionRequest(workflow_type="composite")
+        response = asyncio.run(runner.execute_workflow(request))
+        self.assertFalse(response["success"])
+        self.assertIn("Unsupported workflow type", response["error"])
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_execute_node_batch(self, mock_execute_node):
+        """Test executing independent nodes in one batch request."""
+        mock_execute_node.side_effect = lambda package_name, node_name, inputs, **kwargs: {
+            "success": True,
+            "outputs": [{"index": 0, "name": "result", "value": inputs["a"], "type": "float"}],
+        }
+        request = runner.BatchExecutionRequest(
+            requests=[_node_request("node_1", 1), _node_request("node_2", 2)],
+            max_parallel=2,
+        )
+        response = asyncio.run(runner.execute_node_batch(request))
+        self.assertTrue(response["success"])
+        self.assertEqual(set(response["results"]), {"node_1", "node_2"})
+        self.assertEqual(response["results"]["node_2"]["outputs"][0]["value"], 2)
+        execution_ids = {call.kwargs["execution_id"] for call in mock_execute_node.call_args_list}
+        self.assertEqual(len(execution_ids), 2)
+        self.assertNotIn(None, execution_ids)
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_execute_node_batch_stream(self, mock_execute_node):
+        """Test that streamed batches return an NDJSON response."""
+        mock_execute_node.return_value = {"success": True, "outputs": []}
+        request = runner.BatchExecutionRequest(requests=[_node_request("node_1")], stream=True)
+        response = asyncio.run(runner.execute_node_batch(request))
+        self.assertIsInstance(response, StreamingResponse)
+        self.assertEqual(response.media_type, "application/x-ndjson")
+
+    def test_execute_node_batch_duplicate_ids(self):
+        """Test that batches with duplicate node ids are rejected."""
+        request = runner.BatchExecutionRequest(requests=[_node_request("node_1"), _node_request("node_1")])
+        response = asyncio.run(runner.execute_node_batch(request))
+        self.assertFalse(response["success"])
+        self.assertIn("unique", response["error"])
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_iter_batch_results_yields_every_node(self, mock_execute_node):
+        """Test that batch results are yielded once per node."""
+        mock_execute_node.return_value = {"success": False, "error": "boom"}
+        responses = list(runner._iter_batch_results([_node_request("a"), _node_request("b")], 2))
+        self.assertEqual(sorted(r["node_id"] for r in responses), ["a", "b"])
+        self.assertTrue(all(r["error"] == "boom" for r in responses))
+
+    @unittest.mock.patch.object(runner, "get_execution_registry")
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_iter_batch_results_close_does_not_wait(self, mock_execute_node, mock_get_registry):
+        """Test that closing the stream early neither waits for running nodes nor starts queued ones."""
+        release = threading.Event()
+        calls = []
+
+        def execute(package_name, node_name, inputs, **kwargs):
+            calls.append(inputs["a"])
+            if inputs["a"] != 0:
+                release.wait(5)
+            return {"success": True, "outputs": []}
+
+        mock_execute_node.side_effect = execute
+        requests = [runner._with_execution_id(_node_request(node_id, value)) for value, node_id in enumerate("abc")]
+        responses = runner._iter_batch_results(requests, 1)
+        next(responses)
+        start = time.monotonic()
+        responses.close()
+        self.assertLess(time.monotonic() - start, 1)
+        # Running nodes are killed through their execution ids
+        cancelled = {call.args[0] for call in mock_get_registry.return_value.cancel.call_args_list}
+        self.assertEqual(cancelled, {request.execution_id for request in requests})
+        release.set()
+        deadline = time.monotonic() + 5
+        while any(t.name.startswith("runner-batch") for t in threading.enumerate()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn(2, calls)
+
+    def test_batch_parallelism(self):
+        """Test that the batch parallelism honours settings, request and batch size."""
+        with unittest.mock.patch.object(runner.settings, "RUNNER_BATCH_MAX_PARALLEL", 4):
+            self.assertEqual(runner._batch_parallelism(None, 10), 4)
+            self.assertEqual(runner._batch_parallelism(2, 10), 2)
+            self.assertEqual(runner._batch_parallelism(None, 3), 3)
+        with unittest.mock.patch.object(runner.settings, "RUNNER_BATCH_MAX_PARALLEL", 0), \
+                unittest.mock.patch.object(runner.settings, "RUNNER_POOL_SIZE", 3):
+            self.assertEqual(runner._batch_parallelism(None, 10), 3)
+
+    def test_fetch_result_cache_stats_disabled(self):
+        """Test cache stats when memoization is disabled."""
+        with unittest.mock.patch.object(runner, "get_result_cache", return_value=None):
+            self.assertEqual(runner.fetch_result_cache_stats(), {"enabled": False})
+
+    def test_fetch_result_cache_stats(self):
+        """Test cache stats when memoization is enabled."""
+        cache = unittest.mock.Mock()
+        cache.stats.return_value = {"enabled": True, "hits": 1, "misses": 0}
+        with unittest.mock.patch.object(runner, "get_result_cache", return_value=cache):
+            self.assertEqual(runner.fetch_result_cache_stats()["hits"], 1)
+
+    def test_fetch_object_cache_stats(self):
+        """Test object cache stats are returned as is."""
+        with unittest.mock.patch.object(runner, "cache_stats", return_value={"entries": 2, "evictions": 1}), \
+                unittest.mock.patch.object(runner, "get_cache_janitor", return_value=None):
+            stats = runner.fetch_object_cache_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["janitor"], {"running": False})
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_node_job_lifecycle(self, mock_execute_node):
+        """Test submitting a job, polling it and reading its event stream."""
+        def fake_execute(package_name, node_name, inputs, **kwargs):
+            kwargs["on_log"]("evaluating")
+            return {"success": True, "outputs": [{"index": 0, "name": "result", "value": 8, "type": "float"}]}
+        mock_execute_node.side_effect = fake_execute
+
+        request = runner.JobSubmitRequest(**_node_request("node_1").model_dump(), timeout=10)
+        accepted = runner.submit_node_job(request)
+        self.assertEqual(accepted["node_id"], "node_1")
+
+        deadline = time.monotonic() + 5
+        while runner.fetch_node_job(accepted["job_id"])["state"] not in ("done", "error"):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        job = runner.fetch_node_job(accepted["job_id"])
+        self.assertEqual(job["state"], "done")
+        self.assertEqual(job["result"]["outputs"][0]["value"], 8)
+        self.assertEqual(mock_execute_node.call_args.kwargs["timeout"], 10)
+
+        async def collect():
+            return [frame async for frame in runner._job_event_stream(accepted["job_id"], 0, poll_interval=0.01)]
+        frames = asyncio.run(collect())
+        self.assertTrue(frames[0].startswith("id: 1\nevent: state"))
+        self.assertTrue(any("event: log" in frame and "evaluating" in frame for frame in frames))
+        self.assertIn('"state": "done"', frames[-1])
+
+        response = runner.stream_node_job_events(accepted["job_id"], last_event_id="2")
+        self.assertEqual(response.media_type, "text/event-stream")
+
+    def test_unknown_job(self):
+        """Test that unknown jobs return 404."""
+        with self.assertRaises(HTTPException) as ctx:
+            runner.fetch_node_job("missing")
+        self.assertEqual(ctx.exception.status_code, 404)
+        with self.assertRaises(HTTPException):
+            runner.stream_node_job_events("missing")
+
+    def test_cancel_unknown_execution(self):
+        """Test that cancelling an execution that is not running returns 404."""
+        with self.assertRaises(HTTPException) as ctx:
+            runner.cancel_execution("missing")
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_cancel_running_execution(self, mock_execute_node):
+        """Test that the cancel endpoint reaches a running execution by id."""
+        def fake_execute(package_name, node_name, inputs, execution_id=None, **kwargs):
+            with runner.get_execution_registry().track(execution_id) as execution:
+                started.set()
+                while not execution.cancelled:
+                    time.sleep(0.01)
+            return {"success": False, "error": "Execution cancelled", "cancelled": True}
+        started = threading.Event()
+        mock_execute_node.side_effect = fake_execute
+
+        request = _node_request("node_1").model_copy(update={"execution_id": "exec-1"})
+        worker = threading.Thread(target=lambda: results.append(runner._run_node_request(request)))
+        results = []
+        worker.start()
+        self.assertTrue(started.wait(5))
+        self.assertEqual(runner.cancel_execution("exec-1"), {"execution_id": "exec-1", "cancelled": True})
+        worker.join(5)
+        self.assertEqual(results[0]["error"], "Execution cancelled")
+
+    @unittest.mock.patch.object(runner, "DISCONNECT_POLL_INTERVAL", 0.01)
+    @unittest.mock.patch.object(runner, "get_execution_registry")
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_execute_cancelled_on_disconnect(self, mock_execute_node, mock_get_registry):
+        """Test that a client disconnect cancels the execution it was waiting for."""
+        cancelled = threading.Event()
+        mock_get_registry.return_value.cancel.side_effect = lambda execution_id: cancelled.set()
+
+        def fake_execute(package_name, node_name, inputs, execution_id=None, **kwargs):
+            cancelled.wait(5)
+            return {"success": False, "error": "Execution cancelled"}
+        mock_execute_node.side_effect = fake_execute
+
+        http_request = unittest.mock.Mock()
+        http_request.is_disconnected = unittest.mock.AsyncMock(return_value=True)
+        response = asyncio.run(runner.execute_single_node(_node_request("node_1"), http_request))
+
+        self.assertEqual(response["error"], "Execution cancelled")
+        execution_id = mock_get_registry.return_value.cancel.call_args.args[0]
+        self.assertEqual(mock_execute_node.call_args.kwargs["execution_id"], execution_id)
+
+    @unittest.mock.patch.object(runner, "DISCONNECT_POLL_INTERVAL", 0.01)
+    @unittest.mock.patch.object(runner, "get_execution_registry")
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner.execute_node")
+    def test_execute_node_batch_cancelled_on_disconnect(self, mock_execute_node, mock_get_registry):
+        """Test that a client disconnect kills running batch nodes and skips queued ones."""
+        cancelled = set()
+        mock_get_registry.return_value.cancel.side_effect = cancelled.add
+        running = []
+
+        def fake_execute(package_name, node_name, inputs, execution_id=None, **kwargs):
+            running.append(execution_id)
+            deadline = time.monotonic() + 5
+            while execution_id not in cancelled and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return {"success": False, "error": "Execution cancelled"}
+        mock_execute_node.side_effect = fake_execute
+
+        http_request = unittest.mock.Mock()
+        http_request.is_disconnected = unittest.mock.AsyncMock(return_value=True)
+        request = runner.BatchExecutionRequest(requests=[_node_request("a"), _node_request("b")], max_parallel=1)
+        response = asyncio.run(runner.execute_node_batch(request, http_request))
+
+        self.assertFalse(response["success"])
+        self.assertEqual(len(running), 1)
+        self.assertIn(running[0], cancelled)
+        self.assertTrue(all(result["error"] == "Execution cancelled" for result in response["results"].values()))
+
+    def test_fetch_collection_items(self):
+        """Test paging through a cached collection output."""
+        with unittest.mock.patch.dict(runner._loaded_collections, clear=True), \
+                unittest.mock.patch.object(runner, "cache_load", return_value=list(range(250))):
+            page = runner.fetch_collection_items("ref_1", offset=240, limit=100)
+        self.assertEqual(page["length"], 250)
+        self.assertEqual(page["type"], "list")
+        self.assertEqual(page["items"], list(range(240, 250)))
+
+    def test_fetch_collection_items_loads_once(self):
+        """Test that paging through a collection unpickles it once."""
+        with unittest.mock.patch.dict(runner._loaded_collections, clear=True), \
+                unittest.mock.patch.object(runner, "cache_load", return_value=list(range(250))) as mock_load:
+            pages = [runner.fetch_collection_items("ref_1", offset=offset, limit=100) for offset in (0, 100, 200)]
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(pages[2]["items"], list(range(200, 250)))
+
+    def test_fetch_collection_items_cache_is_bounded(self):
+        """Test that only the most recently paged collections stay loaded."""
+        with unittest.mock.patch.dict(runner._loaded_collections, clear=True), \
+                unittest.mock.patch.object(runner.settings, "RUNNER_COLLECTION_CACHE_MAX_ENTRIES", 1), \
+                unittest.mock.patch.object(runner, "cache_load", return_value=[1]) as mock_load:
+            for ref_id in ("ref_1", "ref_2", "ref_1"):
+                runner.fetch_collection_items(ref_id, offset=0, limit=10)
+            self.assertEqual(mock_load.call_count, 3)
+            self.assertEqual(list(runner._loaded_collections), ["ref_1"])
+
+    @unittest.mock.patch.dict(runner._loaded_collections, clear=True)
+    def test_fetch_collection_items_errors(self):
+        """Test unknown refs and non-collection refs."""
+        with unittest.mock.patch.object(runner, "cache_load", side_effect=FileNotFoundError("gone")):
+            with self.assertRaises(HTTPException) as ctx:
+                runner.fetch_collection_items("ref_1", offset=0, limit=10)
+        self.assertEqual(ctx.exception.status_code, 404)
+        with unittest.mock.patch.object(runner, "cache_load", return_value=object()):
+            with self.assertRaises(HTTPException) as ctx:
+                runner.fetch_collection_items("ref_1", offset=0, limit=10)
+        self.assertEqual(ctx.exception.status_code, 400)
+        with unittest.mock.patch.object(runner, "cache_load", side_effect=ModuleNotFoundError("openalea")):
+            with self.assertRaises(HTTPException) as ctx:
+                runner.fetch_collection_items("ref_1", offset=0, limit=10)
+        self.assertEqual(ctx.exception.status_code, 500)
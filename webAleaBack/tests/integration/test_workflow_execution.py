@@ -0,0 +1,57 @@
+"""Integration tests for whole-workflow execution in WebAleaBack."""
+import unittest
+from unittest import TestCase
+
+
+def _has_openalea() -> bool:
+    try:
+        import openalea.core  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def _equal_node(node_id: str, b_value=3, node_name: str = "==") -> dict:
+    return {
+        "id": node_id,
+        "packageName": "openalea.math",
+        "nodeName": node_name,
+        "inputs": [
+            {"id": "port_0_a", "name": "a", "value": 0},
+            {"id": "port_1_b", "name": "b", "value": b_value},
+        ],
+        "outputs": [{"id": "output_0", "name": "out"}],
+    }
+
+
+@unittest.skipUnless(_has_openalea(), "OpenAlea not installed")
+class TestWorkflowExecutionIntegration(TestCase):
+    """Runs run_workflow.execute_workflow in this process with openalea.math nodes."""
+
+    def setUp(self):
+        from model.openalea.runner.runnable.run_workflow import execute_workflow
+
+        self.execute_workflow = execute_workflow
+
+    def test_values_flow_between_nodes(self):
+        """A primitive output is wired into an OpenAlea node; only sink outputs are serialized."""
+        workflow = {
+            "nodes": [{"id": "value", "outputs": [{"id": "output_0", "value": 3}]}, _equal_node("equal")],
+            "edges": [{"source": "value", "sourceHandle": "output_0", "target": "equal", "targetHandle": "port_0_a"}],
+        }
+        response = self.execute_workflow(workflow)
+        self.assertTrue(response["success"])
+        self.assertEqual(response["results"]["value"], {"success": True})
+        self.assertIs(response["results"]["equal"]["outputs"][0]["value"], True)
+
+    def test_failed_node_skips_successors(self):
+        """A node that cannot be evaluated marks its successors as skipped."""
+        workflow = {
+            "nodes": [_equal_node("broken", node_name="no_such_node"), _equal_node("equal")],
+            "edges": [{"source": "broken", "sourceHandle": "output_0", "target": "equal", "targetHandle": "port_0_a"}],
+            "return_nodes": ["broken", "equal"],
+        }
+        response = self.execute_workflow(workflow)
+        self.assertFalse(response["success"])
+        self.assertFalse(response["results"]["broken"]["success"])
+        self.assertTrue(response["results"]["equal"]["skipped"])
@@ -0,0 +1,111 @@
+import os
+from unittest import TestCase, mock
+
+from model.openalea.cache import backends
+from model.openalea.cache.backends import MemoryBackend, RedisBackend, split_ref
+
+
+class FakeRedis:
+    """In-memory stand-in for the ``redis.Redis`` methods used by ``RedisBackend``."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    def set(self, key, value, ex=None):
+        self.data[key] = bytes(value)
+        if ex:
+            self.ttl[key] = ex
+        else:
+            self.ttl.pop(key, None)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def expire(self, key, seconds):
+        self.ttl[key] = seconds
+
+    def delete(self, key):
+        self.ttl.pop(key, None)
+        return int(self.data.pop(key, None) is not None)
+
+
+class TestRefs(TestCase):
+    def test_split_ref(self):
+        self.assertEqual(split_ref("kv~abc"), ("kv", "abc"))
+        self.assertEqual(split_ref("disk@node-1~abc.batched"), ("disk@node-1", "abc.batched"))
+        self.assertEqual(split_ref("abc"), (None, "abc"))
+
+    def test_node_id_is_sanitized(self):
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_NODE_ID": "api/1~a b"}):
+            self.assertEqual(backends.get_node_id(), "api-1-a-b")
+
+
+class TestMemoryBackend(TestCase):
+    def test_roundtrip_compressed(self):
+        backend = MemoryBackend()
+        backend.write("r", ".json", "scene_json", lambda f: f.write(b"x" * 100_000), compress=True)
+        self.assertTrue(backend.exists("r", ".json"))
+        self.assertFalse(backend.exists("r", ".bin"))
+        self.assertEqual(backend.read("r", ".json", lambda f: f.read(), compressed=True), b"x" * 100_000)
+        with self.assertRaises(FileNotFoundError):
+            backend.read("missing", ".json", lambda f: f.read())
+
+    def test_corrupt_entry_is_a_miss(self):
+        backend = MemoryBackend()
+        backend._put("r.json", b"OAC\x01\x04gz")
+        with self.assertRaises(FileNotFoundError):
+            backend.read("r", ".json", lambda f: f.read(), compressed=True)
+
+    def test_map_is_private_copy(self):
+        backend = MemoryBackend()
+        backend.write("r", ".bin", "scene_bin", lambda f: f.write(b"abc"))
+        view = backend.map("r", ".bin")
+        view[0] = ord("z")
+        self.assertEqual(bytes(backend.map("r", ".bin")), b"abc")
+
+    def test_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_bytes=10)
+        backend.write("a", ".bin", "scene_bin", lambda f: f.write(b"1234"))
+        backend.write("b", ".bin", "scene_bin", lambda f: f.write(b"1234"))
+        backend.read("a", ".bin", lambda f: f.read())
+        backend.write("c", ".bin", "scene_bin", lambda f: f.write(b"1234"))
+        self.assertTrue(backend.exists("a", ".bin"))
+        self.assertFalse(backend.exists("b", ".bin"))
+        stats = backend.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["bytes"], 8)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_delete(self):
+        backend = MemoryBackend()
+        backend.write("r", ".bin", "scene_bin", lambda f: f.write(b"abc"))
+        backend.delete("r", ".bin")
+        backend.delete("missing", ".bin")
+        self.assertFalse(backend.exists("r", ".bin"))
+        self.assertEqual(backend.stats()["bytes"], 0)
+
+
+class TestRedisBackend(TestCase):
+    def test_roundtrip_and_ttl_refresh(self):
+        client = FakeRedis()
+        backend = RedisBackend(client, ttl_seconds=60, prefix="t:")
+        backend.write("r", ".pkl", "object", lambda f: f.write(b"data"))
+        self.assertEqual(client.data["t:r.pkl"], b"data")
+        self.assertEqual(client.ttl["t:r.pkl"], 60)
+        client.ttl["t:r.pkl"] = 1
+        self.assertEqual(backend.read("r", ".pkl", lambda f: f.read()), b"data")
+        self.assertEqual(client.ttl["t:r.pkl"], 60)
+        self.assertTrue(backend.exists("r", ".pkl"))
+        with self.assertRaises(FileNotFoundError):
+            backend.map("r", ".npy")
+        backend.delete("r", ".pkl")
+        self.assertNotIn("t:r.pkl", client.data)
+
+    def test_from_url_without_package(self):
+        with mock.patch.dict("sys.modules", {"redis": None}):
+            with self.assertRaises(ValueError):
+                RedisBackend.from_url("redis://localhost:6379/0")
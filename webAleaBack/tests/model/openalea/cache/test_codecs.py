@@ -0,0 +1,95 @@
+import io
+import os
+import unittest
+import unittest.mock
+from unittest import TestCase
+
+from model.openalea.cache import codecs
+
+
+def _write(content: bytes) -> tuple:
+    f = io.BytesIO()
+    with codecs.EntryWriter(f) as writer:
+        writer.write(content)
+    return f.getvalue(), writer.codec
+
+
+def _read(data: bytes) -> tuple:
+    stream, codec = codecs.open_entry(io.BytesIO(data))
+    return stream.read(), codec
+
+
+class TestCodecs(TestCase):
+    def setUp(self):
+        self._env = unittest.mock.patch.dict(os.environ, {
+            "OPENALEA_CACHE_COMPRESS_MIN_BYTES": "100",
+            "OPENALEA_CACHE_COMPRESS_LARGE_BYTES": "1000",
+        })
+        self._env.start()
+        os.environ.pop("OPENALEA_CACHE_CODEC", None)
+
+    def tearDown(self):
+        self._env.stop()
+
+    def test_small_entries_are_not_compressed(self):
+        data, codec = _write(b"x" * 50)
+        self.assertEqual(codec, "none")
+        self.assertEqual(data, codecs.HEADER_MAGIC + b"\x04none" + b"x" * 50)
+        self.assertEqual(_read(data), (b"x" * 50, "none"))
+
+    def test_codec_follows_entry_size(self):
+        fast = codecs.choose_codec(500, complete=True).name
+        dense = codecs.choose_codec(500, complete=False).name
+        self.assertIn(fast, ("lz4", "gzip"))
+        self.assertIn(dense, ("zstd", "gzip"))
+        content = b"0123456789" * 500
+        data, codec = _write(content)
+        self.assertEqual(codec, dense)
+        self.assertLess(len(data), len(content))
+        self.assertEqual(_read(data), (content, codec))
+
+    def test_forced_codec(self):
+        os.environ["OPENALEA_CACHE_CODEC"] = "gzip"
+        content = b"abc" * 100
+        data, codec = _write(content)
+        self.assertEqual(codec, "gzip")
+        self.assertEqual(_read(data), (content, "gzip"))
+
+    def test_every_available_codec_roundtrips(self):
+        content = bytes(range(256)) * 40
+        for name in codecs.available_codecs():
+            with self.subTest(codec=name):
+                os.environ["OPENALEA_CACHE_CODEC"] = name
+                data, codec = _write(content)
+                self.assertEqual(codec, name)
+                self.assertEqual(_read(data), (content, name))
+
+    def test_headerless_entries_are_read_as_is(self):
+        self.assertEqual(_read(b'{"objects": []}'), (b'{"objects": []}', "none"))
+
+    def test_unavailable_codecs(self):
+        with self.assertRaises(ValueError):
+            codecs.get_codec("brotli")
+        with unittest.mock.patch.object(codecs, "_zstd", return_value=None):
+            with self.assertRaisesRegex(ValueError, "zstandard"):
+                codecs.get_codec("zstd")
+            with self.assertRaisesRegex(ValueError, "zstandard"):
+                codecs.open_entry(io.BytesIO(codecs.HEADER_MAGIC + b"\x04zstd..."))
+
+    def test_damaged_entries_are_reported_as_corrupt(self):
+        os.environ["OPENALEA_CACHE_CODEC"] = "gzip"
+        data, _ = _write(b"abc" * 100)
+        for damaged in (codecs.HEADER_MAGIC, codecs.HEADER_MAGIC + b"\x04gz", codecs.HEADER_MAGIC + b"\x03xyz",
+                        data[:-20], data[:12] + b"\x00" * 40):
+            with self.subTest(data=damaged[:16]):
+                with self.assertRaises(codecs.CorruptEntryError):
+                    codecs.read_entry(io.BytesIO(damaged), lambda stream: stream.read(), compressed=True)
+
+    @unittest.skipUnless("zstd" in codecs.available_codecs(), "zstandard is not installed")
+    def test_zstd_stream_supports_pickle(self):
+        import pickle
+
+        os.environ["OPENALEA_CACHE_CODEC"] = "zstd"
+        data, _ = _write(pickle.dumps(list(range(1000)), protocol=0))
+        stream, _ = codecs.open_entry(io.BytesIO(data))
+        self.assertEqual(pickle.load(stream), list(range(1000)))
@@ -0,0 +1,63 @@
+import asyncio
+import unittest.mock
+from unittest import TestCase
+
+from model.openalea.cache import janitor
+
+
+class TestCacheJanitor(TestCase):
+    def test_sweep_is_rate_limited(self):
+        cache_janitor = janitor.CacheJanitor(interval_seconds=60, max_deletes=7)
+        with unittest.mock.patch.object(janitor, "cache_sweep", return_value=5) as cache_sweep, \
+                unittest.mock.patch.object(janitor, "cache_sweep_unindexed", return_value=2) as sweep_unindexed:
+            self.assertEqual(cache_janitor.sweep(), 7)
+        cache_sweep.assert_called_once_with(max_entries=7)
+        sweep_unindexed.assert_called_once_with("", max_entries=2)
+        self.assertEqual(cache_janitor.stats()["removed"], 7)
+        self.assertEqual(cache_janitor.stats()["unindexed_removed"], 2)
+
+    def test_unindexed_files_are_swept_one_shard_at_a_time(self):
+        cache_janitor = janitor.CacheJanitor(interval_seconds=60, max_deletes=7)
+        with unittest.mock.patch.object(janitor, "cache_sweep", return_value=0), \
+                unittest.mock.patch.object(janitor, "cache_sweep_unindexed", return_value=0) as sweep_unindexed:
+            for _ in range(len(janitor.CACHE_SHARDS) + 1):
+                cache_janitor.sweep()
+        shards = [call.args[0] for call in sweep_unindexed.call_args_list]
+        self.assertEqual(shards[:-1], list(janitor.CACHE_SHARDS))
+        self.assertEqual(shards[-1], janitor.CACHE_SHARDS[0])
+
+    def test_runs_in_background_until_stopped(self):
+        async def scenario():
+            cache_janitor = janitor.CacheJanitor(interval_seconds=0.01, max_deletes=1)
+            cache_janitor.start()
+            self.assertTrue(cache_janitor.stats()["running"])
+            while cache_janitor.sweeps < 3:
+                await asyncio.sleep(0.01)
+            await cache_janitor.stop()
+            return cache_janitor
+
+        with unittest.mock.patch.object(janitor, "cache_sweep", side_effect=[RuntimeError("locked"), 1, 0, 0, 0]), \
+                unittest.mock.patch.object(janitor, "cache_sweep_unindexed", return_value=0):
+            cache_janitor = asyncio.run(scenario())
+        self.assertFalse(cache_janitor.stats()["running"])
+        self.assertEqual(cache_janitor.removed, 1)
+
+    def test_disabled_by_settings(self):
+        async def scenario():
+            with unittest.mock.patch.object(janitor.settings, "CACHE_JANITOR_INTERVAL_SECONDS", 0):
+                self.assertIsNone(janitor.start_cache_janitor())
+            self.assertIsNone(janitor.get_cache_janitor())
+            await janitor.stop_cache_janitor()
+
+        asyncio.run(scenario())
+
+    def test_process_wide_janitor_lifecycle(self):
+        async def scenario():
+            with unittest.mock.patch.object(janitor.settings, "CACHE_JANITOR_INTERVAL_SECONDS", 60):
+                started = janitor.start_cache_janitor()
+            self.assertIs(janitor.get_cache_janitor(), started)
+            await janitor.stop_cache_janitor()
+            self.assertIsNone(janitor.get_cache_janitor())
+
+        with unittest.mock.patch.object(janitor, "cache_sweep", return_value=0):
+            asyncio.run(scenario())
@@ -1,8 +1,14 @@
+import json
 import os
+import pickle
+import sqlite3
 import tempfile
-from unittest import TestCase
+from pathlib import Path
+from unittest import TestCase, mock
 
-from model.openalea.cache import object_cache
+from model.openalea.cache import codecs, object_cache
+from model.openalea.cache.backends import RedisBackend
+from tests.model.openalea.cache.test_backends import FakeRedis
 
 
 class TestObjectCache(TestCase):
@@ -10,8 +16,13 @@ class TestObjectCache(TestCase):
         self._temp_dir = tempfile.TemporaryDirectory()
         self._old_cache_dir = os.environ.get("OPENALEA_CACHE_DIR")
         os.environ["OPENALEA_CACHE_DIR"] = self._temp_dir.name
+        self._old_max_bytes = os.environ.pop("OPENALEA_CACHE_MAX_BYTES", None)
 
     def tearDown(self):
+        if self._old_max_bytes is not None:
+            os.environ["OPENALEA_CACHE_MAX_BYTES"] = self._old_max_bytes
+        else:
+            os.environ.pop("OPENALEA_CACHE_MAX_BYTES", None)
         if self._old_cache_dir is None:
             os.environ.pop("OPENALEA_CACHE_DIR", None)
         else:
@@ -30,6 +41,17 @@ class TestObjectCache(TestCase):
         loaded = object_cache.cache_load_scene_json(ref_id)
         self.assertEqual(loaded, scene)
 
+    def test_array_cache_roundtrip(self):
+        import numpy as np
+
+        array = np.arange(6, dtype=np.int16).reshape(2, 3)
+        ref_id = object_cache.cache_store_array(array)
+        self.assertTrue(object_cache.cache_exists(ref_id))
+        loaded = object_cache.cache_load_array(ref_id)
+        np.testing.assert_array_equal(loaded, array)
+        with self.assertRaises(FileNotFoundError):
+            object_cache.cache_load_array("missing")
+
     def test_cache_cleanup_removes_old_entries(self):
         value = {"a": 1}
         ref_id = object_cache.cache_store(value)
@@ -40,3 +62,346 @@ class TestObjectCache(TestCase):
         removed = object_cache.cache_cleanup(ttl_seconds=1)
         self.assertGreaterEqual(removed, 1)
         self.assertFalse(path.exists())
+
+    def test_entries_are_sharded_and_indexed(self):
+        ref_id = object_cache.cache_store({"a": 1})
+        object_cache.cache_store_scene_json(ref_id, {"objects": []})
+        path = object_cache._cache_path(ref_id)
+        self.assertEqual(path.parent.parent, object_cache.get_cache_dir())
+        self.assertEqual(len(path.parent.name), 2)
+        stats = object_cache.cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["kinds"]["object"]["bytes"], path.stat().st_size)
+        self.assertIn("scene_json", stats["kinds"])
+
+    def test_load_updates_access_time(self):
+        ref_id = object_cache.cache_store({"a": 1})
+        path = object_cache._cache_path(ref_id)
+        os.utime(path, (0, 0))
+        object_cache.cache_load(ref_id)
+        self.assertGreater(path.stat().st_mtime, 0)
+        self.assertEqual(object_cache.cache_cleanup(ttl_seconds=60), 0)
+        self.assertEqual(object_cache.cache_stats()["hits"], 1)
+
+    def test_quota_evicts_least_recently_used(self):
+        os.environ["OPENALEA_CACHE_MAX_BYTES"] = "2500"
+        payload = b"x" * 1000
+        refs = [object_cache.cache_store(payload) for _ in range(2)]
+        # Reading the oldest entry makes the second one the least recently used
+        object_cache.cache_load(refs[0])
+        refs.append(object_cache.cache_store(payload))
+        self.assertTrue(object_cache.cache_exists(refs[0]))
+        self.assertFalse(object_cache.cache_exists(refs[1]))
+        self.assertTrue(object_cache.cache_exists(refs[2]))
+        stats = object_cache.cache_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], 2500)
+        with self.assertRaises(FileNotFoundError):
+            object_cache.cache_load(refs[1])
+
+    def _indexed_bytes(self):
+        connection = object_cache._index()
+        total = connection.execute("SELECT value FROM counters WHERE name = 'indexed_bytes'").fetchone()[0]
+        self.assertEqual(total, connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+        return total
+
+    def test_indexed_bytes_total_follows_every_change(self):
+        os.environ["OPENALEA_CACHE_MAX_BYTES"] = "2500"
+        self.assertEqual(self._indexed_bytes(), 0)
+        object_cache.cache_store_scene_json("scene", {"objects": [{"id": "a"}]})
+        # Rewriting a key replaces its size
+        object_cache.cache_store_scene_json("scene", {"objects": [{"id": "a"}, {"id": "b"}]})
+        object_cache.cache_delete_scene_json("scene")
+        self.assertEqual(self._indexed_bytes(), 0)
+        refs = [object_cache.cache_store(b"x" * 1000) for _ in range(3)]
+        self.assertEqual(object_cache.cache_stats()["evictions"], 1)
+        self.assertLessEqual(self._indexed_bytes(), 2500)
+        self._age(refs[-1], 0)
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=60), 1)
+        self.assertGreater(self._indexed_bytes(), 0)
+        os.utime(object_cache._cache_path(refs[1]), (0, 0))
+        self.assertEqual(object_cache.cache_cleanup(ttl_seconds=60), 1)
+        self.assertEqual(self._indexed_bytes(), 0)
+
+    def test_indexed_bytes_total_is_seeded_for_older_indexes(self):
+        object_cache.cache_store(b"x" * 100)
+        connection = object_cache._index()
+        expected = self._indexed_bytes()
+        connection.execute("DELETE FROM counters WHERE name = 'indexed_bytes'")
+        # A process opening the index for the first time
+        object_cache._local.connections.clear()
+        self.assertEqual(self._indexed_bytes(), expected)
+
+    def test_oversized_entry_is_kept(self):
+        os.environ["OPENALEA_CACHE_MAX_BYTES"] = "100"
+        small = object_cache.cache_store(b"x")
+        large = object_cache.cache_store(b"y" * 1000)
+        self.assertFalse(object_cache.cache_exists(small))
+        self.assertEqual(object_cache.cache_load(large), b"y" * 1000)
+
+    def test_corrupt_entries_are_removed_as_misses(self):
+        ref_id = object_cache.cache_store({"a": 1})
+        object_cache.cache_store_scene_json(ref_id, {"objects": []})
+        for path in (object_cache._cache_path(ref_id), object_cache._scene_json_path(ref_id)):
+            # Cut inside the codec header
+            path.write_bytes(path.read_bytes()[:6])
+        with self.assertRaises(FileNotFoundError):
+            object_cache.cache_load(ref_id)
+        self.assertIsNone(object_cache.cache_load_scene_json(ref_id))
+        self.assertFalse(object_cache._cache_path(ref_id).exists())
+        self.assertFalse(object_cache._scene_json_path(ref_id).exists())
+        self.assertEqual(object_cache.cache_stats()["entries"], 0)
+
+    def test_delete_scene_json(self):
+        object_cache.cache_store_scene_json("scratch", {"objects": []})
+        object_cache.cache_delete_scene_json("scratch")
+        object_cache.cache_delete_scene_json("scratch")
+        self.assertIsNone(object_cache.cache_load_scene_json("scratch"))
+        self.assertFalse(object_cache._scene_json_path("scratch").exists())
+        self.assertEqual(object_cache.cache_stats()["entries"], 0)
+
+    def test_missing_scene_entries_return_none(self):
+        self.assertIsNone(object_cache.cache_load_scene_json("missing"))
+        self.assertIsNone(object_cache.cache_load_scene_bin("missing"))
+        self.assertIsNone(object_cache.cache_load_scene_index("missing"))
+
+    def _age(self, ref_id, accessed):
+        # Loads refresh both the index access time and the file mtime
+        object_cache._index().execute("UPDATE entries SET accessed = ? WHERE ref = ?", (accessed, ref_id))
+        os.utime(object_cache._cache_path(ref_id), (accessed, accessed))
+
+    def test_sweep_expires_idle_entries_oldest_first(self):
+        refs = [object_cache.cache_store({"i": i}) for i in range(4)]
+        for age, ref_id in enumerate(refs[:3]):
+            self._age(ref_id, age)
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=60, max_entries=2), 2)
+        self.assertFalse(object_cache.cache_exists(refs[0]))
+        self.assertFalse(object_cache.cache_exists(refs[1]))
+        self.assertTrue(object_cache.cache_exists(refs[2]))
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=60, max_entries=2), 1)
+        self.assertTrue(object_cache.cache_exists(refs[3]))
+        stats = object_cache.cache_stats()
+        self.assertEqual(stats["expired"], 3)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_sweep_keeps_a_key_rewritten_before_its_index_update(self):
+        object_cache.cache_store_scene_json("tile", {"objects": []})
+        object_cache._index().execute("UPDATE entries SET accessed = 0 WHERE ref = ?", ("tile",))
+        # The file was just replaced; its index update has not run yet
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=60), 0)
+        self.assertEqual(object_cache.cache_load_scene_json("tile"), {"objects": []})
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=60), 0)
+
+    def test_unindexed_files_expire_by_shard(self):
+        kept = object_cache.cache_store({"a": 1})
+        orphan = object_cache._cache_path("orphan")
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(b"x")
+        legacy = object_cache.get_cache_dir() / "legacy.scene.json"
+        legacy.write_bytes(b"{}")
+        for path in (orphan, legacy, object_cache._cache_path(kept)):
+            os.utime(path, (0, 0))
+        self.assertEqual(object_cache.cache_sweep_unindexed(orphan.parent.name, ttl_seconds=60, max_entries=0), 0)
+        removed = sum(
+            object_cache.cache_sweep_unindexed(shard, ttl_seconds=60) for shard in object_cache.CACHE_SHARDS
+        )
+        self.assertEqual(removed, 2)
+        self.assertFalse(orphan.exists())
+        self.assertFalse(legacy.exists())
+        # Indexed entries are left to cache_sweep
+        self.assertTrue(object_cache.cache_exists(kept))
+
+    def test_sweep_disabled_without_ttl(self):
+        ref_id = object_cache.cache_store({"a": 1})
+        self._age(ref_id, 0)
+        self.assertEqual(object_cache.cache_sweep(ttl_seconds=0), 0)
+        self.assertTrue(object_cache.cache_exists(ref_id))
+
+    def test_registered_files_are_indexed(self):
+        path = object_cache.get_cache_dir() / "tessellation" / "key.npz"
+        path.parent.mkdir()
+        path.write_bytes(b"x" * 10)
+        object_cache.cache_register_file(path, "tessellation")
+        self.assertEqual(object_cache.cache_stats()["kinds"]["tessellation"], {"entries": 1, "bytes": 10})
+        object_cache.cache_touch_file(path)
+        self.assertEqual(object_cache.cache_stats()["hits"], 1)
+        outside = Path(self._temp_dir.name).parent / "elsewhere.npz"
+        object_cache.cache_register_file(outside, "tessellation")
+        self.assertEqual(object_cache.cache_stats()["entries"], 1)
+
+    def test_index_uses_rollback_journal_unless_local_wal_requested(self):
+        object_cache.cache_store({"a": 1})
+        self.assertEqual(object_cache._index().execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_INDEX_JOURNAL": "wal"}):
+            self.assertEqual(object_cache.get_cache_index_journal(), "WAL")
+            # A dir shared across hosts cannot use WAL
+            with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "fs"}):
+                self.assertEqual(object_cache.get_cache_index_journal(), "DELETE")
+
+    def test_stats_report_index_errors(self):
+        with mock.patch.object(object_cache, "_index", side_effect=sqlite3.OperationalError("database is locked")):
+            stats = object_cache.cache_stats()
+        self.assertEqual(stats["entries"], 0)
+        self.assertEqual(stats["error"], "database is locked")
+
+    def test_large_entries_are_compressed(self):
+        os.environ["OPENALEA_CACHE_COMPRESS_MIN_BYTES"] = "1000"
+        try:
+            scene = {"objects": [{"id": str(i), "geometry": {"vertices": [[0.0, 0.0, 1.0]] * 10}} for i in range(100)]}
+            ref_id = object_cache.cache_store_scene_json_new(scene)
+            value = {"values": list(range(1000))}
+            pickle_ref = object_cache.cache_store(value)
+        finally:
+            os.environ.pop("OPENALEA_CACHE_COMPRESS_MIN_BYTES")
+        self.assertTrue(object_cache._scene_json_path(ref_id).read_bytes().startswith(codecs.HEADER_MAGIC))
+        self.assertEqual(object_cache.cache_load_scene_json(ref_id), scene)
+        self.assertEqual(object_cache.cache_load(pickle_ref), value)
+        self.assertLess(object_cache._scene_json_path(ref_id).stat().st_size, len(json.dumps(scene)))
+
+    def test_loads_entries_written_without_header(self):
+        path = object_cache._scene_json_path("legacy")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"objects": []}))
+        self.assertEqual(object_cache.cache_load_scene_json("legacy"), {"objects": []})
+
+    def test_large_buffers_are_stored_out_of_band(self):
+        import mmap
+
+        import numpy as np
+
+        os.environ["OPENALEA_CACHE_OOB_MIN_BYTES"] = "1024"
+        try:
+            value = {"big": np.arange(1000, dtype=np.float64), "small": np.arange(4), "strided": np.arange(1000)[::2]}
+            ref_id = object_cache.cache_store(value)
+        finally:
+            os.environ.pop("OPENALEA_CACHE_OOB_MIN_BYTES")
+        self.assertLess(object_cache._cache_path(ref_id).stat().st_size, 8000)
+        self.assertGreaterEqual(object_cache._buffers_path(ref_id).stat().st_size, 8000)
+        loaded = object_cache.cache_load(ref_id)
+        for key in value:
+            np.testing.assert_array_equal(loaded[key], value[key])
+        big = loaded["big"]
+        self.assertEqual(big.ctypes.data % 64, 0)
+        base = big
+        while isinstance(base, np.ndarray):
+            base = base.base
+        self.assertIsInstance(base.obj, mmap.mmap)
+        # Copy-on-write: edits stay private to the loaded value
+        big[0] = -1
+        self.assertEqual(object_cache.cache_load(ref_id)["big"][0], 0)
+        self.assertEqual(object_cache.cache_stats()["kinds"]["object_buffers"]["entries"], 1)
+
+    def test_small_buffers_stay_in_band(self):
+        import numpy as np
+
+        ref_id = object_cache.cache_store({"array": np.arange(10)})
+        self.assertFalse(object_cache._buffers_path(ref_id).exists())
+        np.testing.assert_array_equal(object_cache.cache_load(ref_id)["array"], np.arange(10))
+
+    def test_missing_buffers_mean_missing_entry(self):
+        import numpy as np
+
+        os.environ["OPENALEA_CACHE_OOB_MIN_BYTES"] = "0"
+        try:
+            ref_id = object_cache.cache_store(np.arange(10))
+        finally:
+            os.environ.pop("OPENALEA_CACHE_OOB_MIN_BYTES")
+        object_cache._buffers_path(ref_id).unlink()
+        with self.assertRaises(FileNotFoundError):
+            object_cache.cache_load(ref_id)
+
+
+class TestCacheBackendRouting(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        patches = [
+            mock.patch.dict(os.environ, {"OPENALEA_CACHE_DIR": self._temp_dir.name, "OPENALEA_CACHE_NODE_ID": "node-a"}),
+            # Backends are process-wide: start each test from an empty registry
+            mock.patch.dict(object_cache._backends, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def test_disk_refs_name_their_node(self):
+        ref_id = object_cache.cache_store({"a": 1})
+        self.assertTrue(ref_id.startswith("disk@node-a~"))
+        self.assertTrue(object_cache._cache_path(ref_id).exists())
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_NODE_ID": "node-b"}):
+            self.assertFalse(object_cache.cache_exists(ref_id))
+            with self.assertRaisesRegex(FileNotFoundError, "disk@node-a"):
+                object_cache.cache_load(ref_id)
+
+    def test_unnamed_node_refs_survive_host_name_changes(self):
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_NODE_ID": ""}):
+            with mock.patch("socket.gethostname", return_value="container-1"):
+                ref_id = object_cache.cache_store({"a": 1})
+            self.assertTrue(ref_id.startswith("disk~"))
+            # A restarted container gets a new host name
+            with mock.patch("socket.gethostname", return_value="container-2"):
+                self.assertEqual(object_cache.cache_load(ref_id), {"a": 1})
+            # Refs named after the host name are still local to that host
+            legacy_ref = "disk@container-1~" + ref_id.split("~")[1]
+            object_cache._cache_path(legacy_ref).parent.mkdir(exist_ok=True)
+            object_cache._cache_path(legacy_ref).write_bytes(object_cache._cache_path(ref_id).read_bytes())
+            with mock.patch("socket.gethostname", return_value="container-1"):
+                self.assertEqual(object_cache.cache_load(legacy_ref), {"a": 1})
+
+    def test_shared_fs_refs_resolve_on_any_node(self):
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "fs"}):
+            ref_id = object_cache.cache_store({"a": 1})
+        self.assertTrue(ref_id.startswith("fs~"))
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_NODE_ID": "node-b"}):
+            self.assertEqual(object_cache.cache_load(ref_id), {"a": 1})
+
+    def test_legacy_refs_load_from_disk(self):
+        path = object_cache._cache_path("abc")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(pickle.dumps({"a": 1}))
+        self.assertEqual(object_cache.cache_load("abc"), {"a": 1})
+
+    def test_memory_backend(self):
+        import numpy as np
+
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "memory", "OPENALEA_CACHE_OOB_MIN_BYTES": "0"}):
+            ref_id = object_cache.cache_store({"array": np.arange(10)})
+            array_ref = object_cache.cache_store_array(np.arange(6).reshape(2, 3))
+            self.assertEqual(object_cache.cache_stats()["backend"]["entries"], 3)
+        self.assertTrue(ref_id.startswith(f"mem@node-a:{os.getpid()}~"))
+        np.testing.assert_array_equal(object_cache.cache_load(ref_id)["array"], np.arange(10))
+        np.testing.assert_array_equal(object_cache.cache_load_array(array_ref), np.arange(6).reshape(2, 3))
+        self.assertEqual(list(Path(self._temp_dir.name).rglob("*.pkl")), [])
+
+    def test_runner_processes_do_not_issue_memory_refs(self):
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "memory"}), \
+                mock.patch.object(object_cache, "_runner_process", False):
+            object_cache.mark_runner_process()
+            ref_id = object_cache.cache_store({"a": 1})
+        self.assertTrue(ref_id.startswith("disk@node-a~"))
+        self.assertEqual(object_cache.cache_load(ref_id), {"a": 1})
+
+    def test_kv_backend_shared_between_replicas(self):
+        import numpy as np
+
+        client = FakeRedis()
+        object_cache.register_cache_backend(RedisBackend(client))
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "kv", "OPENALEA_CACHE_OOB_MIN_BYTES": "0"}):
+            ref_id = object_cache.cache_store({"array": np.arange(10)})
+            scene_ref = object_cache.cache_store_scene_json_new({"objects": [{"id": "x"}]})
+        self.assertTrue(ref_id.startswith("kv~"))
+        object_cache.cache_store_scene_bin(scene_ref, b"bin")
+        # Another replica only shares the store
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_NODE_ID": "node-b"}):
+            np.testing.assert_array_equal(object_cache.cache_load(ref_id)["array"], np.arange(10))
+            self.assertEqual(object_cache.cache_load_scene_json(scene_ref), {"objects": [{"id": "x"}]})
+            self.assertEqual(object_cache.cache_load_scene_bin(scene_ref), b"bin")
+            self.assertIsNone(object_cache.cache_load_scene_index(scene_ref))
+            self.assertTrue(object_cache.cache_exists(scene_ref))
+
+    def test_kv_backend_requires_url(self):
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_BACKEND": "kv"}):
+            os.environ.pop("OPENALEA_CACHE_REDIS_URL", None)
+            with self.assertRaises(ValueError):
+                object_cache.cache_store({"a": 1})
+            self.assertIn("error", object_cache.cache_stats()["backend"])
@@ -0,0 +1,145 @@
+"""Tests for cancellation of running executions."""
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.openalea.runner.execution_registry import ExecutionRegistry
+from model.openalea.runner.openalea_runner import OpenAleaRunner
+from model.openalea.runner.utils.openalea_runner_helpers import run_node_subprocess
+
+_TESTS_ROOT = next(p for p in Path(__file__).resolve().parents if p.name == "tests")
+FAKE_SCRIPT = str(_TESTS_ROOT / "resources" / "runner" / "fake_run_workflow.py")
+
+
+def _is_running(pid):
+    """Return True if pid is alive and not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _wait_for_pid(pid_file, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(pid_file) and os.path.getsize(pid_file):
+            with open(pid_file, encoding="utf-8") as f:
+                return int(f.read())
+        time.sleep(0.02)
+    raise AssertionError("fake script did not start")
+
+
+def _wait_dead(pid, timeout=5):
+    deadline = time.monotonic() + timeout
+    while _is_running(pid) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return not _is_running(pid)
+
+
+class TestExecutionRegistry(unittest.TestCase):
+    """Tests the ExecutionRegistry class."""
+
+    def setUp(self):
+        self.registry = ExecutionRegistry()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pid_file = os.path.join(self.tmp.name, "pid")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_track_registers_for_block_duration(self):
+        """Executions are only cancellable while tracked."""
+        with self.registry.track("exec-1") as execution:
+            self.assertEqual(self.registry.running(), ["exec-1"])
+            with self.assertRaises(ValueError):
+                with self.registry.track("exec-1"):
+                    pass
+            self.assertTrue(self.registry.cancel("exec-1"))
+            self.assertTrue(execution.cancelled)
+        self.assertFalse(self.registry.cancel("exec-1"))
+        with self.registry.track() as generated:
+            self.assertTrue(generated.execution_id)
+
+    def test_cancel_kills_process_group(self):
+        """Cancelling kills the attached process and its grandchildren."""
+        with self.registry.track("exec-1") as execution:
+            timer = threading.Timer(
+                0.1, lambda: (_wait_for_pid(self.pid_file), self.registry.cancel("exec-1"))
+            )
+            timer.start()
+            result = run_node_subprocess(
+                FAKE_SCRIPT, {"inputs": {"pid_file": self.pid_file, "sleep": 30}}, 20, execution.attach
+            )
+            timer.join()
+        self.assertLess(result.returncode, 0)
+        self.assertTrue(_wait_dead(_wait_for_pid(self.pid_file)))
+
+    def test_attach_after_cancel_kills_immediately(self):
+        """A process attached to an already cancelled execution is killed."""
+        with self.registry.track("exec-1") as execution:
+            execution.cancel()
+            result = run_node_subprocess(
+                FAKE_SCRIPT, {"inputs": {"pid_file": self.pid_file, "sleep": 30}}, 20, execution.attach
+            )
+        self.assertLess(result.returncode, 0)
+
+    def test_stderr_lines_arrive_while_running(self):
+        """stderr lines reach on_log before the subprocess exits."""
+        received = []
+        start = time.monotonic()
+        result = run_node_subprocess(
+            FAKE_SCRIPT, {"inputs": {"pid_file": self.pid_file, "sleep": 1, "log": "step 1"}}, 20,
+            on_log=lambda line: received.append((line, time.monotonic() - start)),
+        )
+        elapsed = time.monotonic() - start
+        self.assertEqual([line for line, _ in received], ["step 1"])
+        self.assertLess(received[0][1], elapsed - 0.5)
+        self.assertIn("step 1", result.stderr)
+        self.assertIn('"success": true', result.stdout)
+
+    def test_exit_kills_grandchildren_holding_pipes(self):
+        """A background grandchild holding the pipes does not outlive a successful run."""
+        start = time.monotonic()
+        result = run_node_subprocess(
+            FAKE_SCRIPT, {"inputs": {"pid_file": self.pid_file, "inherit_pipes": True}}, 20
+        )
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertIn('"success": true', result.stdout)
+        self.assertTrue(_wait_dead(_wait_for_pid(self.pid_file)))
+
+    def test_timeout_kills_grandchildren(self):
+        """A timed out subprocess is killed with its whole process group."""
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_node_subprocess(FAKE_SCRIPT, {"inputs": {"pid_file": self.pid_file, "sleep": 30}}, 1)
+        self.assertTrue(_wait_dead(_wait_for_pid(self.pid_file)))
+
+
+class TestOpenAleaRunnerCancellation(unittest.TestCase):
+    """Tests cancellation through OpenAleaRunner."""
+
+    @mock.patch("model.openalea.runner.openalea_runner.get_worker_pool", return_value=None)
+    def test_cancelled_execution_response(self, _mock_get_pool):
+        """A cancelled node reports a cancelled failure instead of a crash."""
+        from model.openalea.runner.execution_registry import get_execution_registry
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(OpenAleaRunner, "SCRIPT_PATH", FAKE_SCRIPT):
+            pid_file = os.path.join(tmp, "pid")
+            timer = threading.Timer(
+                0.1, lambda: (_wait_for_pid(pid_file), get_execution_registry().cancel("exec-2"))
+            )
+            timer.start()
+            response = OpenAleaRunner.execute_node(
+                "openalea.math", "sleep", {"pid_file": pid_file, "sleep": 30},
+                timeout=20, use_cache=False, execution_id="exec-2",
+            )
+            timer.join()
+        self.assertFalse(response["success"])
+        self.assertTrue(response["cancelled"])
+        self.assertEqual(get_execution_registry().running(), [])
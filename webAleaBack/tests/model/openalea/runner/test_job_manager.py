@@ -0,0 +1,104 @@
+"""Tests for asynchronous runner jobs."""
+import threading
+import time
+import unittest
+
+from model.openalea.runner import job_manager
+from model.openalea.runner.job_manager import JobManager
+
+
+def _wait_finished(manager, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.state in job_manager.TERMINAL_STATES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobManager(unittest.TestCase):
+    """Tests the JobManager class."""
+
+    def setUp(self):
+        self.manager = JobManager(max_concurrent=2, retention_seconds=60)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_successful_job_events(self):
+        """A successful job goes queued -> running -> done with logs and result."""
+        def work(on_log):
+            on_log("step 1")
+            return {"success": True, "outputs": [1]}
+
+        job = self.manager.submit("test", work)
+        finished = _wait_finished(self.manager, job.job_id)
+        self.assertEqual(finished.state, job_manager.JOB_DONE)
+        self.assertEqual(finished.snapshot()["result"]["outputs"], [1])
+
+        events = self.manager.events_since(job.job_id)
+        self.assertEqual(
+            [e["event"] for e in events],
+            ["state", "state", "log", "result", "state"],
+        )
+        self.assertEqual(events[-1]["data"]["state"], job_manager.JOB_DONE)
+        self.assertEqual(self.manager.events_since(job.job_id, after=events[-1]["id"]), [])
+
+    def test_failed_job(self):
+        """Failed responses and exceptions both end in the error state."""
+        failed = self.manager.submit("fail", lambda on_log: {"success": False, "error": "bad input"})
+        crashed = self.manager.submit("crash", lambda on_log: 1 / 0)
+        self.assertEqual(_wait_finished(self.manager, failed.job_id).error, "bad input")
+        self.assertEqual(_wait_finished(self.manager, crashed.job_id).state, job_manager.JOB_ERROR)
+
+    def test_events_since_waits_for_new_event(self):
+        """events_since blocks until the running job emits something."""
+        release = threading.Event()
+
+        def work(on_log):
+            release.wait(5)
+            on_log("late line")
+            return {"success": True}
+
+        job = self.manager.submit("wait", work)
+        _ = self.manager.events_since(job.job_id)
+        last_id = self.manager.get(job.job_id).events[-1]["id"]
+        threading.Timer(0.1, release.set).start()
+        events = self.manager.events_since(job.job_id, after=last_id, timeout=5)
+        self.assertTrue(events)
+
+    def test_prune_expired_jobs(self):
+        """Finished jobs are forgotten after the retention period."""
+        job = self.manager.submit("done", lambda on_log: {"success": True})
+        _wait_finished(self.manager, job.job_id)
+        self.manager.retention_seconds = -1
+        self.assertEqual(self.manager.prune(), 1)
+        self.assertIsNone(self.manager.get(job.job_id))
+        self.assertEqual(self.manager.events_since(job.job_id), [])
+
+    def test_log_events_are_bounded(self):
+        """Old log lines are dropped beyond MAX_LOG_EVENTS."""
+        def work(on_log):
+            for i in range(job_manager.MAX_LOG_EVENTS + 10):
+                on_log(str(i))
+            return {"success": True}
+
+        job = self.manager.submit("chatty", work)
+        finished = _wait_finished(self.manager, job.job_id)
+        logs = [e for e in finished.events if e["event"] == "log"]
+        self.assertEqual(len(logs), job_manager.MAX_LOG_EVENTS)
+        self.assertEqual(logs[-1]["data"]["line"], str(job_manager.MAX_LOG_EVENTS + 9))
+        self.assertEqual(finished.snapshot()["log_count"], job_manager.MAX_LOG_EVENTS + 10)
+
+
+class TestJobManagerSingleton(unittest.TestCase):
+    """Tests the settings-driven job manager accessor."""
+
+    def test_job_manager_is_shared(self):
+        """The accessor returns one manager until it is shut down."""
+        manager = job_manager.get_job_manager()
+        self.assertIs(manager, job_manager.get_job_manager())
+        job_manager.shutdown_job_manager()
+        self.assertIsNot(manager, job_manager.get_job_manager())
+        job_manager.shutdown_job_manager()
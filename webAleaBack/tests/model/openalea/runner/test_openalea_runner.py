@@ -123,3 +123,29 @@ class TestOpenAleaRunnerFailure(unittest.TestCase):
             self.assertIsInstance(result, dict)
             self.assertFalse(result.get("success"))
             self.assertIn("error", result)
+
+
+class TestOpenAleaRunnerWorkflow(unittest.TestCase):
+    """Tests whole-workflow execution through the OpenAleaRunner class"""
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.run_node_subprocess")
+    def test_execute_workflow(self, mock_run_node):
+        """Test that a workflow is sent as a single subprocess payload."""
+        mock_response = {"success": True, "results": {"a": {"success": True}}}
+        mock_run_node.return_value = unittest.mock.Mock(stdout=json.dumps(mock_response), stderr="")
+
+        result = OpenAleaRunner.execute_workflow(nodes=[{"id": "a"}], edges=[], return_nodes=["a"])
+
+        self.assertTrue(result["success"])
+        node_info = mock_run_node.call_args.args[1]
+        self.assertEqual(node_info["workflow"]["return_nodes"], ["a"])
+
+    @unittest.mock.patch("model.openalea.runner.openalea_runner.run_node_subprocess")
+    def test_execute_workflow_cycle(self, mock_run_node):
+        """Test that cyclic workflows are rejected without spawning a subprocess."""
+        edges = [{"source": "a", "target": "b"}, {"source": "b", "target": "a"}]
+        result = OpenAleaRunner.execute_workflow(nodes=[{"id": "a"}, {"id": "b"}], edges=edges)
+
+        self.assertFalse(result["success"])
+        self.assertIn("cycle", result["error"])
+        mock_run_node.assert_not_called()
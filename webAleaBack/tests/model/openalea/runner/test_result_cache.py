@@ -0,0 +1,142 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest import mock
+
+from model.openalea.cache import object_cache
+from model.openalea.runner import result_cache
+from model.openalea.runner.openalea_runner import OpenAleaRunner
+
+
+def _response(value):
+    return {"success": True, "outputs": [{"index": 0, "name": "out", "value": value, "type": "int"}]}
+
+
+class TestResultCacheKey(TestCase):
+    def test_hash_is_order_independent(self):
+        self.assertEqual(
+            result_cache.hash_inputs({"a": 1, "b": [1, 2]}),
+            result_cache.hash_inputs({"b": [1, 2], "a": 1}),
+        )
+        self.assertNotEqual(result_cache.hash_inputs({"a": 1}), result_cache.hash_inputs({"a": 2}))
+
+    def test_refs_hash_by_id(self):
+        first = {"x": {"__type__": "Foo", "__ref__": "abc", "summary": "Foo(1)"}}
+        second = {"x": {"__type__": "Foo", "__ref__": "abc", "summary": "changed"}}
+        self.assertEqual(result_cache.hash_inputs(first), result_cache.hash_inputs(second))
+
+    def test_key_includes_package_version(self):
+        with mock.patch.object(result_cache, "package_version", return_value="1.0"):
+            key_v1 = result_cache.result_cache_key("openalea.math", "addition", {"a": 1})
+        with mock.patch.object(result_cache, "package_version", return_value="2.0"):
+            key_v2 = result_cache.result_cache_key("openalea.math", "addition", {"a": 1})
+        self.assertNotEqual(key_v1, key_v2)
+
+    def test_unknown_package_version(self):
+        self.assertEqual(result_cache.package_version("surely.not.installed.pkg"), "unknown")
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"OPENALEA_CACHE_DIR": self._temp_dir.name})
+        self._env.start()
+        self.cache = result_cache.ResultCache(max_entries=2, max_bytes=10_000, exclude=["random", "pkg.noise"])
+
+    def tearDown(self):
+        self._env.stop()
+        self._temp_dir.cleanup()
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", _response(1))
+        self.assertEqual(self.cache.get("k")["outputs"][0]["value"], 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_failures_are_not_stored(self):
+        self.cache.put("k", {"success": False, "error": "boom"})
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_lru_eviction_by_count(self):
+        self.cache.put("a", _response(1))
+        self.cache.put("b", _response(2))
+        self.cache.get("a")
+        self.cache.put("c", _response(3))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_eviction_by_bytes(self):
+        cache = result_cache.ResultCache(max_entries=10, max_bytes=150)
+        cache.put("a", _response("x" * 40))
+        cache.put("b", _response("y" * 40))
+        self.assertIsNone(cache.get("a"))
+        self.assertLessEqual(cache.stats()["bytes"], 150)
+
+    def test_expired_refs_invalidate_entry(self):
+        ref_id = object_cache.cache_store({"big": "object"})
+        self.cache.put("k", _response({"__type__": "dict", "__ref__": ref_id}))
+        self.assertIsNotNone(self.cache.get("k"))
+        object_cache._cache_path(ref_id).unlink()
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_ref_check_runs_outside_lock(self):
+        ref_id = object_cache.cache_store({"big": "object"})
+        self.cache.put("k", _response({"__type__": "dict", "__ref__": ref_id}))
+
+        def check(ref):
+            # Another thread can use the cache while the files are checked
+            self.assertFalse(self.cache._lock.locked())
+            return True
+
+        with mock.patch.object(result_cache, "cache_exists", side_effect=check) as exists:
+            self.assertIsNotNone(self.cache.get("k"))
+        exists.assert_called_once_with(ref_id)
+
+    def test_replaced_entry_is_not_invalidated(self):
+        ref_id = object_cache.cache_store({"big": "object"})
+        self.cache.put("k", _response({"__type__": "dict", "__ref__": ref_id}))
+
+        def replace_then_miss(ref):
+            self.cache.put("k", _response(2))
+            return False
+
+        with mock.patch.object(result_cache, "cache_exists", side_effect=replace_then_miss):
+            self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.get("k")["outputs"][0]["value"], 2)
+
+    def test_excluded_nodes(self):
+        self.assertFalse(self.cache.is_cacheable("any", "random"))
+        self.assertFalse(self.cache.is_cacheable("pkg", "noise"))
+        self.assertTrue(self.cache.is_cacheable("pkg", "addition"))
+
+    def test_returns_copies(self):
+        self.cache.put("k", _response([1]))
+        self.cache.get("k")["outputs"][0]["value"].append(2)
+        self.assertEqual(self.cache.get("k")["outputs"][0]["value"], [1])
+
+
+class TestOpenAleaRunnerMemoization(TestCase):
+    def setUp(self):
+        self.cache = result_cache.ResultCache(max_entries=8, max_bytes=10_000, exclude=["random"])
+        patcher = mock.patch("model.openalea.runner.openalea_runner.get_result_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner._run_payload")
+    def test_second_execution_is_memoized(self, mock_run):
+        mock_run.return_value = _response(5)
+        first = OpenAleaRunner.execute_node("openalea.math", "addition", {"a": 2, "b": 3})
+        second = OpenAleaRunner.execute_node("openalea.math", "addition", {"b": 3, "a": 2})
+        self.assertEqual(first, second)
+        mock_run.assert_called_once()
+
+    @mock.patch("model.openalea.runner.openalea_runner.OpenAleaRunner._run_payload")
+    def test_opt_out(self, mock_run):
+        mock_run.return_value = _response(5)
+        OpenAleaRunner.execute_node("openalea.math", "addition", {"a": 1}, use_cache=False)
+        OpenAleaRunner.execute_node("openalea.math", "addition", {"a": 1}, use_cache=False)
+        OpenAleaRunner.execute_node("openalea.math", "random", {})
+        OpenAleaRunner.execute_node("openalea.math", "random", {})
+        self.assertEqual(mock_run.call_count, 4)
@@ -0,0 +1,150 @@
+"""Tests for the ndarray transport of serialized node outputs."""
+import json
+import mmap
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from model.openalea.runner.utils import serialization
+from model.openalea.runner.utils.input_resolver import resolve_value
+from model.openalea.runner.utils.serialization import serialize_value
+
+
+class TestNdarraySerialization(unittest.TestCase):
+    """Tests ndarray encoding in serialize_value and decoding in resolve_value."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"OPENALEA_CACHE_DIR": self._temp_dir.name})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._temp_dir.cleanup()
+
+    def test_tiny_array_stays_list(self):
+        """Arrays up to the list threshold keep the plain list form."""
+        self.assertEqual(serialize_value(np.arange(6, dtype=np.int16).reshape(2, 3)), [[0, 1, 2], [3, 4, 5]])
+        with mock.patch.dict(os.environ, {"OPENALEA_NDARRAY_LIST_MAX_BYTES": "0"}):
+            self.assertEqual(serialize_value(np.arange(6, dtype=np.int16))["__type__"], "ndarray")
+
+    def test_small_array_is_inlined(self):
+        """Small numeric arrays round-trip through an inline base64 buffer."""
+        array = np.arange(1200, dtype=np.float32).reshape(30, 40)
+        payload = json.loads(json.dumps(serialize_value(array)))
+        self.assertEqual(payload["__type__"], "ndarray")
+        self.assertEqual(payload["dtype"], "<f4")
+        self.assertEqual(payload["shape"], [30, 40])
+
+        restored = resolve_value(payload)
+        np.testing.assert_array_equal(restored, array)
+        self.assertEqual(restored.dtype, np.float32)
+        restored[0, 0] = 42  # inputs stay writable for in-place nodes
+
+    def test_non_contiguous_array(self):
+        """Transposed views are packed in C order."""
+        array = np.arange(600, dtype=np.int64).reshape(20, 30).T
+        np.testing.assert_array_equal(resolve_value(serialize_value(array)), array)
+
+    def test_large_array_is_cached(self):
+        """Arrays above the threshold are stored as .npy refs with a preview."""
+        array = np.arange(100, dtype=np.float64).reshape(10, 10)
+        with mock.patch.dict(os.environ, {"OPENALEA_NDARRAY_INLINE_MAX_BYTES": "64", "OPENALEA_NDARRAY_LIST_MAX_BYTES": "0"}):
+            payload = serialize_value(array)
+        self.assertEqual(payload["__type__"], "ndarray_ref")
+        self.assertEqual(payload["__meta__"]["nbytes"], 800)
+        self.assertEqual(payload["__meta__"]["preview"], list(range(serialization.NDARRAY_PREVIEW_LENGTH)))
+        self.assertNotIn("data", payload)
+
+        restored = resolve_value(json.loads(json.dumps(payload)))
+        self.assertIsInstance(restored, np.memmap)
+        np.testing.assert_array_equal(restored, array)
+
+    def test_complex_preview_is_json(self):
+        """Complex previews are sent as [real, imag] pairs."""
+        array = np.array([1 + 2j, 3 - 4j])
+        with mock.patch.dict(os.environ, {"OPENALEA_NDARRAY_INLINE_MAX_BYTES": "0"}):
+            payload = serialize_value(array)
+        self.assertEqual(payload["__meta__"]["preview"], [[1.0, 2.0], [3.0, -4.0]])
+        np.testing.assert_array_equal(resolve_value(payload), array)
+
+    def test_non_numeric_values_use_tolist(self):
+        """Object arrays, 0-d arrays and numpy scalars keep the list/scalar form."""
+        self.assertEqual(serialize_value(np.array(["a", "b"])), ["a", "b"])
+        self.assertEqual(serialize_value(np.array(3.5)), 3.5)
+        self.assertEqual(serialize_value(np.int64(7)), 7)
+
+    def test_inline_threshold_setting(self):
+        """Invalid threshold values fall back to the default."""
+        with mock.patch.dict(os.environ, {"OPENALEA_NDARRAY_INLINE_MAX_BYTES": "bad"}):
+            self.assertEqual(
+                serialization.get_ndarray_inline_max_bytes(),
+                serialization.DEFAULT_NDARRAY_INLINE_MAX_BYTES,
+            )
+
+
+class TestCollectionSerialization(unittest.TestCase):
+    """Tests size-aware serialization of lists, tuples and dicts."""
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"OPENALEA_CACHE_DIR": self._temp_dir.name})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._temp_dir.cleanup()
+
+    def test_small_collections_stay_inline(self):
+        """Values under the budget serialize exactly as before."""
+        value = {"a": [1, 2, (3, 4)], "b": "text"}
+        self.assertEqual(serialize_value(value), {"a": [1, 2, [3, 4]], "b": "text"})
+
+    def test_long_list_becomes_ref(self):
+        """Lists over the item budget are cached and returned with their head."""
+        value = [(i, i * 2) for i in range(5000)]
+        payload = serialize_value(value)
+        self.assertEqual(payload["__type__"], "builtins.list")
+        self.assertEqual(payload["length"], 5000)
+        self.assertEqual(len(payload["head"]), serialization.COLLECTION_PREVIEW_LENGTH)
+        self.assertEqual(payload["head"][1], [1, 2])
+        self.assertEqual(resolve_value(payload), value)
+
+    def test_byte_budget(self):
+        """Short collections of large values are cached once over the byte budget."""
+        value = {"x": "a" * 100, "y": "b" * 100}
+        with mock.patch.dict(os.environ, {"OPENALEA_COLLECTION_INLINE_MAX_BYTES": "50"}):
+            payload = serialize_value(value)
+        self.assertEqual(payload["length"], 2)
+        self.assertEqual(payload["head"][0], ["x", "a" * 100])
+
+    def test_collection_slice(self):
+        """Slices page through lists and dict items."""
+        self.assertEqual(serialization.serialize_collection_slice(list(range(10)), 8, 5), [8, 9])
+        self.assertEqual(
+            serialization.serialize_collection_slice({"a": 1, "b": 2, "c": 3}, 1, 1),
+            [["b", 2]],
+        )
+
+    def test_cached_arrays_resolve_memory_mapped(self):
+        """Large arrays inside a cached collection come back as views of the mapped segment file."""
+        value = [np.arange(300_000, dtype=np.float64) + i for i in range(40)]
+        with mock.patch.dict(os.environ, {"OPENALEA_CACHE_OOB_MIN_BYTES": "1024"}):
+            payload = serialize_value(value)
+        restored = resolve_value(payload)
+        np.testing.assert_array_equal(restored[3], value[3])
+        base = restored[3]
+        while isinstance(base, np.ndarray):
+            base = base.base
+        self.assertIsInstance(base.obj, mmap.mmap)
+
+    def test_uncacheable_collection_stays_inline(self):
+        """Collections that cannot be pickled fall back to inline serialization."""
+        value = [lambda: None] * 2
+        with mock.patch.dict(os.environ, {"OPENALEA_COLLECTION_INLINE_MAX_ITEMS": "1"}), \
+                mock.patch.object(serialization, "cache_store", side_effect=TypeError("no pickle")):
+            payload = serialize_value(value)
+        self.assertIsInstance(payload, list)
@@ -0,0 +1,146 @@
+"""Tests for the warm OpenAlea worker pool."""
+import subprocess
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from model.openalea.runner import worker_pool
+from model.openalea.runner.openalea_runner import OpenAleaRunner
+from model.openalea.runner.utils.openalea_runner_helpers import kill_process_group
+from model.openalea.runner.worker_pool import WorkerCrashedError, WorkerPool, WorkerStartupTimeout
+
+_TESTS_ROOT = next(p for p in Path(__file__).resolve().parents if p.name == "tests")
+FAKE_WORKER = str(_TESTS_ROOT / "resources" / "runner" / "fake_node_worker.py")
+
+
+def _node_info(node_name="addition", inputs=None):
+    return {"package_name": "openalea.math", "node_name": node_name, "inputs": inputs or {"a": 1}}
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Tests the WorkerPool class against a fake worker script."""
+
+    def setUp(self):
+        self.pool = WorkerPool(FAKE_WORKER, size=1, max_jobs_per_worker=0, startup_timeout=10)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_execute_reuses_worker(self):
+        """Consecutive jobs are served by the same warm process."""
+        first = self.pool.execute(_node_info(inputs={"a": 2}), timeout=10)
+        second = self.pool.execute(_node_info(), timeout=10)
+        self.assertTrue(first["success"])
+        self.assertEqual(first["outputs"][1]["value"], {"a": 2})
+        self.assertEqual(first["outputs"][0]["value"], second["outputs"][0]["value"])
+
+    def test_execute_forwards_job_logs(self):
+        """Worker stderr lines of a job are passed to on_log."""
+        lines = []
+        self.pool.execute(_node_info("addition"), timeout=10, on_log=lines.append)
+        self.assertEqual(lines, ["evaluating addition"])
+
+    def test_execute_reports_serving_process(self):
+        """on_process receives the worker pid during the job and None afterwards."""
+        calls = []
+        pid = self.pool.execute(_node_info(), timeout=10, on_process=calls.append)["outputs"][0]["value"]
+        self.assertEqual(calls, [pid, None])
+
+    def test_killed_worker_fails_job(self):
+        """Killing the serving process group fails the job and the worker is replaced."""
+        def kill_soon(pgid):
+            if pgid is not None:
+                threading.Timer(0.2, kill_process_group, args=(pgid,)).start()
+
+        with self.assertRaises(WorkerCrashedError):
+            self.pool.execute(_node_info("sleep"), timeout=10, on_process=kill_soon)
+        self.assertTrue(self.pool.execute(_node_info(), timeout=10)["success"])
+
+    def test_crashed_worker_is_replaced(self):
+        """A crash fails the job and the next job gets a fresh worker."""
+        pid = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        with self.assertRaises(WorkerCrashedError):
+            self.pool.execute(_node_info("crash"), timeout=10)
+        new_pid = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        self.assertNotEqual(pid, new_pid)
+
+    def test_timed_out_worker_is_killed(self):
+        """A timed out job kills its worker instead of returning it to the pool."""
+        self.pool.start()
+        busy_worker = self.pool._idle[0]
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.pool.execute(_node_info("sleep"), timeout=1)
+        self.assertFalse(busy_worker.is_alive())
+        self.assertTrue(self.pool.execute(_node_info(), timeout=10)["success"])
+
+    def test_worker_recycled_after_max_jobs(self):
+        """Workers are replaced once they served max_jobs_per_worker jobs."""
+        self.pool.max_jobs_per_worker = 1
+        first = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        second = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        self.assertNotEqual(first, second)
+
+    def test_restart_retires_idle_workers(self):
+        """restart() replaces workers started before it."""
+        first = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        self.pool.restart()
+        second = self.pool.execute(_node_info(), timeout=10)["outputs"][0]["value"]
+        self.assertNotEqual(first, second)
+
+    def test_shutdown_refuses_jobs(self):
+        """A shut down pool raises instead of spawning workers."""
+        self.pool.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.pool.execute(_node_info(), timeout=10)
+
+
+class TestWorkerPoolSingleton(unittest.TestCase):
+    """Tests the settings-driven pool accessor."""
+
+    def tearDown(self):
+        worker_pool.shutdown_worker_pool()
+
+    def test_disabled_by_default(self):
+        """No pool is created when RUNNER_POOL_SIZE is 0."""
+        with mock.patch.object(worker_pool.settings, "RUNNER_POOL_SIZE", 0):
+            self.assertIsNone(worker_pool.get_worker_pool())
+
+    def test_pool_is_shared(self):
+        """The accessor returns the same configured pool instance."""
+        with mock.patch.object(worker_pool.settings, "RUNNER_POOL_SIZE", 2):
+            pool = worker_pool.get_worker_pool()
+            self.assertIs(pool, worker_pool.get_worker_pool())
+            self.assertEqual(pool.size, 2)
+
+
+class TestOpenAleaRunnerPool(unittest.TestCase):
+    """Tests that OpenAleaRunner dispatches to the pool when enabled."""
+
+    @mock.patch("model.openalea.runner.openalea_runner.run_node_subprocess")
+    @mock.patch("model.openalea.runner.openalea_runner.get_worker_pool")
+    def test_execute_node_uses_pool(self, mock_get_pool, mock_run_node):
+        """Pool responses are returned without spawning a subprocess."""
+        mock_get_pool.return_value.execute.return_value = {
+            "success": True,
+            "outputs": [{"index": 0, "name": "result", "value": 5, "type": "int"}],
+        }
+        result = OpenAleaRunner.execute_node("openalea.math", "addition", {"a": 2, "b": 3})
+        self.assertTrue(result["success"])
+        mock_run_node.assert_not_called()
+
+    @mock.patch("model.openalea.runner.openalea_runner.get_worker_pool")
+    def test_execute_node_worker_crash(self, mock_get_pool):
+        """Worker crashes are reported as failed executions."""
+        mock_get_pool.return_value.execute.side_effect = WorkerCrashedError("boom")
+        result = OpenAleaRunner.execute_node("openalea.math", "addition", {})
+        self.assertFalse(result["success"])
+        self.assertIn("boom", result["error"])
+
+    @mock.patch("model.openalea.runner.openalea_runner.get_worker_pool")
+    def test_execute_node_startup_timeout(self, mock_get_pool):
+        """Startup timeouts report the pool's startup timeout, not the execution one."""
+        mock_get_pool.return_value.execute.side_effect = WorkerStartupTimeout(cmd="worker 1", timeout=120)
+        result = OpenAleaRunner.execute_node("openalea.math", "addition", {}, timeout=5)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Worker startup timed out after 120 seconds")
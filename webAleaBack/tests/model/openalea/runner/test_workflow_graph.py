@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from model.openalea.runner.utils import workflow_graph as graph
+
+
+def _node(node_id, inputs=None, outputs=None, package="openalea.math", name="addition"):
+    return {
+        "id": node_id,
+        "packageName": package,
+        "nodeName": name,
+        "inputs": inputs or [],
+        "outputs": outputs or [],
+    }
+
+
+def _edge(source, target, source_handle="output_0", target_handle="in_0"):
+    return {"source": source, "sourceHandle": source_handle, "target": target, "targetHandle": target_handle}
+
+
+class TestWorkflowGraph(TestCase):
+    def test_topological_order(self):
+        nodes = [_node("c"), _node("b"), _node("a")]
+        edges = [_edge("a", "b"), _edge("b", "c"), _edge("a", "c")]
+        self.assertEqual(graph.topological_order(nodes, edges), ["a", "b", "c"])
+
+    def test_topological_order_detects_cycle(self):
+        nodes = [_node("a"), _node("b"), _node("root")]
+        edges = [_edge("a", "b"), _edge("b", "a")]
+        with self.assertRaises(ValueError) as ctx:
+            graph.topological_order(nodes, edges)
+        self.assertIn("cycle", str(ctx.exception))
+
+    def test_topological_order_rejects_unknown_edge(self):
+        with self.assertRaises(ValueError):
+            graph.topological_order([_node("a")], [_edge("a", "missing")])
+
+    def test_output_index(self):
+        self.assertEqual(graph.output_index("output_3"), 3)
+        self.assertEqual(graph.output_index(None), 0)
+
+    def test_sink_node_ids(self):
+        nodes = [_node("a"), _node("b"), _node("c")]
+        self.assertEqual(graph.sink_node_ids(nodes, [_edge("a", "b")]), ["b", "c"])
+
+    def test_gather_inputs_prefers_live_upstream_values(self):
+        upstream = object()
+        node = _node("b", inputs=[
+            {"id": "in_0", "name": "a", "value": 1},
+            {"id": "in_1", "name": "b", "value": None, "default": 7},
+        ])
+        inputs = graph.gather_inputs(
+            node,
+            [_edge("a", "b", "output_1", "in_0")],
+            {"a": ["unused", upstream]},
+            resolve=lambda value: value,
+        )
+        self.assertIs(inputs["a"], upstream)
+        self.assertEqual(inputs["b"], 7)
+
+    def test_gather_inputs_resolves_literals_only(self):
+        node = _node("b", inputs=[{"id": "in_0", "name": "a", "value": {"__ref__": "x"}}])
+        inputs = graph.gather_inputs(node, [], {}, resolve=lambda value: "resolved")
+        self.assertEqual(inputs["a"], "resolved")
+
+    def test_primitive_outputs(self):
+        node = {"id": "p", "outputs": [{"name": "value", "value": 4}]}
+        self.assertFalse(graph.is_openalea_node(node))
+        self.assertEqual(graph.primitive_outputs(node, resolve=lambda value: value), [4])
@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils.batching import batch_scene, batched_cache_key
+
+RED = {"color": [1, 0, 0], "opacity": 1}
+GREEN = {"color": [0, 1, 0], "opacity": 1}
+TRIANGLE = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]], "indices": [[0, 1, 2]]}
+QUAD = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], "indices": [[0, 1, 2, 3]]}
+
+
+def mesh(obj_id, geometry, material=RED, **extra):
+    return {"id": obj_id, "objectType": "mesh", "geometry": geometry, "material": material, **extra}
+
+
+class TestBatching(TestCase):
+    def test_merges_per_material_with_rebased_indices(self):
+        scene = {"objects": [mesh("a", TRIANGLE), mesh("b", QUAD), mesh("c", TRIANGLE, GREEN)]}
+        batched = batch_scene(scene)
+        self.assertEqual(len(batched["objects"]), 2)
+        red = batched["objects"][0]
+        self.assertEqual(red["material"], RED)
+        self.assertEqual(red["batch"], {"ids": ["a", "b"], "faceOffsets": [0, 1, 3]})
+        self.assertEqual(len(red["geometry"]["vertices"]), 7)
+        self.assertEqual(red["geometry"]["indices"], [[0, 1, 2], [3, 4, 5], [3, 5, 6]])
+        self.assertEqual(batched["objects"][1]["batch"]["ids"], ["c"])
+
+    def test_materials_differing_beyond_color_are_not_merged(self):
+        shiny = dict(RED, shininess=0.9)
+        scene = {"objects": [mesh("a", TRIANGLE), mesh("b", TRIANGLE, shiny), mesh("c", QUAD, {"color": [1.0, 0.0, 0.0]})]}
+        batched = batch_scene(scene)
+        self.assertEqual([obj["batch"]["ids"] for obj in batched["objects"]], [["a", "c"], ["b"]])
+        self.assertEqual(batched["objects"][1]["material"], shiny)
+
+    def test_bakes_transforms(self):
+        translated = mesh("a", TRIANGLE, transform={"position": [0, 0, 5], "rotation": [0, 0, 0], "scale": [1, 1, 1]})
+        matrix = np.identity(4)
+        matrix[0, 0] = -1
+        mirrored = mesh("b", TRIANGLE, transform={"matrix": matrix.T.reshape(-1).tolist()})
+        geometry = batch_scene({"objects": [translated, mirrored]})["objects"][0]["geometry"]
+        np.testing.assert_allclose(geometry["vertices"][:3], [[0, 0, 5], [1, 0, 5], [0, 1, 5]])
+        np.testing.assert_allclose(geometry["vertices"][3:], [[0, 0, 0], [-1, 0, 0], [0, 1, 0]])
+        # The mirrored copy keeps its front face by reversing the winding
+        self.assertEqual(geometry["indices"][1], [5, 4, 3])
+
+    def test_batch_bbox_covers_baked_vertices(self):
+        translated = mesh("a", TRIANGLE, transform={"position": [0, 0, 5], "rotation": [0, 0, 0], "scale": [1, 1, 1]})
+        batch = batch_scene({"objects": [translated, mesh("b", QUAD)]})["objects"][0]
+        self.assertEqual(batch["bbox"], [0, 0, 0, 1, 1, 5])
+
+    def test_keeps_instances_and_other_objects(self):
+        scene = {
+            "objects": [
+                {"id": "i1", "objectType": "mesh", "geometryRef": "g0", "material": RED},
+                {"id": "i2", "objectType": "mesh", "geometryRef": "g0", "material": RED},
+                {"id": "s", "objectType": "mesh", "geometryRef": "g1", "material": RED},
+                mesh("anim", TRIANGLE, animation={"type": "rotation"}),
+                {"id": "t", "objectType": "text", "text": "x", "position": [0, 0, 0]},
+            ],
+            "geometries": {"g0": TRIANGLE, "g1": QUAD},
+        }
+        batched = batch_scene(scene)
+        ids = [obj["id"] for obj in batched["objects"]]
+        self.assertEqual(ids, ["batch-0", "i1", "i2", "anim", "t"])
+        self.assertEqual(batched["objects"][0]["batch"]["ids"], ["s"])
+        self.assertEqual(set(batched["geometries"]), {"g0"})
+
+    def test_non_indexed_meshes_are_triangle_lists(self):
+        geometry = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]]}
+        batched = batch_scene({"objects": [mesh("a", geometry)]})
+        self.assertEqual(batched["objects"][0]["geometry"]["indices"], [[0, 1, 2]])
+
+    def test_batched_cache_key(self):
+        self.assertEqual(batched_cache_key("abc.lod-preview"), "abc.lod-preview.batched")
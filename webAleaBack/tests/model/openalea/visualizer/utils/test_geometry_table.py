@@ -0,0 +1,97 @@
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils.geometry_table import GeometryTable
+
+
+def _has_plantgl() -> bool:
+    try:
+        import openalea.plantgl.all  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+class FakeGeometry:
+    """Geometry with a PlantGL-like object id; ``size`` defines its mesh."""
+
+    def __init__(self, object_id, size):
+        self.object_id = object_id
+        self.size = size
+
+    def getObjectId(self):
+        return self.object_id
+
+
+calls = []
+
+
+def fake_tessellate_chunk(geometries):
+    calls.append([geometry.object_id for geometry in geometries])
+    return [
+        {
+            "type": "mesh",
+            "vertices": np.array([[0, 0, 0], [geometry.size, 0, 0], [0, geometry.size, 0]], dtype=np.float64),
+            "indices": np.array([[0, 1, 2]], dtype=np.uint32),
+        }
+        for geometry in geometries
+    ]
+
+
+class TestGeometryTable(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.table = GeometryTable(fake_tessellate_chunk)
+
+    def test_same_instance_is_tessellated_once(self):
+        geometry = FakeGeometry(1, 1.0)
+        self.assertEqual(self.table.add(geometry), self.table.add(geometry))
+        geometries = self.table.tessellate()
+        self.assertEqual(calls, [[1]])
+        self.assertEqual(list(geometries), ["g0"])
+
+    def test_equal_meshes_share_a_reference(self):
+        objects = [
+            {"geometryRef": self.table.add(FakeGeometry(1, 1.0))},
+            {"geometryRef": self.table.add(FakeGeometry(2, 1.0))},
+            {"geometryRef": self.table.add(FakeGeometry(3, 2.0))},
+            {"objectType": "text"},
+        ]
+        geometries = self.table.tessellate()
+        self.table.remap(objects)
+        self.assertEqual(list(geometries), ["g0", "g2"])
+        self.assertEqual([obj.get("geometryRef") for obj in objects], ["g0", "g0", "g2", None])
+        self.assertEqual(set(self.table.digests), {"g0", "g2"})
+        self.assertEqual(set(self.table.bounds), {"g0", "g2"})
+        self.assertEqual(geometries["g2"]["vertices"][1], [2.0, 0.0, 0.0])
+
+    def test_alias_across_chunks_points_at_emitted_geometry(self):
+        first = {"geometryRef": self.table.add(FakeGeometry(1, 1.0))}
+        self.assertEqual(list(self.table.tessellate()), ["g0"])
+        self.table.remap([first])
+        second = {"geometryRef": self.table.add(FakeGeometry(2, 1.0))}
+        # The equal mesh was emitted with the previous chunk
+        self.assertEqual(self.table.tessellate(), {})
+        self.table.remap([second])
+        self.assertEqual(second["geometryRef"], "g0")
+        self.assertEqual(self.table.resolve("g1"), "g0")
+        self.assertEqual(calls, [[1], [2]])
+
+
+@unittest.skipUnless(_has_plantgl(), "PlantGL not installed")
+class TestSerializeGeometryTable(TestCase):
+    def test_distinct_equal_geometries_share_a_reference(self):
+        from openalea.plantgl.all import Box, Scene, Shape, Translated, Vector3
+        from model.openalea.visualizer.utils.serialize import serialize_scene
+
+        scene = Scene([
+            Shape(Box(Vector3(1, 1, 1))),
+            Shape(Translated(Vector3(2, 0, 0), Box(Vector3(1, 1, 1)))),
+        ])
+        scene_json = serialize_scene(scene, workers=1)
+        refs = [obj["geometryRef"] for obj in scene_json["objects"]]
+        self.assertEqual(refs[0], refs[1])
+        self.assertEqual(list(scene_json["geometries"]), [refs[0]])
+        self.assertEqual(scene_json["objects"][1]["transform"]["matrix"][12], 2)
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import instancing
+
+
+def _apply(matrix, point):
+    return (matrix @ np.append(point, 1.0))[:3]
+
+
+class TestInstancing(TestCase):
+    def test_translation_and_scaling(self):
+        matrix = instancing.translation_matrix([1, 2, 3]) @ instancing.scaling_matrix([2, 2, 2])
+        np.testing.assert_allclose(_apply(matrix, [1, 1, 1]), [3, 4, 5])
+
+    def test_orientation(self):
+        matrix = instancing.orientation_matrix([0, 1, 0], [-1, 0, 0])
+        np.testing.assert_allclose(_apply(matrix, [1, 0, 0]), [0, 1, 0])
+        np.testing.assert_allclose(_apply(matrix, [0, 0, 1]), [0, 0, 1])
+
+    def test_axis_rotation(self):
+        matrix = instancing.axis_rotation_matrix([0, 0, 2], np.pi / 2)
+        np.testing.assert_allclose(_apply(matrix, [1, 0, 0]), [0, 1, 0], atol=1e-12)
+        self.assertTrue(instancing.is_identity(instancing.axis_rotation_matrix([0, 0, 0], 1.0)))
+
+    def test_euler_rotation_order(self):
+        matrix = instancing.euler_rotation_matrix(np.pi / 2, 0, np.pi / 2)
+        # Roll about x first, then azimuth about z
+        np.testing.assert_allclose(_apply(matrix, [0, 1, 0]), [0, 0, 1], atol=1e-12)
+        np.testing.assert_allclose(_apply(matrix, [1, 0, 0]), [0, 1, 0], atol=1e-12)
+
+    def test_matrix_to_list_is_column_major(self):
+        values = instancing.matrix_to_list(instancing.translation_matrix([1, 2, 3]))
+        self.assertEqual(len(values), 16)
+        self.assertEqual(values[12:15], [1.0, 2.0, 3.0])
+
+    def test_transform_matrix(self):
+        matrix = instancing.transform_matrix({"position": [1, 0, 0], "rotation": [0, 0, np.pi / 2], "scale": [2, 2, 2]})
+        np.testing.assert_allclose(_apply(matrix, [1, 0, 0]), [1, 2, 0], atol=1e-12)
+        column_major = instancing.matrix_to_list(matrix)
+        np.testing.assert_allclose(instancing.transform_matrix({"matrix": column_major}), matrix)
+        self.assertTrue(instancing.is_identity(instancing.transform_matrix(None)))
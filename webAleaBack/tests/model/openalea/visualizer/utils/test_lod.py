@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import lod
+
+
+def _grid(size=40, offset=0.0):
+    """Flat square patch of 2 * (size - 1)^2 triangles."""
+    xs, ys = np.meshgrid(np.linspace(0, 1, size), np.linspace(0, 1, size))
+    vertices = np.column_stack([xs.ravel() + offset, ys.ravel(), np.zeros(size * size)])
+    faces = []
+    for i in range(size - 1):
+        for j in range(size - 1):
+            a = i * size + j
+            faces += [[a, a + 1, a + size], [a + 1, a + size + 1, a + size]]
+    return vertices.tolist(), faces
+
+
+def _scene_triangles(scene):
+    geometries = scene.get("geometries", {})
+    total = 0
+    for obj in scene["objects"]:
+        geometry = geometries.get(obj.get("geometryRef")) or obj.get("geometry") or {}
+        total += len(geometry.get("indices") or [])
+    return total
+
+
+class TestParseLod(TestCase):
+    def test_levels(self):
+        self.assertIsNone(lod.parse_lod(None))
+        self.assertIsNone(lod.parse_lod("full"))
+        self.assertEqual(lod.parse_lod("preview"), "preview")
+        self.assertEqual(lod.parse_lod(5000), "t5000")
+        self.assertEqual(lod.parse_lod("5000"), "t5000")
+        self.assertEqual(lod.lod_triangle_budget("t5000"), 5000)
+        self.assertEqual(lod.lod_cache_key("abc", "preview"), "abc.lod-preview")
+
+    def test_invalid(self):
+        for value in ("huge", 0, -3, True):
+            with self.assertRaises(ValueError):
+                lod.parse_lod(value)
+
+
+class TestSceneLod(TestCase):
+    def test_budget_is_respected(self):
+        vertices, faces = _grid()
+        scene = {"objects": [
+            {"id": i, "objectType": "mesh", "geometry": {"type": "mesh", "vertices": vertices, "indices": faces}}
+            for i in range(4)
+        ] + [{"id": "label", "objectType": "text", "text": "plant"}]}
+        source = _scene_triangles(scene)
+
+        result = lod.scene_lod(scene, 1000, "t1000")
+
+        self.assertTrue(result["lod"]["decimated"])
+        self.assertEqual(result["lod"]["sourceTriangles"], source)
+        self.assertLessEqual(_scene_triangles(result), 1000 * 1.2)
+        self.assertGreater(_scene_triangles(result), 1000 * 0.3)
+        self.assertEqual(result["lod"]["triangles"], _scene_triangles(result))
+        self.assertEqual(result["objects"][4], scene["objects"][4])
+        # Source scene is left untouched
+        self.assertEqual(_scene_triangles(scene), source)
+        for obj in result["objects"][:4]:
+            vertices = np.asarray(obj["geometry"]["vertices"])
+            self.assertLess(np.asarray(obj["geometry"]["indices"]).max(), len(vertices))
+            np.testing.assert_array_less(vertices[:, :2], 1.0 + 1e-9)
+
+    def test_shared_geometries_weighted_by_instances(self):
+        vertices, faces = _grid()
+        instance = {"objectType": "mesh", "geometryRef": "g0", "transform": {"matrix": [1.0] * 16}}
+        scene = {
+            "objects": [dict(instance, id=i) for i in range(10)],
+            "geometries": {"g0": {"type": "mesh", "vertices": vertices, "indices": faces}},
+        }
+        result = lod.scene_lod(scene, 2000, "t2000")
+        self.assertLessEqual(_scene_triangles(result), 2000 * 1.2)
+        self.assertEqual(len(scene["geometries"]["g0"]["indices"]), len(faces))
+
+    def test_small_scene_is_unchanged(self):
+        vertices, faces = _grid(5)
+        scene = {"objects": [{"id": 1, "objectType": "mesh", "geometry": {"type": "mesh", "vertices": vertices, "indices": faces}}]}
+        result = lod.scene_lod(scene, 1000, "preview")
+        self.assertFalse(result["lod"]["decimated"])
+        self.assertEqual(result["objects"], scene["objects"])
+
+    def test_decimate_meshes_batches_many_objects(self):
+        vertices, faces = _grid(10)
+        meshes = [(np.asarray(vertices) + [k, 0, 0], np.asarray(faces)) for k in range(200)]
+        result = lod.decimate_meshes(meshes, [20] * 200)
+        counts = [len(triangles) for _, triangles in result]
+        self.assertTrue(all(0 < count <= 24 for count in counts))
+        np.testing.assert_allclose(np.asarray(result[7][0])[:, 0].min(), 7, atol=0.2)
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import mesh_arrays
+
+
+class SequencePoint:
+    """Stand-in for a PlantGL Vector3 supporting the sequence protocol."""
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+
+class AttributePoint:
+    """Stand-in for a point only exposing x/y/z attributes."""
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class ArrayBacked:
+    """Stand-in for a PlantGL array exposing the NumPy array protocol."""
+
+    def __init__(self, data):
+        self._data = np.asarray(data)
+
+    def __array__(self, dtype=None, copy=None):
+        return self._data if dtype is None else self._data.astype(dtype)
+
+
+class TestMeshArrays(TestCase):
+    def test_points_bulk_conversion(self):
+        points = [SequencePoint(0, 1, 2), SequencePoint(3.5, 4, 5)]
+        array = mesh_arrays.points_to_array(points)
+        self.assertEqual(array.dtype, np.float32)
+        self.assertTrue(array.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(array, [[0, 1, 2], [3.5, 4, 5]])
+
+    def test_points_array_protocol(self):
+        array = mesh_arrays.points_to_array(ArrayBacked([[1, 2, 3]]), dtype=np.float64)
+        self.assertEqual(array.dtype, np.float64)
+        np.testing.assert_array_equal(array, [[1, 2, 3]])
+
+    def test_points_attribute_fallback(self):
+        array = mesh_arrays.points_to_array([AttributePoint(1, 2, 3)])
+        np.testing.assert_array_equal(array, [[1, 2, 3]])
+
+    def test_points_empty(self):
+        self.assertEqual(mesh_arrays.points_to_array([]).shape, (0, 3))
+
+    def test_indices_conversion(self):
+        faces = mesh_arrays.indices_to_array([(0, 1, 2), (2, 3, 0)])
+        self.assertEqual(faces.dtype, np.uint32)
+        np.testing.assert_array_equal(faces, [[0, 1, 2], [2, 3, 0]])
+
+    def test_indices_ragged(self):
+        self.assertIsNone(mesh_arrays.indices_to_array([(0, 1, 2), (0, 1, 2, 3)]))
+        self.assertIsNone(mesh_arrays.indices_to_array([(0, 1), (0, 1, 2, 3)]))
+
+    def test_indices_fallback_for_non_sequence_faces(self):
+        class Face:
+            def __init__(self, *values):
+                self._values = values
+
+            def __iter__(self):
+                return iter(self._values)
+
+        faces = mesh_arrays.indices_to_array([Face(0, 1, 2)])
+        np.testing.assert_array_equal(faces, [[0, 1, 2]])
@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import mesh_codec
+
+
+def _soup_grid(size=20):
+    """Triangle soup of a curved grid, one vertex copy per face like the Tesselator output."""
+    u, v = np.meshgrid(np.linspace(0, 1, size), np.linspace(0, 3, size))
+    points = np.column_stack([u.ravel(), v.ravel(), np.sin(3 * u.ravel())])
+    grid = np.arange(size * size).reshape(size, size)
+    triangles = np.concatenate([
+        np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 3),
+        np.stack([grid[1:, :-1], grid[:-1, 1:], grid[1:, 1:]], axis=-1).reshape(-1, 3),
+    ])
+    soup = points[triangles].reshape(-1, 3)
+    return soup, np.arange(len(soup)).reshape(-1, 3)
+
+
+def _soup_cube():
+    """Triangle soup of a unit cube, one vertex copy per face."""
+    corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+    quads = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    triangles = np.array([[q[0], q[1], q[2]] for q in quads] + [[q[0], q[2], q[3]] for q in quads])
+    soup = corners[triangles].reshape(-1, 3)
+    return soup, np.arange(len(soup)).reshape(-1, 3)
+
+
+class TestMeshCodec(TestCase):
+    def test_weld_keeps_first_occurrence_order(self):
+        vertices = np.array([[1, 0, 0], [0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=float)
+        welded, triangles = mesh_codec.weld_vertices(vertices, np.array([[0, 1, 3], [2, 3, 1]]))
+        np.testing.assert_array_equal(welded, [[1, 0, 0], [0, 0, 0], [0, 1, 0]])
+        np.testing.assert_array_equal(triangles, [[0, 1, 2], [0, 2, 1]])
+
+    def test_weld_keeps_hard_edges(self):
+        soup, triangles = _soup_cube()
+        welded, welded_triangles = mesh_codec.weld_vertices(soup, triangles, mesh_codec.CREASE_ANGLE)
+        # One vertex per cube corner and face
+        self.assertEqual(len(welded), 24)
+        self.assertEqual(len(mesh_codec.weld_vertices(soup, triangles)[0]), 8)
+
+        decoded = mesh_codec.decode_mesh(mesh_codec.encode_mesh(soup, triangles))
+        face_normals = np.cross(
+            soup[triangles[:, 1]] - soup[triangles[:, 0]], soup[triangles[:, 2]] - soup[triangles[:, 0]]
+        )
+        corner_normals = decoded["normals"][decoded["triangles"]]
+        cosines = np.sum(corner_normals * face_normals[:, None, :], axis=2)
+        self.assertGreater(cosines.min(), np.cos(np.radians(0.01)))
+
+    def test_round_trip_accuracy(self):
+        soup, triangles = _soup_grid()
+        encoded = mesh_codec.encode_mesh(soup, triangles)
+        self.assertEqual(len(encoded["positions"]), 400)
+        self.assertEqual(encoded["indices"].dtype, np.uint16)
+
+        decoded = mesh_codec.decode_mesh(encoded)
+        error = np.abs(decoded["vertices"][decoded["triangles"]] - soup[triangles])
+        self.assertTrue(np.all(error <= encoded["scale"] / 2 + 1e-12))
+
+        welded, welded_triangles = mesh_codec.weld_vertices(soup, triangles)
+        normals = mesh_codec.vertex_normals(welded, welded_triangles)
+        cosines = np.sum(decoded["normals"] * normals, axis=1)
+        self.assertGreater(cosines.min(), np.cos(np.radians(0.01)))
+
+    def test_octahedral_covers_both_hemispheres(self):
+        normals = np.array([[0, 0, 1], [0, 0, -1], [1, 0, 0], [-0.6, 0, -0.8], [0.48, -0.6, -0.64]])
+        decoded = mesh_codec.octahedral_decode(mesh_codec.octahedral_encode(normals))
+        np.testing.assert_allclose(decoded, normals, atol=1e-4)
+
+    def test_deflate_round_trip(self):
+        soup, triangles = _soup_grid()
+        encoded = mesh_codec.encode_mesh(soup, triangles)
+        data = mesh_codec.deflate_mesh(encoded)
+        inflated = mesh_codec.inflate_mesh(data)
+        for key, value in encoded.items():
+            np.testing.assert_array_equal(inflated[key], value)
+            self.assertEqual(inflated[key].dtype, value.dtype)
+        self.assertLess(len(data), sum(value.nbytes for value in encoded.values()))
+
+    def test_large_meshes_use_uint32_indices(self):
+        vertices = np.random.default_rng(0).random((70_000, 3))
+        encoded = mesh_codec.encode_mesh(vertices, np.arange(69_999).reshape(-1, 3), normals=False)
+        self.assertEqual(encoded["indices"].dtype, np.uint32)
+        self.assertNotIn("normals", encoded)
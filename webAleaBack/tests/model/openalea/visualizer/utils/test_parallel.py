@@ -0,0 +1,41 @@
+from unittest import TestCase
+from unittest import mock
+
+from model.openalea.visualizer.utils import parallel
+
+
+def _square_chunk(items):
+    return [item * item for item in items]
+
+
+class TestParallel(TestCase):
+    def tearDown(self):
+        parallel.shutdown_pool()
+
+    def test_split_chunks_keeps_order(self):
+        chunks = parallel.split_chunks(list(range(10)), 4)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 2, 2])
+        self.assertEqual(sum(chunks, []), list(range(10)))
+        self.assertEqual(parallel.split_chunks([1, 2], 8), [[1], [2]])
+
+    def test_single_worker_runs_in_process(self):
+        with mock.patch.object(parallel, "_get_pool") as get_pool:
+            self.assertEqual(parallel.map_chunks(_square_chunk, [1, 2, 3], 1), [1, 4, 9])
+        get_pool.assert_not_called()
+
+    def test_worker_limit_caps_the_pool(self):
+        parallel.limit_workers(1)
+        self.addCleanup(parallel.limit_workers, None)
+        with mock.patch.object(parallel, "_get_pool") as get_pool:
+            self.assertEqual(parallel.map_chunks(_square_chunk, [1, 2, 3], 8), [1, 4, 9])
+        get_pool.assert_not_called()
+
+    def test_pool_results_are_merged_in_order(self):
+        items = list(range(50))
+        self.assertEqual(parallel.map_chunks(_square_chunk, items, 2), [item * item for item in items])
+
+    def test_pool_failure_falls_back_to_single_process(self):
+        pool = mock.Mock()
+        pool.map.side_effect = RuntimeError("Pickling of this object is not enabled")
+        with mock.patch.object(parallel, "_get_pool", return_value=pool):
+            self.assertEqual(parallel.map_chunks(_square_chunk, [1, 2, 3], 2), [1, 4, 9])
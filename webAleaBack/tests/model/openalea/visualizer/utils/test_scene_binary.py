@@ -0,0 +1,131 @@
+import json
+import struct
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import scene_binary
+
+
+def _scene(vertex_count=4, indices=None):
+    vertices = [[float(i), float(i) + 0.5, -float(i)] for i in range(vertex_count)]
+    material = {"color": [0.1, 0.2, 0.3], "opacity": 1.0}
+    return {
+        "objects": [
+            {
+                "id": "mesh-1",
+                "objectType": "mesh",
+                "geometry": {"type": "mesh", "vertices": vertices, "indices": indices or [[0, 1, 2], [2, 3, 0]]},
+                "material": material,
+                "transform": {"position": [0, 0, 0], "rotation": [0, 0, 0], "scale": [1, 1, 1]},
+            },
+            {
+                "id": "line-1",
+                "objectType": "line",
+                "geometry": {"type": "line", "vertices": vertices[:2]},
+                "material": dict(material),
+            },
+            {"id": "text-1", "objectType": "text", "text": "hello", "position": [1, 2, 3]},
+        ]
+    }
+
+
+def _header(data):
+    _, _, header_length = struct.unpack_from("<4sII", data)
+    return header_length, json.loads(data[12:12 + header_length])
+
+
+class TestSceneBinary(TestCase):
+    def test_roundtrip(self):
+        scene = _scene()
+        data = scene_binary.encode_scene_binary(scene)
+        decoded = scene_binary.decode_scene_binary(data)
+
+        mesh, line, text = decoded["objects"]
+        np.testing.assert_allclose(mesh["geometry"]["vertices"], scene["objects"][0]["geometry"]["vertices"])
+        np.testing.assert_array_equal(mesh["geometry"]["indices"], [0, 1, 2, 2, 3, 0])
+        self.assertEqual(mesh["material"], scene["objects"][0]["material"])
+        self.assertEqual(mesh["transform"], scene["objects"][0]["transform"])
+        self.assertEqual(line["geometry"]["vertices"].shape, (2, 3))
+        self.assertEqual(text, scene["objects"][2])
+
+    def test_keeps_bounds(self):
+        scene = _scene()
+        scene["objects"][0]["bbox"] = [0, 0.5, -3, 3, 3.5, 0]
+        scene["bounds"] = {"min": [0, 0.5, -3], "max": [3, 3.5, 0]}
+        decoded = scene_binary.decode_scene_binary(scene_binary.encode_scene_binary(scene))
+        self.assertEqual(decoded["bounds"], scene["bounds"])
+        self.assertEqual(decoded["objects"][0]["bbox"], scene["objects"][0]["bbox"])
+
+    def test_layout(self):
+        data = scene_binary.encode_scene_binary(_scene())
+        magic, version, _ = struct.unpack_from("<4sII", data)
+        self.assertEqual((magic, version), (b"WASB", 1))
+        header_length, header = _header(data)
+        self.assertEqual(header_length % 4, 0)
+        self.assertEqual(len(header["materials"]), 1)
+        self.assertEqual({obj.get("materialIndex") for obj in header["objects"][:2]}, {0})
+        for obj in header["objects"][:2]:
+            for view in (obj["geometry"]["vertices"], obj["geometry"].get("indices")):
+                if view:
+                    self.assertEqual(view["byteOffset"] % 4, 0)
+        self.assertEqual(len(data), 12 + header_length + header["bufferByteLength"])
+
+    def test_index_width(self):
+        _, small = _header(scene_binary.encode_scene_binary(_scene()))
+        self.assertEqual(small["objects"][0]["geometry"]["indices"]["componentType"], "uint16")
+        large = scene_binary.decode_scene_binary(
+            scene_binary.encode_scene_binary(_scene(indices=[[0, 1, 70000]]))
+        )
+        self.assertEqual(large["objects"][0]["geometry"]["indices"].dtype, np.dtype("<u4"))
+
+    def test_polygons_are_fan_triangulated(self):
+        decoded = scene_binary.decode_scene_binary(
+            scene_binary.encode_scene_binary(_scene(indices=[[0, 1, 2, 3], [0, 1, 2]]))
+        )
+        np.testing.assert_array_equal(decoded["objects"][0]["geometry"]["indices"], [0, 1, 2, 0, 2, 3, 0, 1, 2])
+
+    def test_smaller_than_json(self):
+        scene = _scene(vertex_count=3000, indices=[[i, i + 1, i + 2] for i in range(2997)])
+        self.assertLess(len(scene_binary.encode_scene_binary(scene)) * 2, len(json.dumps(scene)))
+
+    def test_shared_geometries_written_once(self):
+        geometry = _scene()["objects"][0]["geometry"]
+        instance = {"objectType": "mesh", "geometryRef": "g0", "transform": {"matrix": [1.0] * 16}}
+        scene = {"objects": [dict(instance, id=i) for i in range(50)], "geometries": {"g0": geometry}}
+        data = scene_binary.encode_scene_binary(scene)
+        _, header = _header(data)
+        self.assertEqual(header["bufferByteLength"], 4 * 3 * 4 + 2 * 6)
+        decoded = scene_binary.decode_scene_binary(data)
+        self.assertEqual(decoded["objects"][7], dict(instance, id=7))
+        np.testing.assert_array_equal(decoded["geometries"]["g0"]["indices"], [0, 1, 2, 2, 3, 0])
+
+    def test_rejects_other_payloads(self):
+        with self.assertRaises(ValueError):
+            scene_binary.decode_scene_binary(b"JSON" + b"\0" * 8)
+
+    def test_compact_roundtrip(self):
+        scene = _scene()
+        data = scene_binary.encode_scene_binary(scene, compact=True)
+        _, header = _header(data)
+        geometry = header["objects"][0]["geometry"]
+        self.assertEqual(geometry["encoding"], "compact")
+        self.assertEqual(geometry["vertices"]["componentType"], "uint16")
+        self.assertEqual(geometry["normals"]["componentType"], "int16")
+        # Lines keep float32 vertices
+        self.assertEqual(header["objects"][1]["geometry"]["vertices"]["componentType"], "float32")
+
+        mesh = scene_binary.decode_scene_binary(data)["objects"][0]["geometry"]
+        np.testing.assert_allclose(
+            mesh["vertices"], scene["objects"][0]["geometry"]["vertices"], atol=np.max(geometry["quantization"]["scale"])
+        )
+        self.assertEqual(mesh["normals"].shape, (4, 3))
+        self.assertNotIn("encoding", mesh)
+
+    def test_compact_welds_vertices(self):
+        soup = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
+        scene = {"objects": [{"id": "m", "objectType": "mesh", "geometry": {"type": "mesh", "vertices": soup, "indices": [[0, 1, 2], [3, 4, 5]]}}]}
+        mesh = scene_binary.decode_scene_binary(scene_binary.encode_scene_binary(scene, compact=True))["objects"][0]["geometry"]
+        self.assertEqual(mesh["vertices"].shape, (4, 3))
+        np.testing.assert_array_equal(mesh["indices"], [0, 1, 2, 1, 3, 2])
+        np.testing.assert_allclose(mesh["normals"], [[0, 0, 1]] * 4, atol=1e-4)
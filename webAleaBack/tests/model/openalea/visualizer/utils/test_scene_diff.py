@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils.scene_diff import (
+    assign_object_ids,
+    diff_cache_key,
+    diff_scenes,
+    mesh_digest,
+)
+
+TRIANGLE = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]], "indices": [[0, 1, 2]]}
+BIG_TRIANGLE = {"type": "mesh", "vertices": [[0, 0, 0], [2, 0, 0], [0, 2, 0]], "indices": [[0, 1, 2]]}
+RED = {"color": [1, 0, 0], "opacity": 1}
+
+
+def leaf(ref, x=0, shape_id=None):
+    obj = {
+        "objectType": "mesh",
+        "geometryRef": ref,
+        "material": RED,
+        "transform": {"position": [x, 0, 0], "rotation": [0, 0, 0], "scale": [1, 1, 1]},
+    }
+    if shape_id is not None:
+        obj["shapeId"] = shape_id
+    return obj
+
+
+def scene(objects, geometries):
+    digests = {ref: ref.upper() for ref in geometries}
+    assign_object_ids(objects, digests, {})
+    return {"objects": objects, "geometries": geometries}
+
+
+class TestObjectIds(TestCase):
+    def test_ids_depend_on_content_only(self):
+        first, second = [leaf("g0", 1, shape_id=3), leaf("g1")], [leaf("g7", 1, shape_id=9), leaf("g1")]
+        assign_object_ids(first, {"g0": "a", "g1": "b"}, {})
+        # Same geometry content under another reference and shape number
+        assign_object_ids(second, {"g7": "a", "g1": "b"}, {})
+        self.assertEqual([obj["id"] for obj in first], [obj["id"] for obj in second])
+        self.assertEqual(len(first[0]["id"]), 20)
+
+    def test_identical_copies_get_distinct_ids(self):
+        objects = [leaf("g0"), leaf("g0"), {"objectType": "text", "text": "a", "position": [0, 0, 0]}]
+        occurrences = {}
+        assign_object_ids(objects[:1], {"g0": "a"}, occurrences)
+        # Chunks share the occurrence counts
+        assign_object_ids(objects[1:], {"g0": "a"}, occurrences)
+        self.assertEqual(len({obj["id"] for obj in objects}), 3)
+
+    def test_mesh_digest(self):
+        mesh = {"type": "mesh", "vertices": np.zeros((3, 3)), "indices": np.array([[0, 1, 2]], dtype=np.uint32)}
+        ragged = {"type": "mesh", "vertices": np.zeros((4, 3)), "indices": [[0, 1, 2, 3]]}
+        self.assertEqual(mesh_digest(mesh), mesh_digest(dict(mesh, vertices=np.zeros((3, 3), dtype=np.float32))))
+        self.assertNotEqual(mesh_digest(mesh), mesh_digest(ragged))
+
+
+class TestDiffScenes(TestCase):
+    def test_added_changed_removed(self):
+        previous = scene([leaf("g0", 0), leaf("g0", 1, shape_id=5), leaf("g0", 2)], {"g0": TRIANGLE})
+        current = scene(
+            [leaf("g0", 0), leaf("g1", 1, shape_id=5), leaf("g0", 3)],
+            {"g0": TRIANGLE, "g1": BIG_TRIANGLE},
+        )
+        diff = diff_scenes(previous, current, "prev")
+        self.assertEqual(diff["base"], "prev")
+        self.assertEqual(diff["unchanged"], 1)
+        self.assertEqual(diff["objectCount"], 3)
+        self.assertEqual([obj["id"] for obj in diff["changed"]], [current["objects"][1]["id"]])
+        self.assertEqual(diff["changed"][0]["previousId"], previous["objects"][1]["id"])
+        self.assertEqual([obj["id"] for obj in diff["added"]], [current["objects"][2]["id"]])
+        self.assertEqual(diff["removed"], [previous["objects"][2]["id"]])
+        # Geometries are keyed by content so they cannot clash with the client's references
+        refs = {obj["geometryRef"] for obj in diff["added"] + diff["changed"]}
+        self.assertEqual(refs, set(diff["geometries"]))
+        self.assertTrue(all(ref.startswith("h") for ref in refs))
+
+    def test_identical_scenes(self):
+        previous = scene([leaf("g0", 0)], {"g0": TRIANGLE})
+        current = scene([leaf("g0", 0)], {"g0": TRIANGLE})
+        diff = diff_scenes(previous, current)
+        self.assertEqual((diff["added"], diff["changed"], diff["removed"], diff["geometries"]), ([], [], [], {}))
+
+    def test_cache_key(self):
+        self.assertEqual(diff_cache_key("new", "old"), "new.diff-old")
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils.spatial import BVH, annotate_bounds, object_boxes, scene_bounds
+
+TRIANGLE = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]], "indices": [[0, 1, 2]]}
+
+
+def _grid_scene(size=6):
+    objects = []
+    for x in range(size):
+        for y in range(size):
+            objects.append({
+                "id": f"{x}-{y}",
+                "objectType": "mesh",
+                "geometryRef": "g",
+                "transform": {"position": [x * 2, y * 2, 0], "rotation": [0, 0, 0], "scale": [1, 1, 1]},
+            })
+    return {"objects": objects, "geometries": {"g": TRIANGLE}}
+
+
+class TestSpatial(TestCase):
+    def test_object_boxes_apply_transforms(self):
+        objects = [
+            {"id": "a", "objectType": "mesh", "geometry": TRIANGLE,
+             "transform": {"position": [10, 0, 0], "rotation": [0, 0, 0], "scale": [2, 2, 2]}},
+            {"id": "b", "objectType": "mesh", "geometryRef": "g",
+             "transform": {"matrix": [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 3, 1]}},
+            {"id": "t", "objectType": "text", "text": "hi", "position": [1, 2, 3]},
+            {"id": "group", "objectType": "group"},
+        ]
+        mins, maxs = object_boxes(objects, {"g": TRIANGLE})
+        np.testing.assert_allclose(mins[0], [10, 0, 0])
+        np.testing.assert_allclose(maxs[0], [12, 2, 0])
+        np.testing.assert_allclose(mins[1], [0, 0, 3])
+        np.testing.assert_allclose(maxs[2], [1, 2, 3])
+        self.assertTrue(np.isnan(mins[3]).all())
+
+    def test_annotate_and_scene_bounds(self):
+        scene = _grid_scene(2)
+        annotate_bounds(scene["objects"], scene["geometries"])
+        self.assertEqual(scene["objects"][3]["bbox"], [2, 2, 0, 3, 3, 0])
+        self.assertEqual(scene_bounds(scene["objects"]), {"min": [0, 0, 0], "max": [3, 3, 0]})
+        self.assertIsNone(scene_bounds([{"id": "group"}]))
+
+    def test_query_box_matches_brute_force(self):
+        bvh = BVH.from_scene(_grid_scene())
+        self.assertGreater(len(bvh.node_child), 1)
+        self.assertEqual(bvh.query_box([3.5, 3.5, -1], [6.5, 4.5, 1]), ["2-2", "3-2"])
+        self.assertEqual(bvh.query_box([100, 100, 100], [101, 101, 101]), [])
+        self.assertEqual(len(bvh.query_box([-1, -1, -1], [20, 20, 1])), 36)
+
+    def test_query_frustum(self):
+        bvh = BVH.from_scene(_grid_scene())
+        # Half-space x <= 2.5 and y <= 0.5
+        self.assertEqual(bvh.query_frustum([[-1, 0, 0, 2.5], [0, -1, 0, 0.5]]), ["0-0", "1-0"])
+
+    def test_round_trip_bytes(self):
+        bvh = BVH.from_scene(_grid_scene())
+        loaded = BVH.from_bytes(bvh.to_bytes())
+        self.assertEqual(loaded.ids, bvh.ids)
+        self.assertEqual(loaded.query_box([0, 0, 0], [4, 0.5, 0]), bvh.query_box([0, 0, 0], [4, 0.5, 0]))
+
+    def test_empty_scene(self):
+        bvh = BVH.from_scene({"objects": [{"id": "group", "objectType": "group"}]})
+        self.assertEqual(bvh.query_box([0, 0, 0], [1, 1, 1]), [])
+        self.assertEqual(BVH.from_bytes(bvh.to_bytes()).query_frustum([[1, 0, 0, 0]]), [])
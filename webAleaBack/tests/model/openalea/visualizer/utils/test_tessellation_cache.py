@@ -0,0 +1,115 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from model.openalea.visualizer.utils import tessellation_cache
+
+
+class Sphere:
+    """Picklable stand-in for a parametric PlantGL geometry."""
+
+    def __init__(self, radius, slices, name=""):
+        self.radius = radius
+        self.slices = slices
+        self.name = name
+
+
+class Extrusion:
+    """Stand-in for a PlantGL geometry exposing its fields as properties, with a nested scene object."""
+
+    __slots__ = ("_profile", "_name")
+
+    def __init__(self, profile, name=""):
+        self._profile = profile
+        self._name = name
+
+    profile = property(lambda self: self._profile)
+    name = property(lambda self: self._name)
+
+    def getObjectId(self):
+        return id(self)
+
+
+def _mesh(vertex_count=3):
+    return {
+        "type": "mesh",
+        "vertices": np.zeros((vertex_count, 3), dtype=np.float64),
+        "indices": np.array([[0, 1, 2]], dtype=np.uint32),
+    }
+
+
+class TestTessellationKey(TestCase):
+    def test_key_follows_parameters(self):
+        key = tessellation_cache.tessellation_key(Sphere(1.0, 8), "Tesselator", np.float64)
+        self.assertEqual(key, tessellation_cache.tessellation_key(Sphere(1.0, 8), "Tesselator", np.float64))
+        self.assertNotEqual(key, tessellation_cache.tessellation_key(Sphere(1.0, 16), "Tesselator", np.float64))
+        self.assertNotEqual(key, tessellation_cache.tessellation_key(Sphere(1.0, 8), "Tesselator", np.float32))
+
+    def test_key_ignores_names(self):
+        key = tessellation_cache.tessellation_key(Sphere(1.0, 8, "leaf_1"), "Tesselator", np.float64)
+        self.assertEqual(key, tessellation_cache.tessellation_key(Sphere(1.0, 8, "leaf_2"), "Tesselator", np.float64))
+
+    def test_key_ignores_nested_names(self):
+        first = Extrusion(Extrusion(Sphere(1.0, 8), name="profile_1"), name="stem_1")
+        second = Extrusion(Extrusion(Sphere(1.0, 8), name="profile_2"), name="stem_2")
+        key = tessellation_cache.tessellation_key(first, "Tesselator", np.float64)
+        self.assertEqual(key, tessellation_cache.tessellation_key(second, "Tesselator", np.float64))
+        other = Extrusion(Extrusion(Sphere(2.0, 8)))
+        self.assertNotEqual(key, tessellation_cache.tessellation_key(other, "Tesselator", np.float64))
+
+    def test_unpicklable_geometry(self):
+        self.assertIsNone(tessellation_cache.tessellation_key(lambda: None, "Tesselator", np.float64))
+
+
+class TestTessellationCache(TestCase):
+    def test_hit_and_miss_counters(self):
+        cache = tessellation_cache.TessellationCache(max_bytes=10_000)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", _mesh())
+        mesh = cache.get("a")
+        self.assertFalse(mesh["vertices"].flags.writeable)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        size = 3 * 3 * 8 + 3 * 4
+        cache = tessellation_cache.TessellationCache(max_bytes=2 * size)
+        cache.put("a", _mesh())
+        cache.put("b", _mesh())
+        cache.get("a")
+        cache.put("c", _mesh())
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["bytes"], 2 * size)
+
+    def test_oversized_mesh_is_not_kept(self):
+        cache = tessellation_cache.TessellationCache(max_bytes=10)
+        mesh = cache.put("a", _mesh())
+        self.assertEqual(cache.stats()["entries"], 0)
+        # Not shared, so the caller may still modify it
+        self.assertTrue(mesh["vertices"].flags.writeable)
+
+    def test_disk_tier_is_shared(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            disk_dir = Path(tmp) / "tessellation"
+            tessellation_cache.TessellationCache(max_bytes=10_000, disk_dir=disk_dir).put("a", _mesh(4))
+
+            other = tessellation_cache.TessellationCache(max_bytes=10_000, disk_dir=disk_dir)
+            mesh = other.get("a")
+            self.assertEqual(mesh["type"], "mesh")
+            self.assertEqual(mesh["vertices"].shape, (4, 3))
+            np.testing.assert_array_equal(mesh["indices"], [[0, 1, 2]])
+            self.assertEqual(other.stats()["disk_hits"], 1)
+            self.assertEqual(list(disk_dir.glob("*.tmp")), [])
+
+    def test_ragged_faces_stay_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            disk_dir = Path(tmp) / "tessellation"
+            cache = tessellation_cache.TessellationCache(max_bytes=10_000, disk_dir=disk_dir)
+            cache.put("a", dict(_mesh(), indices=[[0, 1, 2], [0, 1, 2, 3]]))
+            self.assertIsNotNone(cache.get("a"))
+            self.assertFalse(disk_dir.exists())
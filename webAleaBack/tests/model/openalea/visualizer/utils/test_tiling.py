@@ -0,0 +1,229 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest import mock
+
+import numpy as np
+
+from core.config import settings
+from model.openalea.cache import object_cache
+from model.openalea.visualizer.utils import visualizer_service
+from model.openalea.visualizer.utils.scene_binary import decode_scene_binary
+from model.openalea.visualizer.utils.tiling import (
+    LeafBuckets,
+    build_octree,
+    coarse_tile_scene,
+    merge_tile_scenes,
+    pack_tile_members,
+    tile_cache_key,
+    unpack_tile_members,
+)
+
+TRIANGLE = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]], "indices": [[0, 1, 2]]}
+GREEN = {"color": [0, 1, 0], "opacity": 1}
+
+
+def _field(size=4):
+    """Grid of instanced triangles plus an inline mesh and a text."""
+    objects = [
+        {
+            "id": f"{x}-{y}",
+            "objectType": "mesh",
+            "geometryRef": "g",
+            "material": GREEN,
+            "transform": {"position": [x * 10, y * 10, 0], "rotation": [0, 0, 0], "scale": [1, 1, 1]},
+        }
+        for x in range(size) for y in range(size)
+    ]
+    objects.append({"id": "inline", "objectType": "mesh", "geometry": TRIANGLE, "material": GREEN})
+    objects.append({"id": "label", "objectType": "text", "text": "plot", "position": [5, 5, 0]})
+    return {"objects": objects, "geometries": {"g": TRIANGLE}}
+
+
+class TestTiling(TestCase):
+    def test_build_octree_splits_until_leaf_capacity(self):
+        mins = np.array([[0, 0, 0], [1, 1, 1], [9, 9, 9], [10, 10, 10], [np.nan] * 3])
+        tiles, leaf_of = build_octree(mins, mins + 0.5, max_objects=2, max_depth=4)
+        self.assertEqual(tiles[0]["id"], "r")
+        self.assertEqual(tiles[0]["objectCount"], 5)
+        self.assertEqual(tiles[0]["bounds"], {"min": [0, 0, 0], "max": [10.5, 10.5, 10.5]})
+        self.assertEqual(tiles[0]["children"], ["r0", "r7"])
+        leaves = [tiles[index]["id"] for index in leaf_of]
+        self.assertEqual(leaves[:2], ["r0", "r0"])
+        self.assertTrue(all(leaf.startswith("r7") for leaf in leaves[2:4]))
+        # Boxless objects go to the tile holding the scene center
+        self.assertTrue(leaves[4].startswith("r7"))
+        self.assertTrue(all(tiles[index]["objectCount"] <= 2 for index in leaf_of))
+
+    def test_build_octree_depth_limit(self):
+        mins = np.zeros((10, 3))
+        tiles, leaf_of = build_octree(mins, mins, max_objects=2, max_depth=3)
+        self.assertEqual(max(tile["depth"] for tile in tiles), 3)
+        self.assertEqual(len(set(leaf_of.tolist())), 1)
+
+    def test_merge_prefixes_ids_and_refs(self):
+        merged = merge_tile_scenes([
+            ("r0", {"objects": [{"id": "a", "geometryRef": "g", "bbox": [0, 0, 0, 1, 1, 0]}], "geometries": {"g": TRIANGLE}}),
+            ("r1", {"objects": [{"id": "a", "geometryRef": "g", "bbox": [2, 0, 0, 3, 1, 0]}], "geometries": {"g": TRIANGLE}}),
+        ])
+        self.assertEqual([obj["id"] for obj in merged["objects"]], ["r0/a", "r1/a"])
+        self.assertEqual(sorted(merged["geometries"]), ["r0/g", "r1/g"])
+        self.assertEqual(merged["bounds"], {"min": [0, 0, 0], "max": [3, 1, 0]})
+
+    def test_coarse_bakes_instances_into_one_mesh_per_material(self):
+        coarse = coarse_tile_scene(_field(), budget=100)
+        self.assertEqual(len(coarse["objects"]), 1)
+        self.assertEqual(coarse["geometries"], {})
+        self.assertEqual(len(coarse["objects"][0]["batch"]["ids"]), 17)
+        self.assertEqual(coarse["lod"]["level"], "coarse")
+        self.assertEqual(coarse["bounds"], {"min": [0, 0, 0], "max": [31, 31, 0]})
+
+    def test_leaf_buckets_spill_and_keep_scene_order(self):
+        completed, spills = {}, {}
+        buckets = LeafBuckets(
+            [0, 3, 1], {"g": {1}, "h": {2}}, max_buffered=2,
+            complete=completed.__setitem__,
+            spill=lambda leaf, n, scene: spills.__setitem__((leaf, n), scene),
+            load_spill=lambda leaf, n: spills[(leaf, n)],
+        )
+        buckets.add([1, 1], {"objects": [{"id": "a"}, {"id": "b"}], "geometries": {"g": TRIANGLE}})
+        self.assertEqual(list(spills), [(1, 0)])
+        buckets.add([2, 1], {"objects": [{"id": "c"}, {"id": "d"}], "geometries": {"h": TRIANGLE}})
+        buckets.finish()
+        self.assertEqual([obj["id"] for obj in completed[1]["objects"]], ["a", "b", "d"])
+        self.assertEqual(list(completed[1]["geometries"]), ["g"])
+        self.assertEqual(list(completed[2]["geometries"]), ["h"])
+
+    def test_leaf_buckets_report_missing_objects(self):
+        buckets = LeafBuckets([2], {}, 10, complete=None, spill=None, load_spill=None)
+        buckets.add([0], {"objects": [{"id": "a"}], "geometries": {}})
+        with self.assertRaises(ValueError):
+            buckets.finish()
+
+    def test_tile_members_round_trip(self):
+        members = unpack_tile_members(pack_tile_members(np.array([0, 2, 1]), [0, -1, 1], ["g", "h"]))
+        self.assertEqual(members["leaf_of"].tolist(), [0, 2, 1])
+        self.assertEqual(members["ref_of"].tolist(), [0, -1, 1])
+        self.assertEqual(members["refs"].tolist(), ["g", "h"])
+
+    def test_tile_cache_key(self):
+        self.assertEqual(tile_cache_key("abc", "r0", "fine"), "abc.tile-r0")
+        self.assertEqual(tile_cache_key("abc", "r0", "coarse"), "abc.tile-r0.coarse")
+
+
+class TestTiledScene(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._env = mock.patch.dict(os.environ, {"OPENALEA_CACHE_DIR": self._temp_dir.name})
+        self._env.start()
+        self._settings = [
+            mock.patch.object(settings, "VISUALIZER_TILE_MAX_OBJECTS", 5),
+            mock.patch.object(settings, "VISUALIZER_STREAM_CHUNK_SHAPES", 4),
+        ]
+        for patcher in self._settings:
+            patcher.start()
+        object_cache.cache_store_scene_json("field", _field())
+
+    def tearDown(self):
+        for patcher in self._settings:
+            patcher.stop()
+        self._env.stop()
+        self._temp_dir.cleanup()
+
+    def test_manifest_covers_every_object_once(self):
+        manifest = visualizer_service.resolve_tileset("field")
+        self.assertEqual(manifest["objectCount"], 18)
+        leaves = [tile for tile in manifest["tiles"] if not tile["children"]]
+        self.assertGreater(len(leaves), 1)
+        self.assertEqual(sum(tile["objectCount"] for tile in leaves), 18)
+        self.assertEqual(object_cache.cache_load_scene_json("field.tileset"), manifest)
+
+    def test_leaf_tiles_hold_their_objects_and_geometries(self):
+        manifest = visualizer_service.resolve_tileset("field")
+        ids = []
+        for tile in manifest["tiles"]:
+            if tile["children"]:
+                continue
+            scene = decode_scene_binary(visualizer_service.resolve_tile_binary("field", tile["id"]))
+            ids += [obj["id"] for obj in scene["objects"]]
+            for obj in scene["objects"]:
+                if obj.get("geometryRef"):
+                    self.assertIn(obj["geometryRef"], scene["geometries"])
+        self.assertEqual(sorted(ids), sorted(obj["id"] for obj in _field()["objects"]))
+
+    def test_inner_tile_fine_level_merges_children_coarse(self):
+        manifest = visualizer_service.resolve_tileset("field")
+        root = manifest["tiles"][0]
+        fine = decode_scene_binary(visualizer_service.resolve_tile_binary("field", "r"))
+        self.assertEqual({obj["id"].split("/")[0] for obj in fine["objects"]}, set(root["children"]))
+        coarse = decode_scene_binary(visualizer_service.resolve_tile_binary("field", "r", level="coarse", compact=True))
+        self.assertEqual(len(coarse["objects"]), 1)
+        self.assertIsNotNone(object_cache.cache_load_scene_json("field.tile-r.coarse"))
+
+    def test_only_leaf_fine_levels_are_stored_with_the_manifest(self):
+        with mock.patch.object(settings, "VISUALIZER_TILE_BUFFER_OBJECTS", 3):
+            manifest = visualizer_service.resolve_tileset("field")
+        leaves = [tile for tile in manifest["tiles"] if not tile["children"]]
+        for tile in manifest["tiles"]:
+            stored = object_cache.cache_load_scene_json(tile_cache_key("field", tile["id"], "fine"))
+            self.assertEqual(stored is not None, not tile["children"])
+            self.assertIsNone(object_cache.cache_load_scene_json(tile_cache_key("field", tile["id"], "coarse")))
+        scene = object_cache.cache_load_scene_json(tile_cache_key("field", leaves[0]["id"], "fine"))
+        self.assertEqual(len(scene["objects"]), leaves[0]["objectCount"])
+        # Chunks and spills are scratch data, removed once read
+        scratch = [path.name for path in object_cache.get_cache_dir().glob("??/field.til*")
+                   if ".part-" in path.name or ".tiles-part-" in path.name]
+        self.assertEqual(scratch, [])
+        # The source scene, the manifest and one level per leaf
+        kinds = object_cache.cache_stats()["kinds"]
+        self.assertEqual(kinds["scene_json"]["entries"], 2 + len(leaves))
+        self.assertEqual(kinds["scene_index"]["entries"], 1)
+
+        # Levels are produced on request, the root's from its children's coarse levels
+        visualizer_service.resolve_tile_binary("field", "r", level="coarse")
+        self.assertIsNotNone(object_cache.cache_load_scene_json("field.tile-r.coarse"))
+        for child in manifest["tiles"][0]["children"]:
+            self.assertIsNotNone(object_cache.cache_load_scene_json(tile_cache_key("field", child, "coarse")))
+
+    def test_evicted_leaf_is_gathered_alone(self):
+        manifest = visualizer_service.resolve_tileset("field")
+        leaf = max((tile for tile in manifest["tiles"] if not tile["children"]), key=lambda tile: tile["objectCount"])
+        expected = object_cache.cache_load_scene_json(tile_cache_key("field", leaf["id"], "fine"))
+        object_cache.cache_delete_scene_json(tile_cache_key("field", leaf["id"], "fine"))
+        with mock.patch.object(visualizer_service, "_build_tileset", wraps=visualizer_service._build_tileset) as build:
+            scene = decode_scene_binary(visualizer_service.resolve_tile_binary("field", leaf["id"]))
+        build.assert_not_called()
+        self.assertEqual(sorted(obj["id"] for obj in scene["objects"]), sorted(obj["id"] for obj in expected["objects"]))
+        self.assertEqual(set(scene["geometries"]), set(expected["geometries"]))
+
+    def test_missing_tileset_data_partitions_again(self):
+        manifest = visualizer_service.resolve_tileset("field")
+        # A manifest whose tiles and object table left the cache
+        object_cache.cache_store_scene_json("copy", _field())
+        object_cache.cache_store_scene_json("copy.tileset", {**manifest, "sceneRef": "copy"})
+        leaf = next(tile for tile in manifest["tiles"] if not tile["children"])
+        scene = decode_scene_binary(visualizer_service.resolve_tile_binary("copy", leaf["id"]))
+        self.assertEqual(len(scene["objects"]), leaf["objectCount"])
+
+    def test_concurrent_first_requests_build_once(self):
+        build = visualizer_service._build_tileset
+
+        def slow_build(scene_ref):
+            time.sleep(0.05)
+            return build(scene_ref)
+
+        with mock.patch.object(visualizer_service, "_build_tileset", side_effect=slow_build) as patched:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                manifests = list(pool.map(visualizer_service.resolve_tileset, ["field"] * 4))
+        self.assertEqual(patched.call_count, 1)
+        self.assertTrue(all(manifest == manifests[0] for manifest in manifests))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            visualizer_service.resolve_tile_binary("field", "r", level="medium")
+        with self.assertRaises(LookupError):
+            visualizer_service.resolve_tile_binary("field", "r9")
+        with self.assertRaises(LookupError):
+            visualizer_service.resolve_tileset("missing")
@@ -46,3 +46,189 @@ class TestVisualizerService(TestCase):
             response = visualizer_service.resolve_visualization("node-4", payload)
             self.assertTrue(response["success"])
             self.assertEqual(response["scene"]["objects"][0]["id"], 4)
+
+    def test_resolve_scene_binary_builds_and_caches(self):
+        scene = {"objects": [{"id": 5, "objectType": "mesh", "geometry": {"type": "mesh", "vertices": [[0, 0, 0]]}}]}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=scene), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_bin") as store_bin:
+            data = visualizer_service.resolve_scene_binary("abc")
+            self.assertTrue(data.startswith(b"WASB"))
+            store_bin.assert_called_once_with("abc", data)
+
+    def test_resolve_scene_binary_cache_hit(self):
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=b"WASB..."):
+            self.assertEqual(visualizer_service.resolve_scene_binary("abc"), b"WASB...")
+
+    def test_resolve_scene_binary_missing(self):
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load", side_effect=FileNotFoundError("gone")):
+            with self.assertRaises(LookupError):
+                visualizer_service.resolve_scene_binary("abc")
+
+    def test_resolve_inline_scene_lod(self):
+        faces = [[i, i + 1, i + 2] for i in range(50)]
+        vertices = [[i, i % 2, 0] for i in range(52)]
+        payload = {"scene": {"objects": [{"id": 1, "objectType": "mesh", "geometry": {"type": "mesh", "vertices": vertices, "indices": faces}}]}}
+        response = visualizer_service.resolve_visualization("node-5", payload, lod=10)
+        self.assertTrue(response["success"])
+        self.assertEqual(response["scene"]["lod"]["level"], "t10")
+        self.assertTrue(response["scene"]["lod"]["decimated"])
+
+    def test_resolve_invalid_lod(self):
+        response = visualizer_service.resolve_visualization("node-6", {"scene": {"objects": []}}, lod="huge")
+        self.assertFalse(response["success"])
+
+    def test_resolve_scene_ref_lod_cached_under_own_key(self):
+        payload = {"outputs": [{"value": {"__type__": "plantgl_scene_json_ref", "__ref__": "abc"}}]}
+        scenes = {"abc": {"objects": [{"id": 2}]}}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", side_effect=scenes.get), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json") as cache_store:
+            response = visualizer_service.resolve_visualization("node-7", payload, lod="preview")
+            self.assertTrue(response["success"])
+            self.assertEqual(response["scene"]["lod"]["level"], "preview")
+            cache_store.assert_called_once_with("abc.lod-preview", response["scene"])
+
+    def test_resolve_scene_binary_lod(self):
+        scene = {"objects": [{"id": 5, "objectType": "mesh", "geometry": {"type": "mesh", "vertices": [[0, 0, 0]]}}]}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=None) as load_bin, \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", side_effect=[None, scene]), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json"), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_bin") as store_bin:
+            data = visualizer_service.resolve_scene_binary("abc", lod="medium")
+            load_bin.assert_called_once_with("abc.lod-medium")
+            store_bin.assert_called_once_with("abc.lod-medium", data)
+
+    def test_iter_scene_chunks_sends_geometries_once(self):
+        scene = {
+            "objects": [{"id": i, "geometryRef": "g0" if i % 2 else "g1"} for i in range(5)],
+            "geometries": {"g0": {"type": "mesh"}, "g1": {"type": "line"}},
+        }
+        chunks = list(visualizer_service.iter_scene_chunks(scene, 2))
+        self.assertEqual([len(chunk["objects"]) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(set(chunks[0]["geometries"]), {"g0", "g1"})
+        self.assertEqual(chunks[1]["geometries"], {})
+
+    def test_stream_inline_scene(self):
+        payload = {"scene": {"objects": [{"id": 1}, {"id": 2}, {"id": 3}]}}
+        messages = list(visualizer_service.stream_visualization("node-7", payload, chunk_size=2))
+        self.assertEqual([m["type"] for m in messages], ["scene", "chunk", "chunk", "end"])
+        self.assertEqual(messages[-1]["objectCount"], 3)
+
+    def test_stream_scene_ref_caches_full_scene(self):
+        payload = {"outputs": [{"value": {"__type__": "plantgl_scene_ref", "__ref__": "abc"}}]}
+        chunks = [
+            {"objects": [{"id": 1, "geometryRef": "g0"}], "geometries": {"g0": {"type": "mesh"}}},
+            {"objects": [{"id": 2, "geometryRef": "g0"}], "geometries": {}},
+        ]
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load", return_value="raw"), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.iter_json_from_result", return_value=iter(chunks)), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json") as cache_store:
+            messages = list(visualizer_service.stream_visualization("node-8", payload))
+        self.assertEqual([m["type"] for m in messages], ["scene", "chunk", "chunk", "end"])
+        self.assertFalse(messages[0]["cacheHit"])
+        cache_store.assert_called_once_with("abc", {
+            "objects": [{"id": 1, "geometryRef": "g0"}, {"id": 2, "geometryRef": "g0"}],
+            "geometries": {"g0": {"type": "mesh"}},
+        })
+
+    def test_stream_serialization_error(self):
+        payload = {"outputs": [{"value": {"__type__": "plantgl_scene_ref", "__ref__": "abc"}}]}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load", return_value="raw"), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.iter_json_from_result", return_value=iter([{"error": "bad"}])), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json") as cache_store:
+            messages = list(visualizer_service.stream_visualization("node-9", payload))
+        self.assertEqual(messages[-1], {"type": "error", "nodeId": "node-9", "error": "bad"})
+        cache_store.assert_not_called()
+
+    def test_stream_no_data(self):
+        messages = list(visualizer_service.stream_visualization("node-10", {}))
+        self.assertEqual(messages[0]["type"], "error")
+
+    def test_resolve_inline_scene_batched(self):
+        geometry = {"type": "mesh", "vertices": [[0, 0, 0], [1, 0, 0], [0, 1, 0]], "indices": [[0, 1, 2]]}
+        payload = {"scene": {"objects": [
+            {"id": i, "objectType": "mesh", "geometry": geometry, "material": {"color": [1, 0, 0], "opacity": 1}}
+            for i in range(3)
+        ]}}
+        response = visualizer_service.resolve_visualization("node-11", payload, batched=True)
+        self.assertTrue(response["success"])
+        self.assertEqual(len(response["scene"]["objects"]), 1)
+        self.assertEqual(response["scene"]["objects"][0]["batch"]["ids"], [0, 1, 2])
+
+    def test_resolve_scene_ref_batched_cached_under_own_key(self):
+        payload = {"outputs": [{"value": {"__type__": "plantgl_scene_json_ref", "__ref__": "abc"}}]}
+
+        def load(key):
+            return {"objects": [{"id": 1}]} if key == "abc.lod-preview" else None
+
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", side_effect=load), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json") as cache_store:
+            response = visualizer_service.resolve_visualization("node-12", payload, lod="preview", batched=True)
+        self.assertTrue(response["success"])
+        self.assertFalse(response["cacheHit"])
+        cache_store.assert_called_once()
+        self.assertEqual(cache_store.call_args[0][0], "abc.lod-preview.batched")
+
+    def test_resolve_scene_binary_batched_key(self):
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=b"WASB...") as load_bin:
+            visualizer_service.resolve_scene_binary("abc", batched=True)
+        load_bin.assert_called_once_with("abc.batched")
+
+    def test_resolve_scene_binary_compact_key(self):
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_bin", return_value=b"WASB...") as load_bin:
+            visualizer_service.resolve_scene_binary("abc", lod="preview", compact=True)
+        load_bin.assert_called_once_with("abc.lod-preview.compact")
+
+    def test_query_scene_builds_and_caches_index(self):
+        scene = {"objects": [
+            {"id": "a", "objectType": "text", "text": "a", "position": [0, 0, 0]},
+            {"id": "b", "objectType": "text", "text": "b", "position": [5, 0, 0]},
+        ]}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_index", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=scene), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_index") as store_index:
+            ids = visualizer_service.query_scene("abc", box={"min": [4, -1, -1], "max": [6, 1, 1]})
+            self.assertEqual(ids, ["b"])
+            self.assertEqual(store_index.call_args[0][0], "abc")
+        with mock.patch(
+            "model.openalea.visualizer.utils.visualizer_service.cache_load_scene_index",
+            return_value=store_index.call_args[0][1],
+        ):
+            self.assertEqual(visualizer_service.query_scene("abc", frustum=[[-1, 0, 0, 1]]), ["a"])
+
+    def test_query_scene_invalid(self):
+        with self.assertRaises(ValueError):
+            visualizer_service.query_scene("abc")
+        with self.assertRaises(ValueError):
+            visualizer_service.query_scene("abc", box={"min": [0, 2, 0], "max": [1, 1, 1]})
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_index", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load", side_effect=FileNotFoundError("gone")):
+            with self.assertRaises(LookupError):
+                visualizer_service.query_scene("abc", frustum=[[1, 0, 0, 0]])
+
+    def test_resolve_scene_diff(self):
+        previous = {"objects": [{"id": "a"}, {"id": "b"}]}
+        current = {"objects": [{"id": "a"}, {"id": "c"}]}
+        scenes = {"old": previous, "new": current}
+        payload = {"outputs": [{"value": {"__type__": "plantgl_scene_json_ref", "__ref__": "new"}}]}
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", side_effect=scenes.get), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_store_scene_json") as cache_store:
+            response = visualizer_service.resolve_scene_diff("node-1", payload, "old")
+            self.assertTrue(response["success"])
+            self.assertEqual([obj["id"] for obj in response["diff"]["added"]], ["c"])
+            self.assertEqual(response["diff"]["removed"], ["b"])
+            self.assertEqual(cache_store.call_args[0][0], "new.diff-old")
+
+    def test_resolve_scene_diff_errors(self):
+        payload = {"scene": {"objects": []}}
+        self.assertFalse(visualizer_service.resolve_scene_diff("n", payload, "old", lod="preview")["success"])
+        self.assertFalse(visualizer_service.resolve_scene_diff("n", payload, "old", batched=True)["success"])
+        with mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load_scene_json", return_value=None), \
+            mock.patch("model.openalea.visualizer.utils.visualizer_service.cache_load", side_effect=FileNotFoundError("gone")):
+            response = visualizer_service.resolve_scene_diff("n", payload, "old")
+            self.assertEqual(response["error"], "Previous scene not found: old")
@@ -42,3 +42,19 @@ class TestVisualizerUtils(TestCase):
             mock.patch.dict(sys.modules, {"model.openalea.visualizer.utils.serialize": fake_serialize_module}):
             result = visualizer_utils.json_from_result(DummyShape())
             self.assertEqual(result, {"objects": ["shape"]})
+
+    def test_iter_json_from_result_without_plantgl(self):
+        chunks = list(visualizer_utils.iter_json_from_result("value", 10))
+        self.assertEqual(len(chunks), 1)
+        self.assertIn("error", chunks[0])
+
+    def test_iter_json_from_result_scene(self):
+        fake_serialize_module = types.SimpleNamespace(
+            iter_serialize_scene=lambda _scene, chunk_size: iter([{"objects": ["a"]}, {"objects": ["b"]}])
+        )
+        with mock.patch.object(visualizer_utils, "PLANTGL_AVAILABLE", True), \
+            mock.patch.object(visualizer_utils, "Scene", DummyScene), \
+            mock.patch.object(visualizer_utils, "Shape", DummyShape), \
+            mock.patch.dict(sys.modules, {"model.openalea.visualizer.utils.serialize": fake_serialize_module}):
+            chunks = list(visualizer_utils.iter_json_from_result(DummyScene(), 1))
+            self.assertEqual(chunks, [{"objects": ["a"]}, {"objects": ["b"]}])
@@ -0,0 +1,30 @@
+"""Minimal stand-in for ``node_worker.py`` used by the worker pool tests.
+
+Echoes the inputs back as outputs. The node names ``crash`` and ``sleep``
+simulate a dying worker and a long-running evaluation.
+"""
+import json
+import os
+import sys
+import time
+
+print(json.dumps({"ready": True, "pid": os.getpid()}), flush=True)
+
+for line in sys.stdin:
+    job = json.loads(line)
+    node_info = job["node_info"]
+    node_name = node_info["node_name"]
+    if node_name == "crash":
+        os._exit(3)
+    if node_name == "sleep":
+        time.sleep(30)
+    print(f"evaluating {node_name}", file=sys.stderr, flush=True)
+    response = {
+        "success": True,
+        "outputs": [
+            {"index": 0, "name": "pid", "value": os.getpid(), "type": "int"},
+            {"index": 1, "name": "inputs", "value": node_info["inputs"], "type": "dict"},
+        ],
+    }
+    print(f"__webalea_job_end__ {job['job_id']}", file=sys.stderr, flush=True)
+    print(json.dumps({"job_id": job["job_id"], "response": response}), flush=True)
@@ -0,0 +1,22 @@
+"""Minimal stand-in for ``run_workflow.py`` used by the cancellation tests.
+
+Reads the payload on stdin, spawns a long-running grandchild whose pid is
+written to ``inputs["pid_file"]`` (holding this script's pipes when
+``inputs["inherit_pipes"]`` is set), writes ``inputs["log"]`` (if any) on stderr,
+then sleeps for ``inputs["sleep"]`` seconds.
+"""
+import json
+import subprocess
+import sys
+import time
+
+node_info = json.loads(sys.stdin.read())
+inputs = node_info["inputs"]
+pipes = {} if inputs.get("inherit_pipes") else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+grandchild = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"], **pipes)
+with open(inputs["pid_file"], "w", encoding="utf-8") as f:
+    f.write(str(grandchild.pid))
+if "log" in inputs:
+    print(inputs["log"], file=sys.stderr, flush=True)
+time.sleep(inputs.get("sleep", 0))
+print(json.dumps({"success": True, "outputs": []}))
@@ -1,5 +1,5 @@
 // runnerAPI.js
-import { fetchJSON } from "./utils.js";
+import { fetchJSON, fetchNDJSON } from "./utils.js";
 import { API_BASE_URL_RUNNER } from "../config/api";
 
 // ===============================
@@ -12,10 +12,11 @@ import { API_BASE_URL_RUNNER } from "../config/api";
  * @param {string} nodeData.packageName - OpenAlea package name
  * @param {string} nodeData.nodeName - Node name within the package
  * @param {Array} nodeData.inputs - Array of input objects {id, name, type, value}
+ * @param {string} [nodeData.executionId] - Id used to cancel the execution with cancelExecution
  * @returns {Promise<Object>} Execution result
  */
 export async function executeNode(nodeData) {
-    const { nodeId, packageName, nodeName, inputs, signal } = nodeData;
+    const { nodeId, packageName, nodeName, inputs, executionId, signal } = nodeData;
 
     return fetchJSON(`${API_BASE_URL_RUNNER}/execute`, "POST", {
         node_id: nodeId,
@@ -26,6 +27,62 @@ export async function executeNode(nodeData) {
             name: input.name,
             type: input.type,
             value: input.value
-        }))
+        })),
+        execution_id: executionId
     }, { signal });
 }
+
+/**
+ * Cancel a running execution on the backend (kills its process)
+ * @param {string} executionId - Id passed to executeNode or executeNodeBatch
+ * @returns {Promise<Object>} Cancellation result
+ */
+export async function cancelExecution(executionId) {
+    return fetchJSON(`${API_BASE_URL_RUNNER}/cancel/${encodeURIComponent(executionId)}`, "POST");
+}
+
+// ===============================
+// BATCH EXECUTION
+// ===============================
+/**
+ * Execute several independent nodes in a single request, streaming each result as it completes
+ * @param {Array} nodesData - Node execution data (same shape as executeNode arguments)
+ * @param {Object} options - Batch options
+ * @param {function(Object): void} options.onResult - Called with each node response ({success, node_id, outputs, error})
+ * @param {number} [options.maxParallel] - Upper bound on concurrent executions
+ * @param {AbortSignal} [options.signal] - Abort signal; the backend then cancels the whole batch
+ * @returns {Promise<void>} Resolves once every node response was received
+ */
+export async function executeNodeBatch(nodesData, { onResult, maxParallel = null, signal } = {}) {
+    return fetchNDJSON(`${API_BASE_URL_RUNNER}/execute/batch`, {
+        requests: nodesData.map(({ nodeId, packageName, nodeName, inputs, executionId }) => ({
+            node_id: nodeId,
+            package_name: packageName,
+            node_name: nodeName,
+            inputs: inputs.map(input => ({
+                id: input.id,
+                name: input.name,
+                type: input.type,
+                value: input.value
+            })),
+            execution_id: executionId
+        })),
+        max_parallel: maxParallel,
+        stream: true
+    }, onResult, { signal });
+}
+
+// ===============================
+// LARGE OUTPUTS
+// ===============================
+/**
+ * Fetch a page of a large collection output returned as {__type__, __ref__, length, head}
+ * @param {string} refId - The output's __ref__
+ * @param {number} [offset=0] - Index of the first item
+ * @param {number} [limit=100] - Number of items (max 1000)
+ * @returns {Promise<Object>} {ref, type, length, offset, items}
+ */
+export async function fetchCollectionItems(refId, offset = 0, limit = 100) {
+    const params = new URLSearchParams({ offset: String(offset), limit: String(limit) });
+    return fetchJSON(`${API_BASE_URL_RUNNER}/refs/${encodeURIComponent(refId)}/items?${params}`);
+}
@@ -27,3 +27,67 @@ export async function fetchJSON(url, method = "GET", body = null, options = {})
         throw err;
     }
 }
+
+/**
+ * Split newline-delimited JSON text, fed in arbitrary pieces, into parsed messages
+ * @param {function(Object): void} onMessage - Called with every parsed line, in order
+ * @returns {{push: function(string): void, end: function(): void}} Feed text with push, then call end
+ **/
+export function createNdjsonParser(onMessage) {
+    let buffer = "";
+    const emit = (line) => {
+        if (line.trim()) {
+            onMessage(JSON.parse(line));
+        }
+    };
+    return {
+        push(text) {
+            buffer += text;
+            const lines = buffer.split("\n");
+            // The last piece may be an incomplete line
+            buffer = lines.pop();
+            lines.forEach(emit);
+        },
+        end() {
+            emit(buffer);
+            buffer = "";
+        }
+    };
+}
+
+/**
+ * POST a JSON body and read the newline-delimited JSON response as it arrives
+ * @param {string} url - Endpoint URL
+ * @param {Object} body - Request body
+ * @param {function(Object): void} onMessage - Called with every parsed line, in order
+ * @param {Object} [options]
+ * @param {AbortSignal} [options.signal] - Abort signal
+ * @returns {Promise<void>} Resolves once the whole stream was read
+ **/
+export async function fetchNDJSON(url, body, onMessage, { signal } = {}) {
+    const res = await fetch(url, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(body),
+        signal,
+    });
+    if (!res.ok) {
+        throw new Error(`Erreur API : HTTP ${res.status}`);
+    }
+    const parser = createNdjsonParser(onMessage);
+    if (!res.body?.getReader) {
+        // No readable stream (older runtimes): parse the whole body at once
+        parser.push(await res.text());
+        parser.end();
+        return;
+    }
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        parser.push(decoder.decode(value, { stream: true }));
+    }
+    parser.push(decoder.decode());
+    parser.end();
+}
@@ -1,4 +1,4 @@
-import { fetchJSON } from "./utils.js";
+import { fetchJSON, fetchNDJSON } from "./utils.js";
 import { API_BASE_URL_VISUALIZER } from "../config/api";
 
 // ===============================
@@ -8,12 +8,105 @@ import { API_BASE_URL_VISUALIZER } from "../config/api";
 /**
  * Fetch a serialized PlantGL scene from the backend
  * @param {Object} visualizerData - Data required for visualization
+ * @param {string|number} [lod] - "preview", "medium", "full" or a triangle budget
+ * @param {boolean} [batched] - Merge static meshes into one mesh per material on the backend
+ * @param {string} [diffFrom] - Scene ref of a previous run: the response carries a `diff` (see utils/sceneDiff.js)
  * @returns {Promise<Object>} Serialized scene data
  **/
 
-export async function fetchNodeScene({ nodeId = "123", visualizationData = {} } = {}) {
-    return fetchJSON(`${API_BASE_URL_VISUALIZER}/visualize`, "POST", {
+export async function fetchNodeScene({ nodeId = "123", visualizationData = {}, lod, batched, diffFrom } = {}) {
+    const body = {
         node_id: nodeId,
         visualization_data: visualizationData
-    });
+    };
+    if (lod !== undefined) {
+        body.lod = lod;
+    }
+    if (batched) {
+        body.batched = true;
+    }
+    if (diffFrom) {
+        body.diff_from = diffFrom;
+    }
+    return fetchJSON(`${API_BASE_URL_VISUALIZER}/visualize`, "POST", body);
+}
+
+/**
+ * Stream a serialized scene chunk by chunk from /visualize/stream (newline-delimited JSON)
+ * @param {Object} options
+ * @param {string} options.nodeId - Node identifier
+ * @param {Object} options.visualizationData - Data required for visualization
+ * @param {number} [options.chunkSize] - Objects per chunk, backend default when omitted
+ * @param {function(Object): void} options.onMessage - Called with each `scene`, `chunk`, `end` or `error` message
+ * @returns {Promise<void>} Resolves once the whole stream was read
+ **/
+export async function streamNodeScene({ nodeId = "123", visualizationData = {}, chunkSize, onMessage }) {
+    const body = {
+        node_id: nodeId,
+        visualization_data: visualizationData
+    };
+    if (chunkSize) {
+        body.chunk_size = chunkSize;
+    }
+    return fetchNDJSON(`${API_BASE_URL_VISUALIZER}/visualize/stream`, body, onMessage);
+}
+
+/**
+ * Fetch a cached scene in the packed binary format
+ * @param {string} sceneRef - Scene cache reference
+ * @param {Object} [options]
+ * @param {string|number} [options.lod] - "preview", "medium", "full" or a triangle budget
+ * @param {boolean} [options.batched] - Merge static meshes into one mesh per material on the backend
+ * @param {boolean} [options.compact] - Quantized positions, precomputed normals and welded meshes
+ * @returns {Promise<ArrayBuffer>} Binary scene (see utils/sceneBinary.js)
+ **/
+export async function fetchSceneBinary(sceneRef, { lod, batched, compact } = {}) {
+    const params = new URLSearchParams();
+    if (lod !== undefined) {
+        params.set("lod", lod);
+    }
+    if (batched) {
+        params.set("batched", "true");
+    }
+    if (compact) {
+        params.set("compact", "true");
+    }
+    const query = params.toString() ? `?${params}` : "";
+    const res = await fetch(`${API_BASE_URL_VISUALIZER}/scene/${encodeURIComponent(sceneRef)}.bin${query}`);
+    if (!res.ok) {
+        throw new Error(`Erreur API : HTTP ${res.status}`);
+    }
+    return res.arrayBuffer();
+}
+
+/**
+ * Fetch the octree tileset manifest of a cached scene (partitioned on first request)
+ * @param {string} sceneRef - Scene cache reference
+ * @returns {Promise<Object>} Manifest with root, bounds and tiles (see utils/tiles.js)
+ **/
+export async function fetchSceneTileset(sceneRef) {
+    return fetchJSON(`${API_BASE_URL_VISUALIZER}/scene/${encodeURIComponent(sceneRef)}/tileset`);
+}
+
+/**
+ * Fetch one level of a scene tile in the packed binary format
+ * @param {string} sceneRef - Scene cache reference
+ * @param {string} tileId - Tile identifier from the manifest
+ * @param {Object} [options]
+ * @param {string} [options.level] - "coarse" or "fine" (default)
+ * @param {boolean} [options.compact] - Quantized positions, precomputed normals and welded meshes
+ * @returns {Promise<ArrayBuffer>} Binary scene (see utils/sceneBinary.js)
+ **/
+export async function fetchSceneTileBinary(sceneRef, tileId, { level = "fine", compact } = {}) {
+    const params = new URLSearchParams({ level });
+    if (compact) {
+        params.set("compact", "true");
+    }
+    const res = await fetch(
+        `${API_BASE_URL_VISUALIZER}/scene/${encodeURIComponent(sceneRef)}/tiles/${encodeURIComponent(tileId)}.bin?${params}`
+    );
+    if (!res.ok) {
+        throw new Error(`Erreur API : HTTP ${res.status}`);
+    }
+    return res.arrayBuffer();
 }
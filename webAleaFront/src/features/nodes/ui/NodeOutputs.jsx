@@ -17,10 +17,24 @@ function renderObjectValue(value) {
     }
 }
 
+const NDARRAY_TYPES = new Set(["ndarray", "ndarray_ref"]);
+
+// Show the header of packed arrays rather than their base64 buffer
+function describeNdarray(value) {
+    return {
+        dtype: value.dtype,
+        shape: value.shape,
+        preview: value.__meta__?.preview
+    };
+}
+
 function NodeOutputValue({ value }) {
     if (isPlainObject(value) && typeof value.__type__ === "string") {
         const typeName = value.__type__;
-        const data = value.data !== undefined ? value.data : value;
+        let data = value.data !== undefined ? value.data : value;
+        if (NDARRAY_TYPES.has(typeName)) {
+            data = describeNdarray(value);
+        }
         return (
             <div>
                 <div className="small text-muted mb-1">
@@ -6,6 +6,7 @@ import { frameCameraToScene } from "./core/framing";
 import { addDefaultLights } from "./core/lighting";
 import { buildSceneObjects } from "./core/objectPipeline";
 import { attachResizeHandler } from "./core/resize";
+import { createTileLayer } from "./core/tileLayer";
 import {
     createCamera,
     createControls,
@@ -15,6 +16,8 @@ import {
 
 /**
  * Builds a Three.js scene from a JSON description.
+ * A scene with ``tiles: { tileset, loadTile }`` streams the tiles visible from the camera
+ * instead of holding every object (see core/tileLayer.js).
  * @param {object} sceneJSON
  * @param {React.RefObject} mountRef
  * @returns {object | null}
@@ -31,7 +34,7 @@ export function buildSceneFromJSON(sceneJSON, mountRef) {
 
     const { objects, hasAnimations } = buildSceneObjects(scene, sceneJSON);
     addDefaultLights(scene);
-    frameCameraToScene(scene, camera, controls);
+    frameCameraToScene(scene, camera, controls, sceneJSON.bounds);
 
     const detachResize = attachResizeHandler(mountRef, renderer, camera);
     const { start, stop, renderOnce } = createRenderLoop({
@@ -42,17 +45,29 @@ export function buildSceneFromJSON(sceneJSON, mountRef) {
         applyAnimation
     });
 
+    const tileLayer = sceneJSON.tiles
+        ? createTileLayer({ scene, camera, ...sceneJSON.tiles, onChange: renderOnce })
+        : null;
+
     if (hasAnimations) {
         start();
     } else {
         controls.addEventListener("change", renderOnce);
         renderOnce();
     }
+    if (tileLayer) {
+        controls.addEventListener("change", tileLayer.update);
+        tileLayer.update();
+    }
 
     function dispose() {
         stop();
         detachResize();
         controls.removeEventListener("change", renderOnce);
+        if (tileLayer) {
+            controls.removeEventListener("change", tileLayer.update);
+            tileLayer.dispose();
+        }
         disposeSceneResources(objects);
         controls.dispose();
         renderer.dispose();
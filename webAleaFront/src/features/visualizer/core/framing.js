@@ -1,7 +1,16 @@
 import * as THREE from "three";
 
-export function frameCameraToScene(scene, camera, controls) {
-    const bounds = new THREE.Box3().setFromObject(scene);
+/**
+ * Points the camera at the whole scene.
+ * @param {THREE.Scene} scene
+ * @param {THREE.PerspectiveCamera} camera
+ * @param {object} controls
+ * @param {{min: number[], max: number[]}} [sceneBounds] Scene box from the backend; avoids walking every vertex.
+ */
+export function frameCameraToScene(scene, camera, controls, sceneBounds) {
+    const bounds = sceneBounds
+        ? new THREE.Box3(new THREE.Vector3(...sceneBounds.min), new THREE.Vector3(...sceneBounds.max))
+        : new THREE.Box3().setFromObject(scene);
     if (!bounds.isEmpty()) {
         const size = new THREE.Vector3();
         const center = new THREE.Vector3();
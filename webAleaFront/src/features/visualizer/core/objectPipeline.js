@@ -1,8 +1,8 @@
 import * as THREE from "three";
 import { mergeGeometries } from "three/examples/jsm/utils/BufferGeometryUtils.js";
 import { buildObjectNode } from "../SceneFactory";
-import { buildFloat32Array, buildIndexArray } from "../utils/geometry";
-import { isIdentityTransform } from "../utils/transforms";
+import { applyNormals, buildFloat32Array, buildIndexArray } from "../utils/geometry";
+import { isIdentityTransform, transformToMatrix } from "../utils/transforms";
 
 function isStaticMesh(objJSON) {
     return objJSON?.objectType === "mesh" && !objJSON.animation && !objJSON.children;
@@ -23,25 +23,106 @@ function splitObjects(objects = []) {
     return { staticMeshes, otherObjects };
 }
 
+function resolveGeometry(objJSON, geometries) {
+    if (!objJSON?.geometryRef) return objJSON;
+    return { ...objJSON, geometry: geometries[objJSON.geometryRef] };
+}
+
+function materialKey(objJSON) {
+    const color = objJSON.material?.color ?? [0.8, 0.8, 0.8];
+    const opacity = objJSON.material?.opacity ?? 1;
+    return { color, opacity, key: `${color.join(",")}|${opacity}` };
+}
+
+function groupInstances(staticMeshes) {
+    const groups = new Map();
+    const singles = [];
+
+    staticMeshes.forEach(obj => {
+        if (!obj.geometryRef) {
+            singles.push(obj);
+            return;
+        }
+
+        const { color, opacity, key } = materialKey(obj);
+        const groupKey = `${obj.geometryRef}|${key}`;
+        if (!groups.has(groupKey)) {
+            groups.set(groupKey, { geometryRef: obj.geometryRef, color, opacity, items: [] });
+        }
+        groups.get(groupKey).items.push(obj);
+    });
+
+    // A geometry used once is cheaper to merge with the other static meshes
+    const instanceGroups = [];
+    groups.forEach(group => {
+        if (group.items.length > 1) {
+            instanceGroups.push(group);
+        } else {
+            singles.push(...group.items);
+        }
+    });
+
+    return { instanceGroups, singles };
+}
+
+function buildBufferGeometry(geometryJSON) {
+    const geometry = new THREE.BufferGeometry();
+    const vertices = buildFloat32Array(geometryJSON?.vertices ?? []);
+    geometry.setAttribute("position", new THREE.BufferAttribute(vertices, 3));
+
+    if (geometryJSON?.indices) {
+        const indices = buildIndexArray(geometryJSON.indices ?? []);
+        if (indices) {
+            geometry.setIndex(new THREE.BufferAttribute(indices, 1));
+        }
+    }
+    applyNormals(geometry, geometryJSON?.normals);
+
+    return geometry;
+}
+
+function buildInstancedMeshes(instanceGroups, geometries) {
+    const matrix = new THREE.Matrix4();
+
+    return instanceGroups.map(group => {
+        const geometry = buildBufferGeometry(geometries[group.geometryRef]);
+        const material = new THREE.MeshStandardMaterial({
+            color: new THREE.Color(...group.color),
+            opacity: group.opacity,
+            transparent: group.opacity < 1
+        });
+
+        const mesh = new THREE.InstancedMesh(geometry, material, group.items.length);
+        group.items.forEach((obj, index) => {
+            mesh.setMatrixAt(index, transformToMatrix(obj.transform, matrix));
+        });
+        mesh.instanceMatrix.needsUpdate = true;
+        mesh.computeBoundingBox();
+        mesh.computeBoundingSphere();
+
+        return { object3D: mesh, animation: null };
+    });
+}
+
 function groupStaticMeshes(staticMeshes) {
     const groups = new Map();
     const nonMerged = [];
 
     staticMeshes.forEach(obj => {
-        if (!isIdentityTransform(obj.transform)) {
+        // Backend batches are already merged per material
+        if (obj.batch || !isIdentityTransform(obj.transform)) {
             nonMerged.push(obj);
             return;
         }
 
-        const color = obj.material?.color ?? [0.8, 0.8, 0.8];
-        const opacity = obj.material?.opacity ?? 1;
+        const { color, opacity, key } = materialKey(obj);
         const hasIndices = Boolean(obj.geometry?.indices);
-        const key = `${color.join(",")}|${opacity}|${hasIndices ? "idx" : "noidx"}`;
+        const groupKey = `${key}|${hasIndices ? "idx" : "noidx"}`;
 
-        if (!groups.has(key)) {
-            groups.set(key, { color, opacity, items: [] });
+        if (!groups.has(groupKey)) {
+            groups.set(groupKey, { color, opacity, items: [] });
         }
-        groups.get(key).items.push(obj);
+        groups.get(groupKey).items.push(obj);
     });
 
     return { groups, nonMerged };
@@ -54,23 +135,12 @@ function buildMergedMeshes(groups) {
         const geometries = [];
 
         group.items.forEach(meshJSON => {
-            const geometry = new THREE.BufferGeometry();
-            const vertices = buildFloat32Array(meshJSON.geometry?.vertices ?? []);
-            geometry.setAttribute("position", new THREE.BufferAttribute(vertices, 3));
-
-            if (meshJSON.geometry?.indices) {
-                const indices = buildIndexArray(meshJSON.geometry.indices ?? []);
-                if (indices) {
-                    geometry.setIndex(new THREE.BufferAttribute(indices, 1));
-                }
-            }
-
-            geometries.push(geometry);
+            geometries.push(buildBufferGeometry(meshJSON.geometry));
         });
 
+        // Normals are set per source geometry, which share no vertices once merged
         const mergedGeometry = mergeGeometries(geometries, false);
         if (mergedGeometry) {
-            mergedGeometry.computeVertexNormals();
             const material = new THREE.MeshStandardMaterial({
                 color: new THREE.Color(...group.color),
                 opacity: group.opacity,
@@ -106,11 +176,15 @@ function buildObjectEntries(objects = []) {
 export function buildSceneObjects(scene, sceneJSON) {
     const objects = [];
     const rawObjects = Array.isArray(sceneJSON.objects) ? sceneJSON.objects : [];
+    // Shared geometry table of instanced scenes, referenced by geometryRef
+    const geometries = sceneJSON.geometries ?? {};
     const { staticMeshes, otherObjects } = splitObjects(rawObjects);
-    const { groups, nonMerged } = groupStaticMeshes(staticMeshes);
+    const { instanceGroups, singles } = groupInstances(staticMeshes);
+    const instancedObjects = buildInstancedMeshes(instanceGroups, geometries);
+    const { groups, nonMerged } = groupStaticMeshes(singles.map(obj => resolveGeometry(obj, geometries)));
     const mergedObjects = buildMergedMeshes(groups);
 
-    mergedObjects.forEach(entry => {
+    instancedObjects.concat(mergedObjects).forEach(entry => {
         scene.add(entry.object3D);
         objects.push(entry);
     });
@@ -120,7 +194,7 @@ export function buildSceneObjects(scene, sceneJSON) {
         objects.push(entry);
     });
 
-    buildObjectEntries(otherObjects).forEach(entry => {
+    buildObjectEntries(otherObjects.map(obj => resolveGeometry(obj, geometries))).forEach(entry => {
         scene.add(entry.object3D);
         objects.push(entry);
     });
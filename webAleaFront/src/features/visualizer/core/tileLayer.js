@@ -0,0 +1,80 @@
+import * as THREE from "three";
+import { selectTiles } from "../utils/tiles";
+import { disposeSceneResources } from "./dispose";
+import { buildSceneObjects } from "./objectPipeline";
+
+function tileKey({ id, level }) {
+    return `${id}|${level}`;
+}
+
+/**
+ * Keeps the tiles selected for the camera loaded in a scene.
+ * Tiles drawn for the previous view stay until every tile of the new selection has arrived,
+ * so moving the camera never leaves holes.
+ * @param {Object} options
+ * @param {THREE.Scene} options.scene - Scene the tile groups are added to
+ * @param {THREE.Camera} options.camera - Camera the tiles are selected for
+ * @param {Object} options.tileset - Manifest from fetchSceneTileset
+ * @param {function(string, string): Promise<Object>} options.loadTile - Resolves the scene JSON of a tile level
+ * @param {function(): void} [options.onChange] - Called when the drawn tiles changed
+ * @returns {{update: function(): void, dispose: function(): void}}
+ **/
+export function createTileLayer({ scene, camera, tileset, loadTile, onChange = () => {} }) {
+    const loaded = new Map();
+    const pending = new Set();
+    let wanted = new Set();
+    let disposed = false;
+
+    function unload(key) {
+        const { group, objects } = loaded.get(key);
+        scene.remove(group);
+        disposeSceneResources(objects);
+        loaded.delete(key);
+    }
+
+    function prune() {
+        if ([...wanted].some((key) => !loaded.has(key))) return;
+        [...loaded.keys()].filter((key) => !wanted.has(key)).forEach(unload);
+    }
+
+    function load(tile) {
+        const key = tileKey(tile);
+        pending.add(key);
+        loadTile(tile.id, tile.level)
+            .then((sceneJSON) => {
+                if (disposed || !wanted.has(key)) return;
+                const group = new THREE.Group();
+                const { objects } = buildSceneObjects(group, sceneJSON);
+                scene.add(group);
+                loaded.set(key, { group, objects });
+            })
+            .catch(() => {
+                // A failed tile is dropped from the selection so the previous view can be released
+                wanted.delete(key);
+            })
+            .finally(() => {
+                pending.delete(key);
+                if (disposed) return;
+                prune();
+                onChange();
+            });
+    }
+
+    function update() {
+        if (disposed) return;
+        camera.updateMatrixWorld();
+        const selected = selectTiles(tileset, camera);
+        wanted = new Set(selected.map(tileKey));
+        selected
+            .filter((tile) => !loaded.has(tileKey(tile)) && !pending.has(tileKey(tile)))
+            .forEach(load);
+        prune();
+    }
+
+    function dispose() {
+        disposed = true;
+        [...loaded.keys()].forEach(unload);
+    }
+
+    return { update, dispose };
+}
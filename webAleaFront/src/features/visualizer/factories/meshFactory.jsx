@@ -1,5 +1,5 @@
 import * as THREE from "three";
-import { buildFloat32Array, buildIndexArray } from "../utils/geometry";
+import { applyNormals, buildFloat32Array, buildIndexArray } from "../utils/geometry";
 import { applyTransform } from "../utils/transforms";
 
 /**
@@ -19,7 +19,7 @@ export function meshFromJSON(meshJSON) {
         geometry.setIndex(new THREE.BufferAttribute(indices, 1));
     }
 
-    geometry.computeVertexNormals();
+    applyNormals(geometry, meshJSON?.geometry?.normals);
 
     const color = meshJSON?.material?.color ?? [0.8, 0.8, 0.8];
     const opacity = meshJSON?.material?.opacity ?? 1;
@@ -31,6 +31,10 @@ export function meshFromJSON(meshJSON) {
     });
 
     const mesh = new THREE.Mesh(geometry, material);
+    if (meshJSON?.batch) {
+        // Face-range table of the merged objects, see utils/batch.js
+        mesh.userData.batch = meshJSON.batch;
+    }
     if (meshJSON?.transform) {
         applyTransform(mesh, meshJSON.transform);
     }
@@ -1,15 +1,113 @@
 import { useCallback, useRef, useState } from "react";
-import { fetchNodeScene } from "../../../api/visualizerAPI";
 import {
+    fetchNodeScene,
+    fetchSceneBinary,
+    fetchSceneTileBinary,
+    fetchSceneTileset,
+    streamNodeScene
+} from "../../../api/visualizerAPI";
+import {
+    appendSceneChunk,
     buildOutputSummary,
     buildVisualizationData,
     parseSceneData
 } from "../services/visualizerService";
 import { debugLog } from "../utils/debug";
+import { decodeSceneBinary } from "../utils/sceneBinary";
+import { applySceneDiff } from "../utils/sceneDiff";
+
+// Decimated level shown first for scene refs, then upgraded to full resolution
+const PREVIEW_LOD = "preview";
+// Static meshes are merged per material once on the backend instead of on every open
+const BATCHED = true;
+// Quantized vertices and precomputed normals: smaller downloads, no computeVertexNormals()
+const COMPACT = true;
+// Above this many source triangles the full scene is streamed as tiles instead of loaded at once
+const TILED_MIN_TRIANGLES = 2_000_000;
+// Partial streamed scenes are re-rendered at most this often while chunks arrive
+const STREAM_REFRESH_MS = 1000;
+
+async function fetchBinaryScene(sceneRef, lod) {
+    try {
+        const parsedScene = decodeSceneBinary(
+            await fetchSceneBinary(sceneRef, { lod, batched: BATCHED, compact: COMPACT })
+        );
+        return { parsedScene, objectCount: parsedScene.objects.length };
+    } catch (err) {
+        // Falls back to the JSON endpoint, which also reports scene errors
+        debugLog("[Visualizer] Binary scene unavailable, using JSON", err);
+        return null;
+    }
+}
+
+async function fetchTiledScene(sceneRef) {
+    try {
+        const tileset = await fetchSceneTileset(sceneRef);
+        const loadTile = async (tileId, level) =>
+            decodeSceneBinary(await fetchSceneTileBinary(sceneRef, tileId, { level, compact: COMPACT }));
+        return { objects: [], geometries: {}, bounds: tileset.bounds, tiles: { tileset, loadTile } };
+    } catch (err) {
+        debugLog("[Visualizer] Tileset unavailable, loading the whole scene", err);
+        return null;
+    }
+}
+
+async function fetchDiffScene(nodeId, visualizationData, base) {
+    try {
+        const sceneData = await fetchNodeScene({ nodeId, visualizationData, diffFrom: base.sceneRef });
+        if (!sceneData?.success) {
+            debugLog("[Visualizer] Scene diff unavailable, loading the whole scene", sceneData?.error);
+            return null;
+        }
+        const parsedScene = applySceneDiff(base.scene, sceneData.diff);
+        return { parsedScene, objectCount: parsedScene.objects.length, diff: sceneData.diff };
+    } catch (err) {
+        debugLog("[Visualizer] Scene diff unavailable, loading the whole scene", err);
+        return null;
+    }
+}
+
+async function streamScene(nodeId, visualizationData, onPartial) {
+    let scene = { objects: [], geometries: {} };
+    let result = null;
+    let lastRefresh = 0;
+    try {
+        await streamNodeScene({
+            nodeId,
+            visualizationData,
+            onMessage: (message) => {
+                if (message.type === "chunk") {
+                    scene = appendSceneChunk(scene, message);
+                    const now = Date.now();
+                    if (scene.objects.length && now - lastRefresh >= STREAM_REFRESH_MS) {
+                        lastRefresh = now;
+                        onPartial(scene);
+                    }
+                } else if (message.type === "error") {
+                    result = { error: message.error };
+                } else if (message.type === "end") {
+                    result = { parsedScene: scene, objectCount: scene.objects.length, warning: message.warning };
+                }
+            }
+        });
+    } catch (err) {
+        // Before anything was shown, fall back to the JSON endpoint
+        if (lastRefresh) {
+            return { error: err?.message || "Scene stream interrupted." };
+        }
+        debugLog("[Visualizer] Scene stream unavailable, using JSON", err);
+        return null;
+    }
+    return result ?? { error: "Scene stream ended before the whole scene was received." };
+}
 
 export function useVisualizerScene({ currentNodeId, nodes }) {
     const sceneJSONRef = useRef(null);
     const sceneNodeIdRef = useRef(null);
+    // Scene ref of the run shown, to tell a new run of the same node from the cached one
+    const sceneRefRef = useRef(null);
+    // Last full-resolution, unbatched scene of the node with its ref: later runs are fetched as diffs against it
+    const diffBaseRef = useRef(null);
 
     const [sceneVersion, setSceneVersion] = useState(0);
     const [isLoading, setIsLoading] = useState(false);
@@ -20,41 +118,72 @@ export function useVisualizerScene({ currentNodeId, nodes }) {
     const clearScene = useCallback(() => {
         sceneJSONRef.current = null;
         sceneNodeIdRef.current = null;
+        sceneRefRef.current = null;
+        diffBaseRef.current = null;
         setSceneVersion(prev => prev + 1);
         setError(null);
         setWarning(null);
         setShowModal(false);
     }, []);
 
+    const upgradeScene = useCallback(async (sceneRef, nodeId, sourceTriangles) => {
+        if (sourceTriangles > TILED_MIN_TRIANGLES) {
+            const tiledScene = await fetchTiledScene(sceneRef);
+            if (tiledScene) {
+                if (sceneNodeIdRef.current !== nodeId || sceneRefRef.current !== sceneRef) return;
+                debugLog("[Visualizer] Tiled scene ready", {
+                    nodeId,
+                    tiles: tiledScene.tiles.tileset.tiles?.length
+                });
+                sceneJSONRef.current = tiledScene;
+                setSceneVersion(prev => prev + 1);
+                return;
+            }
+        }
+        const fullScene = await fetchBinaryScene(sceneRef);
+        // Ignore the upgrade if the user switched node, re-ran it or cleared the scene meanwhile
+        if (!fullScene || sceneNodeIdRef.current !== nodeId || sceneRefRef.current !== sceneRef) return;
+        debugLog("[Visualizer] Full resolution scene ready", {
+            nodeId,
+            objects: fullScene.objectCount
+        });
+        sceneJSONRef.current = fullScene.parsedScene;
+        setSceneVersion(prev => prev + 1);
+    }, []);
+
     const handleRender = useCallback(async () => {
-        if (sceneJSONRef.current && sceneNodeIdRef.current === currentNodeId) {
+        const node = nodes.find(n => n.id === currentNodeId);
+        const outputs = node?.data?.outputs ?? [];
+        const visualizationData = outputs.length ? buildVisualizationData(outputs) : null;
+        const sceneRef = visualizationData?.scene_ref;
+        const sameNode = sceneNodeIdRef.current === currentNodeId;
+        if (sceneJSONRef.current && sameNode && (!sceneRef || sceneRef === sceneRefRef.current)) {
             debugLog("[Visualizer] Reusing cached scene for node", currentNodeId);
             setShowModal(true);
             return;
         }
 
-        if (sceneNodeIdRef.current !== currentNodeId) {
+        if (!sameNode) {
             debugLog("[Visualizer] Switching node, clearing previous scene cache", {
                 previousNode: sceneNodeIdRef.current,
                 nextNode: currentNodeId
             });
             sceneJSONRef.current = null;
             sceneNodeIdRef.current = null;
+            sceneRefRef.current = null;
+            diffBaseRef.current = null;
         }
 
-        const node = nodes.find(n => n.id === currentNodeId);
         if (!node) {
             setError("No node selected.");
             return;
         }
 
-        const outputs = node.data?.outputs ?? [];
         if (!outputs.length) {
             setError("No outputs available for visualization.");
             return;
         }
 
-        const visualizationData = buildVisualizationData(outputs);
         const outputSummary = buildOutputSummary(outputs);
         debugLog("[Visualizer] Render request payload summary", {
             nodeId: node.id,
@@ -68,9 +197,104 @@ export function useVisualizerScene({ currentNodeId, nodes }) {
         setWarning(null);
 
         try {
+            // A new run of the node shown from an unbatched scene: only fetch what changed
+            const base = sameNode && diffBaseRef.current?.sceneRef !== sceneRef ? diffBaseRef.current : null;
+            const diffScene = base && sceneRef ? await fetchDiffScene(node.id, visualizationData, base) : null;
+            if (diffScene) {
+                debugLog("[Visualizer] Scene diff applied", {
+                    nodeId: node.id,
+                    added: diffScene.diff.added?.length,
+                    changed: diffScene.diff.changed?.length,
+                    removed: diffScene.diff.removed?.length
+                });
+                sceneJSONRef.current = diffScene.parsedScene;
+                sceneRefRef.current = sceneRef;
+                diffBaseRef.current = { sceneRef, scene: diffScene.parsedScene };
+                setSceneVersion(prev => prev + 1);
+                if (diffScene.objectCount === 0) {
+                    setWarning("Scene contains no objects.");
+                }
+                setShowModal(true);
+                return;
+            }
+
+            // Re-runs of a node are streamed unbatched so that the next run can be fetched as a diff;
+            // tiled scenes are too large for that and keep the preview and tiles
+            const streamRerun = sameNode && !sceneJSONRef.current?.tiles;
+            const binaryScene = sceneRef && !streamRerun
+                ? await fetchBinaryScene(sceneRef, PREVIEW_LOD)
+                : null;
+            if (binaryScene) {
+                debugLog("[Visualizer] Binary scene ready", {
+                    nodeId: node.id,
+                    objects: binaryScene.objectCount,
+                    lod: binaryScene.parsedScene.lod
+                });
+                sceneJSONRef.current = binaryScene.parsedScene;
+                sceneNodeIdRef.current = currentNodeId;
+                sceneRefRef.current = sceneRef;
+                setSceneVersion(prev => prev + 1);
+                if (binaryScene.objectCount === 0) {
+                    setWarning("Scene contains no objects.");
+                }
+                setShowModal(true);
+                if (binaryScene.parsedScene.lod?.decimated) {
+                    upgradeScene(
+                        sceneRef,
+                        currentNodeId,
+                        binaryScene.parsedScene.lod.sourceTriangles
+                    );
+                }
+                return;
+            }
+
+            // Not available as a cached binary scene: show objects as they are serialized
+            let partialShown = false;
+            const streamed = await streamScene(node.id, visualizationData, (partialScene) => {
+                sceneJSONRef.current = partialScene;
+                sceneNodeIdRef.current = currentNodeId;
+                sceneRefRef.current = sceneRef;
+                setSceneVersion(prev => prev + 1);
+                // Opened once: a user closing the modal is not overridden by later chunks
+                if (!partialShown) {
+                    partialShown = true;
+                    setShowModal(true);
+                }
+            });
+            if (streamed?.error) {
+                debugLog("[Visualizer] Scene stream failed", streamed.error);
+                sceneJSONRef.current = null;
+                sceneNodeIdRef.current = null;
+                sceneRefRef.current = null;
+                setSceneVersion(prev => prev + 1);
+                setError(streamed.error);
+                return;
+            }
+            if (streamed) {
+                debugLog("[Visualizer] Streamed scene ready", {
+                    nodeId: node.id,
+                    objects: streamed.objectCount
+                });
+                sceneJSONRef.current = streamed.parsedScene;
+                sceneNodeIdRef.current = currentNodeId;
+                sceneRefRef.current = sceneRef;
+                if (sceneRef) {
+                    diffBaseRef.current = { sceneRef, scene: streamed.parsedScene };
+                }
+                setSceneVersion(prev => prev + 1);
+                if (streamed.warning) {
+                    setWarning(streamed.warning);
+                }
+                if (!partialShown) {
+                    setShowModal(true);
+                }
+                return;
+            }
+
             const sceneData = await fetchNodeScene({
                 nodeId: node.id,
-                visualizationData
+                visualizationData,
+                batched: BATCHED
             });
 
             if (!sceneData?.success) {
@@ -89,6 +313,7 @@ export function useVisualizerScene({ currentNodeId, nodes }) {
 
             sceneJSONRef.current = parsedScene;
             sceneNodeIdRef.current = currentNodeId;
+            sceneRefRef.current = sceneRef;
             setSceneVersion(prev => prev + 1);
 
             if (sceneData?.warning) {
@@ -103,7 +328,7 @@ export function useVisualizerScene({ currentNodeId, nodes }) {
         } finally {
             setIsLoading(false);
         }
-    }, [currentNodeId, nodes]);
+    }, [currentNodeId, nodes, upgradeScene]);
 
     return {
         isLoading,
@@ -41,3 +41,17 @@ export function parseSceneData(sceneData) {
 
     return { parsedScene, objectCount };
 }
+
+/**
+ * Merge a `chunk` message of /visualize/stream into the scene streamed so far
+ * @param {Object} scene - Scene with `objects` and `geometries` received so far
+ * @param {Object} chunk - Chunk message with new `objects` and the `geometries` they first reference
+ * @returns {Object} New scene holding both
+ **/
+export function appendSceneChunk(scene, chunk) {
+    return {
+        ...scene,
+        objects: scene.objects.concat(chunk.objects ?? []),
+        geometries: { ...scene.geometries, ...(chunk.geometries ?? {}) }
+    };
+}
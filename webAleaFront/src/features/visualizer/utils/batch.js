@@ -0,0 +1,24 @@
+/**
+ * Find which source object a triangle of a backend batch belongs to.
+ * The triangles of batch.ids[i] are batch.faceOffsets[i] to batch.faceOffsets[i + 1].
+ * @param {{ids: Array, faceOffsets: number[]}} batch - Face-range table of a merged mesh
+ * @param {number} faceIndex - Triangle index, e.g. from a raycaster intersection
+ * @returns {*} Source object id, or null when out of range
+ **/
+export function batchObjectId(batch, faceIndex) {
+    const offsets = batch?.faceOffsets ?? [];
+    if (faceIndex < 0 || offsets.length < 2 || faceIndex >= offsets[offsets.length - 1]) {
+        return null;
+    }
+    let low = 0;
+    let high = offsets.length - 2;
+    while (low < high) {
+        const mid = (low + high + 1) >> 1;
+        if (offsets[mid] <= faceIndex) {
+            low = mid;
+        } else {
+            high = mid - 1;
+        }
+    }
+    return batch.ids[low];
+}
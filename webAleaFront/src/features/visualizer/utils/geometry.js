@@ -1,4 +1,9 @@
+import * as THREE from "three";
+
 export function buildFloat32Array(points = []) {
+    // Binary scenes already provide flat typed arrays
+    if (points instanceof Float32Array) return points;
+
     const count = points.length * 3;
     const array = new Float32Array(count);
     let offset = 0;
@@ -14,6 +19,7 @@ export function buildFloat32Array(points = []) {
 
 export function buildIndexArray(indices = []) {
     if (!indices.length) return null;
+    if (indices instanceof Uint16Array || indices instanceof Uint32Array) return indices;
 
     let maxIndex = 0;
     for (let i = 0; i < indices.length; i += 1) {
@@ -35,3 +41,12 @@ export function buildIndexArray(indices = []) {
     }
     return array;
 }
+
+// Sets precomputed normals (compact binary scenes) or computes them
+export function applyNormals(geometry, normals) {
+    if (normals instanceof Float32Array && normals.length === geometry.getAttribute("position").array.length) {
+        geometry.setAttribute("normal", new THREE.BufferAttribute(normals, 3));
+        return;
+    }
+    geometry.computeVertexNormals();
+}
@@ -0,0 +1,43 @@
+// Decoders for the compact mesh encoding of binary scenes (backend utils/mesh_codec.py)
+
+const OCT_MAX = 32767;
+
+/**
+ * Convert uint16 quantized positions back to floats: offset + q * scale, per axis.
+ * @param {Uint16Array} quantized - Flat xyz positions
+ * @param {{offset: number[], scale: number[]}} quantization - Bounding box minimum and step size
+ * @returns {Float32Array} Flat xyz positions
+ **/
+export function dequantizePositions(quantized, { offset, scale }) {
+    const positions = new Float32Array(quantized.length);
+    for (let i = 0; i < quantized.length; i += 3) {
+        positions[i] = offset[0] + quantized[i] * scale[0];
+        positions[i + 1] = offset[1] + quantized[i + 1] * scale[1];
+        positions[i + 2] = offset[2] + quantized[i + 2] * scale[2];
+    }
+    return positions;
+}
+
+/**
+ * Decode octahedral normals (two int16 per normal) to unit vectors.
+ * @param {Int16Array} encoded - Flat octahedral coordinates
+ * @returns {Float32Array} Flat xyz normals
+ **/
+export function decodeOctahedralNormals(encoded) {
+    const normals = new Float32Array((encoded.length / 2) * 3);
+    for (let i = 0, j = 0; i < encoded.length; i += 2, j += 3) {
+        let x = encoded[i] / OCT_MAX;
+        let y = encoded[i + 1] / OCT_MAX;
+        const z = 1 - Math.abs(x) - Math.abs(y);
+        if (z < 0) {
+            const folded = x;
+            x = (1 - Math.abs(y)) * (folded >= 0 ? 1 : -1);
+            y = (1 - Math.abs(folded)) * (y >= 0 ? 1 : -1);
+        }
+        const length = Math.hypot(x, y, z) || 1;
+        normals[j] = x / length;
+        normals[j + 1] = y / length;
+        normals[j + 2] = z / length;
+    }
+    return normals;
+}
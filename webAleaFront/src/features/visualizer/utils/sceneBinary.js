@@ -0,0 +1,90 @@
+// Decoder for the packed binary scene format served by /visualizer/scene/{ref}.bin:
+// "WASB" | uint32 version | uint32 headerLength | header JSON | buffer
+
+import { decodeOctahedralNormals, dequantizePositions } from "./meshCodec";
+
+const MAGIC = "WASB";
+const VERSION = 1;
+const PREAMBLE_LENGTH = 12;
+
+const ARRAY_TYPES = {
+    float32: Float32Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    uint32: Uint32Array
+};
+
+function bufferView(buffer, offset, accessor) {
+    const ArrayType = ARRAY_TYPES[accessor.componentType];
+    if (!ArrayType) {
+        throw new Error(`Unsupported component type: ${accessor.componentType}`);
+    }
+    return new ArrayType(buffer, offset + accessor.byteOffset, accessor.count);
+}
+
+/**
+ * Decode a binary scene into the scene JSON shape used by SceneBuilder.
+ * Geometry vertices/indices become flat typed arrays viewing the buffer.
+ * @param {ArrayBuffer} buffer - Binary scene
+ * @returns {Object} Scene with an objects array
+ **/
+export function decodeSceneBinary(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    const version = view.getUint32(4, true);
+    if (magic !== MAGIC || version !== VERSION) {
+        throw new Error("Not a WebAlea binary scene");
+    }
+
+    const headerLength = view.getUint32(8, true);
+    const headerBytes = new Uint8Array(buffer, PREAMBLE_LENGTH, headerLength);
+    const header = JSON.parse(new TextDecoder().decode(headerBytes));
+    const bufferOffset = PREAMBLE_LENGTH + headerLength;
+    const materials = header.materials ?? [];
+
+    const geometryViews = geometry => {
+        if (!geometry?.vertices || Array.isArray(geometry.vertices)) return geometry;
+        const decoded = {
+            ...geometry,
+            vertices: bufferView(buffer, bufferOffset, geometry.vertices)
+        };
+        if (geometry.indices) {
+            decoded.indices = bufferView(buffer, bufferOffset, geometry.indices);
+        }
+        if (geometry.encoding === "compact") {
+            // Quantized positions and octahedral normals, see utils/meshCodec.js
+            const { encoding, quantization, ...rest } = decoded;
+            return {
+                ...rest,
+                vertices: dequantizePositions(decoded.vertices, quantization),
+                normals: decodeOctahedralNormals(bufferView(buffer, bufferOffset, geometry.normals))
+            };
+        }
+        return decoded;
+    };
+
+    const objects = (header.objects ?? []).map(obj => {
+        const { materialIndex, ...decoded } = obj;
+        if (obj.geometry) {
+            decoded.geometry = geometryViews(obj.geometry);
+        }
+        if (materialIndex !== undefined) {
+            decoded.material = materials[materialIndex];
+        }
+        return decoded;
+    });
+
+    const scene = { objects };
+    if (header.lod) {
+        scene.lod = header.lod;
+    }
+    if (header.bounds) {
+        scene.bounds = header.bounds;
+    }
+    if (header.geometries) {
+        scene.geometries = Object.fromEntries(
+            Object.entries(header.geometries).map(([ref, geometry]) => [ref, geometryViews(geometry)])
+        );
+    }
+    return scene;
+}
@@ -0,0 +1,28 @@
+/**
+ * Apply a backend scene diff to the scene JSON of the previous run.
+ * Removed objects and the previous versions of changed ones are dropped, then added and changed
+ * objects are appended with the geometries they reference.
+ * @param {Object} scene - Scene JSON the diff was computed against
+ * @param {{added: Object[], changed: Object[], removed: string[], geometries: Object, bounds?: Object}} diff
+ * @returns {Object} Scene JSON of the new run
+ **/
+export function applySceneDiff(scene, diff) {
+    const dropped = new Set([...(diff.removed ?? []), ...(diff.changed ?? []).map((obj) => obj.previousId)]);
+    const objects = (scene?.objects ?? []).filter((obj) => !dropped.has(obj.id));
+    for (const obj of [...(diff.added ?? []), ...(diff.changed ?? [])]) {
+        const { previousId, ...current } = obj;
+        objects.push(current);
+    }
+
+    const geometries = { ...(scene?.geometries ?? {}), ...(diff.geometries ?? {}) };
+    const used = new Set(objects.map((obj) => obj.geometryRef).filter(Boolean));
+    const next = {
+        ...scene,
+        objects,
+        geometries: Object.fromEntries(Object.entries(geometries).filter(([ref]) => used.has(ref)))
+    };
+    if (diff.bounds) {
+        next.bounds = diff.bounds;
+    }
+    return next;
+}
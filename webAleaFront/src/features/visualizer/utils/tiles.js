@@ -0,0 +1,46 @@
+import * as THREE from "three";
+
+// A tile is drawn at "coarse" below this ratio of its size to its distance, and refined above the fine one
+export const COARSE_SIZE_RATIO = 0.25;
+export const FINE_SIZE_RATIO = 1;
+
+function tileBox(tile) {
+    return new THREE.Box3(new THREE.Vector3(...tile.bounds.min), new THREE.Vector3(...tile.bounds.max));
+}
+
+/**
+ * Choose the tiles and levels to draw for a camera.
+ * Tiles outside the frustum are skipped; a visible tile is drawn at "coarse" when small on screen,
+ * at "fine" when larger (or when it is a leaf), and replaced by its children when larger still.
+ * @param {Object} tileset - Manifest from fetchSceneTileset
+ * @param {THREE.Camera} camera - Camera with up-to-date matrices
+ * @param {Object} [options]
+ * @param {number} [options.coarseRatio] - Size/distance ratio below which the coarse level is enough
+ * @param {number} [options.fineRatio] - Size/distance ratio above which inner tiles are refined
+ * @returns {{id: string, level: string}[]} Tiles to draw
+ **/
+export function selectTiles(tileset, camera, { coarseRatio = COARSE_SIZE_RATIO, fineRatio = FINE_SIZE_RATIO } = {}) {
+    const tiles = new Map((tileset?.tiles ?? []).map((tile) => [tile.id, tile]));
+    const frustum = new THREE.Frustum().setFromProjectionMatrix(
+        new THREE.Matrix4().multiplyMatrices(camera.projectionMatrix, camera.matrixWorldInverse)
+    );
+    const size = new THREE.Vector3();
+    const selected = [];
+    const stack = tiles.has(tileset?.root) ? [tileset.root] : [];
+    while (stack.length) {
+        const tile = tiles.get(stack.pop());
+        const box = tileBox(tile);
+        if (!frustum.intersectsBox(box)) {
+            continue;
+        }
+        const ratio = box.getSize(size).length() / Math.max(box.distanceToPoint(camera.position), 1e-6);
+        if (ratio < coarseRatio) {
+            selected.push({ id: tile.id, level: "coarse" });
+        } else if (!tile.children.length || ratio < fineRatio) {
+            selected.push({ id: tile.id, level: "fine" });
+        } else {
+            stack.push(...tile.children);
+        }
+    }
+    return selected;
+}
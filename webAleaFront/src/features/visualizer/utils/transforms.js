@@ -1,3 +1,5 @@
+import * as THREE from "three";
+
 const DEFAULT_POSITION = [0, 0, 0];
 const DEFAULT_ROTATION = [0, 0, 0];
 const DEFAULT_SCALE = [1, 1, 1];
@@ -16,6 +18,8 @@ export function getTransformComponents(transform = {}) {
 
 export function isIdentityTransform(transform) {
     if (!transform) return true;
+    // The backend only emits a matrix for non-identity instance transforms
+    if (transform.matrix) return false;
     const { position, rotation, scale } = getTransformComponents(transform);
     const isIdentityPos = position[0] === 0 && position[1] === 0 && position[2] === 0;
     const isIdentityRot = rotation[0] === 0 && rotation[1] === 0 && rotation[2] === 0;
@@ -23,8 +27,26 @@ export function isIdentityTransform(transform) {
     return isIdentityPos && isIdentityRot && isIdentityScale;
 }
 
+export function transformToMatrix(transform, target = new THREE.Matrix4()) {
+    if (transform?.matrix) {
+        return target.fromArray(transform.matrix);
+    }
+    const { position, rotation, scale } = getTransformComponents(transform);
+    return target.compose(
+        new THREE.Vector3(position[0], position[1], position[2]),
+        new THREE.Quaternion().setFromEuler(new THREE.Euler(rotation[0], rotation[1], rotation[2])),
+        new THREE.Vector3(scale[0], scale[1], scale[2])
+    );
+}
+
 export function applyTransform(object3D, transform) {
     if (!object3D || !transform) return;
+    if (transform.matrix) {
+        // Column-major 4x4 matrix; may contain shear, so it is not decomposed
+        object3D.matrix.fromArray(transform.matrix);
+        object3D.matrixAutoUpdate = false;
+        return;
+    }
     const { position, rotation, scale } = getTransformComponents(transform);
     object3D.position.set(position[0], position[1], position[2]);
     object3D.rotation.set(rotation[0], rotation[1], rotation[2]);
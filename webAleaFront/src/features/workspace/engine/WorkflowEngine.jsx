@@ -5,13 +5,14 @@
  *
  * Features:
  *  - Parallel execution of independent branches: nodes without mutual dependencies run concurrently to improve throughput.
+ *    Backend nodes that become ready together are sent in one batch request, whose results stream back one by one.
  *  - Automatic input resolution and gating: a node will wait until all connected inputs or preset default values are available before starting.
  *  - Cycle detection and reporting: the validator detects circular dependencies and returns the involved nodes to prevent infinite execution.
  *  - Graceful cancellation via AbortController: in-flight backend calls are abortable and remaining tasks are canceled cleanly.
  *  - Real-time feedback through events: emits lifecycle events (workflow-start, node-start, node-result, node-error, node-skipped, node-done, node-state-change, workflow-done, etc.) for UI updates and logging.
  */
 
-import { executeNode } from "../../../api/runnerAPI.js";
+import { cancelExecution, executeNode, executeNodeBatch } from "../../../api/runnerAPI.js";
 import { NodeState } from "../constants/nodeState.js";
 import { DataType } from "../constants/workflowConstants.js";
 import { WorkflowValidator } from "./WorkflowValidator.jsx";
@@ -46,6 +47,9 @@ export class WorkflowEngine {
         // Promises for node executions
         this.executionPromises = new Map();  // nodeId -> Promise
         this.nodeResolvers = new Map();      // nodeId -> { resolve, reject }
+
+        // Backend executions in flight, cancelled on stop()
+        this.activeExecutionIds = new Set();
     }
 
     // =========================================================================
@@ -195,6 +199,14 @@ export class WorkflowEngine {
             this.abortController.abort();
         }
 
+        // Aborting the fetch does not stop the backend process: cancel it explicitly
+        for (const executionId of this.activeExecutionIds) {
+            Promise.resolve(cancelExecution(executionId)).catch((error) => {
+                console.warn(`WorkflowEngine: Failed to cancel execution ${executionId}`, error);
+            });
+        }
+        this.activeExecutionIds.clear();
+
         // Update states of running/pending nodes to CANCELLED
         for (const [nodeId, state] of this.nodeStates) {
             if (state === NodeState.PENDING || state === NodeState.READY || state === NodeState.RUNNING) {
@@ -255,10 +267,17 @@ export class WorkflowEngine {
 
     /**
      * Execute all ready nodes in parallel
+     * Several backend nodes share one batch request instead of one request each.
      * @param {Array} readyNodeIds - List of node IDs ready to execute
      */
     async _executeReadyNodes(readyNodeIds, runId = this.currentRunId) {
-        const executions = readyNodeIds.map(nodeId => this._executeNode(nodeId, runId));
+        const backendNodes = readyNodeIds
+            .map(nodeId => this.graph.find(n => n.id === nodeId))
+            .filter(node => node?.packageName && node?.nodeName);
+        const batched = backendNodes.length > 1 && this.running && runId === this.currentRunId
+            ? this._executeBatchViaBackend(backendNodes)
+            : new Map();
+        const executions = readyNodeIds.map(nodeId => this._executeNode(nodeId, runId, batched.get(nodeId)));
         await Promise.allSettled(executions);
     }
 
@@ -273,12 +292,15 @@ export class WorkflowEngine {
     /**
      * Executes a single node
      * @param {string} nodeId - ID of the node to execute
+     * @param {Promise<Array>} [batchedOutputs] - Outputs of the node from a batch request already sent
      */
-    async _executeNode(nodeId, runId = this.currentRunId) {
+    async _executeNode(nodeId, runId = this.currentRunId, batchedOutputs = null) {
         // Create a promise for this node's execution : will be resolved/rejected later
         const nodePromise = new Promise((resolve, reject) => {
             this.nodeResolvers.set(nodeId, { resolve, reject });
         });
+        // Awaited by _waitForAllNodes, possibly after it failed (a batch settles its nodes one by one)
+        nodePromise.catch(() => {});
         this.executionPromises.set(nodeId, nodePromise);
 
         try {
@@ -303,7 +325,9 @@ export class WorkflowEngine {
 
             // Execute the node (via backend or primitive)
             let outputs;
-            if (node.packageName && node.nodeName) {
+            if (batchedOutputs) {
+                outputs = await batchedOutputs;
+            } else if (node.packageName && node.nodeName) {
                 outputs = await this._executeViaBackend(node, resolvedInputs);
             } else {
                 // Primitive node: simulate execution locally
@@ -386,10 +410,7 @@ export class WorkflowEngine {
      * Execute a node via backend API
      */
     async _executeViaBackend(node, inputs) {
-        const preparedInputs = (inputs || []).map((input) => ({
-            ...input,
-            value: input.value ?? input.default
-        }));
+        const preparedInputs = this._prepareInputs(inputs);
 
         console.log(`WorkflowEngine: Backend call for ${node.id}`, {
             package: node.packageName,
@@ -397,13 +418,21 @@ export class WorkflowEngine {
             inputs: preparedInputs
         });
 
-        const response = await executeNode({
-            nodeId: node.id,
-            packageName: node.packageName,
-            nodeName: node.nodeName,
-            inputs: preparedInputs,
-            signal: this.abortController?.signal
-        });
+        const executionId = this._newExecutionId(node.id);
+        this.activeExecutionIds.add(executionId);
+        let response;
+        try {
+            response = await executeNode({
+                nodeId: node.id,
+                packageName: node.packageName,
+                nodeName: node.nodeName,
+                inputs: preparedInputs,
+                executionId,
+                signal: this.abortController?.signal
+            });
+        } finally {
+            this.activeExecutionIds.delete(executionId);
+        }
 
         if (response.success) {
             return response.outputs || [];
@@ -412,6 +441,74 @@ export class WorkflowEngine {
         }
     }
 
+    /**
+     * Execute ready backend nodes in one batch request
+     * @param {Array} nodes - Backend nodes whose inputs are all resolved
+     * @returns {Map<string, Promise<Array>>} Outputs of each node, settled as soon as its result arrives
+     */
+    _executeBatchViaBackend(nodes) {
+        const pending = new Map();  // nodeId -> { resolve, reject, executionId }
+        const outputs = new Map();  // nodeId -> Promise
+        const requests = nodes.map((node) => {
+            const executionId = this._newExecutionId(node.id);
+            this.activeExecutionIds.add(executionId);
+            const promise = new Promise((resolve, reject) => {
+                pending.set(node.id, { resolve, reject, executionId });
+            });
+            // Handled by _executeNode; a node stopped before awaiting it must not warn
+            promise.catch(() => {});
+            outputs.set(node.id, promise);
+            return {
+                nodeId: node.id,
+                packageName: node.packageName,
+                nodeName: node.nodeName,
+                inputs: this._prepareInputs(this.dependencyTracker.getResolvedInputs(node.id)),
+                executionId
+            };
+        });
+
+        console.log("WorkflowEngine: Batch backend call for", nodes.map(node => node.id));
+
+        const settle = (nodeId, settleNode) => {
+            const entry = pending.get(nodeId);
+            if (!entry) return;
+            pending.delete(nodeId);
+            this.activeExecutionIds.delete(entry.executionId);
+            settleNode(entry);
+        };
+        const onResult = (response) => settle(response.node_id, ({ resolve, reject }) => {
+            if (response.success) {
+                resolve(response.outputs || []);
+            } else {
+                reject(new Error(response.error || `Execution failed for ${response.node_id}`));
+            }
+        });
+
+        Promise.resolve()
+            .then(() => executeNodeBatch(requests, { onResult, signal: this.abortController?.signal }))
+            .then(
+                () => new Error("Missing result in batch response"),
+                (error) => error
+            )
+            .then((error) => {
+                for (const nodeId of [...pending.keys()]) {
+                    settle(nodeId, ({ reject }) => reject(error));
+                }
+            });
+        return outputs;
+    }
+
+    _prepareInputs(inputs) {
+        return (inputs || []).map((input) => ({
+            ...input,
+            value: input.value ?? input.default
+        }));
+    }
+
+    _newExecutionId(nodeId) {
+        return `${nodeId}-${Date.now()}-${Math.random().toString(36).slice(2, 10)}`;
+    }
+
     _isAbortError(error) {
         return (
             error?.name === "AbortError" ||
@@ -1,5 +1,5 @@
 import { describe, test, expect, beforeEach, jest } from "@jest/globals";
-import { fetchJSON } from "../../../src/api/utils";
+import { createNdjsonParser, fetchJSON, fetchNDJSON } from "../../../src/api/utils";
 
 globalThis.fetch = jest.fn();
 
@@ -41,3 +41,53 @@ describe("fetchJSON", () => {
         await expect(fetchJSON("/abort")).rejects.toThrow("aborted");
     });
 });
+
+describe("createNdjsonParser", () => {
+    test("emits complete lines across pieces", () => {
+        const messages = [];
+        const parser = createNdjsonParser((message) => messages.push(message));
+
+        parser.push('{"type": "scene"}\n{"type": "ch');
+        expect(messages).toEqual([{ type: "scene" }]);
+        parser.push('unk", "objects": []}\n\n{"type": "end"}');
+        parser.end();
+
+        expect(messages).toEqual([{ type: "scene" }, { type: "chunk", objects: [] }, { type: "end" }]);
+    });
+});
+
+describe("fetchNDJSON", () => {
+    beforeEach(() => {
+        jest.clearAllMocks();
+    });
+
+    test("posts the body and passes every line read from the stream", async () => {
+        const encoder = new TextEncoder();
+        const pieces = ['{"node_id": "a"}\n{"node', '_id": "b"}\n'];
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            body: {
+                getReader: () => ({
+                    read: async () => (pieces.length
+                        ? { done: false, value: encoder.encode(pieces.shift()) }
+                        : { done: true })
+                })
+            }
+        });
+        const onMessage = jest.fn();
+
+        await fetchNDJSON("/stream", { stream: true }, onMessage);
+
+        expect(fetch).toHaveBeenCalledWith(
+            "/stream",
+            expect.objectContaining({ method: "POST", body: JSON.stringify({ stream: true }) })
+        );
+        expect(onMessage.mock.calls.map(([message]) => message.node_id)).toEqual(["a", "b"]);
+    });
+
+    test("throws on non-ok response", async () => {
+        fetch.mockResolvedValueOnce({ ok: false, status: 503 });
+
+        await expect(fetchNDJSON("/stream", {}, jest.fn())).rejects.toThrow("HTTP 503");
+    });
+});
@@ -1,5 +1,11 @@
 import { describe, test, expect, beforeEach, jest } from "@jest/globals";
-import { fetchNodeScene } from "../../../src/api/visualizerAPI";
+import {
+    fetchNodeScene,
+    fetchSceneBinary,
+    fetchSceneTileBinary,
+    fetchSceneTileset,
+    streamNodeScene
+} from "../../../src/api/visualizerAPI";
 import { API_BASE_URL_VISUALIZER } from "../../../src/config/api";
 
 jest.mock("../../../src/features/visualizer/utils/debug", () => ({
@@ -43,4 +49,100 @@ describe("visualizerAPI", () => {
         );
         expect(data).toEqual(mockResponse);
     });
+
+    test("fetchSceneBinary requests the level of detail", async () => {
+        const buffer = new ArrayBuffer(4);
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            arrayBuffer: async () => buffer
+        });
+
+        const data = await fetchSceneBinary("abc", { lod: "preview" });
+
+        expect(fetch).toHaveBeenCalledWith(`${API_BASE_URL_VISUALIZER}/scene/abc.bin?lod=preview`);
+        expect(data).toBe(buffer);
+    });
+
+    test("fetchSceneBinary requests the batched compact variant", async () => {
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            arrayBuffer: async () => new ArrayBuffer(4)
+        });
+
+        await fetchSceneBinary("abc", { lod: "preview", batched: true, compact: true });
+
+        expect(fetch).toHaveBeenCalledWith(
+            `${API_BASE_URL_VISUALIZER}/scene/abc.bin?lod=preview&batched=true&compact=true`
+        );
+    });
+
+    test("fetchSceneTileset requests the manifest", async () => {
+        const manifest = { root: "r", tiles: [] };
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            json: async () => manifest
+        });
+
+        const data = await fetchSceneTileset("abc");
+
+        expect(fetch).toHaveBeenCalledWith(
+            `${API_BASE_URL_VISUALIZER}/scene/abc/tileset`,
+            expect.objectContaining({ method: "GET" })
+        );
+        expect(data).toEqual(manifest);
+    });
+
+    test("fetchSceneTileBinary requests a tile level", async () => {
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            arrayBuffer: async () => new ArrayBuffer(4)
+        });
+
+        await fetchSceneTileBinary("abc", "r03", { level: "coarse", compact: true });
+
+        expect(fetch).toHaveBeenCalledWith(
+            `${API_BASE_URL_VISUALIZER}/scene/abc/tiles/r03.bin?level=coarse&compact=true`
+        );
+    });
+
+    test("fetchNodeScene requests a diff against a previous scene", async () => {
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            json: async () => ({ success: true, diff: {} })
+        });
+
+        await fetchNodeScene({ nodeId: "node-1", visualizationData: {}, diffFrom: "old-ref" });
+
+        expect(fetch).toHaveBeenCalledWith(
+            `${API_BASE_URL_VISUALIZER}/visualize`,
+            expect.objectContaining({
+                body: JSON.stringify({ node_id: "node-1", visualization_data: {}, diff_from: "old-ref" })
+            })
+        );
+    });
+
+    test("streamNodeScene posts to the stream endpoint and parses each line", async () => {
+        fetch.mockResolvedValueOnce({
+            ok: true,
+            text: async () => '{"type": "scene"}\n{"type": "chunk", "objects": [], "geometries": {}}\n{"type": "end"}\n'
+        });
+        const onMessage = jest.fn();
+
+        await streamNodeScene({ nodeId: "node-1", visualizationData: { scene_ref: "abc" }, chunkSize: 10, onMessage });
+
+        expect(fetch).toHaveBeenCalledWith(
+            `${API_BASE_URL_VISUALIZER}/visualize/stream`,
+            expect.objectContaining({
+                method: "POST",
+                body: JSON.stringify({ node_id: "node-1", visualization_data: { scene_ref: "abc" }, chunk_size: 10 })
+            })
+        );
+        expect(onMessage.mock.calls.map(([message]) => message.type)).toEqual(["scene", "chunk", "end"]);
+    });
+
+    test("streamNodeScene throws on HTTP errors", async () => {
+        fetch.mockResolvedValueOnce({ ok: false, status: 404 });
+
+        await expect(streamNodeScene({ nodeId: "node-1", onMessage: jest.fn() })).rejects.toThrow("HTTP 404");
+    });
 });
@@ -1,5 +1,6 @@
 import { describe, test, expect, jest, beforeEach } from "@jest/globals";
 import { buildSceneFromJSON } from "../../../../src/features/visualizer/SceneBuilder";
+import { createTileLayer } from "../../../../src/features/visualizer/core/tileLayer";
 
 const mockScene = { add: jest.fn() };
 const mockCamera = {};
@@ -56,6 +57,12 @@ jest.mock("../../../../src/features/visualizer/core/dispose", () => ({
     disposeSceneResources: jest.fn()
 }));
 
+const mockTileLayer = { update: jest.fn(), dispose: jest.fn() };
+
+jest.mock("../../../../src/features/visualizer/core/tileLayer", () => ({
+    createTileLayer: jest.fn(() => mockTileLayer)
+}));
+
 jest.mock("../../../../src/features/visualizer/utils/debug", () => ({
     debugLog: jest.fn()
 }));
@@ -93,4 +100,40 @@ describe("SceneBuilder", () => {
         expect(mockControls.dispose).toHaveBeenCalled();
         expect(mockRenderer.dispose).toHaveBeenCalled();
     });
+
+    test("streams tiles for a tiled scene", () => {
+        const mountRef = {
+            current: {
+                clientWidth: 100,
+                clientHeight: 100,
+                innerHTML: "",
+                appendChild: jest.fn()
+            }
+        };
+        const tiles = { tileset: { root: "r", tiles: [] }, loadTile: jest.fn() };
+
+        const result = buildSceneFromJSON({ objects: [], tiles }, mountRef);
+
+        expect(createTileLayer).toHaveBeenCalledWith({
+            scene: mockScene,
+            camera: mockCamera,
+            ...tiles,
+            onChange: mockRenderOnce
+        });
+        expect(mockTileLayer.update).toHaveBeenCalled();
+        expect(mockControls.addEventListener).toHaveBeenCalledWith("change", mockTileLayer.update);
+
+        result.dispose();
+
+        expect(mockControls.removeEventListener).toHaveBeenCalledWith("change", mockTileLayer.update);
+        expect(mockTileLayer.dispose).toHaveBeenCalled();
+    });
+
+    test("does not create a tile layer for whole scenes", () => {
+        const mountRef = { current: { clientWidth: 100, clientHeight: 100, innerHTML: "", appendChild: jest.fn() } };
+
+        buildSceneFromJSON({ objects: [] }, mountRef);
+
+        expect(createTileLayer).not.toHaveBeenCalled();
+    });
 });
@@ -30,4 +30,16 @@ describe("frameCameraToScene", () => {
 
         expect(camera.position.z).toBe(5);
     });
+
+    test("uses the scene bounds sent by the backend", () => {
+        const scene = new THREE.Scene();
+        const camera = new THREE.PerspectiveCamera(90, 1, 0.1, 1000);
+        const controls = { target: new THREE.Vector3(), update: jest.fn() };
+
+        frameCameraToScene(scene, camera, controls, { min: [0, 0, 0], max: [2, 4, 2] });
+
+        expect(controls.target.toArray()).toEqual([1, 2, 1]);
+        expect(camera.position.x).toBe(1);
+        expect(camera.position.z).toBeCloseTo(1 + 2 * 1.2);
+    });
 });
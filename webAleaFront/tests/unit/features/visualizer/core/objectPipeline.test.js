@@ -37,4 +37,50 @@ describe("objectPipeline", () => {
         expect(scene.children.length).toBe(3);
         expect(result.hasAnimations).toBe(false);
     });
+
+    test("buildSceneObjects instances shared geometries", () => {
+        const scene = new THREE.Scene();
+        const material = { color: [0.2, 0.6, 0.2], opacity: 1 };
+        const leaf = (x) => ({
+            objectType: "mesh",
+            geometryRef: "g0",
+            material,
+            transform: { matrix: [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, x, 0, 0, 1] }
+        });
+        const sceneJSON = {
+            geometries: {
+                g0: { type: "mesh", vertices: [[0, 0, 0], [1, 0, 0], [0, 1, 0]], indices: [[0, 1, 2]] },
+                g1: { type: "line", vertices: [[0, 0, 0], [0, 0, 1]] }
+            },
+            objects: [leaf(0), leaf(1), leaf(2), { objectType: "line", geometryRef: "g1" }]
+        };
+
+        const result = buildSceneObjects(scene, sceneJSON);
+        expect(result.objects.length).toBe(2);
+        const instanced = result.objects[0].object3D;
+        expect(instanced).toBeInstanceOf(THREE.InstancedMesh);
+        expect(instanced.count).toBe(3);
+
+        const matrix = new THREE.Matrix4();
+        instanced.getMatrixAt(2, matrix);
+        expect(new THREE.Vector3().setFromMatrixPosition(matrix).x).toBe(2);
+
+        const line = result.objects[1].object3D;
+        expect(line.geometry.getAttribute("position").count).toBe(2);
+    });
+
+    test("buildSceneObjects keeps backend batches as single meshes", () => {
+        const scene = new THREE.Scene();
+        const batch = {
+            id: "batch-0",
+            objectType: "mesh",
+            geometry: { type: "mesh", vertices: [[0, 0, 0], [1, 0, 0], [0, 1, 0]], indices: [[0, 1, 2]] },
+            material: { color: [1, 0, 0], opacity: 1 },
+            batch: { ids: ["a"], faceOffsets: [0, 1] }
+        };
+
+        const result = buildSceneObjects(scene, { objects: [batch] });
+        expect(result.objects.length).toBe(1);
+        expect(result.objects[0].object3D.userData.batch).toBe(batch.batch);
+    });
 });
@@ -0,0 +1,110 @@
+import { describe, test, expect, jest, beforeEach } from "@jest/globals";
+import { createTileLayer } from "../../../../../src/features/visualizer/core/tileLayer";
+import { selectTiles } from "../../../../../src/features/visualizer/utils/tiles";
+import { buildSceneObjects } from "../../../../../src/features/visualizer/core/objectPipeline";
+import { disposeSceneResources } from "../../../../../src/features/visualizer/core/dispose";
+
+jest.mock("../../../../../src/features/visualizer/utils/tiles", () => ({
+    selectTiles: jest.fn()
+}));
+
+jest.mock("../../../../../src/features/visualizer/core/objectPipeline", () => ({
+    buildSceneObjects: jest.fn(() => ({ objects: [{ object3D: { traverse: jest.fn() } }], hasAnimations: false }))
+}));
+
+jest.mock("../../../../../src/features/visualizer/core/dispose", () => ({
+    disposeSceneResources: jest.fn()
+}));
+
+function deferred() {
+    let resolve;
+    const promise = new Promise((res) => {
+        resolve = res;
+    });
+    return { promise, resolve };
+}
+
+const flush = () => new Promise((resolve) => setTimeout(resolve, 0));
+
+describe("createTileLayer", () => {
+    let scene;
+    let camera;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        scene = { add: jest.fn(), remove: jest.fn() };
+        camera = { updateMatrixWorld: jest.fn() };
+    });
+
+    test("loads the selected tiles once and reports changes", async () => {
+        selectTiles.mockReturnValue([{ id: "r", level: "coarse" }]);
+        const loadTile = jest.fn(async () => ({ objects: [{ id: "a" }] }));
+        const onChange = jest.fn();
+        const layer = createTileLayer({ scene, camera, tileset: {}, loadTile, onChange });
+
+        layer.update();
+        layer.update();
+        await flush();
+
+        expect(loadTile).toHaveBeenCalledTimes(1);
+        expect(loadTile).toHaveBeenCalledWith("r", "coarse");
+        expect(buildSceneObjects).toHaveBeenCalledWith(expect.anything(), { objects: [{ id: "a" }] });
+        expect(scene.add).toHaveBeenCalledTimes(1);
+        expect(onChange).toHaveBeenCalled();
+    });
+
+    test("keeps the previous tiles until the new selection has arrived", async () => {
+        selectTiles.mockReturnValueOnce([{ id: "r", level: "coarse" }]);
+        const fine = deferred();
+        const loadTile = jest.fn(async (id) => (id === "r" ? { objects: [] } : fine.promise));
+        const layer = createTileLayer({ scene, camera, tileset: {}, loadTile });
+
+        layer.update();
+        await flush();
+        const [rootGroup] = scene.add.mock.calls[0];
+
+        selectTiles.mockReturnValueOnce([{ id: "r0", level: "fine" }]);
+        layer.update();
+        await flush();
+        expect(scene.remove).not.toHaveBeenCalled();
+
+        fine.resolve({ objects: [] });
+        await flush();
+        expect(scene.remove).toHaveBeenCalledWith(rootGroup);
+        expect(disposeSceneResources).toHaveBeenCalledTimes(1);
+    });
+
+    test("releases the loaded tiles on dispose and ignores late ones", async () => {
+        selectTiles.mockReturnValue([{ id: "r0", level: "fine" }, { id: "r1", level: "fine" }]);
+        const late = deferred();
+        const loadTile = jest.fn(async (id) => (id === "r0" ? { objects: [] } : late.promise));
+        const layer = createTileLayer({ scene, camera, tileset: {}, loadTile });
+
+        layer.update();
+        await flush();
+        layer.dispose();
+        late.resolve({ objects: [] });
+        await flush();
+
+        expect(scene.add).toHaveBeenCalledTimes(1);
+        expect(scene.remove).toHaveBeenCalledTimes(1);
+    });
+
+    test("drops a tile that failed to load", async () => {
+        selectTiles.mockReturnValueOnce([{ id: "r", level: "coarse" }]);
+        const loadTile = jest.fn(async (id) => {
+            if (id === "r0") throw new Error("Erreur API : HTTP 404");
+            return { objects: [] };
+        });
+        const layer = createTileLayer({ scene, camera, tileset: {}, loadTile });
+
+        layer.update();
+        await flush();
+        selectTiles.mockReturnValueOnce([{ id: "r0", level: "fine" }, { id: "r1", level: "fine" }]);
+        layer.update();
+        await flush();
+
+        expect(scene.add).toHaveBeenCalledTimes(2);
+        expect(scene.remove).toHaveBeenCalledTimes(1);
+    });
+});
@@ -31,4 +31,16 @@ describe("meshFactory", () => {
         expect(mesh.position.x).toBe(1);
         expect(mesh.scale.x).toBe(2);
     });
+
+    test("keeps the face-range table of backend batches", () => {
+        const batch = { ids: ["a", "b"], faceOffsets: [0, 1, 2] };
+        const mesh = meshFromJSON({
+            geometry: {
+                vertices: [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]],
+                indices: [[0, 1, 2], [0, 2, 3]]
+            },
+            batch
+        });
+        expect(mesh.userData.batch).toBe(batch);
+    });
 });
@@ -1,10 +1,25 @@
 import { describe, test, expect, jest, beforeEach } from "@jest/globals";
-import { renderHook, act } from "@testing-library/react";
+import { renderHook, act, waitFor } from "@testing-library/react";
 import { useVisualizerScene } from "../../../../../src/features/visualizer/hooks/useVisualizerScene";
-import { fetchNodeScene } from "../../../../../src/api/visualizerAPI";
+import {
+    fetchNodeScene,
+    fetchSceneBinary,
+    fetchSceneTileBinary,
+    fetchSceneTileset,
+    streamNodeScene
+} from "../../../../../src/api/visualizerAPI";
+import { decodeSceneBinary } from "../../../../../src/features/visualizer/utils/sceneBinary";
 
 jest.mock("../../../../../src/api/visualizerAPI", () => ({
-    fetchNodeScene: jest.fn()
+    fetchNodeScene: jest.fn(),
+    fetchSceneBinary: jest.fn(),
+    fetchSceneTileBinary: jest.fn(),
+    fetchSceneTileset: jest.fn(),
+    streamNodeScene: jest.fn()
+}));
+
+jest.mock("../../../../../src/features/visualizer/utils/sceneBinary", () => ({
+    decodeSceneBinary: jest.fn()
 }));
 
 jest.mock("../../../../../src/features/visualizer/utils/debug", () => ({
@@ -14,6 +29,8 @@ jest.mock("../../../../../src/features/visualizer/utils/debug", () => ({
 describe("useVisualizerScene", () => {
     beforeEach(() => {
         jest.clearAllMocks();
+        fetchSceneBinary.mockRejectedValue(new Error("Erreur API : HTTP 404"));
+        streamNodeScene.mockRejectedValue(new Error("Erreur API : HTTP 404"));
     });
 
     test("loads scene and caches it", async () => {
@@ -96,4 +113,185 @@ describe("useVisualizerScene", () => {
         expect(result.current.sceneJSON).toBeNull();
         expect(result.current.showModal).toBe(false);
     });
+
+    test("prefers the binary scene when a scene ref is available", async () => {
+        const buffer = new ArrayBuffer(8);
+        fetchSceneBinary.mockResolvedValueOnce(buffer);
+        decodeSceneBinary.mockReturnValueOnce({ objects: [{ id: "a" }] });
+
+        const nodes = [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: "ref-1" } }] } }];
+
+        const { result } = renderHook(() =>
+            useVisualizerScene({ currentNodeId: "node-1", nodes })
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        expect(fetchSceneBinary).toHaveBeenCalledWith("ref-1", { lod: "preview", batched: true, compact: true });
+        expect(decodeSceneBinary).toHaveBeenCalledWith(buffer);
+        expect(fetchNodeScene).not.toHaveBeenCalled();
+        expect(result.current.sceneJSON).toEqual({ objects: [{ id: "a" }] });
+        expect(result.current.showModal).toBe(true);
+    });
+
+    test("upgrades a decimated preview to the full scene", async () => {
+        const preview = { objects: [{ id: "a" }], lod: { level: "preview", decimated: true } };
+        const full = { objects: [{ id: "a" }, { id: "b" }] };
+        fetchSceneBinary.mockResolvedValueOnce(new ArrayBuffer(8)).mockResolvedValueOnce(new ArrayBuffer(16));
+        decodeSceneBinary.mockReturnValueOnce(preview).mockReturnValueOnce(full);
+
+        const nodes = [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: "ref-1" } }] } }];
+
+        const { result } = renderHook(() =>
+            useVisualizerScene({ currentNodeId: "node-1", nodes })
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        await waitFor(() => expect(result.current.sceneJSON).toEqual(full));
+        expect(fetchSceneBinary).toHaveBeenNthCalledWith(1, "ref-1", { lod: "preview", batched: true, compact: true });
+        expect(fetchSceneBinary).toHaveBeenNthCalledWith(2, "ref-1", { lod: undefined, batched: true, compact: true });
+        expect(result.current.showModal).toBe(true);
+    });
+
+    test("streams tiles instead of the full scene for very large scenes", async () => {
+        const preview = {
+            objects: [{ id: "a" }],
+            lod: { level: "preview", decimated: true, sourceTriangles: 5_000_000 }
+        };
+        const tileset = { root: "r", bounds: { min: [0, 0, 0], max: [1, 1, 1] }, tiles: [] };
+        const tile = { objects: [{ id: "t" }] };
+        fetchSceneBinary.mockResolvedValueOnce(new ArrayBuffer(8));
+        fetchSceneTileset.mockResolvedValueOnce(tileset);
+        fetchSceneTileBinary.mockResolvedValueOnce(new ArrayBuffer(4));
+        decodeSceneBinary.mockReturnValueOnce(preview).mockReturnValueOnce(tile);
+
+        const nodes = [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: "ref-1" } }] } }];
+
+        const { result } = renderHook(() =>
+            useVisualizerScene({ currentNodeId: "node-1", nodes })
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        await waitFor(() => expect(result.current.sceneJSON?.tiles?.tileset).toBe(tileset));
+        expect(fetchSceneBinary).toHaveBeenCalledTimes(1);
+        expect(result.current.sceneJSON.bounds).toEqual(tileset.bounds);
+        expect(result.current.sceneJSON.objects).toEqual([]);
+
+        await expect(result.current.sceneJSON.tiles.loadTile("r", "coarse")).resolves.toBe(tile);
+        expect(fetchSceneTileBinary).toHaveBeenCalledWith("ref-1", "r", { level: "coarse", compact: true });
+    });
+
+    test("streams the scene when no binary scene is available", async () => {
+        streamNodeScene.mockImplementationOnce(async ({ onMessage }) => {
+            onMessage({ type: "scene", nodeId: "node-1", cacheHit: false });
+            onMessage({ type: "chunk", objects: [{ id: "a", geometryRef: "g0" }], geometries: { g0: { type: "mesh" } } });
+            onMessage({ type: "chunk", objects: [{ id: "b", geometryRef: "g0" }], geometries: {} });
+            onMessage({ type: "end", nodeId: "node-1", objectCount: 2 });
+        });
+
+        const nodes = [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: "ref-1" } }] } }];
+
+        const { result } = renderHook(() =>
+            useVisualizerScene({ currentNodeId: "node-1", nodes })
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        expect(fetchNodeScene).not.toHaveBeenCalled();
+        expect(result.current.sceneJSON).toEqual({
+            objects: [{ id: "a", geometryRef: "g0" }, { id: "b", geometryRef: "g0" }],
+            geometries: { g0: { type: "mesh" } }
+        });
+        expect(result.current.showModal).toBe(true);
+    });
+
+    test("fetches a new run of the shown node as a diff", async () => {
+        streamNodeScene.mockImplementationOnce(async ({ onMessage }) => {
+            onMessage({ type: "chunk", objects: [{ id: "a", geometryRef: "g0" }, { id: "b", geometryRef: "g0" }], geometries: { g0: { type: "mesh" } } });
+            onMessage({ type: "end", nodeId: "node-1", objectCount: 2 });
+        });
+        fetchNodeScene.mockResolvedValueOnce({
+            success: true,
+            diff: { added: [{ id: "c", geometryRef: "g0" }], changed: [], removed: ["b"], geometries: {} }
+        });
+
+        const runNodes = (ref) => [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: ref } }] } }];
+        const { result, rerender } = renderHook(
+            ({ nodes }) => useVisualizerScene({ currentNodeId: "node-1", nodes }),
+            { initialProps: { nodes: runNodes("ref-1") } }
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+        rerender({ nodes: runNodes("ref-2") });
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        expect(fetchNodeScene).toHaveBeenCalledWith(expect.objectContaining({ nodeId: "node-1", diffFrom: "ref-1" }));
+        expect(result.current.sceneJSON).toEqual({
+            objects: [{ id: "a", geometryRef: "g0" }, { id: "c", geometryRef: "g0" }],
+            geometries: { g0: { type: "mesh" } }
+        });
+        expect(streamNodeScene).toHaveBeenCalledTimes(1);
+    });
+
+    test("streams a new run of a node shown from its binary scene", async () => {
+        fetchSceneBinary.mockResolvedValueOnce(new ArrayBuffer(8));
+        decodeSceneBinary.mockReturnValueOnce({ objects: [{ id: "a" }] });
+        streamNodeScene.mockImplementationOnce(async ({ onMessage }) => {
+            onMessage({ type: "chunk", objects: [{ id: "b" }], geometries: {} });
+            onMessage({ type: "end", nodeId: "node-1", objectCount: 1 });
+        });
+
+        const runNodes = (ref) => [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_ref", __ref__: ref } }] } }];
+        const { result, rerender } = renderHook(
+            ({ nodes }) => useVisualizerScene({ currentNodeId: "node-1", nodes }),
+            { initialProps: { nodes: runNodes("ref-1") } }
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+        rerender({ nodes: runNodes("ref-2") });
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        expect(fetchSceneBinary).toHaveBeenCalledTimes(1);
+        expect(fetchNodeScene).not.toHaveBeenCalled();
+        expect(result.current.sceneJSON).toEqual({ objects: [{ id: "b" }], geometries: {} });
+    });
+
+    test("reports a stream error", async () => {
+        streamNodeScene.mockImplementationOnce(async ({ onMessage }) => {
+            onMessage({ type: "scene", nodeId: "node-1", cacheHit: false });
+            onMessage({ type: "error", nodeId: "node-1", error: "Scene JSON cache entry not found: ref-1" });
+        });
+
+        const nodes = [{ id: "node-1", data: { outputs: [{ value: { __type__: "plantgl_scene_json_ref", __ref__: "ref-1" } }] } }];
+
+        const { result } = renderHook(() =>
+            useVisualizerScene({ currentNodeId: "node-1", nodes })
+        );
+
+        await act(async () => {
+            await result.current.handleRender();
+        });
+
+        expect(result.current.error).toBe("Scene JSON cache entry not found: ref-1");
+        expect(result.current.sceneJSON).toBeNull();
+        expect(fetchNodeScene).not.toHaveBeenCalled();
+    });
 });
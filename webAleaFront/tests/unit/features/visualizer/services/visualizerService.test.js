@@ -1,5 +1,6 @@
 import { describe, test, expect } from "@jest/globals";
 import {
+    appendSceneChunk,
     buildOutputSummary,
     buildVisualizationData,
     extractSceneRef,
@@ -78,4 +79,16 @@ describe("visualizerService", () => {
         expect(fromObject.parsedScene).toEqual(scene);
         expect(fromObject.objectCount).toBe(2);
     });
+
+    test("appendSceneChunk merges objects and geometries", () => {
+        const first = appendSceneChunk(
+            { objects: [], geometries: {} },
+            { type: "chunk", objects: [{ id: "a", geometryRef: "g0" }], geometries: { g0: { type: "mesh" } } }
+        );
+        const scene = appendSceneChunk(first, { type: "chunk", objects: [{ id: "b", geometryRef: "g0" }], geometries: {} });
+
+        expect(scene.objects.map((obj) => obj.id)).toEqual(["a", "b"]);
+        expect(scene.geometries).toEqual({ g0: { type: "mesh" } });
+        expect(first.objects).toHaveLength(1);
+    });
 });
@@ -0,0 +1,20 @@
+import { describe, test, expect } from "@jest/globals";
+import { batchObjectId } from "../../../../../src/features/visualizer/utils/batch";
+
+describe("batch utils", () => {
+    const batch = { ids: ["a", "b", "c"], faceOffsets: [0, 2, 2, 5] };
+
+    test("batchObjectId maps a triangle to its source object", () => {
+        expect(batchObjectId(batch, 0)).toBe("a");
+        expect(batchObjectId(batch, 1)).toBe("a");
+        // "b" has no triangles
+        expect(batchObjectId(batch, 2)).toBe("c");
+        expect(batchObjectId(batch, 4)).toBe("c");
+    });
+
+    test("batchObjectId returns null out of range", () => {
+        expect(batchObjectId(batch, 5)).toBeNull();
+        expect(batchObjectId(batch, -1)).toBeNull();
+        expect(batchObjectId(undefined, 0)).toBeNull();
+    });
+});
@@ -1,5 +1,6 @@
 import { describe, test, expect } from "@jest/globals";
-import { buildFloat32Array, buildIndexArray } from "../../../../../src/features/visualizer/utils/geometry";
+import * as THREE from "three";
+import { applyNormals, buildFloat32Array, buildIndexArray } from "../../../../../src/features/visualizer/utils/geometry";
 
 describe("geometry utils", () => {
     test("buildFloat32Array flattens points", () => {
@@ -30,4 +31,25 @@ describe("geometry utils", () => {
         expect(array).toBeInstanceOf(Uint32Array);
         expect(array[0]).toBe(70000);
     });
+
+    test("typed arrays from binary scenes are used as-is", () => {
+        const vertices = new Float32Array([1, 2, 3]);
+        const indices = new Uint32Array([0, 1, 2]);
+        expect(buildFloat32Array(vertices)).toBe(vertices);
+        expect(buildIndexArray(indices)).toBe(indices);
+    });
+
+    test("applyNormals uses precomputed normals when they match the positions", () => {
+        const geometry = new THREE.BufferGeometry();
+        geometry.setAttribute("position", new THREE.BufferAttribute(new Float32Array([0, 0, 0, 1, 0, 0, 0, 1, 0]), 3));
+        const normals = new Float32Array([0, 0, 1, 0, 0, 1, 0, 0, 1]);
+        applyNormals(geometry, normals);
+        expect(geometry.getAttribute("normal").array).toBe(normals);
+
+        const computed = new THREE.BufferGeometry();
+        computed.setAttribute("position", new THREE.BufferAttribute(new Float32Array([0, 0, 0, 1, 0, 0, 0, 1, 0]), 3));
+        applyNormals(computed, undefined);
+        expect(computed.getAttribute("normal").array[2]).toBeCloseTo(1);
+    });
+
 });
@@ -0,0 +1,24 @@
+import { describe, test, expect } from "@jest/globals";
+import {
+    decodeOctahedralNormals,
+    dequantizePositions
+} from "../../../../../src/features/visualizer/utils/meshCodec";
+
+describe("meshCodec utils", () => {
+    test("dequantizePositions scales per axis", () => {
+        const positions = dequantizePositions(new Uint16Array([0, 10, 65535]), {
+            offset: [1, 2, 3],
+            scale: [0.5, 0.1, 1 / 65535]
+        });
+        expect(positions[0]).toBeCloseTo(1);
+        expect(positions[1]).toBeCloseTo(3);
+        expect(positions[2]).toBeCloseTo(4);
+    });
+
+    test("decodeOctahedralNormals covers both hemispheres", () => {
+        // +z, -z and +x as encoded by the backend (mesh_codec.octahedral_encode)
+        const normals = decodeOctahedralNormals(new Int16Array([0, 0, 32767, 32767, 32767, 0]));
+        const expected = [0, 0, 1, 0, 0, -1, 1, 0, 0];
+        expected.forEach((value, index) => expect(normals[index]).toBeCloseTo(value, 4));
+    });
+});
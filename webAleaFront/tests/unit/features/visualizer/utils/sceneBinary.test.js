@@ -0,0 +1,93 @@
+/**
+ * @jest-environment node
+ */
+import { describe, test, expect } from "@jest/globals";
+import { decodeSceneBinary } from "../../../../../src/features/visualizer/utils/sceneBinary";
+
+function encodeScene(header, chunks) {
+    const json = JSON.stringify(header);
+    const headerBytes = new TextEncoder().encode(json + " ".repeat((4 - (json.length % 4)) % 4));
+    const bufferLength = chunks.reduce((total, chunk) => total + chunk.byteLength, 0);
+    const out = new ArrayBuffer(12 + headerBytes.length + bufferLength);
+    const view = new DataView(out);
+    new Uint8Array(out, 0, 4).set(new TextEncoder().encode("WASB"));
+    view.setUint32(4, 1, true);
+    view.setUint32(8, headerBytes.length, true);
+    new Uint8Array(out, 12, headerBytes.length).set(headerBytes);
+    let offset = 12 + headerBytes.length;
+    chunks.forEach(chunk => {
+        new Uint8Array(out, offset, chunk.byteLength).set(new Uint8Array(chunk.buffer));
+        offset += chunk.byteLength;
+    });
+    return out;
+}
+
+describe("sceneBinary", () => {
+    test("decodes typed geometry views and materials", () => {
+        const vertices = new Float32Array([0, 0, 0, 1, 0, 0, 0, 1, 0]);
+        const indices = new Uint16Array([0, 1, 2, 0]);
+        const header = {
+            version: 1,
+            objects: [{
+                id: "a",
+                objectType: "mesh",
+                geometry: {
+                    type: "mesh",
+                    vertices: { byteOffset: 0, count: 9, componentType: "float32", itemSize: 3 },
+                    indices: { byteOffset: 36, count: 3, componentType: "uint16", itemSize: 1 }
+                },
+                materialIndex: 0
+            }],
+            materials: [{ color: [1, 0, 0], opacity: 1 }],
+            bufferByteLength: 44
+        };
+
+        const scene = decodeSceneBinary(encodeScene(header, [vertices, indices]));
+        const [obj] = scene.objects;
+
+        expect(obj.geometry.vertices).toBeInstanceOf(Float32Array);
+        expect(Array.from(obj.geometry.vertices)).toEqual(Array.from(vertices));
+        expect(obj.geometry.indices).toBeInstanceOf(Uint16Array);
+        expect(Array.from(obj.geometry.indices)).toEqual([0, 1, 2]);
+        expect(obj.material).toEqual({ color: [1, 0, 0], opacity: 1 });
+        expect(obj.materialIndex).toBeUndefined();
+    });
+
+    test("rejects other payloads", () => {
+        const buffer = new TextEncoder().encode("{\"objects\": []}  ").buffer;
+        expect(() => decodeSceneBinary(buffer)).toThrow("Not a WebAlea binary scene");
+    });
+
+    test("decodes compact meshes", () => {
+        const vertices = new Uint16Array([0, 0, 0, 65535, 0, 0, 0, 65535, 0, 0]);
+        const normals = new Int16Array([0, 0, 0, 0, 0, 0]);
+        const indices = new Uint16Array([0, 1, 2, 0]);
+        const header = {
+            version: 1,
+            objects: [{
+                id: "a",
+                objectType: "mesh",
+                geometry: {
+                    type: "mesh",
+                    encoding: "compact",
+                    vertices: { byteOffset: 0, count: 9, componentType: "uint16", itemSize: 3 },
+                    quantization: { offset: [1, 0, 0], scale: [2 / 65535, 1 / 65535, 1] },
+                    normals: { byteOffset: 20, count: 6, componentType: "int16", itemSize: 2 },
+                    indices: { byteOffset: 32, count: 3, componentType: "uint16", itemSize: 1 }
+                }
+            }],
+            materials: [],
+            bufferByteLength: 40
+        };
+
+        const [obj] = decodeSceneBinary(encodeScene(header, [vertices, normals, indices])).objects;
+
+        expect(obj.geometry.vertices).toBeInstanceOf(Float32Array);
+        expect(Array.from(obj.geometry.vertices)).toEqual([1, 0, 0, 3, 0, 0, 1, 1, 0]);
+        expect(Array.from(obj.geometry.normals)).toEqual([0, 0, 1, 0, 0, 1, 0, 0, 1]);
+        expect(Array.from(obj.geometry.indices)).toEqual([0, 1, 2]);
+        expect(obj.geometry.encoding).toBeUndefined();
+        expect(obj.geometry.quantization).toBeUndefined();
+    });
+
+});
@@ -0,0 +1,34 @@
+import { describe, test, expect } from "@jest/globals";
+import { applySceneDiff } from "../../../../../src/features/visualizer/utils/sceneDiff";
+
+const scene = {
+    objects: [
+        { id: "a", geometryRef: "g0" },
+        { id: "b", geometryRef: "g0" },
+        { id: "c", geometryRef: "g1" }
+    ],
+    geometries: { g0: { type: "mesh" }, g1: { type: "mesh" } }
+};
+
+describe("applySceneDiff", () => {
+    test("drops removed and replaced objects and appends the new ones", () => {
+        const next = applySceneDiff(scene, {
+            added: [{ id: "d", geometryRef: "h1" }],
+            changed: [{ id: "b2", geometryRef: "g0", previousId: "b" }],
+            removed: ["c"],
+            geometries: { h1: { type: "line" } },
+            bounds: { min: [0, 0, 0], max: [1, 1, 1] }
+        });
+
+        expect(next.objects.map((obj) => obj.id)).toEqual(["a", "d", "b2"]);
+        expect(next.objects[2].previousId).toBeUndefined();
+        expect(Object.keys(next.geometries).sort()).toEqual(["g0", "h1"]);
+        expect(next.bounds).toEqual({ min: [0, 0, 0], max: [1, 1, 1] });
+    });
+
+    test("keeps the scene when nothing changed", () => {
+        const next = applySceneDiff(scene, { added: [], changed: [], removed: [], geometries: {} });
+        expect(next.objects).toEqual(scene.objects);
+        expect(next).not.toBe(scene);
+    });
+});
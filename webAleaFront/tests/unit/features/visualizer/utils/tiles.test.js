@@ -0,0 +1,43 @@
+import { describe, test, expect } from "@jest/globals";
+import * as THREE from "three";
+import { selectTiles } from "../../../../../src/features/visualizer/utils/tiles";
+
+const tileset = {
+    root: "r",
+    tiles: [
+        { id: "r", bounds: { min: [0, 0, 0], max: [20, 10, 1] }, children: ["r0", "r1"] },
+        { id: "r0", bounds: { min: [0, 0, 0], max: [10, 10, 1] }, children: [] },
+        { id: "r1", bounds: { min: [10, 0, 0], max: [20, 10, 1] }, children: [] }
+    ]
+};
+
+function cameraAt(position, target) {
+    const camera = new THREE.PerspectiveCamera(60, 1, 0.1, 10000);
+    camera.position.set(...position);
+    camera.lookAt(new THREE.Vector3(...target));
+    camera.updateMatrixWorld();
+    return camera;
+}
+
+describe("selectTiles", () => {
+    test("draws the root coarse level from far away", () => {
+        const camera = cameraAt([10, 5, 1000], [10, 5, 0]);
+        expect(selectTiles(tileset, camera)).toEqual([{ id: "r", level: "coarse" }]);
+    });
+
+    test("refines into visible children up close", () => {
+        const camera = cameraAt([5, 5, 5], [5, 5, 0]);
+        const selected = selectTiles(tileset, camera);
+        expect(selected).toContainEqual({ id: "r0", level: "fine" });
+        expect(selected.every(({ id }) => id !== "r")).toBe(true);
+    });
+
+    test("skips tiles outside the frustum", () => {
+        const camera = cameraAt([10, 5, 1000], [10, 5, 2000]);
+        expect(selectTiles(tileset, camera)).toEqual([]);
+    });
+
+    test("handles a missing tileset", () => {
+        expect(selectTiles(null, cameraAt([0, 0, 5], [0, 0, 0]))).toEqual([]);
+    });
+});
@@ -1,8 +1,10 @@
 import { describe, test, expect, jest } from "@jest/globals";
+import * as THREE from "three";
 import {
     applyTransform,
     getTransformComponents,
-    isIdentityTransform
+    isIdentityTransform,
+    transformToMatrix
 } from "../../../../../src/features/visualizer/utils/transforms";
 
 describe("transforms utils", () => {
@@ -38,4 +40,21 @@ describe("transforms utils", () => {
         expect(object3D.rotation.set).toHaveBeenCalledWith(0.1, 0.2, 0.3);
         expect(object3D.scale.set).toHaveBeenCalledWith(2, 2, 2);
     });
+
+    test("matrix transforms are applied without decomposition", () => {
+        const matrix = [2, 0, 0, 0, 0.5, 1, 0, 0, 0, 0, 1, 0, 1, 2, 3, 1];
+        const object3D = new THREE.Object3D();
+
+        applyTransform(object3D, { matrix });
+
+        expect(isIdentityTransform({ matrix })).toBe(false);
+        expect(object3D.matrixAutoUpdate).toBe(false);
+        expect(object3D.matrix.toArray()).toEqual(matrix);
+    });
+
+    test("transformToMatrix composes position, rotation and scale", () => {
+        const matrix = transformToMatrix({ position: [1, 2, 3], scale: [2, 2, 2] });
+        const expected = new THREE.Matrix4().makeScale(2, 2, 2).setPosition(1, 2, 3);
+        expect(matrix.equals(expected)).toBe(true);
+    });
 });
@@ -4,7 +4,9 @@
 jest.mock(
     "../../../../../src/api/runnerAPI.js",
     () => ({
-        executeNode: jest.fn()
+        executeNode: jest.fn(),
+        executeNodeBatch: jest.fn(),
+        cancelExecution: jest.fn(() => Promise.resolve({ cancelled: true }))
     })
 );
 
@@ -19,7 +21,7 @@ import WorkflowValidator from "../../../../../src/features/workspace/engine/Work
 
 import { NodeState } from "../../../../../src/features/workspace/constants/nodeState.js";
 
-import { executeNode } from "../../../../../src/api/runnerAPI.js";
+import { cancelExecution, executeNode, executeNodeBatch } from "../../../../../src/api/runnerAPI.js";
 import {
     describe,
     test,
@@ -139,6 +141,44 @@ describe("WorkflowEngine - Units Tests", () => {
         );
     });
 
+    /* --------------------------------------------------------------- */
+    /* start() – batched backend nodes */
+    /* --------------------------------------------------------------- */
+
+    test("start sends ready backend nodes in one batch request", async () => {
+        WorkflowValidator.validate.mockReturnValueOnce({ valid: true, errors: [], warnings: [] });
+        executeNodeBatch.mockImplementationOnce(async (requests, { onResult }) => {
+            onResult({ success: true, node_id: "A", outputs: [{ value: 1 }] });
+            onResult({ success: false, node_id: "B", error: "Backend error" });
+        });
+        engine.bindModel([createNode("A"), createNode("B")], []);
+
+        const result = await engine.start();
+
+        expect(executeNode).not.toHaveBeenCalled();
+        expect(executeNodeBatch).toHaveBeenCalledTimes(1);
+        const [requests] = executeNodeBatch.mock.calls[0];
+        expect(requests.map(request => request.nodeId)).toEqual(["A", "B"]);
+        expect(requests.every(request => request.executionId)).toBe(true);
+        expect(result.success).toBe(false);
+        expect(engine.results.A).toEqual([{ value: 1 }]);
+        expect(engine.nodeStates.get("B")).toBe(NodeState.ERROR);
+        expect(engine.activeExecutionIds.size).toBe(0);
+    });
+
+    test("batch nodes without a result fail", async () => {
+        WorkflowValidator.validate.mockReturnValueOnce({ valid: true, errors: [], warnings: [] });
+        executeNodeBatch.mockImplementationOnce(async (requests, { onResult }) => {
+            onResult({ success: true, node_id: "A", outputs: [] });
+        });
+        engine.bindModel([createNode("A"), createNode("B")], []);
+
+        await engine.start();
+
+        expect(engine.nodeStates.get("A")).toBe(NodeState.COMPLETED);
+        expect(engine.nodeStates.get("B")).toBe(NodeState.ERROR);
+    });
+
     /* --------------------------------------------------------------- */
     /* stop() */
     /* --------------------------------------------------------------- */
@@ -160,6 +200,16 @@ describe("WorkflowEngine - Units Tests", () => {
         expect(listener).toHaveBeenCalledWith("workflow-stopped", {});
     });
 
+    test("stop cancels in-flight backend executions", () => {
+        engine.running = true;
+        engine.activeExecutionIds.add("A-1");
+
+        engine.stop();
+
+        expect(cancelExecution).toHaveBeenCalledWith("A-1");
+        expect(engine.activeExecutionIds.size).toBe(0);
+    });
+
     /* --------------------------------------------------------------- */
     /* executeNodeManual */
     /* --------------------------------------------------------------- */